@@ -5,11 +5,13 @@ Phase 7 Admin Dashboard Implementation:
 - System health status
 - Manual cleanup trigger
 - Aggregation status and triggers
+- Correlation cluster inspection at several thresholds
 
 Created: December 22, 2025
 """
 from datetime import date, datetime, timedelta
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, text
@@ -146,6 +148,36 @@ async def get_aggregation_status_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/correlation-clusters/{portfolio_id}")
+async def get_correlation_clusters_endpoint(
+    portfolio_id: UUID,
+    thresholds: List[float] = Query(default=[0.5, 0.7, 0.9], description="Absolute correlation thresholds"),
+    lookback_days: int = Query(default=90, ge=30, le=365, description="Correlation lookback"),
+    db: AsyncSession = Depends(get_db),
+    admin: AdminUser = Depends(get_current_admin)
+):
+    """
+    Get correlation clusters for a portfolio at several thresholds.
+
+    Cuts one cluster hierarchy built from the stored correlation matrix,
+    so additional thresholds do not recompute anything.
+    """
+    from app.services.correlation_service import CorrelationService
+
+    if any(not 0 < t <= 1 for t in thresholds):
+        raise HTTPException(status_code=400, detail="Thresholds must be in (0, 1]")
+
+    logger.info(f"Admin {admin.email} checking correlation clusters for {portfolio_id}")
+
+    try:
+        return await CorrelationService(db).get_cluster_hierarchy(
+            portfolio_id, thresholds=thresholds, lookback_days=lookback_days
+        )
+    except Exception as e:
+        logger.error(f"Failed to get correlation clusters: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/retention/status")
 async def get_retention_status_endpoint(
     db: AsyncSession = Depends(get_db),
@@ -718,7 +718,9 @@ async def get_aggregate_correlation_matrix(
     """
     try:
         from app.models.positions import Position
-        from app.models.correlations import PairwiseCorrelation, CorrelationCalculation
+        from app.models.correlations import CorrelationCalculation
+        from app.services.correlation_storage import load_correlation_matrix
+        import numpy as np
         from app.calculations.market_data import get_position_value
         from sqlalchemy import select, and_, func
 
@@ -793,39 +795,22 @@ async def get_aggregate_correlation_matrix(
                 "metadata": {"reason": "no_calculation_available"}
             }
 
-        # Get pairwise correlations
-        corr_stmt = select(PairwiseCorrelation).where(
-            PairwiseCorrelation.correlation_calculation_id == latest_calc.id
-        )
-        corr_result = await db.execute(corr_stmt)
-        correlations = corr_result.scalars().all()
+        # Get the correlation matrix
+        matrix_data = await load_correlation_matrix(db, latest_calc)
+        index = matrix_data.symbol_index() if matrix_data is not None else {}
 
-        # Build correlation lookup
-        corr_lookup: Dict[tuple, float] = {}
-        for corr in correlations:
-            corr_lookup[(corr.symbol_1, corr.symbol_2)] = float(corr.correlation_value)
-            corr_lookup[(corr.symbol_2, corr.symbol_1)] = float(corr.correlation_value)
+        # Build matrix for top symbols that are in the calculation
+        symbols_with_data = [symbol for symbol in top_symbols if symbol in index]
 
-        # Build matrix for top symbols
         matrix = {}
-        symbols_with_data = []
-
-        for symbol in top_symbols:
-            # Check if this symbol has any correlation data
-            has_data = any(
-                (symbol, other) in corr_lookup or (other, symbol) in corr_lookup
-                for other in top_symbols if other != symbol
-            )
-            if has_data or symbol in [c.symbol_1 for c in correlations] + [c.symbol_2 for c in correlations]:
-                symbols_with_data.append(symbol)
-
         for symbol1 in symbols_with_data:
             matrix[symbol1] = {}
             for symbol2 in symbols_with_data:
                 if symbol1 == symbol2:
                     matrix[symbol1][symbol2] = 1.0
                 else:
-                    matrix[symbol1][symbol2] = corr_lookup.get((symbol1, symbol2), 0.0)
+                    value = matrix_data.correlations[index[symbol1], index[symbol2]]
+                    matrix[symbol1][symbol2] = 0.0 if np.isnan(value) else float(value)
 
         response = {
             "available": True,
@@ -24,6 +24,8 @@ from app.schemas.analytics import (
     PortfolioFactorExposuresResponse,
     PositionFactorExposuresResponse,
     StressTestResponse,
+    WhatIfStressTestRequest,
+    WhatIfStressTestResponse,
     PortfolioRiskMetricsResponse,
     SectorExposureResponse,
     ConcentrationMetricsResponse,
@@ -37,6 +39,7 @@ from app.services.portfolio_analytics_service import PortfolioAnalyticsService
 from app.services.correlation_service import CorrelationService
 from app.services.factor_exposure_service import FactorExposureService
 from app.services.stress_test_service import StressTestService
+from app.services.stress_what_if_service import StressWhatIfService
 from app.services.risk_metrics_service import RiskMetricsService
 from app.services.preprocessing_service import preprocessing_service
 from app.services.batch_trigger_service import batch_trigger_service
@@ -335,6 +338,52 @@ async def get_stress_test_results(
         raise HTTPException(status_code=500, detail="Internal server error retrieving stress test results")
 
 
+@router.post("/{portfolio_id}/stress-test/what-if", response_model=WhatIfStressTestResponse)
+async def run_what_if_stress_test(
+    portfolio_id: UUID,
+    request: WhatIfStressTestRequest,
+    current_user: User = Depends(get_current_user_clerk),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Evaluate ad-hoc factor shocks against the portfolio's latest factor exposures.
+
+    Optional position changes (symbol, signed market value change) are applied
+    through symbol factor betas before shocking. Exposure vectors and the day's
+    factor correlation matrix are cached in-process; nothing is stored.
+    """
+    try:
+        start = time.time()
+        await validate_portfolio_ownership(db, portfolio_id, current_user.id)
+
+        position_changes: dict = {}
+        for change in request.position_changes:
+            position_changes[change.symbol] = position_changes.get(change.symbol, 0.0) + change.market_value_change
+
+        svc = StressWhatIfService(db)
+        result = await svc.run(
+            portfolio_id,
+            [scenario.model_dump() for scenario in request.scenarios],
+            position_changes=position_changes,
+        )
+
+        elapsed = time.time() - start
+        if elapsed > 0.3:
+            logger.warning(f"Slow what-if stress-test response: {elapsed:.2f}s for portfolio {portfolio_id}")
+        else:
+            logger.info(f"What-if stress-test computed in {elapsed:.3f}s for portfolio {portfolio_id}")
+
+        return WhatIfStressTestResponse(**result)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"Portfolio not found: {portfolio_id} for user {current_user.id}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"What-if stress test failed for {portfolio_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error running what-if stress test")
+
+
 @router.get(
     "/{portfolio_id}/risk-metrics", 
     response_model=PortfolioRiskMetricsResponse,
@@ -1088,6 +1088,9 @@ async def get_factor_etf_prices(
     """
     Get historical prices for factor ETFs used in the 7-factor risk model.
     Returns prices and returns for factor regression calculations.
+
+    Daily returns (last lookback_days trading days) come from the persisted
+    factor_returns table via get_factor_returns().
     """
     # Define factor ETF mappings
     factor_etf_map = {
@@ -1107,7 +1110,12 @@ async def get_factor_etf_prices(
     
     async with db as session:
         from datetime import timedelta
-        
+        from app.calculations.factor_returns import get_factor_returns
+
+        # Calendar window wide enough for lookback_days trading days
+        returns_end = utc_now().date()
+        returns_start = returns_end - timedelta(days=int(lookback_days * 7 / 5) + 10)
+
         # Get real ETF data from database
         factors_data = {}
         
@@ -1121,6 +1129,14 @@ async def get_factor_etf_prices(
             market_data = cache_result.scalar_one_or_none()
             
             if market_data:
+                etf_returns = await get_factor_returns(
+                    session, [etf_symbol], returns_start, returns_end
+                )
+                returns_series = (
+                    etf_returns[etf_symbol].tail(lookback_days) if not etf_returns.empty
+                    else None
+                )
+
                 # Return real market data
                 factors_data[etf_symbol] = {
                     "factor_name": factor_name,
@@ -1134,7 +1150,11 @@ async def get_factor_etf_prices(
                     "updated_at": to_utc_iso8601(market_data.updated_at),
                     "data_source": market_data.data_source,
                     "exchange": market_data.exchange,
-                    "market_cap": float(market_data.market_cap) if market_data.market_cap else None
+                    "market_cap": float(market_data.market_cap) if market_data.market_cap else None,
+                    "daily_return": float(returns_series.iloc[-1]) if returns_series is not None and len(returns_series) else None,
+                    "returns": {
+                        to_iso_date(ts.date()): float(value) for ts, value in returns_series.items()
+                    } if returns_series is not None else {}
                 }
         
         return {
@@ -8,12 +8,14 @@ Simplified approach (V1):
 - No realized gains, dividends, fees, or corporate actions (future enhancement)
 """
 import asyncio
-from datetime import date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Any, Optional
-from uuid import UUID
+from typing import Dict, List, Any, Optional, Set, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, and_, func, case
+import numpy as np
+from sqlalchemy import select, and_, func, case, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
@@ -36,6 +38,10 @@ from sqlalchemy.exc import IntegrityError  # Phase 2.10: Duplicate detection
 
 logger = get_logger(__name__)
 
+OPTION_POSITION_TYPES = (PositionType.LC, PositionType.LP, PositionType.SC, PositionType.SP)
+PREVIOUS_PRICE_LOOKBACK_DAYS = 10
+SNAPSHOT_UPSERT_CHUNK_ROWS = 500  # Portfolios per set-based transaction; ~40 columns per row stays under 32767 bind params
+
 
 class PnLCalculator:
     """
@@ -53,7 +59,8 @@ class PnLCalculator:
         calculation_date: date,
         db: Optional[AsyncSession] = None,
         portfolio_ids: Optional[List[UUID]] = None,
-        price_cache: Optional[PriceCache] = None
+        price_cache: Optional[PriceCache] = None,
+        set_based: bool = False
     ) -> Dict[str, Any]:
         """
         Calculate P&L for all active portfolios
@@ -63,6 +70,8 @@ class PnLCalculator:
             db: Optional database session
             portfolio_ids: Optional list of specific portfolios to process
             price_cache: Optional pre-loaded price cache for optimization
+            set_based: If True, process all portfolios in one pass with bulk
+                queries and a bulk snapshot upsert (see _process_all_set_based)
 
         Returns:
             Summary of portfolios processed
@@ -70,12 +79,13 @@ class PnLCalculator:
         logger.info(f"Phase 2: P&L Calculation for {calculation_date}")
 
         start_time = asyncio.get_event_loop().time()
+        process = self._process_all_set_based if set_based else self._process_all_with_session
 
         if db is None:
             async with AsyncSessionLocal() as session:
-                result = await self._process_all_with_session(session, calculation_date, portfolio_ids, price_cache)
+                result = await process(session, calculation_date, portfolio_ids, price_cache)
         else:
-            result = await self._process_all_with_session(db, calculation_date, portfolio_ids, price_cache)
+            result = await process(db, calculation_date, portfolio_ids, price_cache)
 
         duration = int(asyncio.get_event_loop().time() - start_time)
         result['duration_seconds'] = duration
@@ -150,6 +160,596 @@ class PnLCalculator:
             'errors': errors
         }
 
+    async def _process_all_set_based(
+        self,
+        db: AsyncSession,
+        calculation_date: date,
+        portfolio_ids: Optional[List[UUID]] = None,
+        price_cache: Optional[PriceCache] = None
+    ) -> Dict[str, Any]:
+        """
+        Process all portfolios set-based, in chunks of SNAPSHOT_UPSERT_CHUNK_ROWS
+
+        Produces the same snapshots and equity rollforward as calling
+        calculate_portfolio_pnl() per portfolio, with a fixed number of queries
+        per chunk (see _process_chunk_set_based). Each chunk is its own
+        transaction; a chunk that fails is rolled back and retried through the
+        per-portfolio path, so one bad portfolio cannot blank the whole run.
+        """
+        summary = {
+            'success': True,
+            'portfolios_processed': 0,
+            'snapshots_created': 0,
+            'errors': []
+        }
+
+        if not trading_calendar.is_trading_day(calculation_date):
+            logger.debug(f"{calculation_date} is not a trading day, skipping")
+            return summary
+
+        query = select(Portfolio.id, Portfolio.equity_balance).where(Portfolio.deleted_at.is_(None))
+        if portfolio_ids is not None:
+            query = query.where(Portfolio.id.in_(portfolio_ids))
+        result = await db.execute(query)
+        initial_equity = {portfolio_id: equity for portfolio_id, equity in result.all()}
+
+        logger.debug(f"Found {len(initial_equity)} active portfolios")
+
+        ids = list(initial_equity)
+        for i in range(0, len(ids), SNAPSHOT_UPSERT_CHUNK_ROWS):
+            chunk = ids[i:i + SNAPSHOT_UPSERT_CHUNK_ROWS]
+            try:
+                written = await self._process_chunk_set_based(
+                    db, calculation_date, {pid: initial_equity[pid] for pid in chunk}, price_cache
+                )
+            except Exception as e:
+                logger.error(
+                    f"Set-based P&L failed for {len(chunk)} portfolios on {calculation_date}: {e}; "
+                    f"retrying them one portfolio at a time",
+                    exc_info=True
+                )
+                await db.rollback()
+                fallback = await self._process_all_with_session(db, calculation_date, chunk, price_cache)
+                summary['portfolios_processed'] += fallback['portfolios_processed']
+                summary['snapshots_created'] += fallback['snapshots_created']
+                summary['errors'].extend(fallback['errors'])
+                continue
+
+            summary['portfolios_processed'] += written
+            summary['snapshots_created'] += written
+
+        summary['success'] = len(summary['errors']) == 0
+        return summary
+
+    async def _process_chunk_set_based(
+        self,
+        db: AsyncSession,
+        calculation_date: date,
+        initial_equity: Dict[UUID, Optional[Decimal]],
+        price_cache: Optional[PriceCache] = None
+    ) -> int:
+        """
+        Calculate and write the snapshots of one chunk of portfolios
+
+        1. Claim all (portfolio, date) slots with one INSERT ... ON CONFLICT DO NOTHING
+           (same semantics as lock_snapshot_slot(): incomplete snapshots from
+           crashed runs are deleted and re-claimed, complete ones are skipped)
+        2. Bulk-load positions, previous snapshots, realized P&L, capital flows
+           and prices (one query each)
+        3. Compute P&L, equity, exposures and cash for every portfolio with numpy
+        4. Update all equity balances, run sector analysis on the current date
+           (as populate_snapshot_data() does), upsert all snapshots
+           (is_complete=True) and commit
+
+        Provider beta is left empty; the snapshot analytics pass fills it.
+
+        Returns:
+            Number of snapshots written
+        """
+        claimed = await self._claim_snapshot_slots(db, list(initial_equity), calculation_date)
+        skipped = len(initial_equity) - len(claimed)
+        if skipped:
+            logger.info(
+                f"    [IDEMPOTENCY] {skipped} portfolios already have a snapshot for "
+                f"{calculation_date}, skipping duplicate run"
+            )
+        if not claimed:
+            return 0
+
+        positions = await self._load_positions(db, claimed, calculation_date)
+        previous_snapshots = await self._load_previous_snapshots(db, claimed, calculation_date)
+        realized_pnl = await self._load_daily_realized_pnl(db, claimed, calculation_date)
+        capital_flows = await self._load_daily_capital_flows(db, claimed, calculation_date)
+        prices = await self._load_prices(
+            db, {position.symbol for position in positions}, calculation_date, price_cache
+        )
+
+        rows = self._build_snapshot_rows(
+            claimed=claimed,
+            calculation_date=calculation_date,
+            initial_equity=initial_equity,
+            positions=positions,
+            previous_snapshots=previous_snapshots,
+            realized_pnl=realized_pnl,
+            capital_flows=capital_flows,
+            prices=prices
+        )
+
+        # Equity first: sector weights use the rolled-forward equity_balance
+        await db.execute(
+            update(Portfolio),
+            [{'id': row['portfolio_id'], 'equity_balance': row['equity_balance']} for row in rows]
+        )
+        if calculation_date >= date.today():
+            await self._add_sector_analysis(db, rows, calculation_date)
+        await self._upsert_snapshots(db, rows)
+        await db.commit()
+
+        total_pnl = sum(row['daily_pnl'] for row in rows)
+        logger.info(
+            f"[EQUITY] {calculation_date}: {len(rows)} portfolios, total PnL ${total_pnl:,.0f}"
+        )
+        return len(rows)
+
+    async def _add_sector_analysis(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        calculation_date: date
+    ) -> None:
+        """
+        Fill sector exposure and concentration on snapshot rows (current date only)
+
+        Same fields and failure handling as populate_snapshot_data(); company
+        profiles are shared across the chunk.
+        """
+        from app.calculations.sector_analysis import calculate_portfolio_sector_concentration
+
+        profile_cache: Dict[str, Dict[str, Optional[Any]]] = {}
+        for row in rows:
+            try:
+                sector_result = await calculate_portfolio_sector_concentration(
+                    db=db,
+                    portfolio_id=row['portfolio_id'],
+                    calculation_date=calculation_date,
+                    profile_cache=profile_cache
+                )
+            except Exception as e:
+                logger.warning(f"Could not calculate sector/concentration metrics for {row['portfolio_id']}: {e}")
+                continue
+
+            if not sector_result.get('success'):
+                logger.warning(f"Sector analysis failed for {row['portfolio_id']}: {sector_result.get('error')}")
+                continue
+
+            if sector_result.get('sector_exposure'):
+                row['sector_exposure'] = sector_result['sector_exposure'].get('portfolio_weights', {})
+            if sector_result.get('concentration'):
+                conc = sector_result['concentration']
+                row['hhi'] = Decimal(str(conc.get('hhi', 0)))
+                row['effective_num_positions'] = Decimal(str(conc.get('effective_num_positions', 0)))
+                row['top_3_concentration'] = Decimal(str(conc.get('top_3_concentration', 0)))
+                row['top_10_concentration'] = Decimal(str(conc.get('top_10_concentration', 0)))
+
+    async def _claim_snapshot_slots(
+        self,
+        db: AsyncSession,
+        portfolio_ids: List[UUID],
+        calculation_date: date
+    ) -> List[UUID]:
+        """
+        Bulk version of lock_snapshot_slot(): insert placeholders for many portfolios
+
+        Incomplete snapshots (crashed runs) are deleted and committed first, as
+        calculate_portfolio_pnl() does on recovery. Placeholders are then inserted
+        with ON CONFLICT DO NOTHING; portfolios whose insert conflicts already
+        have a complete snapshot, or are being processed by another run, and are
+        skipped. Placeholders are committed together with the chunk's snapshots,
+        so other runs wait on them.
+
+        Returns:
+            Portfolio IDs whose slot this run owns
+        """
+        result = await db.execute(
+            delete(PortfolioSnapshot).where(
+                and_(
+                    PortfolioSnapshot.portfolio_id.in_(portfolio_ids),
+                    PortfolioSnapshot.snapshot_date == calculation_date,
+                    PortfolioSnapshot.is_complete.is_(False)
+                )
+            ).returning(PortfolioSnapshot.portfolio_id)
+        )
+        recovered = list(result.scalars().all())
+        if recovered:
+            logger.info(
+                f"    [RECOVERY] Deleted {len(recovered)} incomplete snapshots for {calculation_date}, retrying"
+            )
+            await db.commit()
+
+        now = datetime.utcnow()
+        placeholders = [
+            {
+                'id': uuid4(),
+                'portfolio_id': portfolio_id,
+                'snapshot_date': calculation_date,
+                'total_value': Decimal('0'),
+                'cash_value': Decimal('0'),
+                'long_value': Decimal('0'),
+                'short_value': Decimal('0'),
+                'gross_exposure': Decimal('0'),
+                'net_exposure': Decimal('0'),
+                'num_positions': 0,
+                'num_long_positions': 0,
+                'num_short_positions': 0,
+                'is_complete': False,
+                'created_at': now,
+            }
+            for portfolio_id in portfolio_ids
+        ]
+
+        result = await db.execute(
+            pg_insert(PortfolioSnapshot.__table__).values(placeholders).on_conflict_do_nothing(
+                index_elements=['portfolio_id', 'snapshot_date']
+            ).returning(PortfolioSnapshot.__table__.c.portfolio_id)
+        )
+        claimed = list(result.scalars().all())
+
+        logger.debug(f"    [IDEMPOTENCY] Locked {len(claimed)}/{len(portfolio_ids)} snapshot slots")
+        return claimed
+
+    async def _load_positions(
+        self,
+        db: AsyncSession,
+        portfolio_ids: List[UUID],
+        calculation_date: date
+    ) -> List[Any]:
+        """Positions entered on or before calculation_date (same filter as _calculate_daily_pnl)"""
+        result = await db.execute(
+            select(
+                Position.portfolio_id,
+                Position.symbol,
+                Position.quantity,
+                Position.position_type,
+                Position.investment_class,
+                Position.exit_date,
+                Position.market_value,
+                Position.entry_price
+            ).where(
+                and_(
+                    Position.portfolio_id.in_(portfolio_ids),
+                    Position.entry_date <= calculation_date,
+                    Position.deleted_at.is_(None)
+                )
+            )
+        )
+        return list(result.all())
+
+    async def _load_previous_snapshots(
+        self,
+        db: AsyncSession,
+        portfolio_ids: List[UUID],
+        calculation_date: date
+    ) -> Dict[UUID, Any]:
+        """Most recent snapshot before calculation_date per portfolio (DISTINCT ON)"""
+        result = await db.execute(
+            select(
+                PortfolioSnapshot.portfolio_id,
+                PortfolioSnapshot.equity_balance,
+                PortfolioSnapshot.cumulative_pnl,
+                PortfolioSnapshot.cumulative_realized_pnl,
+                PortfolioSnapshot.cumulative_capital_flow
+            ).where(
+                and_(
+                    PortfolioSnapshot.portfolio_id.in_(portfolio_ids),
+                    PortfolioSnapshot.snapshot_date < calculation_date
+                )
+            ).distinct(
+                PortfolioSnapshot.portfolio_id
+            ).order_by(
+                PortfolioSnapshot.portfolio_id,
+                PortfolioSnapshot.snapshot_date.desc()
+            )
+        )
+        return {row.portfolio_id: row for row in result.all()}
+
+    async def _load_daily_realized_pnl(
+        self,
+        db: AsyncSession,
+        portfolio_ids: List[UUID],
+        calculation_date: date
+    ) -> Dict[UUID, Decimal]:
+        """Realized P&L from trades on calculation_date, per portfolio"""
+        result = await db.execute(
+            select(
+                PositionRealizedEvent.portfolio_id,
+                func.sum(PositionRealizedEvent.realized_pnl)
+            ).where(
+                and_(
+                    PositionRealizedEvent.portfolio_id.in_(portfolio_ids),
+                    PositionRealizedEvent.trade_date == calculation_date,
+                )
+            ).group_by(PositionRealizedEvent.portfolio_id)
+        )
+        return {portfolio_id: total or Decimal('0') for portfolio_id, total in result.all()}
+
+    async def _load_daily_capital_flows(
+        self,
+        db: AsyncSession,
+        portfolio_ids: List[UUID],
+        calculation_date: date
+    ) -> Dict[UUID, Decimal]:
+        """Net contributions minus withdrawals on calculation_date, per portfolio"""
+        contributions_case = case(
+            (EquityChange.change_type == EquityChangeType.CONTRIBUTION, EquityChange.amount),
+            else_=Decimal("0"),
+        )
+        withdrawals_case = case(
+            (EquityChange.change_type == EquityChangeType.WITHDRAWAL, EquityChange.amount),
+            else_=Decimal("0"),
+        )
+
+        result = await db.execute(
+            select(
+                EquityChange.portfolio_id,
+                func.coalesce(func.sum(contributions_case), Decimal("0")),
+                func.coalesce(func.sum(withdrawals_case), Decimal("0")),
+            ).where(
+                EquityChange.portfolio_id.in_(portfolio_ids),
+                EquityChange.change_date == calculation_date,
+                EquityChange.deleted_at.is_(None),
+            ).group_by(EquityChange.portfolio_id)
+        )
+        return {
+            portfolio_id: Decimal(contributions or 0) - Decimal(withdrawals or 0)
+            for portfolio_id, contributions, withdrawals in result.all()
+        }
+
+    async def _load_prices(
+        self,
+        db: AsyncSession,
+        symbols: Set[str],
+        calculation_date: date,
+        price_cache: Optional[PriceCache] = None
+    ) -> Dict[str, Tuple[float, float, float]]:
+        """
+        Prices for many symbols from one query (latest two closes per symbol)
+
+        Returns:
+            symbol -> (current, previous, snapshot) prices, NaN when missing:
+            - current: price_cache, else the calculation_date close (> 0),
+              as _get_cached_price()
+            - previous: latest close in the PREVIOUS_PRICE_LOOKBACK_DAYS before
+              calculation_date, as get_previous_trading_day_price()
+            - snapshot: latest close on or before calculation_date, as the
+              historical prices populate_snapshot_data() values positions at
+        """
+        if not symbols:
+            return {}
+
+        ranked = select(
+            MarketDataCache.symbol,
+            MarketDataCache.date,
+            MarketDataCache.close,
+            func.row_number().over(
+                partition_by=MarketDataCache.symbol,
+                order_by=MarketDataCache.date.desc()
+            ).label('price_rank')
+        ).where(
+            MarketDataCache.symbol.in_({symbol.upper() for symbol in symbols}),
+            MarketDataCache.date <= calculation_date
+        ).subquery()
+        result = await db.execute(
+            select(ranked.c.symbol, ranked.c.date, ranked.c.close).where(ranked.c.price_rank <= 2)
+        )
+
+        closes: Dict[str, List[Tuple[date, Optional[Decimal]]]] = {}
+        for symbol, price_date, close in result.all():
+            closes.setdefault(symbol, []).append((price_date, close))
+
+        earliest_previous = calculation_date - timedelta(days=PREVIOUS_PRICE_LOOKBACK_DAYS)
+        prices = {}
+        for symbol in symbols:
+            current = previous = snapshot = np.nan
+            rows = sorted(closes.get(symbol.upper(), []), key=lambda row: row[0], reverse=True)
+            if rows and rows[0][1] is not None:
+                snapshot = float(rows[0][1])
+            for price_date, close in rows:
+                if price_date == calculation_date:
+                    if close is not None and close > 0:
+                        current = float(close)
+                    continue
+                if price_date >= earliest_previous and close is not None:
+                    previous = float(close)
+                break
+
+            if price_cache:
+                cached = price_cache.get_price(symbol, calculation_date)
+                if cached is not None:
+                    current = float(cached)
+
+            prices[symbol] = (current, previous, snapshot)
+
+        return prices
+
+    def _build_snapshot_rows(
+        self,
+        claimed: List[UUID],
+        calculation_date: date,
+        initial_equity: Dict[UUID, Optional[Decimal]],
+        positions: List[Any],
+        previous_snapshots: Dict[UUID, Any],
+        realized_pnl: Dict[UUID, Decimal],
+        capital_flows: Dict[UUID, Decimal],
+        prices: Dict[str, Tuple[float, float, float]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Compute complete snapshot rows for all claimed portfolios with array math
+
+        Position-level P&L and exposures are computed as flat arrays and summed
+        per portfolio with np.bincount; the equity rollforward and the P&L
+        fields follow calculate_portfolio_pnl(), the exposure, cash and count
+        fields follow populate_snapshot_data().
+        """
+        index = {portfolio_id: i for i, portfolio_id in enumerate(claimed)}
+        n_portfolios = len(claimed)
+        n_positions = len(positions)
+        missing = (np.nan, np.nan, np.nan)
+
+        owner = np.fromiter((index[p.portfolio_id] for p in positions), dtype=np.intp, count=n_positions)
+        quantity = np.fromiter((float(p.quantity) for p in positions), dtype=np.float64, count=n_positions)
+        multiplier = np.where(
+            np.fromiter((p.position_type in OPTION_POSITION_TYPES for p in positions), dtype=bool, count=n_positions),
+            100.0,
+            1.0
+        )
+        position_prices = np.array(
+            [prices.get(p.symbol, missing) for p in positions], dtype=np.float64
+        ).reshape(n_positions, 3)
+        current, previous, snapshot_price = position_prices.T
+        private = np.fromiter(
+            (bool(p.investment_class) and str(p.investment_class).upper() == 'PRIVATE' for p in positions),
+            dtype=bool,
+            count=n_positions
+        )
+        has_previous_snapshot = np.fromiter(
+            (p.portfolio_id in previous_snapshots for p in positions), dtype=bool, count=n_positions
+        )
+
+        # Mark-to-market P&L (_calculate_position_pnl): $0 for PRIVATE or unpriced
+        # positions and on a portfolio's first snapshot; a missing prior close
+        # falls back to the current price
+        priced = ~private & (current > 0) & has_previous_snapshot
+        previous = np.where(np.isnan(previous), current, previous)
+        with np.errstate(invalid='ignore'):
+            position_pnl = np.where(priced, (current - previous) * quantity * multiplier, 0.0)
+        unrealized = np.bincount(owner, weights=position_pnl, minlength=n_portfolios)
+
+        # Exposures (_prepare_position_data): positions still open on the date,
+        # PRIVATE positions without a close valued at their own price
+        active = np.fromiter(
+            (p.exit_date is None or p.exit_date > calculation_date for p in positions),
+            dtype=bool,
+            count=n_positions
+        )
+        valuation_price = np.where(
+            np.nan_to_num(snapshot_price) != 0,
+            snapshot_price,
+            np.fromiter((self._private_price(p) for p in positions), dtype=np.float64, count=n_positions)
+        )
+        exposure = np.where(active, quantity * valuation_price * multiplier, np.nan)
+        long_exposure = np.bincount(owner, weights=np.where(exposure > 0, exposure, 0.0), minlength=n_portfolios)
+        short_exposure = np.bincount(owner, weights=np.where(exposure < 0, exposure, 0.0), minlength=n_portfolios)
+        priced_exposure = np.nan_to_num(exposure)
+        gross_exposure = np.bincount(owner, weights=np.abs(priced_exposure), minlength=n_portfolios)
+        net_exposure = np.bincount(owner, weights=priced_exposure, minlength=n_portfolios)
+        num_positions = np.bincount(owner, weights=active, minlength=n_portfolios)
+        num_long = np.bincount(owner, weights=active & (quantity > 0), minlength=n_portfolios)
+
+        now = datetime.utcnow()
+        rows = []
+        for i, portfolio_id in enumerate(claimed):
+            previous_snapshot = previous_snapshots.get(portfolio_id)
+            previous_equity = initial_equity.get(portfolio_id) or Decimal('0')
+            if previous_snapshot:
+                previous_equity = previous_snapshot.equity_balance or previous_equity
+
+            daily_unrealized_pnl = _to_cents(unrealized[i])
+            daily_realized_pnl = realized_pnl.get(portfolio_id, Decimal('0'))
+            daily_capital_flow = capital_flows.get(portfolio_id, Decimal('0'))
+            total_daily_pnl = daily_unrealized_pnl + daily_realized_pnl
+            new_equity = previous_equity + total_daily_pnl + daily_capital_flow
+
+            if previous_snapshot:
+                cumulative_pnl = (previous_snapshot.cumulative_pnl or Decimal('0')) + total_daily_pnl
+                cumulative_realized_pnl = (
+                    (previous_snapshot.cumulative_realized_pnl or Decimal('0')) + daily_realized_pnl
+                )
+                cumulative_capital_flow = (
+                    (previous_snapshot.cumulative_capital_flow or Decimal('0')) + daily_capital_flow
+                )
+            else:
+                cumulative_pnl = total_daily_pnl
+                cumulative_realized_pnl = daily_realized_pnl
+                cumulative_capital_flow = daily_capital_flow
+
+            has_positions = num_positions[i] > 0
+            long_value = _to_cents(long_exposure[i])
+            short_value = _to_cents(short_exposure[i])
+            if has_positions:
+                net_asset_value = new_equity
+                calculated_cash = new_equity - long_value + abs(short_value)
+                cash_value = calculated_cash if calculated_cash > Decimal('0') else Decimal('0')
+            else:
+                # populate_snapshot_data() writes a zero snapshot for empty portfolios
+                net_asset_value = cash_value = Decimal('0')
+            greek = Decimal('0') if has_positions else None
+
+            rows.append({
+                'id': uuid4(),
+                'portfolio_id': portfolio_id,
+                'snapshot_date': calculation_date,
+                'total_value': net_asset_value,
+                'cash_value': cash_value,
+                'long_value': long_value,
+                'short_value': short_value,
+                'gross_exposure': _to_cents(gross_exposure[i]),
+                'net_exposure': _to_cents(net_exposure[i]),
+                'daily_pnl': total_daily_pnl,
+                'daily_return': (total_daily_pnl / previous_equity) if previous_equity > 0 else Decimal('0'),
+                'cumulative_pnl': cumulative_pnl,
+                'daily_realized_pnl': daily_realized_pnl,
+                'cumulative_realized_pnl': cumulative_realized_pnl,
+                'daily_capital_flow': daily_capital_flow,
+                'cumulative_capital_flow': cumulative_capital_flow,
+                'portfolio_delta': greek,
+                'portfolio_gamma': greek,
+                'portfolio_theta': greek,
+                'portfolio_vega': greek,
+                'num_positions': int(num_positions[i]),
+                'num_long_positions': int(num_long[i]),
+                'num_short_positions': int(num_positions[i] - num_long[i]),
+                'equity_balance': new_equity,
+                'sector_exposure': None,
+                'hhi': None,
+                'effective_num_positions': None,
+                'top_3_concentration': None,
+                'top_10_concentration': None,
+                'is_complete': True,
+                'created_at': now,
+            })
+
+        return rows
+
+    @staticmethod
+    def _private_price(position: Any) -> float:
+        """Valuation price for a PRIVATE position without a close (NaN for other positions)"""
+        if position.investment_class != "PRIVATE":
+            return np.nan
+        if position.market_value and position.market_value > 0:
+            return float(position.market_value / position.quantity) if position.quantity else np.nan
+        return float(position.entry_price) if position.entry_price is not None else np.nan
+
+    async def _upsert_snapshots(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """
+        Write completed snapshots over this chunk's placeholders in one bulk upsert
+
+        Only incomplete rows are overwritten, so a complete snapshot is never replaced.
+        """
+        table = PortfolioSnapshot.__table__
+        stmt = pg_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['portfolio_id', 'snapshot_date'],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column not in ('id', 'portfolio_id', 'snapshot_date', 'created_at')
+            },
+            where=table.c.is_complete.is_(False)
+        )
+        await db.execute(stmt)
+
+        logger.debug(f"Upserted {len(rows)} snapshots")
+
     async def calculate_portfolio_pnl(
         self,
         portfolio_id: UUID,
@@ -544,7 +1144,7 @@ class PnLCalculator:
                 db=db,
                 symbol=position.symbol,
                 current_date=calculation_date,
-                max_lookback_days=10,
+                max_lookback_days=PREVIOUS_PRICE_LOOKBACK_DAYS,
             )
 
             if price_lookup:
@@ -564,7 +1164,7 @@ class PnLCalculator:
 
         # Calculate P&L (apply option contract multiplier when applicable)
         price_change = current_price - previous_price
-        if position.position_type in (PositionType.LC, PositionType.LP, PositionType.SC, PositionType.SP):
+        if position.position_type in OPTION_POSITION_TYPES:
             multiplier = Decimal('100')
         else:
             multiplier = Decimal('1')
@@ -610,5 +1210,10 @@ class PnLCalculator:
         return None
 
 
+def _to_cents(value: float) -> Decimal:
+    """Round a float amount to a cent-precision Decimal"""
+    return Decimal(repr(float(value))).quantize(Decimal('0.01'))
+
+
 # Global instance
 pnl_calculator = PnLCalculator()
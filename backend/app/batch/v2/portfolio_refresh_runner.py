@@ -9,6 +9,7 @@ Runs at 9:30 PM ET (30 minutes after symbol batch) to refresh all portfolios:
 5. Calculate position correlations for all portfolios (Phase 4)
 6. Aggregate symbol factors to portfolio level (Phase 5)
 7. Calculate stress tests for all portfolios (Phase 6)
+8. Calculate historical-simulation VaR/ES for all portfolios (Phase 7)
 
 Key Design Decisions:
 - Runs AFTER symbol batch to leverage cached prices and factors
@@ -16,8 +17,9 @@ Key Design Decisions:
 - Uses existing PnLCalculator for snapshot creation
 - Phase 5 reads from symbol_factor_exposures (V2 batch) and writes to factor_exposures
 - Phase 6 reads from factor_exposures for stress scenario calculations
-- Writes to: PortfolioSnapshot, CorrelationCalculation, PairwiseCorrelation,
-  FactorExposure, StressTestResult
+- Phase 7 reads returns from the unified cache's price matrix
+- Writes to: PortfolioSnapshot, CorrelationCalculation (packed matrix),
+  FactorExposure, StressTestResult, PortfolioVaRResult
 
 Reference: PlanningDocs/V2BatchArchitecture/05-PORTFOLIO-REFRESH.md
 """
@@ -92,6 +94,7 @@ class PortfolioRefreshResult:
     snapshots_created: int = 0
     correlations_calculated: int = 0
     stress_tests_calculated: int = 0
+    var_calculated: int = 0
     errors: List[str] = None
     duration_seconds: float = 0.0
     waited_for_symbol_batch: bool = False
@@ -112,6 +115,7 @@ class PortfolioRefreshResult:
             "snapshots_created": self.snapshots_created,
             "correlations_calculated": self.correlations_calculated,
             "stress_tests_calculated": self.stress_tests_calculated,
+            "var_calculated": self.var_calculated,
             "errors": self.errors,
             "duration_seconds": self.duration_seconds,
             "waited_for_symbol_batch": self.waited_for_symbol_batch,
@@ -479,6 +483,21 @@ async def _run_portfolio_refresh_for_date(
     if stress_result.get("errors"):
         result.errors.extend(stress_result["errors"])
 
+    # Phase 7: Historical-simulation VaR/ES for all portfolios
+    print(f"{V2_LOG_PREFIX} Phase 7: Calculating VaR for {len(portfolio_ids)} portfolios...")
+    sys.stdout.flush()
+    phase_start = datetime.now()
+    var_result = await _run_var_for_all_portfolios(
+        portfolio_ids, target_date, unified_cache
+    )
+    phase_durations["phase_7_var"] = (datetime.now() - phase_start).total_seconds()
+    result.var_calculated = var_result.get("calculated", 0)
+    print(f"{V2_LOG_PREFIX} Phase 7 complete: {result.var_calculated} portfolios in {phase_durations['phase_7_var']:.1f}s")
+    sys.stdout.flush()
+
+    if var_result.get("errors"):
+        result.errors.extend(var_result["errors"])
+
     # Finalize results
     result.phase_durations = phase_durations
     result.success = refresh_result.get("success", False)
@@ -649,12 +668,14 @@ async def _refresh_all_portfolios(
     """
     logger.info(f"{V2_LOG_PREFIX} Refreshing all portfolios for {target_date}")
 
-    # Use existing PnLCalculator with the price cache component from unified cache
+    # Use existing PnLCalculator with the price cache component from unified cache.
+    # Set-based mode: sector fields are filled for the current date; provider beta by _run_snapshot_analytics()
     result = await pnl_calculator.calculate_all_portfolios_pnl(
         calculation_date=target_date,
         db=None,  # Let it create its own session
         portfolio_ids=None,  # Process all portfolios
         price_cache=unified_cache._price_cache,  # Use price cache from unified V2 cache
+        set_based=True,  # Bulk queries + one snapshot upsert instead of per-portfolio loop
     )
 
     return result
@@ -678,113 +699,18 @@ async def _get_active_portfolio_ids() -> List[UUID]:
 # PHASE 4: CORRELATIONS
 # =============================================================================
 
-async def _process_single_portfolio_factors(
-    portfolio_id: UUID,
-    target_date: date,
-    semaphore: asyncio.Semaphore,
-) -> Dict[str, Any]:
-    """Process factor aggregation for a single portfolio (helper for parallel execution)."""
-    from app.services.portfolio_factor_service import (
-        get_portfolio_factor_exposures,
-        store_portfolio_factor_exposures
-    )
-
-    async with semaphore:
-        try:
-            async with get_async_session() as db:
-                # Get Ridge factors (aggregated from symbol-level)
-                ridge_result = await get_portfolio_factor_exposures(
-                    db=db,
-                    portfolio_id=portfolio_id,
-                    calculation_date=target_date,
-                    use_delta_adjusted=False,
-                    include_ridge=True,
-                    include_spread=False,
-                    include_ols=False
-                )
-
-                ridge_betas = ridge_result.get('ridge_betas', {})
-                metadata = ridge_result.get('metadata', {})
-                portfolio_equity = metadata.get('portfolio_equity', 0.0)
-
-                if ridge_betas:
-                    await store_portfolio_factor_exposures(
-                        db=db,
-                        portfolio_id=portfolio_id,
-                        portfolio_betas=ridge_betas,
-                        calculation_date=target_date,
-                        portfolio_equity=portfolio_equity
-                    )
-
-                # Get Spread factors (aggregated from symbol-level)
-                spread_result = await get_portfolio_factor_exposures(
-                    db=db,
-                    portfolio_id=portfolio_id,
-                    calculation_date=target_date,
-                    use_delta_adjusted=False,
-                    include_ridge=False,
-                    include_spread=True,
-                    include_ols=False
-                )
-
-                spread_betas = spread_result.get('spread_betas', {})
-
-                if spread_betas:
-                    await store_portfolio_factor_exposures(
-                        db=db,
-                        portfolio_id=portfolio_id,
-                        portfolio_betas=spread_betas,
-                        calculation_date=target_date,
-                        portfolio_equity=portfolio_equity
-                    )
-
-                # Get OLS factors (Market Beta 90D, IR Beta, Provider Beta 1Y)
-                ols_result = await get_portfolio_factor_exposures(
-                    db=db,
-                    portfolio_id=portfolio_id,
-                    calculation_date=target_date,
-                    use_delta_adjusted=False,
-                    include_ridge=False,
-                    include_spread=False,
-                    include_ols=True
-                )
-
-                ols_betas = ols_result.get('ols_betas', {})
-
-                if ols_betas:
-                    await store_portfolio_factor_exposures(
-                        db=db,
-                        portfolio_id=portfolio_id,
-                        portfolio_betas=ols_betas,
-                        calculation_date=target_date,
-                        portfolio_equity=portfolio_equity
-                    )
-
-                # CRITICAL: Commit the transaction (store_portfolio_factor_exposures doesn't commit)
-                if ridge_betas or spread_betas or ols_betas:
-                    await db.commit()
-                    return {"status": "calculated", "portfolio_id": portfolio_id}
-                else:
-                    return {"status": "skipped", "portfolio_id": portfolio_id}
-
-        except Exception as e:
-            return {
-                "status": "failed",
-                "portfolio_id": portfolio_id,
-                "error": f"Factor aggregation failed for {portfolio_id}: {str(e)[:100]}"
-            }
-
-
 async def _aggregate_portfolio_factors(
     portfolio_ids: List[UUID],
     target_date: date,
 ) -> Dict[str, Any]:
     """
-    Phase 5: Aggregate symbol-level factors to portfolio-level - PARALLEL.
+    Phase 5: Aggregate symbol-level factors to portfolio-level - MATRIX.
 
     Uses pre-computed symbol factors from symbol_factor_exposures table
     (populated by V2 symbol batch Phase 3) and aggregates them by position
-    weight to create portfolio-level factor exposures.
+    weight to create portfolio-level factor exposures. All portfolios are
+    aggregated in one pass (one positions query, one symbol beta query, one
+    sparse product per factor family, bulk upsert).
 
     This MUST run before stress tests, which read from factor_exposures table.
 
@@ -795,48 +721,38 @@ async def _aggregate_portfolio_factors(
     Returns:
         Dict with aggregation results
     """
-    logger.info(f"{V2_LOG_PREFIX} Phase 5: Factor aggregation for {len(portfolio_ids)} portfolios (parallel, max {MAX_PORTFOLIO_CONCURRENCY})")
-
-    # Use semaphore to limit concurrent database connections
-    semaphore = asyncio.Semaphore(MAX_PORTFOLIO_CONCURRENCY)
-
-    # Create tasks for all portfolios
-    tasks = [
-        _process_single_portfolio_factors(pid, target_date, semaphore)
-        for pid in portfolio_ids
-    ]
+    from app.services.portfolio_factor_service import aggregate_all_portfolio_factors
 
-    # Run all tasks in parallel
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    logger.info(f"{V2_LOG_PREFIX} Phase 5: Factor aggregation for {len(portfolio_ids)} portfolios (matrix)")
 
-    # Aggregate results
-    calculated = 0
-    skipped = 0
-    failed = 0
-    errors = []
-
-    for result in results:
-        if isinstance(result, Exception):
-            failed += 1
-            errors.append(str(result)[:100])
-        elif result.get("status") == "calculated":
-            calculated += 1
-        elif result.get("status") == "skipped":
-            skipped += 1
-        elif result.get("status") == "failed":
-            failed += 1
-            if result.get("error"):
-                errors.append(result["error"])
+    try:
+        async with get_async_session() as db:
+            agg_result = await aggregate_all_portfolio_factors(
+                db=db,
+                portfolio_ids=portfolio_ids,
+                calculation_date=target_date,
+                use_delta_adjusted=False
+            )
+    except Exception as e:
+        logger.error(f"{V2_LOG_PREFIX} Phase 5 factor aggregation failed: {e}")
+        return {
+            "calculated": 0,
+            "skipped": 0,
+            "failed": len(portfolio_ids),
+            "errors": [f"Factor aggregation failed: {str(e)[:100]}"],
+        }
 
     logger.info(
-        f"{V2_LOG_PREFIX} Phase 5 complete: calculated={calculated}, skipped={skipped}, failed={failed}"
+        f"{V2_LOG_PREFIX} Phase 5 complete: calculated={agg_result['calculated']}, "
+        f"skipped={agg_result['skipped']}, failed={agg_result['failed']}, "
+        f"rows={agg_result['records_stored']}"
     )
 
     return {
-        "calculated": calculated,
-        "skipped": skipped,
-        "failed": failed,
-        "errors": errors,
+        "calculated": agg_result["calculated"],
+        "skipped": agg_result["skipped"],
+        "failed": agg_result["failed"],
+        "errors": agg_result["errors"],
     }
 
 
@@ -847,6 +763,7 @@ async def _process_single_portfolio_correlations(
     target_date: date,
     unified_cache: SymbolCacheService,
     semaphore: asyncio.Semaphore,
+    universe_correlations: Optional[Dict[int, Any]] = None,
 ) -> Dict[str, Any]:
     """Process correlations for a single portfolio (helper for parallel execution)."""
     from app.services.correlation_service import CorrelationService
@@ -854,7 +771,11 @@ async def _process_single_portfolio_correlations(
     async with semaphore:
         try:
             async with get_async_session() as db:
-                correlation_service = CorrelationService(db, price_cache=unified_cache._price_cache)
+                correlation_service = CorrelationService(
+                    db,
+                    price_cache=unified_cache._price_cache,
+                    universe_correlations=universe_correlations
+                )
                 result = await correlation_service.calculate_portfolio_correlations(
                     portfolio_id=portfolio_id,
                     calculation_date=target_date
@@ -882,11 +803,15 @@ async def _run_correlations_for_all_portfolios(
     """
     Phase 4: Calculate position correlations for all portfolios - PARALLEL.
 
-    Uses CorrelationService.calculate_portfolio_correlations() which:
-    - Calculates pairwise correlations between positions
-    - Stores results in CorrelationCalculation and PairwiseCorrelation tables
+    Builds one shared correlation matrix over the union of held symbols
+    (build_universe_correlations), then runs
+    CorrelationService.calculate_portfolio_correlations() per portfolio, which:
+    - Slices each portfolio's matrix out of the shared one
+    - Stores results in CorrelationCalculation (packed matrix on the row)
     - Gracefully skips portfolios with < 2 public positions
 
+    If the shared build fails, portfolios compute their own matrices.
+
     Args:
         portfolio_ids: List of portfolio IDs to process
         target_date: Calculation date
@@ -895,14 +820,32 @@ async def _run_correlations_for_all_portfolios(
     Returns:
         Dict with calculation results
     """
+    from app.calculations.correlation_universe import build_universe_correlations
+
     logger.info(f"{V2_LOG_PREFIX} Phase 4: Correlations for {len(portfolio_ids)} portfolios (parallel, max {MAX_PORTFOLIO_CONCURRENCY})")
 
+    # Shared universe matrix: one correlation estimate reused by every portfolio
+    universe_correlations = None
+    try:
+        async with get_async_session() as db:
+            universe_correlations = await build_universe_correlations(
+                db=db,
+                portfolio_ids=portfolio_ids,
+                calculation_date=target_date,
+                price_cache=unified_cache._price_cache,
+                shrink=settings.CORRELATION_SHRINKAGE
+            )
+    except Exception as e:
+        logger.warning(f"{V2_LOG_PREFIX} Shared correlation matrix failed, computing per portfolio: {e}")
+
     # Use semaphore to limit concurrent database connections
     semaphore = asyncio.Semaphore(MAX_PORTFOLIO_CONCURRENCY)
 
     # Create tasks for all portfolios
     tasks = [
-        _process_single_portfolio_correlations(pid, target_date, unified_cache, semaphore)
+        _process_single_portfolio_correlations(
+            pid, target_date, unified_cache, semaphore, universe_correlations
+        )
         for pid in portfolio_ids
     ]
 
@@ -949,6 +892,7 @@ async def _process_single_portfolio_analytics(
     target_date: date,
     unified_cache: SymbolCacheService,
     semaphore: asyncio.Semaphore,
+    symbol_volatility=None,
 ) -> Dict[str, Any]:
     """Process analytics for a single portfolio (helper for parallel execution)."""
     from app.calculations.market_beta import (
@@ -1029,7 +973,8 @@ async def _process_single_portfolio_analytics(
                         db=db,
                         portfolio_id=portfolio_id,
                         calculation_date=target_date,
-                        price_cache=unified_cache._price_cache
+                        price_cache=unified_cache._price_cache,
+                        symbol_volatility=symbol_volatility
                     )
 
                     if vol_result and vol_result.get('success'):
@@ -1118,6 +1063,9 @@ async def _run_snapshot_analytics(
     - Volatility metrics (21d, 63d, expected, trend)
     - Concentration metrics (HHI, effective positions, top 3/10)
 
+    Symbol volatilities are calculated once for every symbol held by these
+    portfolios and shared by all portfolio tasks.
+
     Args:
         portfolio_ids: List of portfolio IDs to process
         target_date: Calculation date
@@ -1128,12 +1076,30 @@ async def _run_snapshot_analytics(
     """
     logger.info(f"{V2_LOG_PREFIX} Phase 3 analytics: Snapshot analytics for {len(portfolio_ids)} portfolios (parallel, max {MAX_PORTFOLIO_CONCURRENCY})")
 
+    from app.calculations.volatility_analytics import (
+        calculate_symbol_volatilities,
+        get_volatility_symbols,
+    )
+
+    # Symbol-level volatility once for all portfolios (None = per-portfolio fallback)
+    symbol_volatility = None
+    try:
+        async with get_async_session() as db:
+            symbol_volatility = await calculate_symbol_volatilities(
+                db=db,
+                symbols=await get_volatility_symbols(db, portfolio_ids),
+                calculation_date=target_date,
+                price_cache=unified_cache._price_cache
+            )
+    except Exception as e:
+        logger.warning(f"{V2_LOG_PREFIX} Symbol volatility failed, falling back to per-portfolio: {e}")
+
     # Use semaphore to limit concurrent database connections
     semaphore = asyncio.Semaphore(MAX_PORTFOLIO_CONCURRENCY)
 
     # Create tasks for all portfolios
     tasks = [
-        _process_single_portfolio_analytics(pid, target_date, unified_cache, semaphore)
+        _process_single_portfolio_analytics(pid, target_date, unified_cache, semaphore, symbol_volatility)
         for pid in portfolio_ids
     ]
 
@@ -1175,111 +1141,136 @@ async def _run_snapshot_analytics(
 # PHASE 5: STRESS TESTS
 # =============================================================================
 
-async def _process_single_portfolio_stress_test(
-    portfolio_id: UUID,
+async def _run_stress_tests_for_all_portfolios(
+    portfolio_ids: List[UUID],
     target_date: date,
-    semaphore: asyncio.Semaphore,
 ) -> Dict[str, Any]:
-    """Process stress tests for a single portfolio (helper for parallel execution)."""
-    from app.calculations.stress_testing import (
-        run_comprehensive_stress_test,
-        save_stress_test_results
-    )
+    """
+    Phase 5: Calculate stress tests for all portfolios - MATRIX.
 
-    async with semaphore:
-        try:
-            async with get_async_session() as db:
-                # Run comprehensive stress test
-                stress_results = await run_comprehensive_stress_test(
-                    db=db,
-                    portfolio_id=portfolio_id,
-                    calculation_date=target_date
-                )
+    Uses run_stress_tests_for_portfolios() and save_all_stress_test_results():
+    - Loads every portfolio's factor exposures once into a matrix
+    - Runs 10+ stress scenarios (market crash, interest rate shock, etc.)
+      for all portfolios with two matrix products (direct and correlated)
+    - Stores all results in StressTestResult in one bulk write
 
-                # Check if results were returned
-                if not stress_results:
-                    return {"status": "skipped", "portfolio_id": portfolio_id}
+    Args:
+        portfolio_ids: List of portfolio IDs to process
+        target_date: Calculation date
 
-                # Check if stress test was skipped
-                stress_test_data = stress_results.get('stress_test_results', {})
-                if stress_test_data.get('skipped'):
-                    return {"status": "skipped", "portfolio_id": portfolio_id}
+    Returns:
+        Dict with calculation results
+    """
+    from app.calculations.stress_matrix import run_stress_tests_for_portfolios
+    from app.calculations.stress_testing import save_all_stress_test_results
+    from app.services.stress_what_if_service import clear_what_if_cache
 
-                # Save results to database
-                scenarios_tested = stress_results.get('config_metadata', {}).get('scenarios_tested', 0)
-                if scenarios_tested > 0:
-                    saved_count = await save_stress_test_results(
-                        db=db,
-                        portfolio_id=portfolio_id,
-                        stress_test_results=stress_results
-                    )
-                    if saved_count > 0:
-                        return {"status": "calculated", "portfolio_id": portfolio_id}
+    logger.info(f"{V2_LOG_PREFIX} Phase 5: Stress tests for {len(portfolio_ids)} portfolios (matrix)")
 
-                return {"status": "skipped", "portfolio_id": portfolio_id}
+    try:
+        async with get_async_session() as db:
+            engine_result = await run_stress_tests_for_portfolios(
+                db=db,
+                portfolio_ids=portfolio_ids,
+                calculation_date=target_date
+            )
 
-        except Exception as e:
-            return {
-                "status": "failed",
-                "portfolio_id": portfolio_id,
-                "error": f"Stress test failed for {portfolio_id}: {str(e)[:100]}"
+            # Check if stress test was skipped or had no scenarios
+            to_save = {
+                pid: stress_results
+                for pid, stress_results in engine_result['results'].items()
+                if not stress_results.get('stress_test_results', {}).get('skipped')
+                and stress_results.get('config_metadata', {}).get('scenarios_tested', 0) > 0
             }
+            saved_counts = await save_all_stress_test_results(db, to_save) if to_save else {}
 
+        # What-if requests should see the exposures this run just stressed
+        clear_what_if_cache()
+    except Exception as e:
+        logger.error(f"{V2_LOG_PREFIX} Phase 5 stress tests failed: {e}")
+        return {
+            "calculated": 0,
+            "skipped": 0,
+            "failed": len(portfolio_ids),
+            "errors": [f"Stress tests failed: {str(e)[:100]}"],
+        }
 
-async def _run_stress_tests_for_all_portfolios(
+    calculated = sum(1 for count in saved_counts.values() if count > 0)
+    failed = len(engine_result['errors'])
+    skipped = len(portfolio_ids) - calculated - failed
+    errors = [
+        f"Stress test failed for {pid}: {message[:100]}"
+        for pid, message in engine_result['errors'].items()
+    ]
+
+    logger.info(
+        f"{V2_LOG_PREFIX} Phase 5 complete: calculated={calculated}, skipped={skipped}, failed={failed}"
+    )
+
+    return {
+        "calculated": calculated,
+        "skipped": skipped,
+        "failed": failed,
+        "errors": errors,
+    }
+
+
+async def _run_var_for_all_portfolios(
     portfolio_ids: List[UUID],
     target_date: date,
+    unified_cache: SymbolCacheService,
 ) -> Dict[str, Any]:
     """
-    Phase 5: Calculate stress tests for all portfolios - PARALLEL.
+    Phase 7: Historical-simulation VaR/ES for all portfolios - MATRIX.
 
-    Uses run_comprehensive_stress_test() and save_stress_test_results() which:
-    - Runs 10+ stress scenarios (market crash, interest rate shock, etc.)
-    - Uses factor correlations for impact calculation
-    - Stores results in StressTestResult table
+    Uses run_var_for_portfolios() and save_var_results():
+    - Slices one (dates x symbols) return matrix from the unified cache's
+      price matrix (no market_data_cache query)
+    - Position and portfolio P&L scenarios for every portfolio in one pass
+    - 95/99% VaR and ES, 1- and 10-day, historical and filtered historical
+    - Stores all results in PortfolioVaRResult in one bulk upsert
 
     Args:
         portfolio_ids: List of portfolio IDs to process
         target_date: Calculation date
+        unified_cache: V2 unified cache (SymbolCacheService) with prices
 
     Returns:
         Dict with calculation results
     """
-    logger.info(f"{V2_LOG_PREFIX} Phase 5: Stress tests for {len(portfolio_ids)} portfolios (parallel, max {MAX_PORTFOLIO_CONCURRENCY})")
+    from app.calculations.historical_var import run_var_for_portfolios, save_var_results
 
-    # Use semaphore to limit concurrent database connections
-    semaphore = asyncio.Semaphore(MAX_PORTFOLIO_CONCURRENCY)
-
-    # Create tasks for all portfolios
-    tasks = [
-        _process_single_portfolio_stress_test(pid, target_date, semaphore)
-        for pid in portfolio_ids
-    ]
-
-    # Run all tasks in parallel
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    logger.info(f"{V2_LOG_PREFIX} Phase 7: VaR for {len(portfolio_ids)} portfolios (matrix)")
 
-    # Aggregate results
-    calculated = 0
-    skipped = 0
-    failed = 0
-    errors = []
+    try:
+        async with get_async_session() as db:
+            var_result = await run_var_for_portfolios(
+                db=db,
+                portfolio_ids=portfolio_ids,
+                calculation_date=target_date,
+                price_cache=unified_cache._price_cache,
+            )
+            if var_result['results']:
+                await save_var_results(db, target_date, var_result['results'])
+    except Exception as e:
+        logger.error(f"{V2_LOG_PREFIX} Phase 7 VaR failed: {e}")
+        return {
+            "calculated": 0,
+            "skipped": 0,
+            "failed": len(portfolio_ids),
+            "errors": [f"VaR failed: {str(e)[:100]}"],
+        }
 
-    for result in results:
-        if isinstance(result, Exception):
-            failed += 1
-            errors.append(str(result)[:100])
-        elif result.get("status") == "calculated":
-            calculated += 1
-        elif result.get("status") == "skipped":
-            skipped += 1
-        elif result.get("status") == "failed":
-            failed += 1
-            if result.get("error"):
-                errors.append(result["error"])
+    calculated = len(var_result['results'])
+    failed = len(var_result['errors'])
+    skipped = len(var_result['skipped'])
+    errors = [
+        f"VaR failed for {pid}: {message[:100]}"
+        for pid, message in var_result['errors'].items()
+    ]
 
     logger.info(
-        f"{V2_LOG_PREFIX} Phase 5 complete: calculated={calculated}, skipped={skipped}, failed={failed}"
+        f"{V2_LOG_PREFIX} Phase 7 complete: calculated={calculated}, skipped={skipped}, failed={failed}"
     )
 
     return {
@@ -938,8 +938,10 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
     - Calculates Ridge factors (6 style factors) via regression
     - Calculates Spread factors (4 long-short factor spreads)
     - Uses smart caching (skips symbols already calculated for this date)
-    - Writes results to symbol_factor_exposures table
-    - Uses parallel batch processing for speed
+    - Writes results to symbol_factor_exposures with multi-row bulk upserts
+      (throughput reported under "persistence" / "rows_per_second")
+    - Solves regressions in a process pool when FACTOR_REGRESSION_WORKERS > 0
+      (event loop responsiveness reported under "event_loop_lag")
 
     Args:
         symbols: List of symbols to calculate
@@ -950,12 +952,14 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
         Dict with calculation results
     """
     from app.calculations.symbol_factors import calculate_universe_factors
+    from app.core.event_loop_monitor import EventLoopLagMonitor
 
     logger.info(f"{V2_LOG_PREFIX} Phase 3: Factor calculations for {len(symbols)} symbols")
 
     # Print logging for Railway visibility
     print(f"[PHASE3] Starting factor calculations for {len(symbols)} symbols...")
     print(f"[PHASE3] Date: {calc_date}, Ridge=True, Spread=True, cache={'enabled' if price_cache else 'disabled'}")
+    print(f"[PHASE3] Regression workers: {settings.FACTOR_REGRESSION_WORKERS or 'inline'}")
     sys.stdout.flush()
 
     try:
@@ -964,14 +968,17 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
 
         # Use existing universe factor calculation
         # Pass symbols for scoped mode (V2 symbol batch knows which symbols to process)
-        result = await calculate_universe_factors(
-            calculation_date=calc_date,
-            regularization_alpha=1.0,  # Default L2 penalty for Ridge
-            calculate_ridge=True,
-            calculate_spread=True,
-            price_cache=price_cache,  # V2: Use unified cache for 300x speedup
-            symbols=symbols,  # Use our pre-computed symbol list
-        )
+        # Lag monitor: how long other coroutines (health checks, status calls) wait
+        async with EventLoopLagMonitor() as lag_monitor:
+            result = await calculate_universe_factors(
+                calculation_date=calc_date,
+                regularization_alpha=1.0,  # Default L2 penalty for Ridge
+                calculate_ridge=True,
+                calculate_spread=True,
+                price_cache=price_cache,  # V2: Use unified cache for 300x speedup
+                symbols=symbols,  # Use our pre-computed symbol list
+            )
+        event_loop_lag = lag_monitor.get_stats()
 
         # Extract results
         ridge_results = result.get("ridge_results", {})
@@ -979,6 +986,7 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
         market_beta_results = result.get("market_beta_results", {})
         ir_beta_results = result.get("ir_beta_results", {})
         provider_beta_results = result.get("provider_beta_results", {})
+        persistence = result.get("persistence", {})
 
         ridge_calculated = ridge_results.get("calculated", 0)
         ridge_cached = ridge_results.get("cached", 0)
@@ -1011,6 +1019,22 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
         print(f"[PHASE3] Market Beta: calc={market_beta_calculated}, cached={market_beta_cached}, fail={market_beta_failed}")
         print(f"[PHASE3] IR Beta: calc={ir_beta_calculated}, cached={ir_beta_cached}, fail={ir_beta_failed}")
         print(f"[PHASE3] Provider Beta: calc={provider_beta_calculated}, cached={provider_beta_cached}, fail={provider_beta_failed}")
+        if persistence:
+            print(
+                f"[PHASE3] Persist: {persistence.get('rows_written', 0)} rows in "
+                f"{persistence.get('statements', 0)} statements, {persistence.get('elapsed_seconds', 0)}s "
+                f"({persistence.get('rows_per_second', 0)} rows/s)"
+            )
+        alpha_tuning = result.get("alpha_tuning")
+        if alpha_tuning:
+            print(
+                f"[PHASE3] Ridge alpha (GCV): {alpha_tuning['recommended_alpha']} "
+                f"over {alpha_tuning['symbols_evaluated']} symbols"
+            )
+        print(
+            f"[PHASE3] Event loop lag: mean={event_loop_lag['mean_ms']}ms, "
+            f"p95={event_loop_lag['p95_ms']}ms, max={event_loop_lag['max_ms']}ms"
+        )
         sys.stdout.flush()
 
         logger.info(
@@ -1032,6 +1056,11 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
         logger.info(
             f"{V2_LOG_PREFIX}   Provider Beta: calc={provider_beta_calculated}, cached={provider_beta_cached}, fail={provider_beta_failed}"
         )
+        if persistence:
+            logger.info(f"{V2_LOG_PREFIX}   Persist: {persistence}")
+        if alpha_tuning:
+            logger.info(f"{V2_LOG_PREFIX}   Ridge alpha tuning: {alpha_tuning}")
+        logger.info(f"{V2_LOG_PREFIX}   Event loop lag: {event_loop_lag}")
 
         errors = result.get("errors", [])
         if errors:
@@ -1048,6 +1077,10 @@ async def _run_phase_3_factors(symbols: List[str], calc_date: date, price_cache=
             "market_beta_results": market_beta_results,
             "ir_beta_results": ir_beta_results,
             "provider_beta_results": provider_beta_results,
+            "persistence": persistence,
+            "rows_per_second": persistence.get("rows_per_second", 0.0),
+            "event_loop_lag": event_loop_lag,
+            "alpha_tuning": alpha_tuning,
             "errors": errors,
         }
 
@@ -3,6 +3,7 @@ Smart Price Cache with Multi-Day Support
 
 Stage 1: Single-day price cache (300x speedup)
 Stage 2: Multi-day price cache with date range support (critical for backfills)
+Stage 3: Columnar storage with vectorized window slicing
 
 Usage:
     # Single-day cache (for current day calculations)
@@ -17,6 +18,20 @@ Usage:
                                  end_date=date(2025, 11, 6))
     price = cache.get_price('AAPL', date(2025, 10, 15))
 
+    # Window slicing (for regressions / return matrices)
+    prices = cache.get_window(['AAPL', 'MSFT'], date(2025, 10, 1), date(2025, 11, 6))
+    # ndarray shaped (dates, symbols), NaN where no price is cached
+    dates = cache.get_dates(date(2025, 10, 1), date(2025, 11, 6))
+
+    price_df = cache.get_window(['AAPL', 'MSFT'], date(2025, 10, 1), date(2025, 11, 6), as_frame=True)
+
+Storage Layout:
+    - symbol -> row index (Dict[str, int])
+    - date -> column index (Dict[date, int])
+    - one contiguous float64 matrix (symbols x dates), NaN = no price
+    A 5,000 symbol x 200 day warm-up is a single 8MB array instead of
+    ~1M (symbol, date) tuples and Decimal objects.
+
 Performance Impact:
     - Before: N queries (one per position per date)
     - After: 1 bulk query (all symbols, all dates)
@@ -24,9 +39,10 @@ Performance Impact:
 """
 from datetime import date
 from decimal import Decimal
-from typing import Dict, Optional, Set, Tuple
-from uuid import UUID
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
 
+import numpy as np
+import pandas as pd
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -35,6 +51,10 @@ from app.models.market_data import MarketDataCache
 
 logger = get_logger(__name__)
 
+# Initial matrix capacity (grown geometrically as symbols/dates are added)
+_INITIAL_SYMBOL_CAPACITY = 64
+_INITIAL_DATE_CAPACITY = 32
+
 
 class PriceCache:
     """
@@ -42,11 +62,30 @@ class PriceCache:
 
     Eliminates N+1 query pattern by bulk-loading all prices upfront.
     Supports both single-day and multi-day caching for backfills.
+
+    Prices are stored column-wise in a float64 matrix (rows = symbols,
+    columns = dates). Single lookups go through two dict lookups, and
+    `get_window()` slices a whole (dates x symbols) block in one
+    vectorized operation.
     """
 
     def __init__(self):
-        # Cache structure: {(symbol, date): price}
-        self._cache: Dict[Tuple[str, date], Decimal] = {}
+        # Axis indexes: symbol -> row, date -> column
+        self._symbol_index: Dict[str, int] = {}
+        self._date_index: Dict[date, int] = {}
+        self._symbols: List[str] = []
+        self._dates: List[date] = []
+
+        # Price matrix (symbols x dates), NaN = not cached.
+        # Allocated with spare capacity; only [:len(symbols), :len(dates)] is live.
+        self._prices: np.ndarray = np.full(
+            (_INITIAL_SYMBOL_CAPACITY, _INITIAL_DATE_CAPACITY), np.nan, dtype=np.float64
+        )
+
+        # Column ordinals (date.toordinal()) and lazily computed chronological order
+        self._date_ordinals: np.ndarray = np.empty(_INITIAL_DATE_CAPACITY, dtype=np.int64)
+        self._sorted_columns: Optional[np.ndarray] = None
+        self._sorted_ordinals: Optional[np.ndarray] = None
 
         # Track which dates have been loaded
         self._loaded_dates: Set[date] = set()
@@ -58,6 +97,10 @@ class PriceCache:
         self._cache_hits = 0
         self._cache_misses = 0
 
+    # =========================================================================
+    # LOADING
+    # =========================================================================
+
     async def load_single_date(
         self,
         db: AsyncSession,
@@ -101,11 +144,11 @@ class PriceCache:
         rows = result.all()
 
         # Build in-memory cache
-        loaded_count = 0
-        for row in rows:
-            cache_key = (row.symbol, row.date)
-            self._cache[cache_key] = row.close
-            loaded_count += 1
+        loaded_count = self.set_prices(
+            [row.symbol for row in rows],
+            [row.date for row in rows],
+            [row.close for row in rows],
+        )
 
         # Mark date as loaded
         self._loaded_dates.add(calculation_date)
@@ -158,13 +201,13 @@ class PriceCache:
         rows = result.all()
 
         # Build in-memory cache
-        loaded_count = 0
-        dates_seen = set()
-        for row in rows:
-            cache_key = (row.symbol, row.date)
-            self._cache[cache_key] = row.close
-            dates_seen.add(row.date)
-            loaded_count += 1
+        row_dates = [row.date for row in rows]
+        loaded_count = self.set_prices(
+            [row.symbol for row in rows],
+            row_dates,
+            [row.close for row in rows],
+        )
+        dates_seen = set(row_dates)
 
         # Mark all dates in range as loaded
         self._loaded_dates.update(dates_seen)
@@ -176,6 +219,10 @@ class PriceCache:
         )
         return loaded_count
 
+    # =========================================================================
+    # SINGLE-VALUE ACCESS (compatibility API)
+    # =========================================================================
+
     def get_price(
         self,
         symbol: str,
@@ -191,15 +238,18 @@ class PriceCache:
         Returns:
             Price as Decimal, or None if not in cache
         """
-        cache_key = (symbol, price_date)
-        price = self._cache.get(cache_key)
+        row = self._symbol_index.get(symbol)
+        col = self._date_index.get(price_date)
 
-        if price is not None:
-            self._cache_hits += 1
-        else:
-            self._cache_misses += 1
+        if row is not None and col is not None:
+            value = self._prices[row, col]
+            if value == value:  # NaN check without a numpy call
+                self._cache_hits += 1
+                # repr() round-trips Numeric(12, 4) closes exactly
+                return Decimal(repr(float(value)))
 
-        return price
+        self._cache_misses += 1
+        return None
 
     def set_price(
         self,
@@ -215,14 +265,115 @@ class PriceCache:
             price_date: Date of price
             price: Price value to cache
         """
-        cache_key = (symbol, price_date)
-        self._cache[cache_key] = price
+        row = self._row_for(symbol)
+        col = self._column_for(price_date)
+        self._ensure_capacity()
+        self._prices[row, col] = float(price)
         self._loaded_dates.add(price_date)
         self._loaded_symbols.add(symbol)
 
+    def set_prices(
+        self,
+        symbols: Sequence[str],
+        price_dates: Sequence[date],
+        prices: Iterable[Union[Decimal, float]]
+    ) -> int:
+        """
+        Bulk-set prices in the cache (one vectorized scatter into the matrix).
+
+        Args:
+            symbols: Symbol for each price
+            price_dates: Date for each price
+            prices: Price values (Decimal or float), aligned with symbols/dates
+
+        Returns:
+            Number of prices written
+        """
+        count = len(symbols)
+        if count == 0:
+            return 0
+
+        rows = np.fromiter((self._row_for(s) for s in symbols), dtype=np.intp, count=count)
+        cols = np.fromiter((self._column_for(d) for d in price_dates), dtype=np.intp, count=count)
+        values = np.fromiter((float(p) for p in prices), dtype=np.float64, count=count)
+
+        self._ensure_capacity()
+        self._prices[rows, cols] = values
+
+        self._loaded_dates.update(self._dates[c] for c in np.unique(cols))
+        self._loaded_symbols.update(self._symbols[r] for r in np.unique(rows))
+        return count
+
+    # =========================================================================
+    # WINDOW ACCESS (vectorized)
+    # =========================================================================
+
+    def get_dates(self, start_date: date, end_date: date) -> List[date]:
+        """
+        Get cached dates within [start_date, end_date] in chronological order.
+
+        This is the row axis of the array returned by `get_window()`.
+        """
+        columns = self._window_columns(start_date, end_date)
+        return [self._dates[c] for c in columns]
+
+    def get_window(
+        self,
+        symbols: Sequence[str],
+        start_date: date,
+        end_date: date,
+        as_frame: bool = False
+    ) -> Union[np.ndarray, pd.DataFrame]:
+        """
+        Slice prices for many symbols over a date range in one operation.
+
+        Args:
+            symbols: Symbols to slice (output column order follows this list)
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            as_frame: If True, return a DataFrame (DatetimeIndex x symbols)
+
+        Returns:
+            float64 array shaped (n_dates, n_symbols) with NaN for missing prices,
+            where n_dates are the cached dates in range (see `get_dates()`).
+            Symbols not in the cache yield all-NaN columns.
+        """
+        columns = self._window_columns(start_date, end_date)
+        rows = np.fromiter(
+            (self._symbol_index.get(s, -1) for s in symbols), dtype=np.intp, count=len(symbols)
+        )
+
+        window = np.full((len(columns), len(rows)), np.nan, dtype=np.float64)
+        known = rows >= 0
+        if known.any() and len(columns):
+            window[:, known] = self._prices[np.ix_(rows[known], columns)].T
+
+        hits = int(np.count_nonzero(~np.isnan(window)))
+        self._cache_hits += hits
+        self._cache_misses += window.size - hits
+
+        if not as_frame:
+            return window
+
+        index = pd.DatetimeIndex(pd.to_datetime([self._dates[c] for c in columns]))
+        return pd.DataFrame(window, index=index, columns=list(symbols))
+
+    # =========================================================================
+    # MAINTENANCE
+    # =========================================================================
+
     def clear(self):
         """Clear all cached data."""
-        self._cache.clear()
+        self._symbol_index.clear()
+        self._date_index.clear()
+        self._symbols.clear()
+        self._dates.clear()
+        self._prices = np.full(
+            (_INITIAL_SYMBOL_CAPACITY, _INITIAL_DATE_CAPACITY), np.nan, dtype=np.float64
+        )
+        self._date_ordinals = np.empty(_INITIAL_DATE_CAPACITY, dtype=np.int64)
+        self._sorted_columns = None
+        self._sorted_ordinals = None
         self._loaded_dates.clear()
         self._loaded_symbols.clear()
         self._cache_hits = 0
@@ -238,12 +389,71 @@ class PriceCache:
         """
         total_requests = self._cache_hits + self._cache_misses
         hit_rate = (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
+        live = self._prices[:len(self._symbols), :len(self._dates)]
 
         return {
-            'cached_prices': len(self._cache),
+            'cached_prices': int(np.count_nonzero(~np.isnan(live))),
             'loaded_dates': len(self._loaded_dates),
             'loaded_symbols': len(self._loaded_symbols),
+            'matrix_shape': [len(self._symbols), len(self._dates)],
+            'matrix_bytes': int(self._prices.nbytes),
             'cache_hits': self._cache_hits,
             'cache_misses': self._cache_misses,
             'hit_rate_pct': round(hit_rate, 2)
         }
+
+    # =========================================================================
+    # INTERNALS
+    # =========================================================================
+
+    def _row_for(self, symbol: str) -> int:
+        """Get (or allocate) the matrix row for a symbol."""
+        row = self._symbol_index.get(symbol)
+        if row is None:
+            row = len(self._symbols)
+            self._symbol_index[symbol] = row
+            self._symbols.append(symbol)
+        return row
+
+    def _column_for(self, price_date: date) -> int:
+        """Get (or allocate) the matrix column for a date."""
+        col = self._date_index.get(price_date)
+        if col is None:
+            col = len(self._dates)
+            self._date_index[price_date] = col
+            self._dates.append(price_date)
+            if col >= len(self._date_ordinals):
+                grown = np.empty(len(self._date_ordinals) * 2, dtype=np.int64)
+                grown[:col] = self._date_ordinals[:col]
+                self._date_ordinals = grown
+            self._date_ordinals[col] = price_date.toordinal()
+            self._sorted_columns = None
+        return col
+
+    def _ensure_capacity(self) -> None:
+        """Grow the price matrix geometrically to fit all allocated rows/columns."""
+        n_rows, n_cols = self._prices.shape
+        need_rows, need_cols = len(self._symbols), len(self._dates)
+        if need_rows <= n_rows and need_cols <= n_cols:
+            return
+
+        while n_rows < need_rows:
+            n_rows *= 2
+        while n_cols < need_cols:
+            n_cols *= 2
+
+        grown = np.full((n_rows, n_cols), np.nan, dtype=np.float64)
+        old_rows, old_cols = self._prices.shape
+        grown[:old_rows, :old_cols] = self._prices
+        self._prices = grown
+
+    def _window_columns(self, start_date: date, end_date: date) -> np.ndarray:
+        """Column positions of cached dates within [start, end], chronologically."""
+        if self._sorted_columns is None:
+            ordinals = self._date_ordinals[:len(self._dates)]
+            self._sorted_columns = np.argsort(ordinals, kind='stable')
+            self._sorted_ordinals = ordinals[self._sorted_columns]
+
+        lo = np.searchsorted(self._sorted_ordinals, start_date.toordinal(), side='left')
+        hi = np.searchsorted(self._sorted_ordinals, end_date.toordinal(), side='right')
+        return self._sorted_columns[lo:hi]
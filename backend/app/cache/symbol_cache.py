@@ -130,8 +130,13 @@ class SymbolCacheService:
         start_date = target_date - timedelta(days=DEFAULT_CACHE_LOOKBACK_DAYS)
 
         async with get_async_session() as db:
+            # Select only the columns the columnar cache needs (no ORM objects)
             result = await db.execute(
-                select(MarketDataCache)
+                select(
+                    MarketDataCache.symbol,
+                    MarketDataCache.date,
+                    MarketDataCache.close,
+                )
                 .where(
                     and_(
                         MarketDataCache.date >= start_date,
@@ -140,15 +145,17 @@ class SymbolCacheService:
                     )
                 )
             )
-            records = result.scalars().all()
+            records = result.all()
 
-            for record in records:
-                self._price_cache.set_price(record.symbol, record.date, record.close)
-                self._symbols_loaded.add(record.symbol)
-                self._dates_loaded.add(record.date)
+            symbols = [record.symbol for record in records]
+            dates = [record.date for record in records]
+            self._price_cache.set_prices(symbols, dates, [record.close for record in records])
+            self._symbols_loaded.update(symbols)
+            self._dates_loaded.update(dates)
 
             logger.info(
-                f"{V2_LOG_PREFIX} Loaded {len(records)} price records"
+                f"{V2_LOG_PREFIX} Loaded {len(records)} price records "
+                f"(matrix {self._price_cache.get_stats()['matrix_shape']})"
             )
 
     async def _load_factors(self, target_date: date):
@@ -0,0 +1,152 @@
+"""
+Correlation Cluster Detection
+
+Clusters are connected components of the graph linking positions whose
+absolute correlation is at least a threshold. Components are found with
+scipy's sparse-graph routine (no recursion, no per-neighbour Python loop)
+and cluster statistics come from one indicator-matrix product.
+
+Connected components at threshold t are exactly the clusters of a
+single-linkage hierarchy on distance 1 - |corr| cut at 1 - t, so
+CorrelationClusterTree builds the hierarchy once and answers any number of
+thresholds from it without touching the matrix again.
+"""
+import hashlib
+from typing import Dict, Iterable, List
+
+import numpy as np
+from scipy import sparse
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import squareform
+
+# Distance for pairs with no correlation (NaN): never linked at a positive threshold
+_UNLINKED_DISTANCE = 2.0
+
+
+def symbol_set_key(symbols: Iterable[str]) -> str:
+    """
+    Order-independent key for a cluster's membership.
+
+    SHA-256 hex digest of the de-duplicated, upper-cased, sorted symbols, so
+    the same members give the same key however the cluster was discovered.
+    """
+    normalized = sorted({symbol.strip().upper() for symbol in symbols})
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()
+
+
+def find_correlation_components(correlations: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Label connected components of the |corr| >= threshold graph.
+
+    Args:
+        correlations: (n x n) correlation matrix (NaN pairs are never linked)
+        threshold: Minimum absolute correlation for an edge
+
+    Returns:
+        (n,) component label per symbol
+    """
+    with np.errstate(invalid='ignore'):
+        adjacency = np.abs(correlations) >= threshold
+    np.fill_diagonal(adjacency, False)
+    _, labels = connected_components(
+        sparse.csr_matrix(adjacency), directed=False, return_labels=True
+    )
+    return labels
+
+
+def cluster_statistics(correlations: np.ndarray, labels: np.ndarray) -> Dict[int, Dict[str, float]]:
+    """
+    Size and average within-cluster correlation for every multi-member cluster.
+
+    The average is over each unordered member pair (signed correlation);
+    NaN pairs are skipped.
+
+    Returns:
+        {label: {'size': int, 'avg_correlation': float}} for clusters of 2+ members
+    """
+    if len(labels) == 0:
+        return {}
+    indicator = (labels[:, None] == np.arange(labels.max() + 1)).astype(float)  # (n x clusters)
+    sizes = indicator.sum(axis=0)
+
+    valid = ~np.isnan(correlations)
+    np.fill_diagonal(valid, False)
+    values = np.where(valid, correlations, 0.0)
+
+    # Column k of M @ indicator sums each row over cluster k; summing that over
+    # the members of k counts every within-cluster pair twice
+    pair_sums = np.sum(indicator * (values @ indicator), axis=0) / 2.0
+    pair_counts = np.sum(indicator * (valid.astype(float) @ indicator), axis=0) / 2.0
+
+    return {
+        int(label): {
+            'size': int(sizes[label]),
+            'avg_correlation': float(pair_sums[label] / pair_counts[label]) if pair_counts[label] > 0 else 0.0,
+        }
+        for label in np.flatnonzero(sizes >= 2)
+    }
+
+
+def build_clusters(
+    symbols: List[str],
+    correlations: np.ndarray,
+    labels: np.ndarray
+) -> List[Dict]:
+    """
+    Cluster dicts (symbols, indices, avg_correlation) from component labels.
+
+    Clusters of 2+ members only, largest first (ties in order of first member).
+    """
+    statistics = cluster_statistics(correlations, labels)
+    clusters = []
+    for label, cluster_stats in statistics.items():
+        indices = np.flatnonzero(labels == label).tolist()
+        clusters.append({
+            "symbols": [symbols[i] for i in indices],
+            "indices": indices,
+            "avg_correlation": cluster_stats['avg_correlation'],
+        })
+    clusters.sort(key=lambda c: (-len(c["indices"]), c["indices"][0]))
+    return clusters
+
+
+class CorrelationClusterTree:
+    """
+    Single-linkage hierarchy over 1 - |corr|, cut at any correlation threshold.
+
+    Usage:
+        tree = CorrelationClusterTree(symbols, correlations)
+        tree.clusters(0.7)
+        tree.clusters_at([0.5, 0.7, 0.9])
+    """
+
+    def __init__(self, symbols: List[str], correlations: np.ndarray):
+        self.symbols = list(symbols)
+        self.correlations = np.asarray(correlations, dtype=float)
+
+        n = len(self.symbols)
+        if n >= 2:
+            distances = 1.0 - np.clip(np.abs(self.correlations), 0.0, 1.0)
+            distances[np.isnan(distances)] = _UNLINKED_DISTANCE
+            np.fill_diagonal(distances, 0.0)
+            distances = np.minimum(distances, distances.T)  # Guard against asymmetric input
+            self._linkage = linkage(squareform(distances, checks=False), method='single')
+        else:
+            self._linkage = None
+
+    def labels(self, threshold: float) -> np.ndarray:
+        """Component labels of the |corr| >= threshold graph."""
+        if self._linkage is None:
+            return np.zeros(len(self.symbols), dtype=int)
+        # Nudge the cut so pairs exactly at the threshold link (|corr| >= threshold)
+        cut = (1.0 - threshold) + 1e-12
+        return fcluster(self._linkage, t=cut, criterion='distance') - 1
+
+    def clusters(self, threshold: float) -> List[Dict]:
+        """Clusters of 2+ symbols at one threshold (see build_clusters)."""
+        return build_clusters(self.symbols, self.correlations, self.labels(threshold))
+
+    def clusters_at(self, thresholds: Iterable[float]) -> Dict[float, List[Dict]]:
+        """Clusters at several thresholds from the same hierarchy."""
+        return {float(threshold): self.clusters(threshold) for threshold in thresholds}
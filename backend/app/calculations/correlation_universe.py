@@ -0,0 +1,334 @@
+"""
+Universe-Level Shared Correlation Engine
+
+Phase 4 used to compute a correlation matrix per portfolio, reloading prices
+and recomputing correlations for symbols that many portfolios hold. This
+module computes one pairwise-complete correlation and covariance estimate
+over the union of held symbols per lookback, once per batch date; each
+portfolio's matrix is an index slice of it.
+
+- pairwise_complete_statistics(): overlaps, correlations and p-values for
+  every symbol pair in a few matrix products
+- shrink_correlations(): optional Ledoit-Wolf-type shrinkage toward the
+  identity (analytic intensity, Schafer-Strimmer form for pairwise data)
+- fix_psd(): nearest-PSD repair by eigenvalue clipping
+- build_universe_correlations(): the batch entry point
+
+Returns are one-day log returns: a return is only defined when a symbol has
+closes on two consecutive universe trading dates, so every pair correlates
+single-day returns over the same days. PSD repair runs once on the shared
+matrix; any principal submatrix (a portfolio slice) of a PSD matrix is PSD.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sqlalchemy import select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculations.market_data import fetch_historical_prices
+from app.core.logging import get_logger
+from app.models.positions import Position
+
+logger = get_logger(__name__)
+
+# Lookbacks computed by build_universe_correlations() by default (duration_days)
+DEFAULT_CORRELATION_LOOKBACKS = (90,)
+
+# Minimum returns per symbol (same as CorrelationService._validate_data_sufficiency)
+MIN_SYMBOL_OBSERVATIONS = 20
+
+
+def min_pair_overlap(duration_days: int) -> int:
+    """Minimum paired observations for a correlation: 1/3 of the lookback, at least 20."""
+    return max(20, duration_days // 3)
+
+
+@dataclass
+class UniverseCorrelationMatrix:
+    """Shared correlation/covariance estimate for one lookback."""
+    calculation_date: date
+    duration_days: int
+    symbols: List[str]
+    correlations: np.ndarray  # PSD-repaired (and optionally shrunk), NaN where overlap < min
+    covariance: np.ndarray  # Daily log-return covariance consistent with correlations
+    overlaps: np.ndarray  # Paired observation counts (diagonal = symbol observations)
+    p_values: np.ndarray  # Two-sided p-values of the raw pairwise correlations
+    shrinkage: float  # Applied shrinkage intensity (0 = none)
+    psd_corrected: bool
+
+    def slice(self, symbols: Iterable[str]) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """
+        Portfolio view of the shared matrix.
+
+        Keeps symbols (in the given order) that are in the universe with at
+        least MIN_SYMBOL_OBSERVATIONS returns.
+
+        Returns:
+            Tuple of (correlation DataFrame, overlaps, p_values) for the kept symbols
+        """
+        index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        kept = [
+            symbol for symbol in dict.fromkeys(symbols)
+            if symbol in index and self.overlaps[index[symbol], index[symbol]] >= MIN_SYMBOL_OBSERVATIONS
+        ]
+        positions = [index[symbol] for symbol in kept]
+        grid = np.ix_(positions, positions)
+        correlation_df = pd.DataFrame(self.correlations[grid], index=kept, columns=kept)
+        return correlation_df, self.overlaps[grid], self.p_values[grid]
+
+
+def one_day_log_returns(price_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Log returns between consecutive rows, NaN unless both closes exist.
+
+    Non-positive closes are treated as missing. The first row is dropped.
+    """
+    prices = price_df.where(price_df > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(prices / prices.shift(1))
+    return returns.iloc[1:].replace([np.inf, -np.inf], np.nan)
+
+
+def pairwise_complete_statistics(
+    returns_df: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete correlations, overlap counts and p-values in array operations.
+
+    For every pair, uses only the dates where both symbols have a return
+    (like returns_df.corr() and scipy.stats.pearsonr on the paired rows):
+    with M the observed mask and X the zero-filled demeaned returns,
+    n = M'M, sums and squared sums over the paired rows are X'M and
+    (X²)'M, and the cross products are X'X. P-values are two-sided from
+    the t distribution with n - 2 degrees of freedom (pearsonr's test).
+
+    Args:
+        returns_df: DataFrame with dates as index and symbols as columns
+
+    Returns:
+        Tuple of (correlations, overlaps, p_values), each (n_symbols x n_symbols);
+        correlations/p-values are NaN for pairs with < 3 paired observations
+        or no variance (as returns_df.corr(min_periods=3)), and the diagonal
+        p-value is 0
+    """
+    observed = returns_df.notna().to_numpy()
+    mask = observed.astype(float)
+    values = np.where(observed, returns_df.to_numpy(dtype=float), 0.0)
+    # Demean by each column's own mean before summing (limits cancellation)
+    counts = mask.sum(axis=0)
+    values = np.where(observed, values - values.sum(axis=0) / np.maximum(counts, 1), 0.0)
+
+    overlaps = mask.T @ mask
+    sums = values.T @ mask  # [i, j] = sum of x_i over dates where j is observed
+    squares = (values ** 2).T @ mask
+    cross = values.T @ values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = cross - sums * sums.T / overlaps
+        var_i = squares - sums ** 2 / overlaps
+        var_j = var_i.T
+        correlations = cov / np.sqrt(var_i * var_j)
+        correlations = np.clip(correlations, -1.0, 1.0)
+        correlations[(overlaps < 3) | (var_i <= 0) | (var_j <= 0)] = np.nan
+
+        dof = overlaps - 2
+        t_stat = correlations * np.sqrt(dof / (1.0 - correlations ** 2))
+        p_values = 2.0 * stats.t.sf(np.abs(t_stat), dof)
+    p_values[np.abs(correlations) == 1.0] = 0.0
+    p_values[np.isnan(correlations)] = np.nan
+
+    np.fill_diagonal(
+        correlations,
+        np.where((np.diag(overlaps) >= 3) & (np.diag(var_i) > 0), 1.0, np.nan)
+    )
+    np.fill_diagonal(p_values, 0.0)
+
+    return correlations, overlaps.astype(np.int64), p_values
+
+
+def shrink_correlations(
+    returns_df: pd.DataFrame,
+    correlations: np.ndarray,
+    overlaps: np.ndarray
+) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf-type shrinkage of a pairwise correlation matrix toward the identity.
+
+    R* = (1 - λ) R + λ I, with the analytic intensity
+    λ = Σ Var(r_ij) / Σ r_ij² over defined off-diagonal pairs, where Var(r_ij)
+    is estimated from the per-date products of standardized returns
+    (Schafer & Strimmer 2005, which extends Ledoit-Wolf to pairwise-complete data).
+
+    Returns:
+        Tuple of (shrunk correlations, intensity λ in [0, 1])
+    """
+    observed = returns_df.notna().to_numpy()
+    standardized = ((returns_df - returns_df.mean()) / returns_df.std(ddof=1)).to_numpy(dtype=float)
+    standardized = np.where(observed & np.isfinite(standardized), standardized, 0.0)
+
+    n = overlaps.astype(float)
+    w_sum = standardized.T @ standardized
+    w_sq_sum = (standardized ** 2).T @ (standardized ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var_r = n / (n - 1) ** 3 * (w_sq_sum - w_sum ** 2 / n)
+
+    off_diagonal = ~np.eye(len(correlations), dtype=bool) & ~np.isnan(correlations) & (n > 3)
+    denominator = float(np.sum(correlations[off_diagonal] ** 2))
+    if denominator <= 0:
+        return correlations, 0.0
+    intensity = float(np.clip(np.sum(var_r[off_diagonal]) / denominator, 0.0, 1.0))
+
+    shrunk = (1.0 - intensity) * correlations
+    np.fill_diagonal(shrunk, np.diag(correlations))
+    return shrunk, intensity
+
+
+def fix_psd(correlations: np.ndarray) -> Tuple[np.ndarray, bool]:
+    """
+    Nearest-PSD repair of a correlation matrix by eigenvalue clipping.
+
+    NaN pairs are repaired as 0 (uncorrelated) and set back to NaN after, so
+    readers still treat them as missing.
+
+    Returns:
+        Tuple of (matrix, was_corrected)
+    """
+    if correlations.size == 0 or np.isnan(correlations).all():
+        return correlations, False
+
+    missing = np.isnan(correlations)
+    filled = np.where(missing, 0.0, correlations)
+    np.fill_diagonal(filled, 1.0)
+
+    try:
+        eigenvalues, eigenvectors = np.linalg.eigh(filled)
+    except np.linalg.LinAlgError as e:
+        logger.error(f"Failed to compute eigenvalues for PSD validation: {e}")
+        return correlations, False
+
+    # Tolerance for numerical precision (-1e-10 allows for floating point errors)
+    if eigenvalues.min() >= -1e-10:
+        return correlations, False
+
+    logger.warning(
+        f"Non-PSD correlation matrix detected. Min eigenvalue: {eigenvalues.min():.6f}. "
+        f"Applying nearest PSD correction..."
+    )
+    corrected = eigenvectors @ np.diag(np.maximum(eigenvalues, 0)) @ eigenvectors.T
+
+    # Rescale to ensure diagonal = 1.0 (required for correlation matrix)
+    d = np.sqrt(np.diag(corrected))
+    d = np.where(d == 0, 1, d)
+    corrected = corrected / d[:, None] / d[None, :]
+    corrected[missing] = np.nan
+    return corrected, True
+
+
+def build_correlation_matrix(
+    returns_df: pd.DataFrame,
+    calculation_date: date,
+    duration_days: int,
+    shrink: bool = False
+) -> UniverseCorrelationMatrix:
+    """
+    Shared matrix for one lookback from (dates x symbols) one-day returns.
+
+    Pairs with fewer than min_pair_overlap(duration_days) paired returns are NaN.
+    """
+    correlations, overlaps, p_values = pairwise_complete_statistics(returns_df)
+    correlations = np.where(overlaps >= min_pair_overlap(duration_days), correlations, np.nan)
+
+    intensity = 0.0
+    if shrink:
+        correlations, intensity = shrink_correlations(returns_df, correlations, overlaps)
+
+    correlations, psd_corrected = fix_psd(correlations)
+
+    variances = returns_df.var(ddof=1).to_numpy()
+    scale = np.sqrt(np.outer(variances, variances))
+    covariance = correlations * scale
+
+    return UniverseCorrelationMatrix(
+        calculation_date=calculation_date,
+        duration_days=duration_days,
+        symbols=list(returns_df.columns),
+        correlations=correlations,
+        covariance=covariance,
+        overlaps=overlaps,
+        p_values=p_values,
+        shrinkage=intensity,
+        psd_corrected=psd_corrected,
+    )
+
+
+async def build_universe_correlations(
+    db: AsyncSession,
+    portfolio_ids: List,
+    calculation_date: date,
+    lookbacks: Iterable[int] = DEFAULT_CORRELATION_LOOKBACKS,
+    price_cache=None,
+    shrink: bool = False
+) -> Dict[int, UniverseCorrelationMatrix]:
+    """
+    Compute the shared correlation matrices for every held public symbol.
+
+    Args:
+        db: Database session
+        portfolio_ids: Portfolios whose (non-PRIVATE) position symbols form the universe
+        calculation_date: Batch date
+        lookbacks: duration_days values to compute
+        price_cache: Optional PriceCache for the price fetch
+        shrink: Apply Ledoit-Wolf-type shrinkage toward the identity
+
+    Returns:
+        {duration_days: UniverseCorrelationMatrix}
+    """
+    lookbacks = sorted(set(lookbacks))
+    if not portfolio_ids or not lookbacks:
+        return {}
+
+    symbol_result = await db.execute(
+        select(Position.symbol).where(
+            and_(
+                Position.portfolio_id.in_(portfolio_ids),
+                or_(Position.investment_class.is_(None), Position.investment_class != 'PRIVATE'),
+                Position.symbol.isnot(None)
+            )
+        ).distinct()
+    )
+    symbols = sorted({row[0] for row in symbol_result.all() if row[0]})
+    if not symbols:
+        return {}
+
+    start_date = calculation_date - timedelta(days=max(lookbacks))
+    price_df = await fetch_historical_prices(
+        db=db, symbols=symbols, start_date=start_date, end_date=calculation_date, price_cache=price_cache
+    )
+    if price_df.empty and price_cache is not None:
+        price_df = await fetch_historical_prices(
+            db=db, symbols=symbols, start_date=start_date, end_date=calculation_date
+        )
+    if price_df.empty:
+        logger.warning(f"No prices for the correlation universe ({len(symbols)} symbols)")
+        return {}
+
+    price_df = price_df.astype(float)
+    price_df.index = pd.DatetimeIndex(price_df.index)
+
+    matrices: Dict[int, UniverseCorrelationMatrix] = {}
+    for duration_days in lookbacks:
+        window = price_df.loc[pd.Timestamp(calculation_date - timedelta(days=duration_days)):]
+        returns_df = one_day_log_returns(window).dropna(axis=1, how='all')
+        matrix = build_correlation_matrix(returns_df, calculation_date, duration_days, shrink=shrink)
+        matrices[duration_days] = matrix
+        logger.info(
+            f"Universe correlations ({duration_days}d): {len(matrix.symbols)} symbols, "
+            f"{len(returns_df)} return dates, shrinkage={matrix.shrinkage:.3f}, "
+            f"PSD {'CORRECTED' if matrix.psd_corrected else 'PASSED'}"
+        )
+
+    return matrices
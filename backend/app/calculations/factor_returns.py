@@ -0,0 +1,305 @@
+"""
+Persisted Daily Factor Returns
+
+Factor ETF returns used to be rebuilt from prices (fetch + align + pct_change)
+by every consumer: fetch_factor_returns, fetch_spread_returns, the factor
+correlation matrix, the SPY/TLT series in the OLS beta paths and the
+/factors/etf-prices endpoint. This module computes them once per batch date
+into the factor_returns table and serves every consumer from it.
+
+- refresh_factor_returns(): batch step, upserts the daily return of every
+  factor ETF (incremental after the first run)
+- get_factor_returns(): the single accessor, with an in-process memo
+
+Stored returns are measured from each ETF's previous available close, so
+get_factor_returns() can rebuild exactly what
+get_returns(align_dates=True) returns for any subset of ETFs: rows where
+any requested ETF has no close are dropped and the others compound over
+the gap.
+
+Rows are keyed by (symbol, return_date, version). Readers only see
+FACTOR_RETURNS_VERSION, so changing the return definition is a constant bump
+plus a refresh, never an in-place rewrite.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from cachetools import TTLCache
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculations.market_data import fetch_historical_prices, gap_aware_returns, get_returns
+from app.constants.factors import (
+    FACTOR_ETFS,
+    FACTOR_RETURN_HISTORY_DAYS,
+    FACTOR_RETURN_MEMO_MAX_ENTRIES,
+    FACTOR_RETURN_MEMO_TTL_SECONDS,
+    FACTOR_RETURN_REFRESH_OVERLAP_DAYS,
+    FACTOR_RETURNS_VERSION,
+    SPREAD_FACTORS,
+)
+from app.core.logging import get_logger
+from app.models.market_data import FactorReturn
+from app.utils.trading_calendar import trading_calendar
+
+logger = get_logger(__name__)
+
+# Rows per INSERT statement (5 bind params per row)
+UPSERT_CHUNK_ROWS = 2000
+
+# Every ETF stored by refresh_factor_returns()
+FACTOR_RETURN_SYMBOLS: List[str] = sorted(
+    set(FACTOR_ETFS.values()) | {etf for pair in SPREAD_FACTORS.values() for etf in pair}
+)
+
+# (version, symbols, start, end) -> aligned returns
+_memo: TTLCache = TTLCache(maxsize=FACTOR_RETURN_MEMO_MAX_ENTRIES, ttl=FACTOR_RETURN_MEMO_TTL_SECONDS)
+
+
+def clear_factor_return_memo() -> None:
+    """Drop every memoized factor return frame (called after a refresh)."""
+    _memo.clear()
+
+
+def align_factor_returns(stored_returns: pd.DataFrame) -> pd.DataFrame:
+    """
+    Align stored per-ETF returns the way get_returns(align_dates=True) aligns prices.
+
+    Each column is turned back into a price index (cumulative product of
+    1 + return over the dates that ETF has a close), rows where any ETF has
+    no close are dropped, and returns are taken on what remains. Across a
+    dropped row, the returns of the other ETFs compound exactly as their
+    closes would.
+
+    Args:
+        stored_returns: (dates x symbols) stored returns, NaN where the ETF has
+            no close; a close with no stored return (first stored row) is 0.0
+
+    Returns:
+        Aligned daily returns (first aligned date dropped, like pct_change().dropna())
+    """
+    if stored_returns.empty:
+        return pd.DataFrame()
+
+    price_index = (1.0 + stored_returns).cumprod()
+    aligned = price_index.dropna()
+    return aligned.pct_change(fill_method=None).dropna()
+
+
+def factor_return_rows(price_df: pd.DataFrame, stored_symbols: set) -> List[Dict[str, Any]]:
+    """
+    Build factor_returns rows from a (dates x symbols) close matrix.
+
+    A close whose previous close falls before the fetched range has no return;
+    it is written (as NULL) only for symbols with nothing stored yet, where it
+    anchors the series.
+    """
+    returns = gap_aware_returns(price_df)
+    rows = []
+    for symbol in price_df.columns:
+        closes = price_df[symbol]
+        symbol_returns = returns[symbol]
+        for ts in closes.index[closes.notna()]:
+            value = symbol_returns.loc[ts]
+            if pd.isna(value):
+                if symbol in stored_symbols:
+                    continue
+                daily_return = None
+            else:
+                daily_return = Decimal(str(round(float(value), 12)))
+            rows.append({
+                'symbol': symbol,
+                'return_date': ts.date(),
+                'daily_return': daily_return,
+                'version': FACTOR_RETURNS_VERSION,
+            })
+    return rows
+
+
+async def refresh_factor_returns(
+    db: AsyncSession,
+    calculation_date: date,
+    symbols: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Compute and upsert daily factor returns through calculation_date.
+
+    The first run stores FACTOR_RETURN_HISTORY_DAYS of history; later runs
+    only rewrite the last FACTOR_RETURN_REFRESH_OVERLAP_DAYS before the
+    latest stored date (to pick up price corrections) plus anything newer.
+
+    Args:
+        db: Database session (committed here)
+        calculation_date: Batch date
+        symbols: ETFs to refresh (default FACTOR_RETURN_SYMBOLS)
+
+    Returns:
+        Dict with symbols, rows_written, start_date, end_date
+    """
+    symbols = list(symbols or FACTOR_RETURN_SYMBOLS)
+
+    latest_stmt = select(
+        FactorReturn.symbol,
+        func.max(FactorReturn.return_date)
+    ).where(
+        and_(
+            FactorReturn.symbol.in_(symbols),
+            FactorReturn.version == FACTOR_RETURNS_VERSION
+        )
+    ).group_by(FactorReturn.symbol)
+    latest = {symbol: last_date for symbol, last_date in (await db.execute(latest_stmt)).all()}
+
+    if latest and all(symbol in latest for symbol in symbols):
+        start_date = min(latest.values()) - timedelta(days=FACTOR_RETURN_REFRESH_OVERLAP_DAYS)
+    else:
+        start_date = calculation_date - timedelta(days=FACTOR_RETURN_HISTORY_DAYS)
+
+    price_df = await fetch_historical_prices(
+        db=db,
+        symbols=symbols,
+        start_date=start_date,
+        end_date=calculation_date
+    )
+    summary = {
+        'symbols': len(symbols),
+        'rows_written': 0,
+        'start_date': start_date.isoformat(),
+        'end_date': calculation_date.isoformat(),
+    }
+    if price_df.empty:
+        logger.warning(f"No factor ETF prices between {start_date} and {calculation_date}")
+        return summary
+
+    rows = factor_return_rows(price_df, set(latest))
+
+    for i in range(0, len(rows), UPSERT_CHUNK_ROWS):
+        stmt = pg_insert(FactorReturn).values(rows[i:i + UPSERT_CHUNK_ROWS])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['symbol', 'return_date', 'version'],
+            set_={
+                'daily_return': stmt.excluded.daily_return,
+                'updated_at': func.now(),
+            }
+        )
+        await db.execute(stmt)
+    await db.commit()
+
+    clear_factor_return_memo()
+    from app.calculations.stress_testing import clear_factor_correlation_memo  # Avoid import cycle
+    clear_factor_correlation_memo()
+    summary['rows_written'] = len(rows)
+    logger.info(
+        f"Factor returns refreshed: {len(rows)} rows for {len(symbols)} ETFs "
+        f"({start_date} to {calculation_date}, version {FACTOR_RETURNS_VERSION})"
+    )
+    return summary
+
+
+async def get_factor_returns(
+    db: AsyncSession,
+    symbols: List[str],
+    start_date: date,
+    end_date: date,
+    price_cache=None
+) -> pd.DataFrame:
+    """
+    Aligned daily returns for factor ETFs - CANONICAL FACTOR RETURN ACCESSOR
+
+    Same result as get_returns(db, symbols, start_date, end_date,
+    align_dates=True), served from the factor_returns table and memoized
+    in-process for FACTOR_RETURN_MEMO_TTL_SECONDS. If any requested ETF is
+    not stored from the start of the range through the last trading day on
+    or before end_date (table not refreshed yet, window older than the
+    stored history, or an ETF outside FACTOR_RETURN_SYMBOLS), falls back to
+    computing from prices.
+
+    Args:
+        db: Database session
+        symbols: Factor ETF symbols (SPY, VTV, ...)
+        start_date: Start of the price window
+        end_date: End of the price window
+        price_cache: Optional PriceCache for the price fallback
+
+    Returns:
+        DataFrame with dates as index and ETF symbols as columns
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame()
+
+    key = (FACTOR_RETURNS_VERSION, tuple(sorted(symbols)), start_date, end_date)
+    cached = _memo.get(key)
+    if cached is not None:
+        return cached[symbols].copy()
+
+    stmt = select(
+        FactorReturn.symbol,
+        FactorReturn.return_date,
+        FactorReturn.daily_return
+    ).where(
+        and_(
+            FactorReturn.symbol.in_(symbols),
+            FactorReturn.version == FACTOR_RETURNS_VERSION,
+            FactorReturn.return_date >= start_date,
+            FactorReturn.return_date <= end_date
+        )
+    )
+    records = (await db.execute(stmt)).all()
+
+    # Every ETF must be stored from (about) the start of the window through
+    # its last trading day, otherwise the most recent days would be missing
+    first_stored: Dict[str, date] = {}
+    last_stored: Dict[str, date] = {}
+    for record in records:
+        if record.symbol not in first_stored or record.return_date < first_stored[record.symbol]:
+            first_stored[record.symbol] = record.return_date
+        if record.symbol not in last_stored or record.return_date > last_stored[record.symbol]:
+            last_stored[record.symbol] = record.return_date
+    coverage_start = start_date + timedelta(days=FACTOR_RETURN_REFRESH_OVERLAP_DAYS)
+    coverage_end = (
+        end_date if trading_calendar.is_trading_day(end_date)
+        else trading_calendar.get_previous_trading_day(end_date)
+    ) or end_date
+    uncovered = [
+        symbol for symbol in symbols
+        if symbol not in first_stored
+        or first_stored[symbol] > coverage_start
+        or last_stored[symbol] < coverage_end
+    ]
+
+    if uncovered:
+        logger.debug(
+            f"factor_returns does not cover {uncovered} "
+            f"for {start_date} to {end_date}; computing from prices"
+        )
+        returns = await get_returns(
+            db=db,
+            symbols=symbols,
+            start_date=start_date,
+            end_date=end_date,
+            align_dates=True,
+            price_cache=price_cache
+        )
+    else:
+        stored = pd.DataFrame(
+            [
+                (
+                    record.symbol,
+                    pd.Timestamp(record.return_date),
+                    float(record.daily_return) if record.daily_return is not None else 0.0,
+                )
+                for record in records
+            ],
+            columns=['symbol', 'date', 'daily_return']
+        ).pivot(index='date', columns='symbol', values='daily_return').sort_index()
+        returns = align_factor_returns(stored)
+
+    if returns.empty:
+        return pd.DataFrame()
+
+    returns = returns[symbols]
+    _memo[key] = returns
+    return returns.copy()
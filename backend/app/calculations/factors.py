@@ -36,6 +36,7 @@ from app.calculations.factor_utils import (
 )
 from app.calculations.regression_utils import classify_r_squared, classify_significance
 from app.calculations.market_data import get_position_value, get_returns, is_options_position
+from app.calculations.factor_returns import get_factor_returns
 from app.constants.factors import (
     FACTOR_ETFS, REGRESSION_WINDOW_DAYS, MIN_REGRESSION_DAYS,
     BETA_CAP_LIMIT, POSITION_CHUNK_SIZE, QUALITY_FLAG_FULL_HISTORY,
@@ -57,7 +58,8 @@ async def fetch_factor_returns(
     """
     Fetch factor returns calculated from ETF price changes, aligned to common trading dates.
 
-    Phase 8.1: Now uses canonical get_returns() to eliminate duplicate return calculation logic.
+    Reads the persisted factor_returns table via get_factor_returns() (same
+    values as get_returns(align_dates=True), which it falls back to).
 
     Args:
         db: Database session
@@ -79,14 +81,13 @@ async def fetch_factor_returns(
         logger.warning("Empty symbols list provided to fetch_factor_returns")
         return pd.DataFrame()
 
-    # Phase 8.1: Use canonical get_returns() instead of manual pipeline
-    returns_df = await get_returns(
+    # Persisted factor returns, aligned to common trading dates
+    returns_df = await get_factor_returns(
         db=db,
         symbols=symbols,
         start_date=start_date,
         end_date=end_date,
-        align_dates=True,  # Ensures all returns aligned to common trading dates
-        price_cache=price_cache  # Pass through cache for optimization
+        price_cache=price_cache  # Used only if the table has not been refreshed
     )
 
     if returns_df.empty:
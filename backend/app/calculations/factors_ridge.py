@@ -38,8 +38,22 @@ from sklearn.preprocessing import StandardScaler
 
 from app.models.positions import Position
 from app.models.market_data import FactorDefinition, FactorExposure
-from app.calculations.market_data import get_position_value, get_returns
-from app.calculations.regression_utils import classify_r_squared
+from app.calculations.market_data import (
+    get_position_value,
+    get_returns,
+    get_returns_matrix,
+    gap_aware_returns,
+    previous_close_ordinals,
+)
+from app.calculations.factor_returns import get_factor_returns
+from app.calculations.regression_utils import (
+    RegressionMoments,
+    classify_r_squared,
+    masked_regression_moments,
+    ridge_cv_errors,
+    rolling_factor_moments,
+    solve_regression_from_moments,
+)
 from app.calculations.factor_utils import (
     get_default_storage_results,
     get_default_data_quality,
@@ -74,6 +88,9 @@ RIDGE_STYLE_FACTORS = {
 
 EXPECTED_RIDGE_FACTOR_COUNT = 6
 
+# Alphas scored by select_ridge_alpha() (stored as Numeric(6, 4), so < 100)
+RIDGE_ALPHA_GRID = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0)
+
 
 def calculate_single_position_ridge_betas(
     position_returns: pd.Series,
@@ -179,6 +196,159 @@ def calculate_single_position_ridge_betas(
         }
 
 
+def calculate_batch_ridge_betas(
+    symbol_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    regularization_alpha: float = 1.0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Calculate Ridge regression factor betas for many symbols in one batch.
+
+    Numerically equivalent to calling calculate_single_position_ridge_betas()
+    per symbol (same standardization, intercept, MIN_REGRESSION_DAYS /
+    degrees-of-freedom rules and BETA_CAP_LIMIT), but all symbols share the
+    factor matrix, so the whole universe is solved from masked sufficient
+    statistics with one stacked 6x6 solve instead of one sklearn fit each.
+
+    Args:
+        symbol_returns: Daily returns (dates x symbols), NaN where a symbol has
+            no return (see market_data.get_returns_matrix)
+        factor_returns: Daily returns for the style factors (dates x factors)
+        regularization_alpha: L2 penalty strength (default 1.0)
+
+    Returns:
+        {symbol: result} where each result has the same keys as
+        calculate_single_position_ridge_betas() (betas, r_squared,
+        observations, success, error)
+    """
+    factor_returns = factor_returns.dropna()
+    factor_names = list(factor_returns.columns)
+    symbols = list(symbol_returns.columns)
+
+    aligned = symbol_returns.reindex(factor_returns.index)
+    X = factor_returns.to_numpy(dtype=np.float64)
+    Y = aligned.to_numpy(dtype=np.float64)
+    mask = np.isfinite(Y)
+
+    moments = masked_regression_moments(X, Y, mask)
+    return _ridge_results_from_moments(moments, symbols, factor_names, regularization_alpha)
+
+
+def calculate_rolling_ridge_betas(
+    symbol_prices: pd.DataFrame,
+    factor_prices: pd.DataFrame,
+    calculation_dates: List[date],
+    lookback_days: int = REGRESSION_WINDOW_DAYS + 30,
+    regularization_alpha: float = 1.0
+) -> Dict[date, Dict[str, Dict[str, Any]]]:
+    """
+    Calculate Ridge betas for many symbols on several consecutive dates.
+
+    Equivalent to calculate_batch_ridge_betas() on each date's own price
+    window [date - lookback_days, date], but the sufficient statistics slide
+    from one date to the next (rolling_factor_moments) instead of being
+    rebuilt per date, so a multi-day backfill costs about one fit plus a few
+    row updates per extra day.
+
+    Args:
+        symbol_prices: Closes for the whole range (dates x symbols), NaN where missing
+        factor_prices: Style factor ETF closes for the same range, columns
+            named by factor (dates x factors)
+        calculation_dates: Dates to calculate (window end dates)
+        lookback_days: Calendar days per window (per-date price fetch length)
+        regularization_alpha: L2 penalty strength (default 1.0)
+
+    Returns:
+        {calculation_date: {symbol: result}} with calculate_batch_ridge_betas() results
+    """
+    aligned = factor_prices.dropna()
+    factor_returns = gap_aware_returns(aligned).iloc[1:]
+    factor_previous = previous_close_ordinals(aligned).iloc[1:, 0]
+
+    symbols = list(symbol_prices.columns)
+    factor_names = list(factor_returns.columns)
+
+    return {
+        calculation_date: _ridge_results_from_moments(
+            moments, symbols, factor_names, regularization_alpha
+        )
+        for calculation_date, moments in rolling_factor_moments(
+            symbol_returns=gap_aware_returns(symbol_prices),
+            symbol_previous=previous_close_ordinals(symbol_prices),
+            factor_returns=factor_returns,
+            factor_previous=factor_previous,
+            calculation_dates=calculation_dates,
+            lookback_days=lookback_days
+        )
+    }
+
+
+def _ridge_results_from_moments(
+    moments: RegressionMoments,
+    symbols: List[str],
+    factor_names: List[str],
+    regularization_alpha: float
+) -> Dict[str, Dict[str, Any]]:
+    """Solve and package Ridge results (calculate_single_position_ridge_betas keys) per symbol."""
+    observations = moments.n.astype(int)
+
+    enough_data = observations >= MIN_REGRESSION_DAYS
+    enough_dof = observations > len(factor_names)
+    solvable = enough_data & enough_dof
+
+    fitted = None
+    if solvable.any():
+        fitted = solve_regression_from_moments(
+            moments.take(solvable),
+            alpha=regularization_alpha,
+            standardize=True
+        )
+
+    zero_betas = {fn: 0.0 for fn in factor_names}
+    results: Dict[str, Dict[str, Any]] = {}
+    fit_idx = 0
+
+    for j, symbol in enumerate(symbols):
+        n_obs = int(observations[j])
+
+        if not enough_data[j]:
+            results[symbol] = {
+                'betas': dict(zero_betas),
+                'r_squared': 0.0,
+                'observations': n_obs,
+                'success': False,
+                'error': f'Insufficient data: {n_obs} days (minimum: {MIN_REGRESSION_DAYS})'
+            }
+            continue
+
+        if not enough_dof[j]:
+            results[symbol] = {
+                'betas': dict(zero_betas),
+                'r_squared': 0.0,
+                'observations': n_obs,
+                'success': False,
+                'error': f'Insufficient degrees of freedom: {n_obs} obs vs {len(factor_names)} factors'
+            }
+            continue
+
+        raw_betas = fitted.betas[fit_idx]
+        r_squared = float(fitted.r_squared[fit_idx])
+        fit_idx += 1
+
+        raw_betas = np.where(np.isfinite(raw_betas), raw_betas, 0.0)
+        capped_betas = np.clip(raw_betas, -BETA_CAP_LIMIT, BETA_CAP_LIMIT)
+
+        results[symbol] = {
+            'betas': {fn: float(b) for fn, b in zip(factor_names, capped_betas)},
+            'r_squared': r_squared,
+            'observations': n_obs,
+            'success': True,
+            'error': None
+        }
+
+    return results
+
+
 async def calculate_factor_betas_ridge(
     db: AsyncSession,
     portfolio_id: UUID,
@@ -553,28 +723,125 @@ def _build_skip_result(
     }
 
 
+def select_ridge_alpha(
+    symbol_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    alphas: Optional[List[float]] = None,
+    criterion: str = 'gcv'
+) -> Dict[str, Any]:
+    """
+    Pick the Ridge alpha by closed-form cross-validation for many symbols at once.
+
+    Every alpha in the grid is scored for every symbol from one SVD per
+    observation pattern (ridge_cv_errors), with the same data rules as
+    calculate_batch_ridge_betas (symbols below MIN_REGRESSION_DAYS are left
+    out). No regression is refit, so the whole grid costs about one fit.
+
+    The universe-wide error curve averages each symbol's CV error divided by
+    its return variance (roughly 1 - out-of-sample R²), so volatile symbols
+    do not dominate the choice.
+
+    Args:
+        symbol_returns: Daily returns (dates x symbols), NaN where missing
+        factor_returns: Daily returns for the style factors (dates x factors)
+        alphas: Penalties to score (default RIDGE_ALPHA_GRID)
+        criterion: 'gcv' or 'loo'
+
+    Returns:
+        Dictionary containing:
+        - alphas: Grid scored
+        - criterion: 'gcv' or 'loo'
+        - error_curve: Universe-wide relative CV error per alpha
+        - recommended_alpha: Universe-wide best alpha
+        - symbol_alphas: {symbol: best alpha} for every evaluated symbol
+        - symbols_evaluated: Number of symbols scored
+    """
+    alphas = list(alphas or RIDGE_ALPHA_GRID)
+    factor_returns = factor_returns.dropna()
+
+    Y = symbol_returns.reindex(factor_returns.index).to_numpy(dtype=np.float64)
+    mask = np.isfinite(Y)
+    observations = mask.sum(axis=0)
+    with np.errstate(invalid='ignore'):
+        variance = np.nanvar(np.where(mask, Y, np.nan), axis=0) if Y.size else np.zeros(Y.shape[1])
+    usable = (observations >= MIN_REGRESSION_DAYS) & (variance > 0)
+
+    errors = ridge_cv_errors(
+        factor_returns.to_numpy(dtype=np.float64),
+        np.where(mask, Y, 0.0)[:, usable],
+        mask[:, usable],
+        np.asarray(alphas),
+        criterion=criterion
+    )
+    evaluated = np.all(np.isfinite(errors), axis=0)
+    symbols = [s for s, keep in zip(symbol_returns.columns, usable) if keep]
+
+    result = {
+        'alphas': alphas,
+        'criterion': criterion,
+        'error_curve': [],
+        'recommended_alpha': 1.0,  # Default fallback when no symbol can be scored
+        'symbol_alphas': {},
+        'symbols_evaluated': int(evaluated.sum()),
+    }
+    if not evaluated.any():
+        return result
+
+    errors = errors[:, evaluated]
+    relative = errors / variance[usable][evaluated][None, :]
+    curve = relative.mean(axis=1)
+
+    result['error_curve'] = [float(e) for e in curve]
+    result['recommended_alpha'] = float(alphas[int(np.argmin(curve))])
+    result['symbol_alphas'] = {
+        symbol: float(alphas[i])
+        for symbol, i in zip(
+            [s for s, keep in zip(symbols, evaluated) if keep],
+            np.argmin(errors, axis=0)
+        )
+    }
+    return result
+
+
 async def tune_ridge_alpha(
     db: AsyncSession,
     portfolio_id: UUID,
     calculation_date: date,
     alpha_range: Optional[List[float]] = None,
-    context: Optional[PortfolioContext] = None
+    context: Optional[PortfolioContext] = None,
+    method: str = 'refit',
+    price_cache=None
 ) -> Dict[str, Any]:
     """
     Test multiple alpha values and return comparison metrics.
 
     Helps choose optimal regularization strength for this portfolio.
 
+    Methods:
+    - 'refit': run calculate_factor_betas_ridge once per alpha and compare
+      in-sample R² (original behaviour)
+    - 'gcv' / 'loo': score the whole grid for the portfolio's symbols in
+      closed form (select_ridge_alpha); no refits and no writes
+
     Args:
         db: Database session
         portfolio_id: Portfolio ID to analyze
         calculation_date: Date for calculation
-        alpha_range: List of alpha values to test (default: [0.01, 0.1, 1.0, 5.0, 10.0])
+        alpha_range: List of alpha values to test (default: [0.01, 0.1, 1.0, 5.0, 10.0]
+            for 'refit', RIDGE_ALPHA_GRID for 'gcv' / 'loo')
         context: Pre-loaded portfolio context (optional)
+        method: 'refit', 'gcv' or 'loo'
+        price_cache: Optional PriceCache ('gcv' / 'loo' only)
 
     Returns:
         Dictionary with alpha comparison results and recommended alpha
+        ('gcv' / 'loo' add error_curve and symbol_alphas)
     """
+    if method != 'refit':
+        return await _tune_ridge_alpha_closed_form(
+            db, portfolio_id, calculation_date, alpha_range, context, method, price_cache
+        )
+
     if alpha_range is None:
         alpha_range = [0.01, 0.1, 1.0, 5.0, 10.0]
 
@@ -628,3 +895,63 @@ async def tune_ridge_alpha(
         'portfolio_id': str(portfolio_id),
         'calculation_date': calculation_date.isoformat()
     }
+
+
+async def _tune_ridge_alpha_closed_form(
+    db: AsyncSession,
+    portfolio_id: UUID,
+    calculation_date: date,
+    alpha_range: Optional[List[float]],
+    context: Optional[PortfolioContext],
+    criterion: str,
+    price_cache=None
+) -> Dict[str, Any]:
+    """tune_ridge_alpha() 'gcv' / 'loo' mode: score the grid for the portfolio's PUBLIC equities."""
+    if context is None:
+        context = await load_portfolio_context(db, portfolio_id, calculation_date)
+
+    symbols = sorted({
+        p.symbol for p in context.public_positions
+        if p.investment_class == 'PUBLIC' and p.position_type.value in ('LONG', 'SHORT')
+    })
+
+    end_date = calculation_date
+    start_date = end_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
+
+    factor_returns = await get_factor_returns(
+        db, list(RIDGE_STYLE_FACTORS.values()), start_date, end_date, price_cache
+    )
+    symbol_returns = await get_returns_matrix(
+        db=db,
+        symbols=symbols,
+        start_date=start_date,
+        end_date=end_date,
+        price_cache=price_cache
+    ) if symbols else pd.DataFrame()
+
+    if factor_returns.empty or symbol_returns.empty:
+        selection = select_ridge_alpha(pd.DataFrame(), pd.DataFrame(), alpha_range, criterion)
+    else:
+        factor_returns = factor_returns.rename(columns={v: k for k, v in RIDGE_STYLE_FACTORS.items()})
+        selection = select_ridge_alpha(symbol_returns, factor_returns, alpha_range, criterion)
+
+    logger.info(
+        f"Ridge alpha {criterion.upper()} tuning for portfolio {portfolio_id}: "
+        f"recommended alpha={selection['recommended_alpha']} "
+        f"({selection['symbols_evaluated']} symbols)"
+    )
+
+    return {
+        'tuning_results': [
+            {'alpha': alpha, 'cv_error': error}
+            for alpha, error in zip(selection['alphas'], selection['error_curve'])
+        ],
+        'recommended_alpha': selection['recommended_alpha'],
+        'alpha_range_tested': selection['alphas'],
+        'method': criterion,
+        'error_curve': selection['error_curve'],
+        'symbol_alphas': selection['symbol_alphas'],
+        'symbols_evaluated': selection['symbols_evaluated'],
+        'portfolio_id': str(portfolio_id),
+        'calculation_date': calculation_date.isoformat()
+    }
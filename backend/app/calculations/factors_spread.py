@@ -52,8 +52,19 @@ from app.calculations.factor_utils import (
     calculate_position_weights,
     aggregate_position_betas_to_portfolio,
 )
-from app.calculations.market_data import get_position_value, get_returns
-from app.calculations.regression_utils import run_single_factor_regression
+from app.calculations.market_data import (
+    get_position_value,
+    get_returns,
+    gap_aware_returns,
+    previous_close_ordinals,
+)
+from app.calculations.factor_returns import get_factor_returns
+from app.calculations.regression_utils import (
+    run_single_factor_regression,
+    run_batch_single_factor_regression,
+    rolling_factor_moments,
+    single_factor_regression_from_moments,
+)
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -95,19 +106,28 @@ async def fetch_spread_returns(
 
     logger.info(f"Fetching returns for {len(etf_symbols)} ETFs: {etf_symbols}")
 
-    returns = await get_returns(
+    returns = await get_factor_returns(
         db=db,
-        symbols=list(etf_symbols),
+        symbols=sorted(etf_symbols),
         start_date=start_date,
         end_date=end_date,
-        align_dates=True,
         price_cache=price_cache
     )
 
     if returns.empty:
         raise ValueError("No price data available for spread factors")
 
-    # Calculate spread returns
+    spread_returns = _spread_returns_from_etf_returns(returns)
+
+    logger.info(
+        f"Calculated spread returns for {len(spread_returns)} days, "
+        f"{len(spread_returns.columns)} factors"
+    )
+    return spread_returns
+
+
+def _spread_returns_from_etf_returns(returns: pd.DataFrame) -> pd.DataFrame:
+    """Spread Return = Long ETF Return - Short ETF Return, rows with any NaN dropped."""
     spread_returns = pd.DataFrame(index=returns.index)
 
     for spread_name, (long_etf, short_etf) in SPREAD_FACTORS.items():
@@ -122,13 +142,7 @@ async def fetch_spread_returns(
             spread_returns[spread_name] = np.nan
 
     # Drop rows with any NaN values
-    spread_returns = spread_returns.dropna()
-
-    logger.info(
-        f"Calculated spread returns for {len(spread_returns)} days, "
-        f"{len(spread_returns.columns)} factors"
-    )
-    return spread_returns
+    return spread_returns.dropna()
 
 
 def calculate_single_position_spread_betas(
@@ -212,6 +226,131 @@ def calculate_single_position_spread_betas(
     }
 
 
+def calculate_batch_spread_betas(
+    symbol_returns: pd.DataFrame,
+    spread_returns: pd.DataFrame
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Calculate all 4 spread betas for many symbols in one vectorized pass.
+
+    Equivalent to calculate_single_position_spread_betas() per symbol (same
+    SPREAD_MIN_REGRESSION_DAYS rule, BETA_CAP_LIMIT and 90% significance),
+    but every (symbol, spread) OLS comes from one set of masked
+    covariance/variance arrays instead of 4 statsmodels fits per symbol.
+
+    Args:
+        symbol_returns: Daily returns (dates x symbols), NaN where missing
+        spread_returns: Daily returns for the 4 spread factors (dates x factors)
+
+    Returns:
+        {symbol: result} with the same keys as calculate_single_position_spread_betas()
+    """
+    spread_returns = spread_returns.dropna()
+    spread_names = list(spread_returns.columns)
+
+    aligned = symbol_returns.reindex(spread_returns.index)
+    Y = aligned.to_numpy(dtype=np.float64)
+    mask = np.isfinite(Y)
+
+    regression = run_batch_single_factor_regression(
+        Y=Y,
+        X=spread_returns.to_numpy(dtype=np.float64),
+        mask=mask,
+        cap=BETA_CAP_LIMIT,
+        confidence=0.10
+    )
+    return _spread_results_from_regression(regression, list(aligned.columns), spread_names)
+
+
+def calculate_rolling_spread_betas(
+    symbol_prices: pd.DataFrame,
+    etf_prices: pd.DataFrame,
+    calculation_dates: List[date],
+    lookback_days: int = SPREAD_REGRESSION_WINDOW_DAYS + 30
+) -> Dict[date, Dict[str, Dict[str, Any]]]:
+    """
+    Calculate spread betas for many symbols on several consecutive dates.
+
+    Equivalent to fetch_spread_returns() + calculate_batch_spread_betas() on
+    each date's own price window [date - lookback_days, date], with the
+    sufficient statistics slid from date to date (rolling_factor_moments).
+
+    Args:
+        symbol_prices: Closes for the whole range (dates x symbols), NaN where missing
+        etf_prices: Closes for the SPREAD_FACTORS ETFs over the same range
+        calculation_dates: Dates to calculate (window end dates)
+        lookback_days: Calendar days per window (per-date price fetch length)
+
+    Returns:
+        {calculation_date: {symbol: result}} with calculate_batch_spread_betas() results
+    """
+    aligned = etf_prices.dropna()
+    spread_returns = _spread_returns_from_etf_returns(gap_aware_returns(aligned).iloc[1:])
+    factor_previous = previous_close_ordinals(aligned).iloc[1:, 0]
+
+    symbols = list(symbol_prices.columns)
+    spread_names = list(spread_returns.columns)
+
+    return {
+        calculation_date: _spread_results_from_regression(
+            single_factor_regression_from_moments(moments, cap=BETA_CAP_LIMIT, confidence=0.10),
+            symbols,
+            spread_names
+        )
+        for calculation_date, moments in rolling_factor_moments(
+            symbol_returns=gap_aware_returns(symbol_prices),
+            symbol_previous=previous_close_ordinals(symbol_prices),
+            factor_returns=spread_returns,
+            factor_previous=factor_previous,
+            calculation_dates=calculation_dates,
+            lookback_days=lookback_days
+        )
+    }
+
+
+def _spread_results_from_regression(
+    regression: Dict[str, np.ndarray],
+    symbols: List[str],
+    spread_names: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Package batched spread OLS output with calculate_single_position_spread_betas keys."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for j, symbol in enumerate(symbols):
+        n_obs = int(regression['observations'][j])
+
+        if n_obs < SPREAD_MIN_REGRESSION_DAYS:
+            results[symbol] = {
+                'betas': {},
+                'avg_r_squared': 0.0,
+                'observations': n_obs,
+                'success': False,
+                'successful_factors': [],
+                'failed_factors': list(spread_names),
+                'error': f'Insufficient data: {n_obs} days (minimum: {SPREAD_MIN_REGRESSION_DAYS})'
+            }
+            continue
+
+        betas = regression['beta'][j]
+        r_squared = regression['r_squared'][j]
+        ok = np.isfinite(betas) & np.isfinite(r_squared)
+
+        successful_factors = [name for name, good in zip(spread_names, ok) if good]
+        failed_factors = [name for name, good in zip(spread_names, ok) if not good]
+        success = len(successful_factors) > 0
+
+        results[symbol] = {
+            'betas': {name: float(b) for name, b, good in zip(spread_names, betas, ok) if good},
+            'avg_r_squared': float(r_squared[ok].mean()) if success else 0.0,
+            'observations': n_obs,
+            'success': success,
+            'successful_factors': successful_factors,
+            'failed_factors': failed_factors,
+            'error': None if success else 'All regressions failed'
+        }
+
+    return results
+
+
 async def calculate_portfolio_spread_betas(
     db: AsyncSession,
     portfolio_id: UUID,
@@ -1,11 +1,19 @@
 """
 Options Greeks Calculation Functions - Section 1.4.2
 Implements V1.4 hybrid real/mock Greeks calculations with database integration
+
+Greeks come from a vectorized Black-Scholes kernel (black_scholes_greeks) that
+prices whole arrays of contracts at once; bulk updates compute every option in
+a portfolio (or the whole book) in one call and upsert position_greeks in bulk.
 """
 import math
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Sequence, Union
+from uuid import UUID, uuid4
+
+import numpy as np
+from scipy.special import ndtr
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from sqlalchemy.dialects.postgresql import insert
@@ -14,16 +22,13 @@ from app.models.positions import Position, PositionType
 from app.models.market_data import PositionGreeks
 from app.core.logging import get_logger
 from app.calculations.market_data import is_options_position
+from app.calculations.implied_volatility import get_contract_implied_volatilities
 
 logger = get_logger(__name__)
 
-# Import calculation libraries
-try:
-    import mibian
-    MIBIAN_AVAILABLE = True
-except ImportError:
-    logger.warning("mibian not available, falling back to mock calculations")
-    MIBIAN_AVAILABLE = False
+OPTIONS_MULTIPLIER = 100
+GREEKS_UPSERT_CHUNK_ROWS = 1000  # Rows per INSERT ... ON CONFLICT statement
+GREEK_NAMES = ("delta", "gamma", "theta", "vega", "rho")
 
 
 def is_expired_option(position: Position) -> bool:
@@ -90,6 +95,9 @@ def get_implied_volatility(symbol: str, market_data: Dict[str, Any]) -> float:
     """
     Retrieve or estimate implied volatility for option pricing
     
+    Fallback for contracts without a market price to solve an implied
+    volatility from (see resolve_option_volatilities()).
+    
     Args:
         symbol: Underlying symbol
         market_data: Market data dictionary
@@ -123,6 +131,142 @@ def get_risk_free_rate(market_data: Dict[str, Any]) -> float:
     return 0.05
 
 
+def black_scholes_rate(market_data: Dict[str, Any]) -> float:
+    """
+    Rate passed to the Black-Scholes kernel and implied volatility solver
+    
+    get_risk_free_rate() / 100: mibian read its rate argument in percent, and
+    stored Greeks have always been priced that way.
+    """
+    return get_risk_free_rate(market_data) / 100.0
+
+
+def get_option_market_price(position: Position, market_data: Dict[str, Any]) -> Optional[float]:
+    """
+    Market price of an option contract for implied volatility
+    
+    Uses the contract's bid/ask mid, then its mid_price/current_price from
+    market_data (keyed by the option symbol), then the position's last_price.
+    
+    Returns:
+        Price per share, or None if unknown
+    """
+    quote = market_data.get(position.symbol) if market_data else None
+    if isinstance(quote, dict):
+        bid, ask = quote.get("bid"), quote.get("ask")
+        if bid and ask:
+            return (float(bid) + float(ask)) / 2
+        for key in ("mid_price", "current_price"):
+            if quote.get(key):
+                return float(quote[key])
+
+    last_price = getattr(position, "last_price", None)
+    return float(last_price) if last_price else None
+
+
+def resolve_option_volatilities(
+    positions: Sequence[Position],
+    underlying_prices: Sequence[float],
+    option_params: Sequence[Dict[str, Any]],
+    market_data: Dict[str, Any]
+) -> List[float]:
+    """
+    Volatility for each option: solved implied vol from the contract's price,
+    else get_implied_volatility() for its underlying
+    
+    All contracts with a market price are solved in one call and cached per
+    contract, date and quote - see implied_volatility.get_contract_implied_volatilities().
+    """
+    rate = black_scholes_rate(market_data)
+    contracts = []
+    for position, spot, params in zip(positions, underlying_prices, option_params):
+        option_price = get_option_market_price(position, market_data)
+        if option_price is not None:
+            contracts.append({
+                "symbol": position.symbol,
+                "option_price": option_price,
+                "underlying_price": spot,
+                "strike": params["strike"],
+                "time_to_expiry": params["time_to_expiry"],
+                "risk_free_rate": rate,
+                "is_call": params["option_type"] == "c",
+            })
+    solved = (
+        get_contract_implied_volatilities(contracts, date.today(), namespace="greeks")
+        if contracts else {}
+    )
+
+    return [
+        solved.get(position.symbol) or get_implied_volatility(params["underlying_symbol"], market_data)
+        for position, params in zip(positions, option_params)
+    ]
+
+
+def black_scholes_greeks(
+    underlying_price: Union[float, np.ndarray],
+    strike: Union[float, np.ndarray],
+    time_to_expiry: Union[float, np.ndarray],
+    volatility: Union[float, np.ndarray],
+    risk_free_rate: Union[float, np.ndarray],
+    is_call: Union[bool, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """
+    Black-Scholes Greeks for arrays of European options (no dividends)
+
+    Inputs broadcast against each other. Units are the ones stored in
+    position_greeks: delta and gamma per share, theta per calendar day, vega
+    per 1% volatility / 100 and rho per 1% rate / 100 (the mibian per-1%
+    figures that calculate_real_greeks() always scaled down by 100).
+
+    Args:
+        underlying_price: Underlying prices
+        strike: Strike prices
+        time_to_expiry: Years to expiry
+        volatility: Annualized volatilities (decimal, 0.25 = 25%)
+        risk_free_rate: Continuously compounded rates (decimal)
+        is_call: True for calls, False for puts
+
+    Returns:
+        Dictionary of Greek name -> float array; NaN where spot, strike,
+        time or volatility is not positive
+    """
+    spot, strike, tte, vol, rate, call = np.broadcast_arrays(
+        np.asarray(underlying_price, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64),
+        np.asarray(time_to_expiry, dtype=np.float64),
+        np.asarray(volatility, dtype=np.float64),
+        np.asarray(risk_free_rate, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    valid = (spot > 0) & (strike > 0) & (tte > 0) & (vol > 0) & np.isfinite(rate)
+
+    # Placeholder inputs for invalid contracts keep the math warning-free
+    spot = np.where(valid, spot, 1.0)
+    strike = np.where(valid, strike, 1.0)
+    tte = np.where(valid, tte, 1.0)
+    vol = np.where(valid, vol, 1.0)
+    rate = np.where(valid, rate, 0.0)
+
+    sqrt_t = np.sqrt(tte)
+    vol_sqrt_t = vol * sqrt_t
+    d1 = (np.log(spot / strike) + (rate + vol ** 2 / 2) * tte) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    pdf_d1 = np.exp(-d1 ** 2 / 2) / math.sqrt(2 * math.pi)
+    discounted_strike = strike * np.exp(-rate * tte)
+
+    greeks = {
+        "delta": np.where(call, ndtr(d1), -ndtr(-d1)),
+        "gamma": pdf_d1 / (spot * vol_sqrt_t),
+        "theta": (
+            -spot * pdf_d1 * vol / (2 * sqrt_t)
+            + np.where(call, -rate * discounted_strike * ndtr(d2), rate * discounted_strike * ndtr(-d2))
+        ) / 365,
+        "vega": spot * pdf_d1 * sqrt_t / 100 / 100,
+        "rho": np.where(call, tte * discounted_strike * ndtr(d2), -tte * discounted_strike * ndtr(-d2)) / 100 / 100,
+    }
+    return {name: np.where(valid, values, np.nan) for name, values in greeks.items()}
+
+
 def calculate_real_greeks(
     underlying_price: float,
     strike: float,
@@ -132,56 +276,96 @@ def calculate_real_greeks(
     option_type: str
 ) -> Dict[str, float]:
     """
-    Calculate real Greeks using mibian Black-Scholes model
+    Calculate real Greeks using the Black-Scholes kernel for one contract
     
     Args:
         underlying_price: Current underlying price
         strike: Strike price
         time_to_expiry: Time to expiry in years
         volatility: Implied volatility
-        risk_free_rate: Risk-free rate
+        risk_free_rate: Risk-free rate as passed to mibian, which read it in
+            percent (0.05 -> 0.05%); kept so stored Greeks do not change
         option_type: "c" for call, "p" for put
         
     Returns:
         Dictionary with all 5 Greeks
     """
-    if not MIBIAN_AVAILABLE:
-        raise ImportError("mibian not available")
-    
-    try:
-        # Convert time to expiry to days for mibian
-        days_to_expiry = time_to_expiry * 365
-        
-        # Calculate Greeks using mibian
-        if option_type.lower() == 'c':
-            # Call option
-            bs_model = mibian.BS([underlying_price, strike, risk_free_rate, days_to_expiry], volatility=volatility * 100)
-        else:
-            # Put option
-            bs_model = mibian.BS([underlying_price, strike, risk_free_rate, days_to_expiry], volatility=volatility * 100)
-        
-        # Get Greeks - mibian returns them in different units
-        delta_val = bs_model.callDelta if option_type.lower() == 'c' else bs_model.putDelta
-        gamma_val = bs_model.gamma
-        theta_val = bs_model.callTheta if option_type.lower() == 'c' else bs_model.putTheta
-        vega_val = bs_model.vega
-        rho_val = bs_model.callRho if option_type.lower() == 'c' else bs_model.putRho
-        
-        # Convert to appropriate units
-        # mibian returns theta as daily, vega as per 1%, rho as per 1%
-        return {
-            "delta": float(delta_val),
-            "gamma": float(gamma_val),
-            "theta": float(theta_val),        # Already daily
-            "vega": float(vega_val / 100.0),  # Convert to per 1% volatility
-            "rho": float(rho_val / 100.0)     # Convert to per 1% interest rate
-        }
-        
-    except Exception as e:
-        logger.error(f"Real Greeks calculation failed: {str(e)}")
-        raise
+    greeks = black_scholes_greeks(
+        underlying_price, strike, time_to_expiry, volatility,
+        risk_free_rate / 100.0, option_type.lower() == 'c'
+    )
+    if np.isnan(greeks["delta"]):
+        logger.error(
+            f"Real Greeks calculation failed: invalid inputs (S={underlying_price}, K={strike}, "
+            f"T={time_to_expiry}, vol={volatility})"
+        )
+        raise ValueError("Invalid Black-Scholes inputs")
+
+    return {name: float(greeks[name]) for name in GREEK_NAMES}
+
+
+def calculate_positions_greeks(
+    positions: Sequence[Position],
+    market_data: Dict[str, Any]
+) -> Dict[UUID, Dict[str, float]]:
+    """
+    Calculate Greeks for many positions in one Black-Scholes call
+
+    Same results as calculate_position_greeks() per position: expired options
+    get zero Greeks, stock positions and options without parameters or
+    underlying prices are left out. Volatilities come from
+    resolve_option_volatilities() (one implied volatility solve for all).
+
+    Args:
+        positions: Position objects (any mix of stocks and options)
+        market_data: Market data dictionary keyed by symbol
+
+    Returns:
+        position_id -> Greeks dictionary scaled by quantity
+    """
+    results: Dict[UUID, Dict[str, float]] = {}
+    priced: List[Position] = []
+    inputs: List[tuple] = []
+    risk_free_rate = black_scholes_rate(market_data)
 
+    for position in positions:
+        if is_expired_option(position):
+            results[position.id] = {name: 0.0 for name in GREEK_NAMES}
+            continue
+        if not is_options_position(position):
+            continue
 
+        option_params = extract_option_parameters(position)
+        if not option_params:
+            continue
+        underlying_symbol = option_params["underlying_symbol"]
+        underlying_data = market_data.get(underlying_symbol) if market_data else None
+        if not isinstance(underlying_data, dict) or "current_price" not in underlying_data:
+            logger.error(f"No market data for {underlying_symbol}, cannot calculate Greeks")
+            continue
+
+        priced.append(position)
+        inputs.append((float(underlying_data["current_price"]), option_params))
+
+    if not priced:
+        return results
+
+    spot = np.array([underlying_price for underlying_price, _ in inputs])
+    params = [option_params for _, option_params in inputs]
+    strike = np.array([p["strike"] for p in params])
+    tte = np.array([p["time_to_expiry"] for p in params])
+    is_call = np.array([p["option_type"] == "c" for p in params])
+    vol = np.array(resolve_option_volatilities(priced, spot.tolist(), params, market_data))
+    quantity = np.array([float(p.quantity) for p in priced])
+    greeks = black_scholes_greeks(spot, strike, tte, vol, risk_free_rate, is_call)
+    scaled = {name: greeks[name] * quantity for name in GREEK_NAMES}
+
+    for k, position in enumerate(priced):
+        if np.isnan(greeks["delta"][k]):
+            logger.error(f"Greeks calculation failed for {position.symbol}: invalid Black-Scholes inputs")
+            continue
+        results[position.id] = {name: float(scaled[name][k]) for name in GREEK_NAMES}
+    return results
 
 
 async def calculate_position_greeks(
@@ -189,7 +373,7 @@ async def calculate_position_greeks(
     market_data: Dict[str, Any]
 ) -> Optional[Dict[str, float]]:
     """
-    Calculate Greeks using mibian Black-Scholes model
+    Calculate Greeks using the Black-Scholes model
     
     Args:
         position: Position object (SQLAlchemy model or dict)
@@ -235,10 +419,10 @@ async def calculate_position_greeks(
             return None
         
         underlying_price = float(underlying_data["current_price"])
-        volatility = get_implied_volatility(underlying_symbol, market_data)
+        volatility = resolve_option_volatilities([position], [underlying_price], [option_params], market_data)[0]
         risk_free_rate = get_risk_free_rate(market_data)
         
-        # Calculate real Greeks using mibian
+        # Calculate real Greeks (Black-Scholes)
         real_greeks = calculate_real_greeks(
             underlying_price=underlying_price,
             strike=option_params["strike"],
@@ -327,6 +511,55 @@ async def update_position_greeks(
         raise
 
 
+async def bulk_upsert_position_greeks(
+    db: AsyncSession,
+    greeks_by_position: Dict[UUID, Dict[str, float]],
+    calculation_date: Optional[date] = None
+) -> int:
+    """
+    Insert or update Greeks for many positions in chunked bulk upserts
+
+    Same row contents as update_position_greeks(). Does not commit.
+
+    Args:
+        db: Database session
+        greeks_by_position: position_id -> Greeks (e.g. from calculate_positions_greeks())
+        calculation_date: Date to store (default: today)
+
+    Returns:
+        Number of rows written
+    """
+    calculation_date = calculation_date or date.today()
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid4(),
+            "position_id": position_id,
+            "calculation_date": calculation_date,
+            **{name: Decimal(str(greeks[name])) for name in GREEK_NAMES},
+            "delta_dollars": Decimal(str(greeks["delta"] * OPTIONS_MULTIPLIER)),
+            "gamma_dollars": Decimal(str(greeks["gamma"] * OPTIONS_MULTIPLIER)),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for position_id, greeks in greeks_by_position.items()
+    ]
+
+    for i in range(0, len(rows), GREEKS_UPSERT_CHUNK_ROWS):
+        stmt = insert(PositionGreeks).values(rows[i:i + GREEKS_UPSERT_CHUNK_ROWS])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["position_id"],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("calculation_date", *GREEK_NAMES, "delta_dollars", "gamma_dollars", "updated_at")
+            }
+        )
+        await db.execute(stmt)
+
+    logger.debug(f"Upserted Greeks for {len(rows)} positions")
+    return len(rows)
+
+
 async def bulk_update_portfolio_greeks(
     db: AsyncSession,
     portfolio_id: str,
@@ -345,65 +578,72 @@ async def bulk_update_portfolio_greeks(
     """
     logger.info(f"Starting bulk Greeks update for portfolio {portfolio_id}")
 
+    # TODO: Add UUID conversion if this function is re-enabled in batch orchestrator
+    # FIXME: portfolio_id is str, Position.portfolio_id is UUID - needs ensure_uuid() conversion
+    # See Phase 7.0 UUID fixes in batch_orchestrator_v2.py for pattern
+    return await _bulk_update_greeks(db, [portfolio_id], market_data, label=f"portfolio {portfolio_id}")
+
+
+async def bulk_update_all_portfolio_greeks(
+    db: AsyncSession,
+    market_data: Dict[str, Any],
+    portfolio_ids: Optional[List[UUID]] = None
+) -> Dict[str, Any]:
+    """
+    Calculate and update Greeks for every position in many portfolios at once
+
+    One position query, one Black-Scholes call and chunked bulk upserts for
+    the whole book (or the given portfolios).
+
+    Args:
+        db: Database session
+        market_data: Market data dictionary
+        portfolio_ids: Portfolios to update (None = all portfolios)
+
+    Returns:
+        Summary dictionary with update results
+    """
+    label = "all portfolios" if portfolio_ids is None else f"{len(portfolio_ids)} portfolios"
+    logger.info(f"Starting bulk Greeks update for {label}")
+    return await _bulk_update_greeks(db, portfolio_ids, market_data, label=label)
+
+
+async def _bulk_update_greeks(
+    db: AsyncSession,
+    portfolio_ids: Optional[List[Any]],
+    market_data: Dict[str, Any],
+    label: str
+) -> Dict[str, Any]:
+    """Shared body of the bulk Greeks updates (commits on success)."""
     try:
-        # Get all positions for the portfolio
-        # TODO: Add UUID conversion if this function is re-enabled in batch orchestrator
-        # FIXME: portfolio_id is str, Position.portfolio_id is UUID - needs ensure_uuid() conversion
-        # See Phase 7.0 UUID fixes in batch_orchestrator_v2.py for pattern
-        stmt = select(Position).where(
-            Position.portfolio_id == portfolio_id,
-            Position.deleted_at.is_(None)
-        )
+        stmt = select(Position).where(Position.deleted_at.is_(None))
+        if portfolio_ids is not None:
+            stmt = stmt.where(Position.portfolio_id.in_(portfolio_ids))
         result = await db.execute(stmt)
         positions = result.scalars().all()
-        
+
         if not positions:
-            logger.warning(f"No positions found for portfolio {portfolio_id}")
+            logger.warning(f"No positions found for {label}")
             return {"updated": 0, "failed": 0, "errors": []}
-        
-        updated_count = 0
-        failed_count = 0
-        errors = []
-        
-        # Process positions in chunks of 100
-        chunk_size = 100
-        for i in range(0, len(positions), chunk_size):
-            chunk = positions[i:i + chunk_size]
-            
-            for position in chunk:
-                try:
-                    # Calculate Greeks
-                    greeks = await calculate_position_greeks(position, market_data)
-                    
-                    # Update database only if Greeks were calculated
-                    if greeks is not None:
-                        await update_position_greeks(db, position.id, greeks)
-                        updated_count += 1
-                    else:
-                        # Greeks not applicable (stock position) or calculation failed
-                        logger.debug(f"Skipping Greeks update for {position.symbol} (no Greeks calculated)")
-                    
-                except Exception as e:
-                    failed_count += 1
-                    error_msg = f"Position {position.id} ({position.symbol}): {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-        
+
+        greeks_by_position = calculate_positions_greeks(positions, market_data)
+        updated_count = await bulk_upsert_position_greeks(db, greeks_by_position)
+
         # Commit all updates
         await db.commit()
-        
+
         summary = {
             "updated": updated_count,
-            "failed": failed_count,
-            "errors": errors,
+            "failed": 0,
+            "errors": [],
             "total_positions": len(positions)
         }
-        
-        logger.info(f"Bulk Greeks update complete for portfolio {portfolio_id}: {summary}")
+
+        logger.info(f"Bulk Greeks update complete for {label}: {summary}")
         return summary
-        
+
     except Exception as e:
-        logger.error(f"Bulk Greeks update failed for portfolio {portfolio_id}: {str(e)}")
+        logger.error(f"Bulk Greeks update failed for {label}: {str(e)}")
         await db.rollback()
         raise
 
@@ -0,0 +1,341 @@
+"""
+Historical-Simulation Value-at-Risk and Expected Shortfall
+
+Every portfolio's VaR/ES comes from the same (dates x symbols) daily return
+matrix, sliced from the symbol cache's price matrix (no market_data_cache
+query):
+
+- Position P&L scenarios for all positions of all portfolios are one array
+  operation: returns[:, position symbol] x position market value
+- Portfolio P&L scenarios are one sparse (positions -> portfolios) product
+- Tail statistics for all portfolios come from one sort of the
+  (portfolios x scenarios) P&L matrix
+
+Methods:
+- historical: the raw return history
+- filtered_historical: each symbol's returns rescaled by its current EWMA
+  volatility over its EWMA volatility on the day (Hull-White filtering), so
+  the scenarios reflect today's volatility regime
+
+VaR at confidence c is the loss at the k-th worst scenario, k = ceil(T x (1-c)),
+and ES is the mean loss over those k scenarios. 10-day figures scale the
+1-day figures by sqrt(10).
+
+Options are not simulated (market value x stock return would misstate their
+risk), nor are symbols with returns on fewer than VAR_MIN_COVERAGE of the
+window's return days (or fewer than VAR_MIN_OBSERVATIONS); both are counted
+in positions_excluded. The remaining symbols' few missing days are 0.0, so
+gaps cannot turn into a block of zero-loss scenarios.
+"""
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence, Tuple
+from uuid import UUID, uuid4
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.signal import lfilter
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.price_cache import PriceCache
+from app.calculations.market_data import gap_aware_returns
+from app.core.logging import get_logger
+from app.models.market_data import PortfolioVaRResult
+from app.services.portfolio_factor_service import load_all_portfolio_position_weights
+
+logger = get_logger(__name__)
+
+VAR_CONFIDENCE_LEVELS = (0.95, 0.99)
+VAR_HORIZONS_DAYS = (1, 10)
+VAR_METHODS = ('historical', 'filtered_historical')
+VAR_LOOKBACK_CALENDAR_DAYS = 180  # Fits the symbol cache's 200-day price window (~125 trading days)
+VAR_MIN_OBSERVATIONS = 60  # Minimum daily returns per symbol (and scenarios per run)
+VAR_MIN_COVERAGE = 0.95  # Minimum share of the window's return days a simulated symbol must have
+FHS_EWMA_LAMBDA = 0.94  # RiskMetrics decay for filtered historical simulation
+VAR_UPSERT_CHUNK_ROWS = 2000
+
+
+@dataclass
+class PositionBook:
+    """Simulated positions of many portfolios as arrays."""
+    portfolio_ids: List[UUID]
+    symbols: List[str]  # Return matrix columns
+    position_symbol: np.ndarray  # (positions,) column into symbols
+    position_portfolio: np.ndarray  # (positions,) row into portfolio_ids
+    market_values: np.ndarray  # (positions,) signed market value
+    positions_excluded: np.ndarray  # (portfolios,) positions not simulated
+
+    def portfolio_indicator(self) -> sparse.csr_matrix:
+        """(portfolios x positions) 1.0 where the position belongs to the portfolio."""
+        n_positions = len(self.market_values)
+        return sparse.csr_matrix(
+            (np.ones(n_positions), (self.position_portfolio, np.arange(n_positions))),
+            shape=(len(self.portfolio_ids), n_positions)
+        )
+
+
+def filter_returns(returns: np.ndarray, decay: float = FHS_EWMA_LAMBDA) -> np.ndarray:
+    """
+    Hull-White volatility-rescaled returns for filtered historical simulation.
+
+    Zero-mean EWMA variance per symbol, seeded with the window's mean square:
+    var[t] = decay x var[t-1] + (1 - decay) x r[t-1]^2, and the forecast for
+    the next day extends the same recursion past the last return. Each
+    return is scaled by forecast vol / vol on its day (1.0 where that is 0).
+
+    Args:
+        returns: (dates x symbols) daily returns, no NaN
+
+    Returns:
+        (dates x symbols) filtered returns
+    """
+    if returns.shape[0] == 0:
+        return returns
+    squared = returns ** 2
+    seed = squared.mean(axis=0)
+    # y[t] = decay * y[t-1] + (1 - decay) * x[t-1], with y[0] = seed
+    variance, _ = lfilter([0.0, 1.0 - decay], [1.0, -decay], squared, axis=0, zi=seed[None, :])
+    forecast = decay * variance[-1] + (1.0 - decay) * squared[-1]
+    volatility = np.sqrt(variance)
+    scale = np.divide(
+        np.sqrt(forecast)[None, :], volatility,
+        out=np.ones_like(volatility), where=volatility > 0
+    )
+    return returns * scale
+
+
+def portfolio_pnl_scenarios(returns: np.ndarray, book: PositionBook) -> np.ndarray:
+    """
+    (portfolios x dates) P&L of each portfolio under each historical return day.
+
+    Position P&L for every position is one gather-and-scale of the return
+    matrix; portfolio P&L sums it through the sparse position indicator.
+    """
+    position_pnl = returns[:, book.position_symbol] * book.market_values[None, :]  # (dates x positions)
+    return np.asarray(book.portfolio_indicator() @ position_pnl.T)
+
+
+def tail_risk(pnl: np.ndarray, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    1-day VaR and ES (positive = loss) per row of a (portfolios x scenarios) P&L matrix.
+
+    VaR is the loss at the k-th worst scenario and ES the mean loss over the
+    k worst, k = ceil(scenarios x (1 - confidence)).
+    """
+    n_scenarios = pnl.shape[1]
+    k = max(1, math.ceil(n_scenarios * (1.0 - confidence) - 1e-9))
+    worst = np.sort(pnl, axis=1)[:, :k]
+    return -worst[:, -1], -worst.mean(axis=1)
+
+
+def calculate_var_metrics(returns: np.ndarray, book: PositionBook) -> Dict[UUID, List[Dict[str, Any]]]:
+    """
+    VaR/ES for every portfolio, method, confidence level and horizon.
+
+    Args:
+        returns: (dates x symbols) daily returns aligned to book.symbols, no NaN
+        book: Simulated positions
+
+    Returns:
+        {portfolio_id: [{'method', 'confidence_level', 'horizon_days', 'var', 'expected_shortfall'}]}
+    """
+    scenarios = {
+        'historical': returns,
+        'filtered_historical': filter_returns(returns),
+    }
+    metrics: Dict[UUID, List[Dict[str, Any]]] = {pid: [] for pid in book.portfolio_ids}
+    for method in VAR_METHODS:
+        pnl = portfolio_pnl_scenarios(scenarios[method], book)
+        for confidence in VAR_CONFIDENCE_LEVELS:
+            var_1d, es_1d = tail_risk(pnl, confidence)
+            for horizon in VAR_HORIZONS_DAYS:
+                scale = math.sqrt(horizon)
+                for p, pid in enumerate(book.portfolio_ids):
+                    metrics[pid].append({
+                        'method': method,
+                        'confidence_level': confidence,
+                        'horizon_days': horizon,
+                        'var': float(var_1d[p] * scale),
+                        'expected_shortfall': float(es_1d[p] * scale),
+                    })
+    return metrics
+
+
+def cached_returns_matrix(
+    price_cache: PriceCache,
+    symbols: Sequence[str],
+    calculation_date: date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Daily returns for symbols over the VaR lookback from the cached price matrix.
+
+    Returns are measured against each symbol's previous cached close; days
+    without a return for a symbol are 0.0 (no move).
+
+    Returns:
+        Tuple of ((dates x symbols) returns, (symbols,) return count per symbol)
+    """
+    start_date = calculation_date - timedelta(days=VAR_LOOKBACK_CALENDAR_DAYS)
+    prices = price_cache.get_window(list(symbols), start_date, calculation_date)
+    returns = gap_aware_returns(pd.DataFrame(prices)).to_numpy()[1:]
+    observed = ~np.isnan(returns)
+    returns = returns[observed.any(axis=1)]
+    return np.nan_to_num(returns, nan=0.0), observed.sum(axis=0)
+
+
+async def run_var_for_portfolios(
+    db: AsyncSession,
+    portfolio_ids: List[UUID],
+    calculation_date: date,
+    price_cache: PriceCache
+) -> Dict[str, Any]:
+    """
+    Historical and filtered historical VaR/ES for all portfolios in one pass.
+
+    Args:
+        db: Database session (positions only; prices come from price_cache)
+        portfolio_ids: Portfolios to process
+        calculation_date: Last day of the return window
+        price_cache: Warm price cache (SymbolCacheService._price_cache)
+
+    Returns:
+        Dict with:
+            - results: {portfolio_id: {'metrics', 'observations', 'simulated_value',
+              'positions_simulated', 'positions_excluded'}}
+            - skipped: {portfolio_id: reason} (no simulatable positions)
+            - errors: {portfolio_id: message} (missing, invalid equity)
+    """
+    weights_by_portfolio, equity_by_portfolio, errors = await load_all_portfolio_position_weights(
+        db, portfolio_ids
+    )
+    candidates = sorted({
+        w.symbol for weights in weights_by_portfolio.values() for w in weights if not w.is_option
+    })
+    skipped: Dict[UUID, str] = {}
+    if not candidates:
+        for pid in weights_by_portfolio:
+            skipped[pid] = 'no_simulatable_positions'
+        return {'results': {}, 'skipped': skipped, 'errors': errors}
+
+    returns, counts = cached_returns_matrix(price_cache, candidates, calculation_date)
+    if returns.shape[0] < VAR_MIN_OBSERVATIONS:
+        logger.warning(
+            f"VaR skipped: {returns.shape[0]} return days in the price cache "
+            f"(need {VAR_MIN_OBSERVATIONS})"
+        )
+        for pid in weights_by_portfolio:
+            skipped[pid] = 'insufficient_price_history'
+        return {'results': {}, 'skipped': skipped, 'errors': errors}
+
+    # Missing returns are 0.0 scenarios: only near-complete histories are simulated
+    min_returns = max(VAR_MIN_OBSERVATIONS, math.ceil(VAR_MIN_COVERAGE * returns.shape[0]))
+    eligible = counts >= min_returns
+    symbol_column = {symbol: k for k, symbol in enumerate(np.array(candidates)[eligible])}
+    returns = returns[:, eligible]
+
+    portfolio_ids_kept: List[UUID] = []
+    position_symbol, position_portfolio, market_values, excluded = [], [], [], []
+    for pid, weights in weights_by_portfolio.items():
+        simulated = [w for w in weights if not w.is_option and w.symbol in symbol_column]
+        if not simulated:
+            skipped[pid] = 'no_simulatable_positions'
+            continue
+        p = len(portfolio_ids_kept)
+        portfolio_ids_kept.append(pid)
+        excluded.append(len(weights) - len(simulated))
+        for w in simulated:
+            position_symbol.append(symbol_column[w.symbol])
+            position_portfolio.append(p)
+            market_values.append(w.weight * equity_by_portfolio[pid])
+
+    book = PositionBook(
+        portfolio_ids=portfolio_ids_kept,
+        symbols=list(symbol_column),
+        position_symbol=np.array(position_symbol, dtype=np.intp),
+        position_portfolio=np.array(position_portfolio, dtype=np.intp),
+        market_values=np.array(market_values, dtype=float),
+        positions_excluded=np.array(excluded, dtype=int),
+    )
+
+    results: Dict[UUID, Dict[str, Any]] = {}
+    if book.portfolio_ids:
+        metrics = calculate_var_metrics(returns, book)
+        indicator = book.portfolio_indicator()
+        gross = indicator @ np.abs(book.market_values)
+        simulated_counts = np.asarray(indicator.sum(axis=1)).ravel()
+        for p, pid in enumerate(book.portfolio_ids):
+            results[pid] = {
+                'metrics': metrics[pid],
+                'observations': int(returns.shape[0]),
+                'simulated_value': float(gross[p]),
+                'positions_simulated': int(simulated_counts[p]),
+                'positions_excluded': int(book.positions_excluded[p]),
+            }
+
+    logger.info(
+        f"Historical VaR: {len(results)} portfolios, {len(book.market_values)} positions, "
+        f"{len(book.symbols)} symbols x {returns.shape[0]} days "
+        f"({len(skipped)} skipped, {len(errors)} errors)"
+    )
+    return {'results': results, 'skipped': skipped, 'errors': errors}
+
+
+async def save_var_results(
+    db: AsyncSession,
+    calculation_date: date,
+    results: Dict[UUID, Dict[str, Any]]
+) -> int:
+    """
+    Upsert run_var_for_portfolios() results into portfolio_var_results (one commit).
+
+    Returns:
+        Number of rows written
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            'id': uuid4(),
+            'portfolio_id': pid,
+            'calculation_date': calculation_date,
+            'method': metric['method'],
+            'confidence_level': Decimal(str(metric['confidence_level'])),
+            'horizon_days': metric['horizon_days'],
+            'var_amount': Decimal(str(round(metric['var'], 2))),
+            'expected_shortfall': Decimal(str(round(metric['expected_shortfall'], 2))),
+            'simulated_value': Decimal(str(round(result['simulated_value'], 2))),
+            'observations': result['observations'],
+            'positions_simulated': result['positions_simulated'],
+            'positions_excluded': result['positions_excluded'],
+            'created_at': now,
+            'updated_at': now,
+        }
+        for pid, result in results.items()
+        for metric in result['metrics']
+    ]
+
+    try:
+        for i in range(0, len(rows), VAR_UPSERT_CHUNK_ROWS):
+            stmt = pg_insert(PortfolioVaRResult).values(rows[i:i + VAR_UPSERT_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_portfolio_var_results',
+                set_={
+                    column: stmt.excluded[column]
+                    for column in (
+                        'var_amount', 'expected_shortfall', 'simulated_value', 'observations',
+                        'positions_simulated', 'positions_excluded', 'updated_at',
+                    )
+                }
+            )
+            await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Error saving VaR results: {str(e)}")
+        await db.rollback()
+        raise
+
+    logger.info(f"Saved {len(rows)} VaR rows for {len(results)} portfolios")
+    return len(rows)
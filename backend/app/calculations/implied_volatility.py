@@ -0,0 +1,240 @@
+"""
+Implied Volatility - vectorized Black-Scholes inversion
+
+Solves implied volatilities for whole arrays of option contracts (an options
+chain or every held contract) in one call:
+- black_scholes_price(): vectorized European option prices (no dividends)
+- solve_implied_volatility(): safeguarded Newton iteration on arrays - Newton
+  steps on vega, falling back to bisection of a per-contract bracket whenever
+  a step leaves the bracket or vega vanishes
+- get_contract_implied_volatilities(): solves only contracts missing from an
+  in-process cache keyed on a caller namespace, the contract, date and
+  (rounded) solver inputs, so repeated Greeks runs cost no solves and new
+  quotes are always re-solved
+
+Prices outside the no-arbitrage bounds, or needing a volatility outside
+[IV_MIN, IV_MAX], have no implied volatility (NaN / None).
+"""
+import math
+from datetime import date
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from cachetools import TTLCache
+from scipy.special import ndtr
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+IV_MIN = 1e-4  # 0.01% annualized
+IV_MAX = 5.0  # 500% annualized
+IV_PRICE_TOLERANCE = 1e-8  # Absolute price error accepted as converged
+IV_MAX_ITERATIONS = 100  # Bisection alone reaches ~1e-12 vol width in ~45 steps
+
+# Solved IVs keyed by _cache_key(); NaN marks contracts without an IV
+IV_CACHE_TTL_SECONDS = 3600
+IV_CACHE_MAX_ENTRIES = 50_000  # Least recently used entries are evicted beyond this
+_iv_cache: TTLCache = TTLCache(maxsize=IV_CACHE_MAX_ENTRIES, ttl=IV_CACHE_TTL_SECONDS)
+
+ArrayLike = Union[float, np.ndarray, Sequence[float]]
+
+
+def black_scholes_price(
+    underlying_price: ArrayLike,
+    strike: ArrayLike,
+    time_to_expiry: ArrayLike,
+    volatility: ArrayLike,
+    risk_free_rate: ArrayLike,
+    is_call: Union[bool, np.ndarray, Sequence[bool]]
+) -> np.ndarray:
+    """
+    Black-Scholes prices for arrays of European options (inputs broadcast).
+
+    Expects positive spot, strike, time and volatility.
+    """
+    spot, strike, tte, vol, rate, call = np.broadcast_arrays(
+        np.asarray(underlying_price, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64),
+        np.asarray(time_to_expiry, dtype=np.float64),
+        np.asarray(volatility, dtype=np.float64),
+        np.asarray(risk_free_rate, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    vol_sqrt_t = vol * np.sqrt(tte)
+    d1 = (np.log(spot / strike) + (rate + vol ** 2 / 2) * tte) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    discounted_strike = strike * np.exp(-rate * tte)
+    return np.where(
+        call,
+        spot * ndtr(d1) - discounted_strike * ndtr(d2),
+        discounted_strike * ndtr(-d2) - spot * ndtr(-d1)
+    )
+
+
+def solve_implied_volatility(
+    option_price: ArrayLike,
+    underlying_price: ArrayLike,
+    strike: ArrayLike,
+    time_to_expiry: ArrayLike,
+    risk_free_rate: ArrayLike,
+    is_call: Union[bool, np.ndarray, Sequence[bool]],
+    tolerance: float = IV_PRICE_TOLERANCE,
+    max_iterations: int = IV_MAX_ITERATIONS
+) -> np.ndarray:
+    """
+    Implied volatilities for arrays of option prices (inputs broadcast).
+
+    Each contract keeps a bracket [lo, hi] with price(lo) <= target <= price(hi)
+    (price is increasing in volatility). A Newton step is taken when it lands
+    inside the bracket, otherwise the bracket is bisected, so every contract
+    converges; all still-unconverged contracts are updated together each
+    iteration.
+
+    Args:
+        option_price: Option prices (e.g. bid/ask mids)
+        underlying_price: Underlying prices
+        strike: Strike prices
+        time_to_expiry: Years to expiry
+        risk_free_rate: Continuously compounded rates (decimal)
+        is_call: True for calls, False for puts
+        tolerance: Absolute price error accepted as converged
+        max_iterations: Iteration cap
+
+    Returns:
+        Implied volatility array (decimal); NaN where the price violates the
+        no-arbitrage bounds, needs a volatility outside [IV_MIN, IV_MAX], or
+        an input is not positive
+    """
+    arrays = np.broadcast_arrays(
+        np.asarray(option_price, dtype=np.float64),
+        np.asarray(underlying_price, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64),
+        np.asarray(time_to_expiry, dtype=np.float64),
+        np.asarray(risk_free_rate, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    shape = arrays[0].shape
+    price, spot, strike, tte, rate, call = (a.ravel() for a in arrays)
+    result = np.full(price.shape, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        valid = (price > 0) & (spot > 0) & (strike > 0) & (tte > 0) & np.isfinite(rate)
+        discounted_strike = strike * np.exp(-rate * tte)
+        lower_bound = np.where(call, np.maximum(spot - discounted_strike, 0.0), np.maximum(discounted_strike - spot, 0.0))
+        upper_bound = np.where(call, spot, discounted_strike)
+        valid &= (price > lower_bound) & (price < upper_bound)
+
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return result.reshape(shape)
+
+    p, s, k, t, r, c = price[idx], spot[idx], strike[idx], tte[idx], rate[idx], call[idx]
+    lo = np.full(idx.size, IV_MIN)
+    hi = np.full(idx.size, IV_MAX)
+    in_range = (
+        (black_scholes_price(s, k, t, lo, r, c) <= p + tolerance)
+        & (black_scholes_price(s, k, t, hi, r, c) >= p - tolerance)
+    )
+
+    # Brenner-Subrahmanyam starting point, kept inside the bracket
+    sigma = np.clip(math.sqrt(2 * math.pi) / np.sqrt(t) * p / s, 0.05, 2.0)
+    active = np.flatnonzero(in_range)
+    solved = np.zeros(idx.size, dtype=bool)
+
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        sa, ta = s[active], t[active]
+        sigma_a = sigma[active]
+        diff = black_scholes_price(sa, k[active], ta, sigma_a, r[active], c[active]) - p[active]
+
+        converged = np.abs(diff) <= tolerance
+        hi[active] = np.where(diff > 0, sigma_a, hi[active])
+        lo[active] = np.where(diff <= 0, sigma_a, lo[active])
+        converged |= (hi[active] - lo[active]) <= 1e-12
+
+        vol_sqrt_t = sigma_a * np.sqrt(ta)
+        d1 = (np.log(sa / k[active]) + (r[active] + sigma_a ** 2 / 2) * ta) / vol_sqrt_t
+        vega = sa * np.exp(-d1 ** 2 / 2) / math.sqrt(2 * math.pi) * np.sqrt(ta)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = sigma_a - diff / vega
+        inside = (vega > 1e-12) & (newton > lo[active]) & (newton < hi[active])
+        step = np.where(inside, newton, (lo[active] + hi[active]) / 2)
+
+        sigma[active] = np.where(converged, sigma_a, step)
+        solved[active[converged]] = True
+        active = active[~converged]
+
+    result[idx[solved]] = sigma[solved]
+    if active.size:
+        logger.debug(f"Implied volatility did not converge for {active.size} contracts")
+    return result.reshape(shape)
+
+
+def _cache_key(contract: Dict[str, Any], calculation_date: date, namespace: str) -> Tuple:
+    """Namespace, contract, date and every solver input, so a new quote is a cache miss."""
+    return (
+        namespace,
+        contract['symbol'],
+        calculation_date,
+        round(float(contract['option_price']), 4),
+        round(float(contract['underlying_price']), 4),
+        round(float(contract['risk_free_rate']), 8),
+        round(float(contract['time_to_expiry']), 6),
+    )
+
+
+def get_contract_implied_volatilities(
+    contracts: Sequence[Dict[str, Any]],
+    calculation_date: date,
+    namespace: str = "default"
+) -> Dict[str, Optional[float]]:
+    """
+    Implied volatilities for many contracts, cached per contract, date and
+    rounded option price, underlying price, rate and time to expiry.
+
+    Cache misses are solved together in one solve_implied_volatility() call.
+
+    Args:
+        contracts: Dicts with 'symbol', 'option_price', 'underlying_price',
+            'strike', 'time_to_expiry', 'risk_free_rate' and 'is_call'
+        calculation_date: Date the prices are for (part of the cache key)
+        namespace: Cache partition, so callers pricing on different rate
+            conventions (Greeks vs options chains) never share entries
+
+    Returns:
+        symbol -> implied volatility, or None when the price has no IV
+    """
+    volatilities: Dict[str, Optional[float]] = {}
+    misses = []
+    for contract in contracts:
+        cached = _iv_cache.get(_cache_key(contract, calculation_date, namespace))
+        if cached is not None:
+            volatilities[contract['symbol']] = None if np.isnan(cached) else cached
+        else:
+            misses.append(contract)
+
+    if misses:
+        solved = solve_implied_volatility(
+            [c['option_price'] for c in misses],
+            [c['underlying_price'] for c in misses],
+            [c['strike'] for c in misses],
+            [c['time_to_expiry'] for c in misses],
+            [c['risk_free_rate'] for c in misses],
+            [c['is_call'] for c in misses]
+        )
+        for contract, iv in zip(misses, solved):
+            _iv_cache[_cache_key(contract, calculation_date, namespace)] = float(iv)
+            volatilities[contract['symbol']] = None if np.isnan(iv) else float(iv)
+        logger.debug(
+            f"Implied volatility: solved {len(misses)} contracts, "
+            f"{len(contracts) - len(misses)} from cache"
+        )
+
+    return volatilities
+
+
+def clear_implied_volatility_cache() -> None:
+    """Drop all cached implied volatilities."""
+    _iv_cache.clear()
@@ -5,8 +5,10 @@ Implements core position valuation and P&L calculations with database integratio
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Tuple
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -269,7 +271,7 @@ async def get_returns(
         >>> # df may have NaN for OBSCURE on some dates
 
     Performance:
-        - With cache: O(1) lookups, 300x speedup
+        - With cache: one vectorized window slice (see fetch_historical_prices)
         - Without cache: Single database query per call
         - Efficient pandas vectorized pct_change()
         - Date alignment done in-memory (fast)
@@ -660,6 +662,79 @@ async def bulk_update_position_values(
     return results
 
 
+async def get_returns_matrix(
+    db: AsyncSession,
+    symbols: List[str],
+    start_date: date,
+    end_date: date,
+    price_cache=None
+) -> pd.DataFrame:
+    """
+    Fetch per-symbol daily returns for many symbols as one (dates x symbols) matrix.
+
+    Unlike get_returns(align_dates=True), dates are NOT dropped when one symbol is
+    missing. Each column equals what get_returns(db, [symbol], ...) returns for that
+    symbol alone: the return on a date is measured against the symbol's previous
+    available close, and dates without a close for that symbol are NaN.
+
+    Used by the batched universe regressions, which handle missing data with a
+    per-symbol mask instead of one fetch per symbol.
+
+    Args:
+        db: Database session
+        symbols: Symbols to fetch
+        start_date: Start date for prices
+        end_date: End date for prices
+        price_cache: Optional PriceCache instance (single window slice when provided)
+
+    Returns:
+        DataFrame with DatetimeIndex and one column per symbol that has prices
+        (NaN where a symbol has no return for that date). Empty if no data.
+    """
+    price_df = await fetch_historical_prices(
+        db=db,
+        symbols=symbols,
+        start_date=start_date,
+        end_date=end_date,
+        price_cache=price_cache
+    )
+
+    if price_df.empty:
+        return pd.DataFrame()
+
+    return gap_aware_returns(price_df).dropna(how='all')
+
+
+def gap_aware_returns(price_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily returns vs. each symbol's previous available close (per column).
+
+    Dates where a symbol has no close, or no earlier close in price_df, are NaN.
+    """
+    previous_close = price_df.ffill().shift(1)
+    returns_df = price_df / previous_close - 1.0
+    return returns_df.where(price_df.notna())
+
+
+def previous_close_ordinals(price_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Date (as date.toordinal()) of the close each gap_aware_returns() value is measured from.
+
+    Same shape as price_df; NaN where gap_aware_returns() is NaN. Used by the
+    rolling backfill regressions to tell whether a return's earlier close
+    falls inside a given price window.
+    """
+    ordinals = np.array([d.toordinal() for d in pd.DatetimeIndex(price_df.index).date], dtype=np.float64)
+    has_price = price_df.notna().to_numpy()
+    seen = pd.DataFrame(np.where(has_price, ordinals[:, None], np.nan))
+    previous = seen.ffill().shift(1).to_numpy()
+    return pd.DataFrame(
+        np.where(has_price, previous, np.nan),
+        index=price_df.index,
+        columns=price_df.columns
+    )
+
+
 async def fetch_historical_prices(
     db: AsyncSession,
     symbols: List[str],
@@ -686,7 +761,8 @@ async def fetch_historical_prices(
         It ensures data availability and handles missing data gracefully
 
     Performance:
-        - With cache: 1 bulk query upfront, O(1) lookups (300x speedup)
+        - With cache: single vectorized window slice of the columnar PriceCache
+          (no per-symbol/per-date Python loop, no pivot_table)
         - Without cache: 1 query per call (slower but still works)
     """
     logger.debug(f"Fetching historical prices for {len(symbols)} symbols from {start_date} to {end_date}")
@@ -697,65 +773,7 @@ async def fetch_historical_prices(
 
     # OPTIMIZATION: Use price cache if provided (cache-first approach)
     if price_cache:
-        logger.debug(f"CACHE: Using price cache for {len(symbols)} symbols")
-
-        # Generate trading days only (not calendar days) for better cache hit rate
-        date_list = trading_calendar.get_trading_days_between(start_date, end_date)
-        logger.debug(f"CACHE: Checking {len(date_list)} trading days (not calendar days)")
-
-        # Try to fetch all prices from cache
-        data = []
-        cache_hits = 0
-        cache_misses = 0
-
-        for symbol in symbols:
-            for check_date in date_list:
-                price = price_cache.get_price(symbol, check_date)
-                if price is not None:
-                    data.append({
-                        'symbol': symbol,
-                        'date': check_date,
-                        'close': float(price)  # Convert Decimal to float for pandas
-                    })
-                    cache_hits += 1
-                else:
-                    cache_misses += 1
-
-        # Log cache performance (only log warnings for very poor hit rates)
-        total = cache_hits + cache_misses
-        hit_rate = (cache_hits / total * 100) if total > 0 else 0
-        # 50% is expected when 1 of 2 symbols is missing from cache (e.g., options)
-        # Only warn for truly poor rates (<30%) indicating cache issues
-        if hit_rate < 30:
-            logger.warning(f"CACHE: Very low hit rate {hit_rate:.1f}% ({cache_hits}/{total}) for {len(symbols)} symbols: {symbols}")
-        elif hit_rate < 80:
-            logger.debug(f"CACHE: Partial hit rate {hit_rate:.1f}% ({cache_hits}/{total}) for symbols {symbols} - some symbols may not be in cache")
-        else:
-            logger.debug(f"CACHE: {hit_rate:.1f}% hit rate ({cache_hits}/{total})")
-
-        if not data:
-            logger.warning(f"No cached data found for symbols {symbols} between {start_date} and {end_date}")
-            return pd.DataFrame()
-
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-
-        # Pivot to have dates as index and symbols as columns
-        # Use pivot_table with 'last' to handle any duplicate entries gracefully
-        price_df = df.pivot_table(index='date', columns='symbol', values='close', aggfunc='last')
-
-        # Convert index to DatetimeIndex for compatibility
-        price_df.index = pd.to_datetime(price_df.index)
-
-        # Log data availability
-        logger.debug(f"Retrieved {len(price_df)} days of data for {len(price_df.columns)} symbols from cache")
-
-        # Check for missing data
-        missing_data = price_df.isnull().sum()
-        if missing_data.any():
-            logger.warning(f"Missing data points: {missing_data[missing_data > 0].to_dict()}")
-
-        return price_df
+        return _fetch_historical_prices_from_cache(price_cache, symbols, start_date, end_date)
 
     # FALLBACK: Query database directly (slower but still works)
     logger.debug("No cache provided, querying database directly")
@@ -809,6 +827,82 @@ async def fetch_historical_prices(
     return price_df
 
 
+@lru_cache(maxsize=512)
+def _trading_days_in_range(start_date: date, end_date: date) -> frozenset:
+    """
+    Memoized trading-day set for a date range.
+
+    The exchange calendar lookup is far more expensive than the cache slice
+    itself, and every symbol in a batch run asks for the same few windows.
+    """
+    return frozenset(trading_calendar.get_trading_days_between(start_date, end_date))
+
+
+def _fetch_historical_prices_from_cache(
+    price_cache,
+    symbols: List[str],
+    start_date: date,
+    end_date: date
+) -> pd.DataFrame:
+    """
+    Cache-native price fetch: one vectorized window slice, no per-(symbol, date) loop.
+
+    Output matches the previous cache path (pivot of cached trading-day closes):
+    DatetimeIndex of dates with at least one price, alphabetically sorted columns
+    for symbols with at least one price, NaN for gaps.
+    """
+    ordered_symbols = sorted(set(symbols))
+
+    # Restrict to trading days (not calendar days) - cached weekend rows are ignored
+    trading_days = _trading_days_in_range(start_date, end_date)
+    window_dates = price_cache.get_dates(start_date, end_date)
+    trading_mask = np.fromiter(
+        (d in trading_days for d in window_dates), dtype=bool, count=len(window_dates)
+    )
+
+    window = price_cache.get_window(ordered_symbols, start_date, end_date)[trading_mask]
+    present = ~np.isnan(window)
+
+    # Log cache performance (only log warnings for very poor hit rates)
+    cache_hits = int(present.sum())
+    total = len(ordered_symbols) * len(trading_days)
+    hit_rate = (cache_hits / total * 100) if total > 0 else 0
+    # 50% is expected when 1 of 2 symbols is missing from cache (e.g., options)
+    # Only warn for truly poor rates (<30%) indicating cache issues
+    if hit_rate < 30:
+        logger.warning(f"CACHE: Very low hit rate {hit_rate:.1f}% ({cache_hits}/{total}) for {len(symbols)} symbols: {symbols}")
+    elif hit_rate < 80:
+        logger.debug(f"CACHE: Partial hit rate {hit_rate:.1f}% ({cache_hits}/{total}) for symbols {symbols} - some symbols may not be in cache")
+    else:
+        logger.debug(f"CACHE: {hit_rate:.1f}% hit rate ({cache_hits}/{total})")
+
+    if cache_hits == 0:
+        logger.warning(f"No cached data found for symbols {symbols} between {start_date} and {end_date}")
+        return pd.DataFrame()
+
+    # Drop dates / symbols with no cached price at all (same shape pivot_table produced)
+    row_mask = present.any(axis=1)
+    col_mask = present.any(axis=0)
+    trading_dates = [d for d, is_trading in zip(window_dates, trading_mask) if is_trading]
+    kept_dates = [d for d, keep in zip(trading_dates, row_mask) if keep]
+
+    price_df = pd.DataFrame(
+        window[np.ix_(row_mask, col_mask)],
+        index=pd.DatetimeIndex(pd.to_datetime(kept_dates), name='date'),
+        columns=pd.Index([s for s, keep in zip(ordered_symbols, col_mask) if keep], name='symbol'),
+    )
+
+    # Log data availability
+    logger.debug(f"Retrieved {len(price_df)} days of data for {len(price_df.columns)} symbols from cache")
+
+    # Check for missing data
+    missing_data = price_df.isnull().sum()
+    if missing_data.any():
+        logger.warning(f"Missing data points: {missing_data[missing_data > 0].to_dict()}")
+
+    return price_df
+
+
 async def validate_historical_data_availability(
     db: AsyncSession,
     symbols: List[str],
@@ -0,0 +1,128 @@
+"""
+Process-Pool Execution for Universe Regressions
+
+Phase 3 solves every factor regression for the universe in numpy. Run
+inline, that work blocks the event loop (health checks and admin
+batch-status calls stall) and uses a single core. map_symbol_chunks()
+splits a (dates x symbols) returns matrix into column chunks and solves them
+on a shared ProcessPoolExecutor, so the async layer only does DB I/O.
+
+Per-symbol regressions are independent of each other, so chunked results
+are identical to a single inline call.
+
+Worker count: settings.FACTOR_REGRESSION_WORKERS (0 = solve inline on the
+event loop, the previous behaviour).
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Below this many symbols per task, pickling the chunk costs more than the solve saves
+MIN_SYMBOLS_PER_TASK = 250
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+
+def get_regression_executor(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    Get the shared regression process pool, creating it on first use.
+
+    Args:
+        workers: Worker count (defaults to settings.FACTOR_REGRESSION_WORKERS)
+
+    Returns:
+        ProcessPoolExecutor, or None when workers <= 0 (inline mode)
+    """
+    global _executor, _executor_workers
+
+    workers = settings.FACTOR_REGRESSION_WORKERS if workers is None else workers
+    if workers <= 0:
+        return None
+
+    if _executor is None or _executor_workers != workers:
+        shutdown_regression_executor()
+        # spawn, not fork: the parent holds a running event loop and DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        _executor_workers = workers
+        logger.info(f"Started regression process pool with {workers} workers")
+
+    return _executor
+
+
+def shutdown_regression_executor() -> None:
+    """Shut down the shared pool (a new one is created on next use)."""
+    global _executor, _executor_workers
+
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        _executor_workers = 0
+
+
+async def map_symbol_chunks(
+    func: Callable[..., Dict[str, Any]],
+    symbol_returns: pd.DataFrame,
+    *args: Any,
+    workers: Optional[int] = None,
+    nested: bool = False
+) -> Dict[Any, Any]:
+    """
+    Run func(chunk, *args) over column chunks of symbol_returns and merge results.
+
+    func must be a module-level function (picklable by reference) whose first
+    argument is a (dates x symbols) returns or prices frame and which returns
+    {symbol: result}, e.g. calculate_batch_ridge_betas.
+
+    Args:
+        func: Batched per-symbol solver
+        symbol_returns: Daily returns or closes (dates x symbols), NaN where missing
+        *args: Remaining positional arguments for func (shared by every chunk)
+        workers: Worker count override (defaults to settings.FACTOR_REGRESSION_WORKERS)
+        nested: func returns {key: {symbol: result}} (e.g. keyed by calculation
+            date); merge the per-symbol dicts under each key
+
+    Returns:
+        {symbol: result} (or {key: {symbol: result}} when nested) merged across chunks
+    """
+    executor = get_regression_executor(workers)
+    if executor is None:
+        return func(symbol_returns, *args)
+
+    n_symbols = symbol_returns.shape[1]
+    n_chunks = max(1, min(_executor_workers, n_symbols // MIN_SYMBOLS_PER_TASK))
+    column_chunks = np.array_split(np.arange(n_symbols), n_chunks)
+
+    loop = asyncio.get_running_loop()
+    try:
+        parts = await asyncio.gather(*[
+            loop.run_in_executor(executor, func, symbol_returns.iloc[:, columns], *args)
+            for columns in column_chunks
+        ])
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); drop the pool so the next call starts fresh
+        logger.error("Regression process pool broke; it will be recreated on next use")
+        shutdown_regression_executor()
+        raise
+
+    merged: Dict[Any, Any] = {}
+    for part in parts:
+        if nested:
+            for key, value in part.items():
+                merged.setdefault(key, {}).update(value)
+        else:
+            merged.update(part)
+    return merged
@@ -9,10 +9,18 @@ This module consolidates duplicate regression scaffolding from:
 - market_beta.py (OLS vs SPY)
 - interest_rate_beta.py (OLS vs TLT)
 - factors_spread.py (OLS vs spread factors)
+
+Section 4 adds batched kernels that solve the same regression for every symbol
+in the universe at once from masked sufficient statistics (X'X, X'y, y'y).
+Section 5 slides those statistics across consecutive dates for backfills.
+Section 6 scores a whole grid of Ridge alphas from one SVD (GCV / LOO).
 """
-from typing import Dict, Any, Optional
+from datetime import date
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
 import numpy as np
+import pandas as pd
 import statsmodels.api as sm
+from scipy import stats
 
 from app.core.logging import get_logger
 
@@ -280,3 +288,521 @@ def classify_significance(p_value: float, strict: bool = False) -> Dict[str, Any
         'p_value': p_value,
         'threshold': threshold
     }
+
+
+# ============================================================================
+# SECTION 4: BATCHED (UNIVERSE-WIDE) REGRESSION KERNELS
+# ============================================================================
+#
+# Every symbol regresses on the SAME factor return matrix X (T x K); only the
+# dependent returns Y (T x J) and their missing-data mask differ. Per-symbol
+# sufficient statistics are computed for all J symbols with a few matrix
+# products, and the K x K normal equations are solved as one stacked batch.
+
+class RegressionMoments(NamedTuple):
+    """Masked sufficient statistics for J regressions sharing factor matrix X."""
+    n: np.ndarray        # (J,)      observations per symbol
+    sum_x: np.ndarray    # (J, K)    sum of x over each symbol's observed rows
+    sum_xx: np.ndarray   # (J, K, K) sum of x x'
+    sum_y: np.ndarray    # (J,)
+    sum_yy: np.ndarray   # (J,)
+    sum_xy: np.ndarray   # (J, K)
+
+    def take(self, index) -> "RegressionMoments":
+        """Select a subset of symbols (boolean mask or integer index)."""
+        return RegressionMoments(*(field[index] for field in self))
+
+
+class BatchRegressionResult(NamedTuple):
+    """Stacked regression output for J symbols and K factors."""
+    betas: np.ndarray       # (J, K) slopes in original (unscaled) units
+    intercepts: np.ndarray  # (J,)
+    r_squared: np.ndarray   # (J,)
+    ssr: np.ndarray         # (J,) residual sum of squares
+    observations: np.ndarray  # (J,)
+
+
+def masked_regression_moments(
+    X: np.ndarray,
+    Y: np.ndarray,
+    mask: np.ndarray
+) -> RegressionMoments:
+    """
+    Compute per-symbol sufficient statistics over each symbol's observed rows.
+
+    Args:
+        X: Shared factor returns, shape (T, K), no NaN
+        Y: Dependent returns, shape (T, J); values where mask is False are ignored
+        mask: Boolean (T, J), True where Y[t, j] is an observation for symbol j
+
+    Returns:
+        RegressionMoments for all J symbols
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    T, K = X.shape
+
+    W = np.asarray(mask, dtype=np.float64)
+    Yz = np.where(mask, Y, 0.0)
+
+    # Outer products of each factor row, flattened so X'X for all symbols is one matmul
+    x_outer = (X[:, :, None] * X[:, None, :]).reshape(T, K * K)
+
+    return RegressionMoments(
+        n=W.sum(axis=0),
+        sum_x=W.T @ X,
+        sum_xx=(W.T @ x_outer).reshape(-1, K, K),
+        sum_y=Yz.sum(axis=0),
+        sum_yy=(Yz * Yz).sum(axis=0),
+        sum_xy=Yz.T @ X,
+    )
+
+
+def solve_regression_from_moments(
+    moments: RegressionMoments,
+    alpha: float = 0.0,
+    standardize: bool = False
+) -> BatchRegressionResult:
+    """
+    Solve intercept-included (Ridge) regressions for every symbol at once.
+
+    Matches sklearn's StandardScaler + Ridge(fit_intercept=True) when
+    standardize=True (population std, zero-variance factors left unscaled),
+    and plain OLS when alpha=0 and standardize=False.
+
+    Args:
+        moments: Sufficient statistics from masked_regression_moments()
+        alpha: L2 penalty applied to the (optionally standardized) slopes
+        standardize: Scale factors to unit variance before penalizing
+
+    Returns:
+        BatchRegressionResult with betas mapped back to original units
+    """
+    n = moments.n
+    K = moments.sum_x.shape[1]
+    safe_n = np.where(n > 0, n, 1.0)
+
+    mean_x = moments.sum_x / safe_n[:, None]
+    mean_y = moments.sum_y / safe_n
+
+    # Centered (co)variances - the intercept is absorbed by centering
+    cxx = moments.sum_xx - n[:, None, None] * mean_x[:, :, None] * mean_x[:, None, :]
+    cxy = moments.sum_xy - n[:, None] * mean_x * mean_y[:, None]
+    cyy = np.maximum(moments.sum_yy - n * mean_y ** 2, 0.0)
+
+    if standardize:
+        variance = np.maximum(np.diagonal(cxx, axis1=1, axis2=2) / safe_n[:, None], 0.0)
+        scale = np.sqrt(variance)
+        scale = np.where(scale < 10 * np.finfo(np.float64).eps, 1.0, scale)
+    else:
+        scale = np.ones_like(mean_x)
+
+    cxx_s = cxx / (scale[:, :, None] * scale[:, None, :])
+    cxy_s = cxy / scale
+
+    system = cxx_s + alpha * np.eye(K)[None, :, :]
+    try:
+        coef_s = np.linalg.solve(system, cxy_s[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        # Degenerate member(s) in the stack - fall back to pseudo-inverse for all
+        coef_s = (np.linalg.pinv(system) @ cxy_s[:, :, None])[:, :, 0]
+
+    # SSR = yc'yc - 2 b'Xc'yc + b'Xc'Xc b (standardized space, same residuals)
+    ssr = (
+        cyy
+        - 2.0 * np.einsum('jk,jk->j', coef_s, cxy_s)
+        + np.einsum('jk,jkl,jl->j', coef_s, cxx_s, coef_s)
+    )
+    ssr = np.maximum(ssr, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(cyy > 0, 1.0 - ssr / np.where(cyy > 0, cyy, 1.0), 0.0)
+
+    betas = coef_s / scale
+    intercepts = mean_y - np.einsum('jk,jk->j', betas, mean_x)
+
+    return BatchRegressionResult(
+        betas=betas,
+        intercepts=intercepts,
+        r_squared=r_squared,
+        ssr=ssr,
+        observations=n.astype(np.int64),
+    )
+
+
+def run_batch_single_factor_regression(
+    Y: np.ndarray,
+    X: np.ndarray,
+    mask: np.ndarray,
+    cap: Optional[float] = None,
+    confidence: float = 0.10
+) -> Dict[str, np.ndarray]:
+    """
+    Run y = α + β×x + ε for every (symbol, factor) pair at once.
+
+    Vectorized equivalent of run_single_factor_regression(): each symbol j is
+    regressed separately on each factor column f over the rows where
+    mask[:, j] is True. Everything comes from masked covariance / variance
+    arrays, so ~30k tiny regressions cost a handful of matrix products
+    instead of one statsmodels fit each.
+
+    Args:
+        Y: Dependent returns, shape (T, J)
+        X: Factor returns, shape (T, F) or (T,), no NaN
+        mask: Boolean (T, J), True where Y[t, j] is observed
+        cap: Optional beta cap limit (same rule as run_single_factor_regression)
+        confidence: Significance threshold for is_significant
+
+    Returns:
+        Dict of (J, F) arrays: beta (capped), original_beta, alpha, r_squared,
+        std_error, t_stat, p_value, is_significant, capped; plus
+        observations (J,). Statistics are NaN where they are undefined
+        (fewer than 3 observations or a constant factor).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+
+    W = np.asarray(mask, dtype=np.float64)
+    Yz = np.where(mask, Y, 0.0)
+
+    return _single_factor_statistics(
+        n=W.sum(axis=0),
+        sum_x=W.T @ X,
+        sum_xx=W.T @ (X * X),
+        sum_y=Yz.sum(axis=0),
+        sum_yy=(Yz * Yz).sum(axis=0),
+        sum_xy=Yz.T @ X,
+        cap=cap,
+        confidence=confidence
+    )
+
+
+def single_factor_regression_from_moments(
+    moments: RegressionMoments,
+    cap: Optional[float] = None,
+    confidence: float = 0.10
+) -> Dict[str, np.ndarray]:
+    """
+    run_batch_single_factor_regression() from precomputed moments.
+
+    Each factor column is regressed on its own, so only the diagonal of
+    sum_xx is used.
+    """
+    return _single_factor_statistics(
+        n=moments.n,
+        sum_x=moments.sum_x,
+        sum_xx=np.diagonal(moments.sum_xx, axis1=1, axis2=2),
+        sum_y=moments.sum_y,
+        sum_yy=moments.sum_yy,
+        sum_xy=moments.sum_xy,
+        cap=cap,
+        confidence=confidence
+    )
+
+
+def _single_factor_statistics(
+    n: np.ndarray,
+    sum_x: np.ndarray,
+    sum_xx: np.ndarray,
+    sum_y: np.ndarray,
+    sum_yy: np.ndarray,
+    sum_xy: np.ndarray,
+    cap: Optional[float],
+    confidence: float
+) -> Dict[str, np.ndarray]:
+    """OLS statistics for every (symbol, factor) pair; sum_xx holds per-factor sums of x² (J, F)."""
+    n = np.asarray(n, dtype=np.float64)[:, None]     # (J, 1)
+    safe_n = np.where(n > 0, n, 1.0)
+    sum_y = np.asarray(sum_y)[:, None]
+    sum_yy = np.asarray(sum_yy)[:, None]
+
+    mean_x = sum_x / safe_n
+    mean_y = sum_y / safe_n
+    cxx = sum_xx - n * mean_x ** 2
+    cxy = sum_xy - n * mean_x * mean_y
+    cyy = np.maximum(sum_yy - n * mean_y ** 2, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        valid_x = cxx > 0
+        beta_raw = np.where(valid_x, cxy / np.where(valid_x, cxx, 1.0), 0.0)
+        alpha = mean_y - beta_raw * mean_x
+
+        ssr = np.maximum(cyy - beta_raw * cxy, 0.0)
+        r_squared = np.where(cyy > 0, 1.0 - ssr / cyy, np.nan)
+
+        df_resid = n - 2
+        sigma2 = np.where(df_resid > 0, ssr / np.where(df_resid > 0, df_resid, 1.0), np.nan)
+        std_error = np.where(valid_x, np.sqrt(sigma2 / np.where(valid_x, cxx, 1.0)), np.nan)
+        t_stat = beta_raw / std_error
+        p_value = 2.0 * stats.t.sf(np.abs(t_stat), np.where(df_resid > 0, df_resid, np.nan))
+
+    if cap is not None:
+        capped = np.abs(beta_raw) > cap
+        beta = np.clip(beta_raw, -cap, cap)
+    else:
+        capped = np.zeros_like(beta_raw, dtype=bool)
+        beta = beta_raw
+
+    return {
+        'beta': beta,
+        'original_beta': beta_raw,
+        'alpha': alpha,
+        'r_squared': r_squared,
+        'std_error': std_error,
+        't_stat': t_stat,
+        'p_value': p_value,
+        'is_significant': p_value < confidence,
+        'capped': capped,
+        'observations': n[:, 0].astype(np.int64),
+    }
+
+
+# ============================================================================
+# SECTION 5: ROLLING-WINDOW (MULTI-DATE) SUFFICIENT STATISTICS
+# ============================================================================
+#
+# A backfill over N calculation dates solves N windows that overlap in all but
+# a few rows. Moments are additive over observations, so each window is the
+# previous window plus the rows entering and minus the observations leaving:
+# every observation is added once and removed at most once, instead of being
+# re-read by every window that contains it.
+
+def _shift_moments(
+    moments: RegressionMoments,
+    delta: RegressionMoments,
+    sign: float
+) -> RegressionMoments:
+    return RegressionMoments(*(m + sign * d for m, d in zip(moments, delta)))
+
+
+def rolling_window_bounds(
+    row_ordinals: np.ndarray,
+    previous_ordinals: np.ndarray,
+    end_ordinals: np.ndarray,
+    start_ordinals: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Window membership for returns measured between two closes.
+
+    Window w covers prices in [start_w, end_w]. A return on row date t measured
+    from the close on date p lies in window w exactly when t <= end_w and
+    p >= start_w - the same returns a per-date fetch of that window produces.
+
+    Args:
+        row_ordinals: (T,) return row dates as date.toordinal(), ascending
+        previous_ordinals: (T, J) date of the earlier close per return (NaN if none)
+        end_ordinals: (N,) window end dates, ascending
+        start_ordinals: (N,) window start dates, ascending
+
+    Returns:
+        (entry, exit): entry (T,) is the first window containing row t (N if
+        none); exit (T, J) is the first window no longer containing (t, j)
+    """
+    entry = np.searchsorted(end_ordinals, row_ordinals, side='left')
+    previous = np.where(np.isfinite(previous_ordinals), previous_ordinals, -np.inf)
+    exit_ = np.searchsorted(start_ordinals, previous, side='right')
+    return entry, exit_
+
+
+def rolling_regression_moments(
+    X: np.ndarray,
+    Y: np.ndarray,
+    mask: np.ndarray,
+    entry: np.ndarray,
+    exit_: np.ndarray,
+    n_windows: int
+) -> Iterator[RegressionMoments]:
+    """
+    Yield masked_regression_moments() for a sequence of sliding windows.
+
+    Observation (t, j) is in window w iff mask[t, j] and entry[t] <= w < exit_[t, j]
+    (see rolling_window_bounds). Windows are updated incrementally, so N windows
+    cost one pass over the rows they touch rather than N full passes.
+
+    Args:
+        X: Shared factor returns, shape (T, K), no NaN
+        Y: Dependent returns, shape (T, J)
+        mask: Boolean (T, J), True where Y[t, j] is an observation
+        entry: (T,) first window containing row t
+        exit_: (T, J) first window no longer containing observation (t, j)
+        n_windows: Number of windows to yield
+
+    Yields:
+        RegressionMoments for windows 0 .. n_windows - 1
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    T, K = X.shape
+    J = Y.shape[1]
+
+    # Observations that are in at least one window
+    live = np.asarray(mask, dtype=bool) & (exit_ > entry[:, None])
+    # Per-row range of exit windows, to find rows with an observation leaving at w
+    first_exit = np.where(live, exit_, n_windows).min(axis=1) if J else np.full(T, n_windows)
+    last_exit = np.where(live, exit_, -1).max(axis=1) if J else np.full(T, -1)
+
+    current = RegressionMoments(
+        n=np.zeros(J),
+        sum_x=np.zeros((J, K)),
+        sum_xx=np.zeros((J, K, K)),
+        sum_y=np.zeros(J),
+        sum_yy=np.zeros(J),
+        sum_xy=np.zeros((J, K)),
+    )
+
+    for w in range(n_windows):
+        entering = np.flatnonzero(entry == w)
+        if entering.size:
+            delta = masked_regression_moments(X[entering], Y[entering], live[entering])
+            current = _shift_moments(current, delta, 1.0)
+
+        leaving = np.flatnonzero((first_exit <= w) & (last_exit >= w))
+        if leaving.size:
+            leaving_mask = live[leaving] & (exit_[leaving] == w)
+            delta = masked_regression_moments(X[leaving], Y[leaving], leaving_mask)
+            current = _shift_moments(current, delta, -1.0)
+
+        yield current
+
+
+def rolling_factor_moments(
+    symbol_returns: pd.DataFrame,
+    symbol_previous: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    factor_previous: pd.Series,
+    calculation_dates: List[date],
+    lookback_days: int
+) -> Iterator[Tuple[date, RegressionMoments]]:
+    """
+    Moments of every symbol vs. the factors for each calculation date's window.
+
+    The window for date d is the price fetch [d - lookback_days, d] that the
+    per-date path uses; returns come from one fetch over the whole backfill
+    range, with the date of each return's earlier close used to apply the
+    window's left edge exactly.
+
+    Args:
+        symbol_returns: gap_aware_returns() of symbol prices (dates x symbols)
+        symbol_previous: previous_close_ordinals() of the same prices
+        factor_returns: Factor returns on date-aligned rows (dates x factors)
+        factor_previous: Earlier close ordinal for each factor return row
+        calculation_dates: Window end dates
+        lookback_days: Calendar days from window start to end
+
+    Yields:
+        (calculation_date, RegressionMoments) in ascending date order
+    """
+    calculation_dates = sorted(calculation_dates)
+    rows = factor_returns.index
+    row_ordinals = np.array([d.toordinal() for d in pd.DatetimeIndex(rows).date], dtype=np.int64)
+    end_ordinals = np.array([d.toordinal() for d in calculation_dates], dtype=np.int64)
+    start_ordinals = end_ordinals - lookback_days
+
+    Y = symbol_returns.reindex(rows).to_numpy(dtype=np.float64)
+    # A return is in a window only if both closes it spans (symbol and factor) are,
+    # so it leaves with the earlier of the two previous closes
+    previous = np.fmin(
+        symbol_previous.reindex(index=rows, columns=symbol_returns.columns).to_numpy(dtype=np.float64),
+        factor_previous.reindex(rows).to_numpy(dtype=np.float64)[:, None]
+    )
+    previous = np.where(np.isfinite(Y), previous, np.nan)
+
+    entry, exit_ = rolling_window_bounds(row_ordinals, previous, end_ordinals, start_ordinals)
+    windows = rolling_regression_moments(
+        X=factor_returns.to_numpy(dtype=np.float64),
+        Y=Y,
+        mask=np.isfinite(Y) & np.isfinite(previous),
+        entry=entry,
+        exit_=exit_,
+        n_windows=len(calculation_dates)
+    )
+    yield from zip(calculation_dates, windows)
+
+
+# ============================================================================
+# SECTION 6: RIDGE ALPHA SELECTION (CLOSED-FORM CROSS-VALIDATION)
+# ============================================================================
+#
+# With the standardized, centered factor matrix Xs = U S V', the Ridge fit for
+# any alpha is U diag(d) U' y with d = s^2 / (s^2 + alpha), plus the (unpenalized)
+# intercept. One SVD therefore gives the residuals, the hat-matrix trace (GCV)
+# and its diagonal (LOO) for every alpha and every symbol that shares the same
+# observation rows, with no refits.
+
+RIDGE_CV_CRITERIA = ('gcv', 'loo')
+
+
+def ridge_cv_errors(
+    X: np.ndarray,
+    Y: np.ndarray,
+    mask: np.ndarray,
+    alphas: np.ndarray,
+    criterion: str = 'gcv'
+) -> np.ndarray:
+    """
+    Cross-validated mean squared error of StandardScaler + Ridge for each alpha and symbol.
+
+    Symbols are grouped by observation pattern (identical mask columns); each
+    group needs one SVD of its standardized factor rows. Standardization is
+    fitted once on each symbol's rows (as calculate_single_position_ridge_betas
+    does), not per fold.
+
+    Args:
+        X: Factor matrix (T x K)
+        Y: Symbol returns (T x M), NaN allowed where mask is False
+        mask: Observation mask (T x M)
+        alphas: Penalties to score (A,)
+        criterion: 'gcv' (generalized cross-validation) or 'loo' (exact
+            leave-one-out for the fixed standardization)
+
+    Returns:
+        (A x M) errors; NaN for symbols with too few observations (<= K + 1)
+    """
+    if criterion not in RIDGE_CV_CRITERIA:
+        raise ValueError(f"criterion must be one of {RIDGE_CV_CRITERIA}, got {criterion!r}")
+
+    alphas = np.asarray(alphas, dtype=np.float64)
+    K = X.shape[1]
+    errors = np.full((len(alphas), Y.shape[1]), np.nan)
+    if Y.shape[1] == 0:
+        return errors
+
+    patterns, group_of = np.unique(mask.T, axis=0, return_inverse=True)
+    group_of = np.asarray(group_of).ravel()
+
+    for g, rows in enumerate(patterns):
+        n = int(rows.sum())
+        if n <= K + 1:
+            continue
+        cols = np.flatnonzero(group_of == g)
+
+        Xc = X[rows] - X[rows].mean(axis=0)
+        scale = Xc.std(axis=0)
+        scale = np.where(scale < 10 * np.finfo(np.float64).eps, 1.0, scale)
+        U, s, _ = np.linalg.svd(Xc / scale, full_matrices=False)
+
+        Yg = Y[rows][:, cols]
+        Yc = Yg - Yg.mean(axis=0)
+        z = U.T @ Yc                                         # (K x m) rotated targets
+        s2 = s ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shrink = np.where(s2[None, :] > 0, s2[None, :] / (s2[None, :] + alphas[:, None]), 0.0)
+
+        if criterion == 'gcv':
+            outside = np.maximum((Yc ** 2).sum(axis=0) - (z ** 2).sum(axis=0), 0.0)
+            rss = outside[None, :] + ((1.0 - shrink) ** 2) @ (z ** 2)
+            dof = shrink.sum(axis=1) + 1.0                   # +1 for the intercept
+            with np.errstate(divide='ignore', invalid='ignore'):
+                errors[:, cols] = (rss / n) / ((1.0 - dof / n) ** 2)[:, None]
+        else:
+            U2 = U ** 2
+            for a, d in enumerate(shrink):
+                residuals = Yc - U @ (d[:, None] * z)
+                leverage = U2 @ d + 1.0 / n
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    errors[a, cols] = ((residuals / (1.0 - leverage)[:, None]) ** 2).mean(axis=0)
+
+    return errors
@@ -0,0 +1,718 @@
+"""
+Matrix Stress Testing Engine
+
+run_comprehensive_stress_test() used to evaluate one scenario at a time,
+with calculate_direct_stress_impact() and calculate_correlated_stress_impact()
+each re-reading the portfolio's net exposure, factor exposures and IR beta.
+This module evaluates every active scenario for every portfolio at once:
+
+- load_stress_exposures(): one factor exposure query for all portfolios,
+  giving a (portfolios x factors) dollar exposure matrix plus each
+  portfolio's net exposure and IR dollar exposure
+- compile_stress_scenarios(): the scenario config as a (scenarios x shocked
+  factors) shock matrix; direct_shock_matrix() and correlated_shock_matrix()
+  map it onto the exposure factors (correlated = shocks propagated through
+  the factor correlation matrix)
+- run_stress_tests_for_portfolios(): direct and correlated P&L for every
+  (portfolio, scenario) from two matrix products, returned in the
+  run_comprehensive_stress_test() result format
+
+P&L definitions are those of the per-scenario functions: the same factor name
+mappings, exposure_dollar with net-exposure x beta fallback, Interest_Rate via
+the portfolio IR beta, and the 99% loss cap.
+"""
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculations.stress_testing import (
+    CORRELATION_FACTOR_NAME_MAP,
+    DIRECT_FACTOR_NAME_MAP,
+    STRESS_EXPOSURE_ROW_LIMIT,
+    calculate_factor_correlation_matrix,
+    load_stress_scenarios,
+)
+from app.calculations.stress_testing_ir_integration import get_portfolio_ir_beta
+from app.core.logging import get_logger
+from app.models.market_data import FactorDefinition, FactorExposure
+from app.models.snapshots import PortfolioSnapshot
+from app.models.users import Portfolio
+from app.services.portfolio_exposure_service import get_portfolio_exposures
+
+logger = get_logger(__name__)
+
+IR_FACTOR = 'Interest_Rate'
+MAX_LOSS_FRACTION = 0.99  # Losses are clipped at 99% of net exposure
+SNAPSHOT_MAX_STALENESS_DAYS = 3  # Same default as get_portfolio_exposures()
+
+
+@dataclass
+class CompiledStressScenarios:
+    """Active scenarios as shock matrices, in config order."""
+    categories: List[str]  # Category per scenario
+    scenario_ids: List[str]
+    configs: List[Dict[str, Any]]  # Scenario configs (with 'id')
+    shock_factors: List[str]  # Shocked factors other than Interest_Rate
+    exposure_factors: Dict[str, str]  # Shocked factor -> factor_exposures name (direct impacts)
+    shocks: np.ndarray  # (scenarios x shock_factors)
+    ir_shocks: np.ndarray  # (scenarios,) Interest_Rate shock, 0 where none
+    has_ir_shock: np.ndarray  # (scenarios,) bool
+    categories_requested: List[str]  # Categories passing the filter (tested or not)
+    scenarios_available: int
+    scenarios_skipped: int  # Inactive
+
+
+@dataclass
+class StressExposureMatrix:
+    """Latest factor exposures for a set of portfolios."""
+    portfolio_ids: List[UUID]
+    factor_names: List[str]  # factor_exposures names
+    exposure_dollars: np.ndarray  # (portfolios x factors) exposure_dollar, else net exposure x beta; 0 = none
+    reported_dollars: np.ndarray  # (portfolios x factors) stored exposure_dollar, NaN when null or zero
+    present: np.ndarray  # (portfolios x factors) bool, factor among the portfolio's latest exposures
+    net_exposure: np.ndarray  # (portfolios,) net exposure (1.0 when <= 0)
+    exposure_dates: List[Optional[date]]  # Latest factor exposure date per portfolio
+    ir_exposure_dollar: np.ndarray  # (portfolios,) equity x portfolio IR beta, NaN when unavailable
+    ir_details: List[Optional[Dict[str, Any]]]  # get_portfolio_ir_beta() output when successful
+
+
+def compile_stress_scenarios(
+    config: Dict[str, Any],
+    scenario_filter: Optional[List[str]] = None
+) -> CompiledStressScenarios:
+    """
+    Active scenarios from a stress scenario config as a shock matrix.
+
+    Args:
+        config: Output of load_stress_scenarios()
+        scenario_filter: Optional list of scenario categories to include
+
+    Returns:
+        CompiledStressScenarios
+    """
+    categories, scenario_ids, configs = [], [], []
+    categories_requested = []
+    available = skipped = 0
+
+    for category, scenarios in config['stress_scenarios'].items():
+        if scenario_filter and category not in scenario_filter:
+            continue
+        categories_requested.append(category)
+        for scenario_id, scenario_config in scenarios.items():
+            available += 1
+            if not scenario_config.get('active', True):
+                skipped += 1
+                continue
+            categories.append(category)
+            scenario_ids.append(scenario_id)
+            configs.append({**scenario_config, 'id': scenario_id})
+
+    shock_factors = list(dict.fromkeys(
+        factor
+        for scenario_config in configs
+        for factor in scenario_config.get('shocked_factors', {})
+        if factor != IR_FACTOR
+    ))
+    factor_index = {factor: k for k, factor in enumerate(shock_factors)}
+
+    shocks = np.zeros((len(configs), len(shock_factors)))
+    ir_shocks = np.zeros(len(configs))
+    has_ir_shock = np.zeros(len(configs), dtype=bool)
+    for s, scenario_config in enumerate(configs):
+        for factor, shock in scenario_config.get('shocked_factors', {}).items():
+            if factor == IR_FACTOR:
+                ir_shocks[s] = shock
+                has_ir_shock[s] = True
+            else:
+                shocks[s, factor_index[factor]] = shock
+
+    return CompiledStressScenarios(
+        categories=categories,
+        scenario_ids=scenario_ids,
+        configs=configs,
+        shock_factors=shock_factors,
+        exposure_factors={
+            factor: DIRECT_FACTOR_NAME_MAP.get(factor, factor)
+            for scenario_config in configs
+            for factor in scenario_config.get('shocked_factors', {})
+        },
+        shocks=shocks,
+        ir_shocks=ir_shocks,
+        has_ir_shock=has_ir_shock,
+        categories_requested=categories_requested,
+        scenarios_available=available,
+        scenarios_skipped=skipped,
+    )
+
+
+def direct_mapping_matrix(compiled: CompiledStressScenarios, factor_names: List[str]) -> np.ndarray:
+    """(shock_factors x factors) 1.0 where a shocked factor maps directly onto an exposure factor."""
+    factor_index = {name: g for g, name in enumerate(factor_names)}
+    mapping = np.zeros((len(compiled.shock_factors), len(factor_names)))
+    for k, factor in enumerate(compiled.shock_factors):
+        g = factor_index.get(compiled.exposure_factors[factor])
+        if g is not None:
+            mapping[k, g] = 1.0
+    return mapping
+
+
+def correlation_mapping_matrix(
+    shock_factors: List[str],
+    factor_names: List[str],
+    correlation_matrix: Dict[str, Dict[str, float]]
+) -> np.ndarray:
+    """
+    (shock_factors x factors) correlation used to propagate each shocked factor.
+
+    correlation_matrix[shocked][factor] when both are in the matrix, 1.0 when
+    the shocked factor is the exposure factor itself, else 0.0.
+    """
+    mapping = np.zeros((len(shock_factors), len(factor_names)))
+    for g, name in enumerate(factor_names):
+        corr_name = CORRELATION_FACTOR_NAME_MAP.get(name, name)
+        for k, factor in enumerate(shock_factors):
+            if factor in correlation_matrix and corr_name in correlation_matrix[factor]:
+                mapping[k, g] = correlation_matrix[factor][corr_name]
+            elif factor == corr_name:
+                mapping[k, g] = 1.0
+    return mapping
+
+
+def direct_shock_matrix(compiled: CompiledStressScenarios, factor_names: List[str]) -> np.ndarray:
+    """(scenarios x factors) shock applied to each exposure factor without correlation."""
+    return compiled.shocks @ direct_mapping_matrix(compiled, factor_names)
+
+
+def correlated_shock_matrix(
+    compiled: CompiledStressScenarios,
+    factor_names: List[str],
+    correlation_matrix: Dict[str, Dict[str, float]]
+) -> np.ndarray:
+    """(scenarios x factors) shock reaching each exposure factor through the correlation matrix."""
+    return compiled.shocks @ correlation_mapping_matrix(
+        compiled.shock_factors, factor_names, correlation_matrix
+    )
+
+
+def stress_pnl(
+    exposures: StressExposureMatrix,
+    compiled: CompiledStressScenarios,
+    direct_shocks: np.ndarray,
+    correlated_shocks: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Uncapped (portfolios x scenarios) direct and correlated P&L.
+
+    Factor P&L is exposure_dollars @ shocks.T; Interest_Rate shocks add
+    IR dollar exposure x shock where the portfolio IR beta is available.
+    """
+    ir_available = ~np.isnan(exposures.ir_exposure_dollar)
+    ir_pnl = np.where(
+        ir_available[:, None] & compiled.has_ir_shock[None, :],
+        np.nan_to_num(exposures.ir_exposure_dollar)[:, None] * compiled.ir_shocks[None, :],
+        0.0
+    )
+    direct = exposures.exposure_dollars @ direct_shocks.T + ir_pnl
+    correlated = exposures.exposure_dollars @ correlated_shocks.T + ir_pnl
+    return direct, correlated
+
+
+async def _load_net_exposures(
+    db: AsyncSession,
+    portfolio_ids: List[UUID],
+    calculation_date: date
+) -> Dict[UUID, float]:
+    """Net exposure per portfolio: latest fresh snapshot (one query), else get_portfolio_exposures()."""
+    stmt = (
+        select(PortfolioSnapshot.portfolio_id, PortfolioSnapshot.snapshot_date, PortfolioSnapshot.net_exposure)
+        .where(
+            and_(
+                PortfolioSnapshot.portfolio_id.in_(portfolio_ids),
+                PortfolioSnapshot.snapshot_date <= calculation_date
+            )
+        )
+        .order_by(PortfolioSnapshot.portfolio_id, PortfolioSnapshot.snapshot_date.desc())
+        .distinct(PortfolioSnapshot.portfolio_id)
+    )
+    net_exposures = {}
+    for portfolio_id, snapshot_date, net_exposure in (await db.execute(stmt)).all():
+        if (calculation_date - snapshot_date).days <= SNAPSHOT_MAX_STALENESS_DAYS:
+            net_exposures[portfolio_id] = float(net_exposure)
+
+    for portfolio_id in portfolio_ids:
+        if portfolio_id not in net_exposures:
+            exposures = await get_portfolio_exposures(db, portfolio_id, calculation_date)
+            net_exposures[portfolio_id] = exposures['net_exposure']
+    return net_exposures
+
+
+async def load_stress_exposures(
+    db: AsyncSession,
+    portfolio_ids: List[UUID],
+    calculation_date: date,
+    include_ir: bool = True
+) -> StressExposureMatrix:
+    """
+    Latest factor exposures for all portfolios as a matrix.
+
+    Each portfolio's exposures are the latest value per factor among its
+    STRESS_EXPOSURE_ROW_LIMIT most recent factor_exposures rows (the window
+    the per-scenario functions read). Portfolios without exposure rows are
+    left out.
+
+    Args:
+        db: Database session
+        portfolio_ids: Portfolios to load
+        calculation_date: Latest exposure date to use
+        include_ir: Also load portfolio IR betas (needed for Interest_Rate shocks)
+
+    Returns:
+        StressExposureMatrix
+    """
+    ranked = (
+        select(
+            FactorExposure.portfolio_id,
+            FactorDefinition.name,
+            FactorExposure.exposure_value,
+            FactorExposure.exposure_dollar,
+            FactorExposure.calculation_date,
+            func.row_number().over(
+                partition_by=FactorExposure.portfolio_id,
+                order_by=FactorExposure.calculation_date.desc()
+            ).label('row_number')
+        )
+        .join(FactorDefinition, FactorExposure.factor_id == FactorDefinition.id)
+        .where(
+            and_(
+                FactorExposure.portfolio_id.in_(portfolio_ids),
+                FactorExposure.calculation_date <= calculation_date
+            )
+        )
+        .subquery()
+    )
+    stmt = (
+        select(ranked)
+        .where(ranked.c.row_number <= STRESS_EXPOSURE_ROW_LIMIT)
+        .order_by(ranked.c.portfolio_id, ranked.c.row_number)
+    )
+
+    latest: Dict[UUID, Dict[str, Tuple[float, Optional[float], date]]] = {}
+    for row in (await db.execute(stmt)).all():
+        factors = latest.setdefault(row.portfolio_id, {})
+        if row.name not in factors:
+            factors[row.name] = (
+                float(row.exposure_value),
+                float(row.exposure_dollar) if row.exposure_dollar else None,
+                row.calculation_date,
+            )
+
+    loaded_ids = [pid for pid in portfolio_ids if pid in latest]
+    factor_names = sorted({name for factors in latest.values() for name in factors})
+    factor_index = {name: g for g, name in enumerate(factor_names)}
+
+    net_exposures = await _load_net_exposures(db, loaded_ids, calculation_date) if loaded_ids else {}
+
+    n, m = len(loaded_ids), len(factor_names)
+    betas = np.zeros((n, m))
+    reported = np.full((n, m), np.nan)
+    present = np.zeros((n, m), dtype=bool)
+    net = np.ones(n)
+    exposure_dates: List[Optional[date]] = []
+    for p, portfolio_id in enumerate(loaded_ids):
+        net_exposure = net_exposures[portfolio_id]
+        if net_exposure <= 0:
+            logger.warning(f"Portfolio {portfolio_id} has no net exposure")
+        else:
+            net[p] = net_exposure
+        for name, (beta, dollar, _) in latest[portfolio_id].items():
+            g = factor_index[name]
+            present[p, g] = True
+            betas[p, g] = beta
+            if dollar is not None:
+                reported[p, g] = dollar
+        exposure_dates.append(max(d for _, _, d in latest[portfolio_id].values()))
+
+    # ISSUE #2 FIX: exposure_dollar (primary) with beta fallback on net exposure
+    exposure_dollars = np.where(np.isnan(reported), net[:, None] * betas, reported)
+    exposure_dollars[~present] = 0.0
+
+    ir_exposure_dollar = np.full(n, np.nan)
+    ir_details: List[Optional[Dict[str, Any]]] = [None] * n
+    if include_ir:
+        for p, portfolio_id in enumerate(loaded_ids):
+            ir_beta = await get_portfolio_ir_beta(db, portfolio_id, calculation_date)
+            if ir_beta['success']:
+                ir_details[p] = ir_beta
+                ir_exposure_dollar[p] = ir_beta['portfolio_equity'] * ir_beta['portfolio_ir_beta']
+            else:
+                logger.warning(
+                    f"Could not calculate IR impact for portfolio {portfolio_id}: {ir_beta.get('error')}. "
+                    "IR shock will be skipped in stress test."
+                )
+
+    return StressExposureMatrix(
+        portfolio_ids=loaded_ids,
+        factor_names=factor_names,
+        exposure_dollars=exposure_dollars,
+        reported_dollars=reported,
+        present=present,
+        net_exposure=net,
+        exposure_dates=exposure_dates,
+        ir_exposure_dollar=ir_exposure_dollar,
+        ir_details=ir_details,
+    )
+
+
+def _cap(pnl: float, max_loss: float) -> Tuple[float, bool]:
+    """FIX: Cap losses at 99% of portfolio value using simple clipping (not scaling)."""
+    if pnl < max_loss:
+        return max_loss, True
+    return pnl, False
+
+
+def _scenario_results(
+    exposures: StressExposureMatrix,
+    p: int,
+    compiled: CompiledStressScenarios,
+    s: int,
+    direct_total: float,
+    correlated_total: float,
+    factor_index: Dict[str, int],
+    correlated_shocks: np.ndarray,
+    correlation_matrix: Dict[str, Dict[str, float]],
+    calculation_date: date,
+    include_breakdown: bool
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Direct and correlated result dicts for one (portfolio, scenario)."""
+    scenario_config = compiled.configs[s]
+    shocked_factors = scenario_config.get('shocked_factors', {})
+    max_loss = -exposures.net_exposure[p] * MAX_LOSS_FRACTION
+    ir_detail = exposures.ir_details[p]
+    ir_applied = bool(compiled.has_ir_shock[s]) and ir_detail is not None
+    ir_dollar = exposures.ir_exposure_dollar[p]
+
+    direct_impacts = {}
+    if ir_applied:
+        direct_impacts[IR_FACTOR] = {
+            'exposure_dollar': ir_dollar,
+            'shock_amount': shocked_factors[IR_FACTOR],
+            'factor_pnl': ir_dollar * shocked_factors[IR_FACTOR],
+            'calculation_method': 'ir_beta',
+            'ir_beta': ir_detail['portfolio_ir_beta'],
+            'positions_with_beta': ir_detail['positions_with_beta'],
+            'ir_beta_date': ir_detail['ir_beta_date']
+        }
+    for factor_name, shock_amount in shocked_factors.items():
+        if factor_name == IR_FACTOR:
+            continue
+        g = factor_index.get(compiled.exposure_factors[factor_name])
+        if g is not None and exposures.present[p, g]:
+            reported = exposures.reported_dollars[p, g]
+            direct_impacts[factor_name] = {
+                'exposure_dollar': 0.0 if np.isnan(reported) else float(reported),
+                'shock_amount': shock_amount,
+                'factor_pnl': float(exposures.exposure_dollars[p, g] * shock_amount),
+                'calculation_method': 'beta_fallback' if np.isnan(reported) else 'dollar_exposure'
+            }
+        else:
+            direct_impacts[factor_name] = {
+                'exposure_dollar': 0.0,
+                'shock_amount': shock_amount,
+                'factor_pnl': 0.0
+            }
+
+    correlated_impacts = {}
+    if ir_applied:
+        ir_pnl = ir_dollar * shocked_factors[IR_FACTOR]
+        correlated_impacts[IR_FACTOR] = {
+            'exposure_dollar': ir_dollar,
+            'total_factor_impact': ir_pnl,
+            'impact_breakdown': {
+                IR_FACTOR: {
+                    'original_shock': shocked_factors[IR_FACTOR],
+                    'correlation': 1.0,  # IR shock has no correlation with equity factors
+                    'correlated_shock': shocked_factors[IR_FACTOR],
+                    'correlated_pnl': ir_pnl
+                }
+            },
+            'ir_beta': ir_detail['portfolio_ir_beta'],
+            'calculation_method': 'ir_beta_direct'
+        }
+    for g in np.flatnonzero(exposures.present[p]):
+        factor_name = exposures.factor_names[g]
+        reported = exposures.reported_dollars[p, g]
+        impact = {
+            'exposure_dollar': None if np.isnan(reported) else float(reported),
+            'total_factor_impact': float(exposures.exposure_dollars[p, g] * correlated_shocks[s, g]),
+        }
+        if include_breakdown:
+            impact['impact_breakdown'] = _impact_breakdown(
+                exposures.exposure_dollars[p, g],
+                CORRELATION_FACTOR_NAME_MAP.get(factor_name, factor_name),
+                shocked_factors,
+                correlation_matrix
+            )
+        correlated_impacts[factor_name] = impact
+
+    direct_capped, direct_cap_applied = _cap(direct_total, max_loss)
+    correlated_capped, correlated_cap_applied = _cap(correlated_total, max_loss)
+    if direct_cap_applied:
+        for impact in direct_impacts.values():
+            impact.update(original_total=direct_total, clipped_total=direct_capped, cap_applied=True)
+    if correlated_cap_applied:
+        for impact in correlated_impacts.values():
+            impact.update(original_total=correlated_total, clipped_total=correlated_capped, cap_applied=True)
+
+    portfolio_id = str(exposures.portfolio_ids[p])
+    direct_result = {
+        'scenario_name': scenario_config.get('name'),
+        'scenario_id': scenario_config.get('id'),
+        'portfolio_id': portfolio_id,
+        'calculation_date': calculation_date,
+        'shocked_factors': shocked_factors,
+        'factor_impacts': direct_impacts,
+        'total_direct_pnl': direct_capped,
+        'calculation_method': 'direct',
+        'factor_exposures_date': exposures.exposure_dates[p] or calculation_date,
+        'loss_cap_applied': direct_cap_applied,
+        'original_total_pnl': direct_total if direct_cap_applied else None
+    }
+    correlated_result = {
+        'scenario_name': scenario_config.get('name'),
+        'scenario_id': scenario_config.get('id'),
+        'portfolio_id': portfolio_id,
+        'calculation_date': calculation_date,
+        'shocked_factors': shocked_factors,
+        'direct_pnl': direct_capped,
+        'correlated_pnl': correlated_capped,
+        'correlation_effect': correlated_capped - direct_capped,
+        'factor_impacts': correlated_impacts,
+        'calculation_method': 'correlated',
+        'correlation_matrix_stats': {
+            'factors_used': len(correlation_matrix),
+            'shocked_factors': list(shocked_factors.keys())
+        },
+        'loss_cap_applied': correlated_cap_applied,
+        'original_total_pnl': correlated_total if correlated_cap_applied else None
+    }
+    return direct_result, correlated_result
+
+
+def _impact_breakdown(
+    exposure_dollar: float,
+    corr_factor_name: str,
+    shocked_factors: Dict[str, float],
+    correlation_matrix: Dict[str, Dict[str, float]]
+) -> Dict[str, Dict[str, float]]:
+    """Per-shocked-factor contributions to one exposure factor's correlated P&L."""
+    breakdown = {}
+    for shocked_factor, shock_amount in shocked_factors.items():
+        if shocked_factor == IR_FACTOR:
+            continue
+        if shocked_factor in correlation_matrix and corr_factor_name in correlation_matrix[shocked_factor]:
+            correlation = correlation_matrix[shocked_factor][corr_factor_name]
+        elif shocked_factor == corr_factor_name:
+            correlation = 1.0
+        else:
+            continue
+        breakdown[shocked_factor] = {
+            'original_shock': shock_amount,
+            'correlation': correlation,
+            'correlated_shock': shock_amount * correlation,
+            'correlated_pnl': float(exposure_dollar * shock_amount * correlation)
+        }
+    return breakdown
+
+
+def build_stress_results(
+    exposures: StressExposureMatrix,
+    compiled: CompiledStressScenarios,
+    correlation_data: Dict[str, Any],
+    calculation_date: date,
+    portfolio_names: Dict[UUID, str],
+    include_breakdown: bool = False
+) -> Dict[UUID, Dict[str, Any]]:
+    """
+    run_comprehensive_stress_test() results for every loaded portfolio.
+
+    Args:
+        exposures: Output of load_stress_exposures()
+        compiled: Output of compile_stress_scenarios()
+        correlation_data: Output of calculate_factor_correlation_matrix()
+        calculation_date: Date for calculation
+        portfolio_names: {portfolio_id: name}
+        include_breakdown: Include per-shocked-factor correlated breakdowns
+
+    Returns:
+        {portfolio_id: results}
+    """
+    correlation_matrix = correlation_data['correlation_matrix']
+    direct_shocks = direct_shock_matrix(compiled, exposures.factor_names)
+    correlated_shocks = correlated_shock_matrix(compiled, exposures.factor_names, correlation_matrix)
+    direct, correlated = stress_pnl(exposures, compiled, direct_shocks, correlated_shocks)
+
+    # Loss cap applied to the whole matrix for the summary statistics
+    max_loss = -exposures.net_exposure[:, None] * MAX_LOSS_FRACTION
+    direct_capped = np.maximum(direct, max_loss)
+    correlated_capped = np.maximum(correlated, max_loss)
+
+    factor_index = {name: g for g, name in enumerate(exposures.factor_names)}
+    results = {}
+    for p, portfolio_id in enumerate(exposures.portfolio_ids):
+        stress_results = {
+            'direct_impacts': {category: {} for category in compiled.categories_requested},
+            'correlated_impacts': {category: {} for category in compiled.categories_requested},
+            'summary_stats': {},
+            'scenarios_tested': len(compiled.scenario_ids),
+            'scenarios_skipped': compiled.scenarios_skipped
+        }
+        for s, (category, scenario_id) in enumerate(zip(compiled.categories, compiled.scenario_ids)):
+            direct_result, correlated_result = _scenario_results(
+                exposures, p, compiled, s,
+                float(direct[p, s]), float(correlated[p, s]),
+                factor_index, correlated_shocks, correlation_matrix,
+                calculation_date, include_breakdown
+            )
+            stress_results['direct_impacts'][category][scenario_id] = direct_result
+            stress_results['correlated_impacts'][category][scenario_id] = correlated_result
+
+        if compiled.scenario_ids:
+            pnls = correlated_capped[p]
+            stress_results['summary_stats'] = {
+                'worst_case_pnl': float(pnls.min()),
+                'best_case_pnl': float(pnls.max()),
+                'mean_pnl': float(pnls.mean()),
+                'median_pnl': float(np.median(pnls)),
+                'pnl_std': float(pnls.std()),
+                'mean_correlation_effect': float((pnls - direct_capped[p]).mean()),
+                'scenarios_negative': int((pnls < 0).sum()),
+                'scenarios_positive': int((pnls > 0).sum())
+            }
+
+        results[portfolio_id] = {
+            'portfolio_id': str(portfolio_id),
+            'portfolio_name': portfolio_names.get(portfolio_id),
+            'calculation_date': calculation_date,
+            'correlation_matrix_info': {
+                'calculation_date': correlation_data['calculation_date'],
+                'data_days': correlation_data['data_days'],
+                'mean_correlation': correlation_data['matrix_stats']['mean_correlation']
+            },
+            'stress_test_results': stress_results,
+            'config_metadata': {
+                'scenarios_available': compiled.scenarios_available,
+                'scenarios_tested': len(compiled.scenario_ids),
+                'scenarios_skipped': compiled.scenarios_skipped,
+                'categories_tested': len(set(compiled.categories))
+            }
+        }
+    return results
+
+
+def skipped_stress_results(portfolio_id: UUID, portfolio_name: str, calculation_date: date) -> Dict[str, Any]:
+    """Skip payload for a portfolio with no factor exposures (likely all PRIVATE positions)."""
+    # CODE REVIEW FIX: Include ALL required fields to match ComprehensiveStressTestResponse contract
+    return {
+        'portfolio_id': str(portfolio_id),
+        'portfolio_name': portfolio_name,  # REQUIRED by schema
+        'calculation_date': calculation_date,
+        'correlation_matrix_info': {  # REQUIRED by schema
+            'calculation_date': calculation_date.isoformat() if hasattr(calculation_date, 'isoformat') else str(calculation_date),
+            'data_days': 0,
+            'mean_correlation': 0.0
+        },
+        'stress_test_results': {
+            'skipped': True,  # CRITICAL: Task 9 will detect this flag
+            'reason': 'no_factor_exposures',
+            'message': 'Portfolio has no factor exposures (likely all PRIVATE positions)',
+            'direct_impacts': {},
+            'correlated_impacts': {},
+            'summary_stats': {},  # Empty but present (required)
+            'scenarios_tested': 0,
+            'scenarios_skipped': 0
+        },
+        'config_metadata': {
+            'scenarios_available': 0,
+            'scenarios_tested': 0,
+            'scenarios_skipped': 0,
+            'categories_tested': 0
+        }
+    }
+
+
+async def run_stress_tests_for_portfolios(
+    db: AsyncSession,
+    portfolio_ids: List[UUID],
+    calculation_date: date,
+    scenario_filter: Optional[List[str]] = None,
+    config_path: Optional[Path] = None,
+    include_breakdown: bool = False
+) -> Dict[str, Any]:
+    """
+    Run every active stress scenario for every portfolio in one pass.
+
+    Args:
+        db: Database session
+        portfolio_ids: Portfolios to test
+        calculation_date: Date for calculation
+        scenario_filter: Optional list of scenario categories to include
+        config_path: Optional path to custom scenario configuration
+        include_breakdown: Include per-shocked-factor correlated breakdowns
+
+    Returns:
+        Dict with:
+            - results: {portfolio_id: run_comprehensive_stress_test() result},
+              skip payloads for portfolios without factor exposures
+            - errors: {portfolio_id: message} for portfolios not found
+    """
+    if config_path is None:
+        from app.calculations.stress_scenario_registry import stress_scenario_registry
+        config = stress_scenario_registry.config()
+        compiled = stress_scenario_registry.compiled(scenario_filter)
+    else:
+        config = load_stress_scenarios(config_path)
+        compiled = compile_stress_scenarios(config, scenario_filter)
+
+    names_result = await db.execute(
+        select(Portfolio.id, Portfolio.name).where(Portfolio.id.in_(portfolio_ids))
+    )
+    portfolio_names = {pid: name for pid, name in names_result.all()}
+    errors = {
+        pid: f"Portfolio {pid} not found"
+        for pid in portfolio_ids if pid not in portfolio_names
+    }
+    found_ids = [pid for pid in portfolio_ids if pid in portfolio_names]
+
+    exposures = await load_stress_exposures(
+        db, found_ids, calculation_date, include_ir=bool(compiled.has_ir_shock.any())
+    )
+
+    results: Dict[UUID, Dict[str, Any]] = {}
+    if exposures.portfolio_ids:
+        correlation_data = await calculate_factor_correlation_matrix(
+            db, config=config, as_of_date=calculation_date
+        )
+        results = build_stress_results(
+            exposures, compiled, correlation_data, calculation_date,
+            portfolio_names, include_breakdown
+        )
+
+    for pid in found_ids:
+        if pid not in results:
+            logger.warning(
+                f"No factor exposures found for portfolio {pid}. "
+                "Skipping stress test (likely all PRIVATE positions). Returning skip payload."
+            )
+            results[pid] = skipped_stress_results(pid, portfolio_names[pid], calculation_date)
+
+    logger.info(
+        f"Matrix stress test: {len(exposures.portfolio_ids)} portfolios x {len(compiled.scenario_ids)} scenarios "
+        f"({len(found_ids) - len(exposures.portfolio_ids)} without exposures, {len(errors)} not found)"
+    )
+    return {'results': results, 'errors': errors}
@@ -0,0 +1,160 @@
+"""
+Stress Scenario Registry
+
+Parses, validates and compiles app/config/stress_scenarios.json once per
+process instead of on every load_stress_scenarios() call:
+
+- config(): the validated configuration dict (shared - treat as read-only)
+- compiled(scenario_filter): CompiledStressScenarios for the active
+  scenarios, memoized per category filter, with shock arrays already mapped
+  onto factor_exposures factor names
+- the file's mtime is checked on every access; a changed file is reloaded
+  and recompiled, and an invalid edit keeps the last good version in service
+
+Usage:
+    from app.calculations.stress_scenario_registry import stress_scenario_registry
+
+    compiled = stress_scenario_registry.compiled()
+    bounds = stress_scenario_registry.config()['configuration']
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.calculations.stress_matrix import CompiledStressScenarios, compile_stress_scenarios
+from app.calculations.stress_testing import DEFAULT_CONFIG_PATH
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+REQUIRED_CONFIG_KEYS = ('stress_scenarios', 'configuration', 'factor_mappings')
+
+
+def validate_stress_scenario_config(config: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Check a parsed stress scenario config.
+
+    - the required top-level keys are present
+    - every scenario has a non-empty shocked_factors dict of numeric shocks
+      on factors listed in factor_mappings
+    - no shock exceeds configuration.stress_magnitude_cap in magnitude
+    - severities, when given, are listed in severity_levels (if present)
+
+    Returns:
+        Tuple of (active scenarios, total scenarios)
+
+    Raises:
+        ValueError: On the first problem found
+    """
+    for key in REQUIRED_CONFIG_KEYS:
+        if key not in config:
+            raise ValueError(f"Missing required configuration key: {key}")
+
+    magnitude_cap = float(config['configuration'].get('stress_magnitude_cap', 1.0))
+    known_factors = set(config['factor_mappings'])
+    severities = set(config.get('severity_levels', {}))
+
+    total = active = 0
+    for category, scenarios in config['stress_scenarios'].items():
+        for scenario_id, scenario in scenarios.items():
+            total += 1
+            if scenario.get('active', True):
+                active += 1
+            shocked_factors = scenario.get('shocked_factors')
+            if not isinstance(shocked_factors, dict) or not shocked_factors:
+                raise ValueError(f"Scenario {category}.{scenario_id} has no shocked_factors")
+            for factor, shock in shocked_factors.items():
+                if factor not in known_factors:
+                    raise ValueError(f"Scenario {category}.{scenario_id} shocks unknown factor '{factor}'")
+                if isinstance(shock, bool) or not isinstance(shock, (int, float)):
+                    raise ValueError(f"Scenario {category}.{scenario_id} has non-numeric shock for '{factor}'")
+                if abs(shock) > magnitude_cap:
+                    raise ValueError(
+                        f"Scenario {category}.{scenario_id} shock {shock} for '{factor}' "
+                        f"exceeds stress_magnitude_cap {magnitude_cap}"
+                    )
+            severity = scenario.get('severity')
+            if severities and severity is not None and severity not in severities:
+                raise ValueError(f"Scenario {category}.{scenario_id} has unknown severity '{severity}'")
+    return active, total
+
+
+class StressScenarioRegistry:
+    """
+    Parsed and compiled stress scenarios for one config file, reloaded on mtime change.
+    """
+
+    def __init__(self, config_path: Path = DEFAULT_CONFIG_PATH):
+        self.config_path = Path(config_path)
+        self._lock = threading.Lock()
+        self._mtime_ns: Optional[int] = None
+        self._config: Optional[Dict[str, Any]] = None
+        self._compiled: Dict[Optional[Tuple[str, ...]], CompiledStressScenarios] = {}
+        self._reload_count = 0
+
+    def config(self) -> Dict[str, Any]:
+        """Validated configuration dict (shared across callers - do not mutate)."""
+        self._refresh()
+        return self._config
+
+    def compiled(self, scenario_filter: Optional[List[str]] = None) -> CompiledStressScenarios:
+        """Active scenarios as shock matrices (see compile_stress_scenarios()), memoized per filter."""
+        self._refresh()
+        key = tuple(sorted(scenario_filter)) if scenario_filter else None
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(key)
+                if compiled is None:
+                    compiled = compile_stress_scenarios(self._config, scenario_filter)
+                    for array in (compiled.shocks, compiled.ir_shocks, compiled.has_ir_shock):
+                        array.flags.writeable = False  # Shared by every caller
+                    self._compiled[key] = compiled
+        return compiled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry state for monitoring."""
+        return {
+            'config_path': str(self.config_path),
+            'loaded': self._config is not None,
+            'reload_count': self._reload_count,
+            'compiled_filters': len(self._compiled),
+        }
+
+    def _refresh(self) -> None:
+        """Load the file on first use or when its mtime changed."""
+        mtime_ns = os.stat(self.config_path).st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            try:
+                with open(self.config_path, 'r') as f:
+                    config = json.load(f)
+                active, total = validate_stress_scenario_config(config)
+            except (json.JSONDecodeError, ValueError) as e:
+                if self._config is None:
+                    logger.error(f"Invalid stress scenarios configuration {self.config_path}: {str(e)}")
+                    raise
+                logger.error(
+                    f"Invalid stress scenarios configuration {self.config_path}: {str(e)}. "
+                    "Keeping previously loaded scenarios."
+                )
+                self._mtime_ns = mtime_ns  # Do not re-parse the same bad file on every call
+                return
+
+            self._config = config
+            self._compiled = {}
+            self._mtime_ns = mtime_ns
+            self._reload_count += 1
+            logger.info(
+                f"Loaded {active}/{total} active stress scenarios from {self.config_path} "
+                f"(load #{self._reload_count})"
+            )
+
+
+# Global registry for the built-in scenario file
+stress_scenario_registry = StressScenarioRegistry()
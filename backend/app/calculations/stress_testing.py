@@ -2,20 +2,21 @@
 Comprehensive Stress Testing Framework - Section 1.4.7
 Implements advanced stress testing with factor correlation modeling and predefined scenarios
 """
+import copy
 import json
 from datetime import date, timedelta
 from decimal import Decimal
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from uuid import UUID
 import pandas as pd
 import numpy as np
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, insert
 
 from app.models.positions import Position
 from app.models.market_data import FactorDefinition, PositionFactorExposure, FactorExposure, StressTestScenario, StressTestResult
-from app.models.users import Portfolio
 from app.models.snapshots import PortfolioSnapshot
 from app.calculations.factors import fetch_factor_returns
 from app.calculations.portfolio import calculate_portfolio_exposures
@@ -31,43 +32,140 @@ DEFAULT_LOOKBACK_DAYS = 252
 CORRELATION_DECAY_FACTOR = 0.94
 STRESS_MAGNITUDE_CAP = 1.0
 OPTIONS_CONTRACT_MULTIPLIER = 100  # Standard options contract size
+MIN_CORRELATION_OBSERVATIONS = 30  # Paired observations below which a factor correlation is 0.0
+FACTOR_CORRELATION_MEMO_TTL_SECONDS = 3600  # In-process memo lifetime for calculate_factor_correlation_matrix()
+FACTOR_CORRELATION_MEMO_MAX_ENTRIES = 256  # Least recently used matrices are evicted beyond this
 
+STRESS_RESULT_INSERT_CHUNK_ROWS = 2000  # Rows per multi-row INSERT
+
+# Scenario factor names -> factor_exposures names (direct impacts)
+DIRECT_FACTOR_NAME_MAP = {
+    'Market': 'Market Beta (90D)',
+    'Interest_Rate': 'IR Beta',
+    # Add other mappings as needed
+}
+
+# factor_exposures names -> correlation matrix names (correlated impacts)
+# The correlation matrix uses ETF-based names like 'Market', 'Growth', etc.
+# Spread factors don't have direct ETF proxies, will be skipped in correlation lookup
+CORRELATION_FACTOR_NAME_MAP = {
+    'Market Beta': 'Market',
+    'Interest Rate Beta': 'Interest_Rate',
+}
+
+# Most recent factor exposure rows read per portfolio (latest value per factor wins)
+STRESS_EXPOSURE_ROW_LIMIT = 50
+
+# (as-of date, lookback, decay, min bound, max bound) -> results
+_factor_correlation_memo: TTLCache = TTLCache(
+    maxsize=FACTOR_CORRELATION_MEMO_MAX_ENTRIES, ttl=FACTOR_CORRELATION_MEMO_TTL_SECONDS
+)
+
+
+def clear_factor_correlation_memo() -> None:
+    """Drop memoized factor correlation matrices (e.g. after a factor return refresh)."""
+    _factor_correlation_memo.clear()
+
+
+def weighted_correlation_matrix(
+    returns: np.ndarray,
+    decay_factor: float = CORRELATION_DECAY_FACTOR,
+    min_observations: int = MIN_CORRELATION_OBSERVATIONS
+) -> np.ndarray:
+    """
+    Exponentially weighted pairwise correlation matrix, NaN-masked per pair
+
+    Each pair uses only the rows where both series are present, with the decay
+    weights of those rows (most recent row weight 1, then decay_factor, ...).
+    Equivalent to np.average-based weighted means, variances and covariance
+    per pair, computed for all pairs with a few matrix products.
+
+    Args:
+        returns: (days x factors) returns, oldest row first, NaN = missing
+        decay_factor: Exponential decay per day back from the last row
+        min_observations: Pairs with fewer common rows get 0.0
+
+    Returns:
+        (factors x factors) correlation matrix, 1.0 on the diagonal, 0.0 where
+        a pair has too few observations or zero variance
+    """
+    returns = np.asarray(returns, dtype=float)
+    n_days, n_factors = returns.shape
+    weights = decay_factor ** np.arange(n_days - 1, -1, -1, dtype=float)
+
+    present = (~np.isnan(returns)).astype(float)
+    values = np.where(present > 0, returns, 0.0)
+    weighted_values = values * weights[:, None]
+
+    # [i, j] sums over rows where both i and j are present
+    counts = present.T @ present
+    weight_sums = (present * weights[:, None]).T @ present
+    first_moments = weighted_values.T @ present  # sum w * x_i
+    second_moments = (weighted_values * values).T @ present  # sum w * x_i^2
+    cross_moments = weighted_values.T @ values  # sum w * x_i * x_j
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = first_moments / weight_sums
+        mean_squares = second_moments / weight_sums
+        variances = mean_squares - means ** 2
+        covariances = cross_moments / weight_sums - means * means.T
+        correlations = covariances / np.sqrt(variances * variances.T)
+
+        # Raw moments leave rounding noise where the variance is zero (constant series)
+        has_variance = variances > 1e-12 * mean_squares
+
+    valid = (counts >= min_observations) & has_variance & has_variance.T
+    correlations = np.where(valid, correlations, 0.0)
+    np.fill_diagonal(correlations, 1.0)
+    return correlations
 
 
 async def calculate_factor_correlation_matrix(
     db: AsyncSession,
     lookback_days: int = DEFAULT_LOOKBACK_DAYS,
     decay_factor: float = CORRELATION_DECAY_FACTOR,
-    config: Optional[Dict[str, Any]] = None
+    config: Optional[Dict[str, Any]] = None,
+    as_of_date: Optional[date] = None
 ) -> Dict[str, Any]:
     """
     Calculate factor cross-correlation matrix with exponential decay weighting
 
     ISSUE #5 FIX: Now reads correlation bounds from config instead of hardcoded values
 
+    The matrix depends only on the as-of date, lookback, decay and bounds, so
+    results are memoized on those for FACTOR_CORRELATION_MEMO_TTL_SECONDS and
+    every portfolio in a batch shares one computation.
+
     Args:
         db: Database session
         lookback_days: Historical period for correlation calculation (default: 252 days)
         decay_factor: Exponential decay factor for historical data weighting (default: 0.94)
         config: Stress scenario configuration dict (optional, will load if not provided)
+        as_of_date: Last day of the window (default: today)
 
     Returns:
         Dictionary containing correlation matrix and metadata
     """
-    logger.info(f"Calculating factor correlation matrix with {lookback_days} days lookback")
-
     try:
         # ISSUE #5 FIX: Load config to get correlation bounds
         if config is None:
-            config = load_stress_scenarios()
+            from app.calculations.stress_scenario_registry import stress_scenario_registry
+            config = stress_scenario_registry.config()
 
         # Read correlation bounds from configuration
         bounds = config.get('configuration', {})
         min_corr = bounds.get('min_factor_correlation', -0.95)
         max_corr = bounds.get('max_factor_correlation', 0.95)
-        logger.info(f"Using correlation bounds from config: [{min_corr}, {max_corr}]")
         # Define calculation period
-        end_date = date.today()
+        end_date = as_of_date or date.today()
+
+        key = (end_date, lookback_days, float(decay_factor), float(min_corr), float(max_corr))
+        cached = _factor_correlation_memo.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        logger.info(f"Calculating factor correlation matrix with {lookback_days} days lookback")
+        logger.info(f"Using correlation bounds from config: [{min_corr}, {max_corr}]")
         start_date = end_date - timedelta(days=lookback_days + 30)  # Buffer for trading days
         
         # Fetch factor returns
@@ -86,58 +184,21 @@ async def calculate_factor_correlation_matrix(
         if len(factor_returns) < 60:  # Minimum 60 days for meaningful correlation
             logger.warning(f"Limited data for correlation: {len(factor_returns)} days")
         
-        # Calculate exponentially weighted correlation matrix
-        correlation_matrix = {}
+        # Exponentially weighted correlations (more recent data gets higher weight)
         factor_names = factor_returns.columns.tolist()
-        
-        # Apply exponential decay weights (more recent data gets higher weight)
-        weights = np.array([decay_factor ** i for i in range(len(factor_returns))])
-        weights = weights[::-1]  # Reverse so recent data has higher weight
-        weights = weights / weights.sum()  # Normalize weights
-        
-        # Calculate weighted correlation matrix
-        for i, factor1 in enumerate(factor_names):
-            correlation_matrix[factor1] = {}
-            for j, factor2 in enumerate(factor_names):
-                if factor1 == factor2:
-                    correlation_matrix[factor1][factor2] = 1.0
-                else:
-                    # Calculate weighted correlation
-                    data1 = factor_returns[factor1].values
-                    data2 = factor_returns[factor2].values
-                    
-                    # Remove any NaN values
-                    mask = ~(np.isnan(data1) | np.isnan(data2))
-                    data1_clean = data1[mask]
-                    data2_clean = data2[mask]
-                    weights_clean = weights[mask]
-                    
-                    if len(data1_clean) < 30:  # Minimum data for correlation
-                        correlation_matrix[factor1][factor2] = 0.0
-                        continue
-                    
-                    # Weighted covariance and correlation
-                    mean1 = np.average(data1_clean, weights=weights_clean)
-                    mean2 = np.average(data2_clean, weights=weights_clean)
-                    
-                    cov = np.average((data1_clean - mean1) * (data2_clean - mean2), weights=weights_clean)
-                    var1 = np.average((data1_clean - mean1) ** 2, weights=weights_clean)
-                    var2 = np.average((data2_clean - mean2) ** 2, weights=weights_clean)
-                    
-                    if var1 > 0 and var2 > 0:
-                        correlation = cov / (np.sqrt(var1) * np.sqrt(var2))
-                        # ISSUE #5 FIX: Apply correlation bounds from config (not hardcoded)
-                        correlation = max(min_corr, min(max_corr, correlation))
-                        correlation_matrix[factor1][factor2] = float(correlation)
-                    else:
-                        correlation_matrix[factor1][factor2] = 0.0
+        correlations = weighted_correlation_matrix(factor_returns.to_numpy(dtype=float), decay_factor)
+
+        # ISSUE #5 FIX: Apply correlation bounds from config (not hardcoded)
+        off_diagonal = ~np.eye(len(factor_names), dtype=bool)
+        correlations[off_diagonal] = np.clip(correlations[off_diagonal], min_corr, max_corr)
+
+        correlation_matrix = {
+            factor1: {factor2: float(correlations[i, j]) for j, factor2 in enumerate(factor_names)}
+            for i, factor1 in enumerate(factor_names)
+        }
         
         # Calculate matrix statistics
-        correlations_flat = []
-        for factor1 in factor_names:
-            for factor2 in factor_names:
-                if factor1 != factor2:
-                    correlations_flat.append(correlation_matrix[factor1][factor2])
+        correlations_flat = correlations[off_diagonal]
         
         results = {
             'correlation_matrix': correlation_matrix,
@@ -156,8 +217,9 @@ async def calculate_factor_correlation_matrix(
         
         logger.info(f"Factor correlation matrix calculated: {len(factor_names)} factors, "
                    f"mean correlation: {results['matrix_stats']['mean_correlation']:.3f}")
-        
-        return results
+
+        _factor_correlation_memo[key] = results
+        return copy.deepcopy(results)
         
     except Exception as e:
         logger.error(f"Error calculating factor correlation matrix: {str(e)}")
@@ -167,37 +229,33 @@ async def calculate_factor_correlation_matrix(
 def load_stress_scenarios(config_path: Optional[Path] = None) -> Dict[str, Any]:
     """
     Load stress scenario definitions from JSON configuration file
-    
+
+    The built-in file is served from stress_scenario_registry (parsed and
+    validated once, reloaded when the file changes); callers get their own
+    copy. Other paths are read and validated on every call.
+
     Args:
         config_path: Path to JSON configuration file (defaults to built-in scenarios)
         
     Returns:
         Dictionary containing parsed stress scenario definitions
     """
-    if config_path is None:
-        config_path = DEFAULT_CONFIG_PATH
-    
+    from app.calculations.stress_scenario_registry import (
+        stress_scenario_registry,
+        validate_stress_scenario_config,
+    )
+
+    if config_path is None or Path(config_path) == stress_scenario_registry.config_path:
+        return copy.deepcopy(stress_scenario_registry.config())
+
     logger.info(f"Loading stress scenarios from {config_path}")
     
     try:
         with open(config_path, 'r') as f:
             config = json.load(f)
         
-        # Validate configuration structure
-        required_keys = ['stress_scenarios', 'configuration', 'factor_mappings']
-        for key in required_keys:
-            if key not in config:
-                raise ValueError(f"Missing required configuration key: {key}")
-        
-        # Count active scenarios
-        total_scenarios = 0
-        active_scenarios = 0
-        
-        for category, scenarios in config['stress_scenarios'].items():
-            for scenario_id, scenario in scenarios.items():
-                total_scenarios += 1
-                if scenario.get('active', True):
-                    active_scenarios += 1
+        # Validate configuration structure and scenario shocks
+        active_scenarios, total_scenarios = validate_stress_scenario_config(config)
         
         logger.info(f"Loaded {active_scenarios}/{total_scenarios} active stress scenarios")
         
@@ -260,7 +318,7 @@ async def calculate_direct_stress_impact(
                 )
             )
             .order_by(FactorExposure.calculation_date.desc())
-            .limit(50)  # Get recent exposures
+            .limit(STRESS_EXPOSURE_ROW_LIMIT)  # Get recent exposures
         )
 
         result = await db.execute(stmt)
@@ -279,13 +337,6 @@ async def calculate_direct_stress_impact(
                     'calculation_date': exposure.calculation_date
                 }
         
-        # Factor name mapping (scenario names -> database factor names)
-        FACTOR_NAME_MAP = {
-            'Market': 'Market Beta (90D)',
-            'Interest_Rate': 'IR Beta',
-            # Add other mappings as needed
-        }
-        
         # Calculate direct impact for each shocked factor
         shocked_factors = scenario_config.get('shocked_factors', {})
         direct_impacts = {}
@@ -326,7 +377,7 @@ async def calculate_direct_stress_impact(
             if factor_name == 'Interest_Rate':
                 continue
             # Map factor name if needed
-            mapped_factor_name = FACTOR_NAME_MAP.get(factor_name, factor_name)
+            mapped_factor_name = DIRECT_FACTOR_NAME_MAP.get(factor_name, factor_name)
             if mapped_factor_name in latest_exposures:
                 exposure_dollar = latest_exposures[mapped_factor_name]['exposure_dollar']
                 exposure_value = latest_exposures[mapped_factor_name]['exposure_value']  # Beta
@@ -460,7 +511,7 @@ async def calculate_correlated_stress_impact(
                 )
             )
             .order_by(FactorExposure.calculation_date.desc())
-            .limit(50)
+            .limit(STRESS_EXPOSURE_ROW_LIMIT)
         )
 
         result = await db.execute(stmt)
@@ -509,22 +560,14 @@ async def calculate_correlated_stress_impact(
             }
             total_correlated_pnl += ir_impact['predicted_pnl']
 
-        # BUGFIX: Map database factor names to correlation matrix names
-        # The correlation matrix uses ETF-based names like 'Market', 'Growth', etc.
-        # But database stores factors as 'Market Beta', 'Growth-Value Spread', etc.
-        REVERSE_FACTOR_MAP = {
-            'Market Beta': 'Market',
-            'Interest Rate Beta': 'Interest_Rate',
-            # Spread factors don't have direct ETF proxies, will be skipped in correlation lookup
-        }
-
         # For each equity factor in the portfolio, calculate its correlated response
         for factor_name, exposure_data in latest_exposures.items():
             factor_impact = 0.0
             impact_breakdown = {}
 
             # Map database factor name to correlation matrix name for lookups
-            corr_factor_name = REVERSE_FACTOR_MAP.get(factor_name, factor_name)
+            # BUGFIX: database stores factors as 'Market Beta', 'Growth-Value Spread', etc.
+            corr_factor_name = CORRELATION_FACTOR_NAME_MAP.get(factor_name, factor_name)
 
             # Calculate impact from each shocked factor via correlation
             for shocked_factor, shock_amount in shocked_factors.items():
@@ -645,6 +688,10 @@ async def run_comprehensive_stress_test(
 ) -> Dict[str, Any]:
     """
     Run comprehensive stress test for all scenarios
+
+    Single-portfolio call of the matrix engine
+    (app.calculations.stress_matrix.run_stress_tests_for_portfolios), with
+    per-shocked-factor correlated breakdowns included.
     
     Args:
         db: Database session
@@ -656,171 +703,30 @@ async def run_comprehensive_stress_test(
     Returns:
         Dictionary containing complete stress test results
     """
+    from app.calculations.stress_matrix import run_stress_tests_for_portfolios
+
     logger.info(f"Running comprehensive stress test for portfolio {portfolio_id}")
     
     try:
-        # Load stress scenarios
-        config = load_stress_scenarios(config_path)
-        
-        # Calculate factor correlation matrix
-        correlation_data = await calculate_factor_correlation_matrix(db)
-        correlation_matrix = correlation_data['correlation_matrix']
-        
-        # Get portfolio information
-        stmt = select(Portfolio).where(Portfolio.id == portfolio_id)
-        result = await db.execute(stmt)
-        portfolio = result.scalar_one_or_none()
-
-        if not portfolio:
-            raise ValueError(f"Portfolio {portfolio_id} not found")
-
-        # Phase 8.1 Task 8: Check for factor exposures early to avoid trying every scenario
-        factor_check_stmt = select(FactorExposure).where(
-            and_(
-                FactorExposure.portfolio_id == portfolio_id,
-                FactorExposure.calculation_date <= calculation_date
-            )
-        ).limit(1)
-        factor_check_result = await db.execute(factor_check_stmt)
-        has_factor_exposures = factor_check_result.scalar_one_or_none() is not None
+        engine_result = await run_stress_tests_for_portfolios(
+            db,
+            [portfolio_id],
+            calculation_date,
+            scenario_filter=scenario_filter,
+            config_path=config_path,
+            include_breakdown=True
+        )
+        if portfolio_id in engine_result['errors']:
+            raise ValueError(engine_result['errors'][portfolio_id])
 
-        if not has_factor_exposures:
-            logger.warning(
-                f"No factor exposures found for portfolio {portfolio_id}. "
-                "Skipping stress test (likely all PRIVATE positions). Returning skip payload."
+        final_results = engine_result['results'][portfolio_id]
+        stress_results = final_results['stress_test_results']
+        if not stress_results.get('skipped'):
+            logger.info(
+                f"Comprehensive stress test completed: {stress_results['scenarios_tested']}/"
+                f"{final_results['config_metadata']['scenarios_available']} scenarios, "
+                f"worst case: ${stress_results['summary_stats'].get('worst_case_pnl', 0):,.0f}"
             )
-            # CODE REVIEW FIX: Include ALL required fields to match ComprehensiveStressTestResponse contract
-            return {
-                'portfolio_id': str(portfolio_id),
-                'portfolio_name': portfolio.name,  # REQUIRED by schema
-                'calculation_date': calculation_date,
-                'correlation_matrix_info': {  # REQUIRED by schema
-                    'calculation_date': calculation_date.isoformat() if hasattr(calculation_date, 'isoformat') else str(calculation_date),
-                    'data_days': 0,
-                    'mean_correlation': 0.0
-                },
-                'stress_test_results': {
-                    'skipped': True,  # CRITICAL: Task 9 will detect this flag
-                    'reason': 'no_factor_exposures',
-                    'message': 'Portfolio has no factor exposures (likely all PRIVATE positions)',
-                    'direct_impacts': {},
-                    'correlated_impacts': {},
-                    'summary_stats': {},  # Empty but present (required)
-                    'scenarios_tested': 0,
-                    'scenarios_skipped': 0
-                },
-                'config_metadata': {
-                    'scenarios_available': 0,
-                    'scenarios_tested': 0,
-                    'scenarios_skipped': 0,
-                    'categories_tested': 0
-                }
-            }
-
-        # Run stress tests for all active scenarios
-        stress_results = {
-            'direct_impacts': {},
-            'correlated_impacts': {},
-            'summary_stats': {},
-            'scenarios_tested': 0,
-            'scenarios_skipped': 0
-        }
-        
-        total_scenarios = 0
-        processed_scenarios = 0
-        
-        for category, scenarios in config['stress_scenarios'].items():
-            # Apply scenario filter if provided
-            if scenario_filter and category not in scenario_filter:
-                continue
-                
-            stress_results['direct_impacts'][category] = {}
-            stress_results['correlated_impacts'][category] = {}
-            
-            for scenario_id, scenario_config in scenarios.items():
-                total_scenarios += 1
-                
-                # Skip inactive scenarios
-                if not scenario_config.get('active', True):
-                    stress_results['scenarios_skipped'] += 1
-                    continue
-                
-                try:
-                    # Add scenario ID to config for tracking
-                    scenario_config['id'] = scenario_id
-                    
-                    # Calculate direct impact
-                    direct_result = await calculate_direct_stress_impact(
-                        db=db,
-                        portfolio_id=portfolio_id,
-                        scenario_config=scenario_config,
-                        calculation_date=calculation_date
-                    )
-                    stress_results['direct_impacts'][category][scenario_id] = direct_result
-                    
-                    # Calculate correlated impact
-                    correlated_result = await calculate_correlated_stress_impact(
-                        db=db,
-                        portfolio_id=portfolio_id,
-                        scenario_config=scenario_config,
-                        correlation_matrix=correlation_matrix,
-                        calculation_date=calculation_date
-                    )
-                    stress_results['correlated_impacts'][category][scenario_id] = correlated_result
-                    
-                    processed_scenarios += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing scenario {scenario_id}: {str(e)}")
-                    stress_results['scenarios_skipped'] += 1
-        
-        stress_results['scenarios_tested'] = processed_scenarios
-        
-        # Calculate summary statistics
-        all_direct_pnls = []
-        all_correlated_pnls = []
-        
-        for category in stress_results['direct_impacts']:
-            for scenario_id in stress_results['direct_impacts'][category]:
-                direct_pnl = stress_results['direct_impacts'][category][scenario_id]['total_direct_pnl']
-                correlated_pnl = stress_results['correlated_impacts'][category][scenario_id]['correlated_pnl']
-                
-                all_direct_pnls.append(direct_pnl)
-                all_correlated_pnls.append(correlated_pnl)
-        
-        if all_correlated_pnls:
-            stress_results['summary_stats'] = {
-                'worst_case_pnl': float(min(all_correlated_pnls)),
-                'best_case_pnl': float(max(all_correlated_pnls)),
-                'mean_pnl': float(np.mean(all_correlated_pnls)),
-                'median_pnl': float(np.median(all_correlated_pnls)),
-                'pnl_std': float(np.std(all_correlated_pnls)),
-                'mean_correlation_effect': float(np.mean([c - d for c, d in zip(all_correlated_pnls, all_direct_pnls)])),
-                'scenarios_negative': len([pnl for pnl in all_correlated_pnls if pnl < 0]),
-                'scenarios_positive': len([pnl for pnl in all_correlated_pnls if pnl > 0])
-            }
-        
-        # Compile final results
-        final_results = {
-            'portfolio_id': str(portfolio_id),
-            'portfolio_name': portfolio.name,
-            'calculation_date': calculation_date,
-            'correlation_matrix_info': {
-                'calculation_date': correlation_data['calculation_date'],
-                'data_days': correlation_data['data_days'],
-                'mean_correlation': correlation_data['matrix_stats']['mean_correlation']
-            },
-            'stress_test_results': stress_results,
-            'config_metadata': {
-                'scenarios_available': total_scenarios,
-                'scenarios_tested': processed_scenarios,
-                'scenarios_skipped': stress_results['scenarios_skipped'],
-                'categories_tested': len([cat for cat in stress_results['direct_impacts'] if stress_results['direct_impacts'][cat]])
-            }
-        }
-        
-        logger.info(f"Comprehensive stress test completed: {processed_scenarios}/{total_scenarios} scenarios, "
-                   f"worst case: ${stress_results['summary_stats'].get('worst_case_pnl', 0):,.0f}")
         
         return final_results
         
@@ -845,102 +751,135 @@ async def save_stress_test_results(
     Returns:
         Number of results saved
     """
-    from decimal import Decimal
-    
     logger.info(f"Saving stress test results for portfolio {portfolio_id}")
+    saved = await save_all_stress_test_results(db, {portfolio_id: stress_test_results})
+    return saved.get(portfolio_id, 0)
 
-    try:
-        saved_count = 0
-        calculation_date = stress_test_results['calculation_date']
 
+def _stress_result_rows(
+    portfolio_id: UUID,
+    stress_test_results: Dict[str, Any],
+    scenario_map: Dict[str, UUID]
+) -> List[Dict[str, Any]]:
+    """stress_test_results rows for one portfolio's results."""
+    calculation_date = stress_test_results['calculation_date']
+    correlation_info = stress_test_results.get('correlation_matrix_info', {})
+    stress_data = stress_test_results.get('stress_test_results', {})
+    direct_impacts = stress_data.get('direct_impacts', {})
+    correlated_impacts = stress_data.get('correlated_impacts', {})
+
+    rows = []
+    for category in direct_impacts:
+        for scenario_id in direct_impacts[category]:
+            # Get scenario UUID from database
+            scenario_uuid = scenario_map.get(scenario_id)
+            if not scenario_uuid:
+                logger.warning(f"Scenario {scenario_id} not found in database, skipping")
+                continue
+
+            # Get direct and correlated results
+            direct_result = direct_impacts[category][scenario_id]
+            correlated_result = correlated_impacts[category][scenario_id]
+
+            # Extract P&L values
+            direct_pnl = Decimal(str(direct_result['total_direct_pnl']))
+            correlated_pnl = Decimal(str(correlated_result['correlated_pnl']))
+            correlation_effect = correlated_pnl - direct_pnl
+
+            # Prepare factor impacts data
+            factor_impacts = {}
+            for factor_name, impact_data in direct_result['factor_impacts'].items():
+                factor_impacts[factor_name] = {
+                    'shock_pct': impact_data.get('shock_amount', 0) * 100,  # Convert to percentage
+                    'direct_pnl': float(impact_data.get('factor_pnl', 0)),
+                    'exposure': float(impact_data.get('exposure_dollar', 0))
+                }
+
+            # Add correlation impacts
+            if 'factor_correlation_impacts' in correlated_result:
+                for factor_pair, impact in correlated_result['factor_correlation_impacts'].items():
+                    factor_impacts[f"correlation_{factor_pair}"] = float(impact)
+
+            rows.append({
+                'portfolio_id': portfolio_id,
+                'scenario_id': scenario_uuid,
+                'calculation_date': calculation_date,
+                'direct_pnl': direct_pnl,
+                'correlated_pnl': correlated_pnl,
+                'correlation_effect': correlation_effect,
+                'factor_impacts': factor_impacts,
+                'calculation_metadata': {
+                    'scenario_name': direct_result.get('scenario_name', scenario_id),
+                    'category': category,
+                    'correlation_matrix_date': str(correlation_info.get('calculation_date', '')),
+                    'data_days': correlation_info.get('data_days')
+                },
+            })
+    return rows
+
+
+async def save_all_stress_test_results(
+    db: AsyncSession,
+    results_by_portfolio: Dict[UUID, Dict[str, Any]]
+) -> Dict[UUID, int]:
+    """
+    Save stress test results for many portfolios in one transaction
+
+    Replaces each portfolio's existing results for its calculation date
+    (one DELETE per date) and inserts all rows in chunked multi-row INSERTs.
+
+    Args:
+        db: Database session
+        results_by_portfolio: {portfolio_id: run_comprehensive_stress_test() result}
+
+    Returns:
+        {portfolio_id: number of results saved}
+    """
+    try:
         # First, get all scenario IDs from database
-        stmt = select(StressTestScenario)
+        stmt = select(StressTestScenario.scenario_id, StressTestScenario.id)
         result = await db.execute(stmt)
-        scenarios = result.scalars().all()
-        scenario_map = {s.scenario_id: s.id for s in scenarios}
+        scenario_map = {scenario_id: uuid for scenario_id, uuid in result.all()}
 
         if not scenario_map:
             logger.warning(
                 "No stress test scenarios found in database. "
                 "Run 'uv run python scripts/database/seed_stress_scenarios.py' to populate scenarios."
             )
-            return 0
+            return {}
 
         logger.info(f"Found {len(scenario_map)} scenarios in database for result persistence")
 
-        # Delete existing results for this portfolio and date to avoid duplicates
-        from sqlalchemy import delete
-        delete_stmt = delete(StressTestResult).where(
-            and_(
-                StressTestResult.portfolio_id == portfolio_id,
-                StressTestResult.calculation_date == calculation_date
-            )
-        )
-        await db.execute(delete_stmt)
-
-        # Process all test results
-        stress_data = stress_test_results.get('stress_test_results', {})
-        direct_impacts = stress_data.get('direct_impacts', {})
-        correlated_impacts = stress_data.get('correlated_impacts', {})
-
-        for category in direct_impacts:
-            for scenario_id in direct_impacts[category]:
-                # Get scenario UUID from database
-                scenario_uuid = scenario_map.get(scenario_id)
-                if not scenario_uuid:
-                    logger.warning(f"Scenario {scenario_id} not found in database, skipping")
-                    continue
-                
-                # Get direct and correlated results
-                direct_result = direct_impacts[category][scenario_id]
-                correlated_result = correlated_impacts[category][scenario_id]
-                
-                # Extract P&L values
-                direct_pnl = Decimal(str(direct_result['total_direct_pnl']))
-                correlated_pnl = Decimal(str(correlated_result['correlated_pnl']))
-                correlation_effect = correlated_pnl - direct_pnl
-                
-                # Prepare factor impacts data
-                factor_impacts = {}
-                for factor_name, impact_data in direct_result['factor_impacts'].items():
-                    factor_impacts[factor_name] = {
-                        'shock_pct': impact_data.get('shock_amount', 0) * 100,  # Convert to percentage
-                        'direct_pnl': float(impact_data.get('factor_pnl', 0)),
-                        'exposure': float(impact_data.get('exposure_dollar', 0))
-                    }
-                
-                # Add correlation impacts
-                if 'factor_correlation_impacts' in correlated_result:
-                    for factor_pair, impact in correlated_result['factor_correlation_impacts'].items():
-                        factor_impacts[f"correlation_{factor_pair}"] = float(impact)
-                
-                # Create result record
-                stress_result = StressTestResult(
-                    portfolio_id=portfolio_id,
-                    scenario_id=scenario_uuid,
-                    calculation_date=calculation_date,
-                    direct_pnl=direct_pnl,
-                    correlated_pnl=correlated_pnl,
-                    correlation_effect=correlation_effect,
-                    factor_impacts=factor_impacts,
-                    calculation_metadata={
-                        'scenario_name': direct_result.get('scenario_name', scenario_id),
-                        'category': category,
-                        'correlation_matrix_date': str(stress_test_results.get('correlation_matrix_info', {}).get('calculation_date', '')),
-                        'data_days': stress_test_results.get('correlation_matrix_info', {}).get('data_days')
-                    }
+        saved_counts: Dict[UUID, int] = {}
+        rows: List[Dict[str, Any]] = []
+        portfolios_by_date: Dict[date, List[UUID]] = {}
+        for portfolio_id, stress_test_results in results_by_portfolio.items():
+            portfolio_rows = _stress_result_rows(portfolio_id, stress_test_results, scenario_map)
+            saved_counts[portfolio_id] = len(portfolio_rows)
+            rows.extend(portfolio_rows)
+            portfolios_by_date.setdefault(stress_test_results['calculation_date'], []).append(portfolio_id)
+
+        # Delete existing results for these portfolios and dates to avoid duplicates
+        for calculation_date, portfolio_ids in portfolios_by_date.items():
+            await db.execute(
+                delete(StressTestResult).where(
+                    and_(
+                        StressTestResult.portfolio_id.in_(portfolio_ids),
+                        StressTestResult.calculation_date == calculation_date
+                    )
                 )
-                
-                db.add(stress_result)
-                saved_count += 1
-        
+            )
+
+        for i in range(0, len(rows), STRESS_RESULT_INSERT_CHUNK_ROWS):
+            await db.execute(insert(StressTestResult).values(rows[i:i + STRESS_RESULT_INSERT_CHUNK_ROWS]))
+
         # Commit all results
         await db.commit()
-        
-        logger.info(f"Saved {saved_count} stress test results to database")
-        return saved_count
-        
+
+        logger.info(f"Saved {len(rows)} stress test results for {len(results_by_portfolio)} portfolios")
+        return saved_counts
+
     except Exception as e:
         logger.error(f"Error saving stress test results: {str(e)}")
         await db.rollback()
-        raise
\ No newline at end of file
+        raise
@@ -8,9 +8,8 @@ same regardless of which portfolio holds it.
 Architecture:
 1. Get all unique symbols from positions table
 2. Check which symbols need calculation (not cached for today)
-3. Batch symbols into groups (safe parallelization pattern)
-4. Process batches in parallel (each batch = isolated session)
-5. Store results in symbol_factor_exposures table
+3. Solve each factor family for all symbols in one batched regression
+4. Bulk upsert results into symbol_factor_exposures (SymbolFactorBulkWriter)
 
 Benefits:
 - Calculate each symbol ONCE per day (not once per position)
@@ -21,9 +20,9 @@ Benefits:
 Created: 2025-12-20
 Part of Symbol Factor Universe Architecture (Phase 2)
 """
-import asyncio
 import sys
-from datetime import date, datetime, timedelta
+import time
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Dict, List, Optional, Any, Set
 from uuid import UUID, uuid4
@@ -34,22 +33,34 @@ from sqlalchemy import select, and_, func, distinct
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.config import settings
 from app.database import AsyncSessionLocal
 from app.models.positions import Position
 from app.models.market_data import FactorDefinition
 from app.models.symbol_analytics import SymbolUniverse, SymbolFactorExposure
-from app.calculations.market_data import get_returns
+from app.calculations.market_data import (
+    fetch_historical_prices,
+    get_returns,
+    get_returns_matrix,
+)
+from app.calculations.factor_returns import get_factor_returns, refresh_factor_returns
 from app.calculations.factors_ridge import (
     calculate_single_position_ridge_betas,
+    calculate_batch_ridge_betas,
+    calculate_rolling_ridge_betas,
+    select_ridge_alpha,
     RIDGE_STYLE_FACTORS,
     EXPECTED_RIDGE_FACTOR_COUNT,
 )
 from app.calculations.factors_spread import (
     calculate_single_position_spread_betas,
+    calculate_batch_spread_betas,
+    calculate_rolling_spread_betas,
     fetch_spread_returns,
     EXPECTED_SPREAD_FACTOR_COUNT,
 )
 from app.constants.factors import (
+    SPREAD_FACTORS,
     REGRESSION_WINDOW_DAYS,
     SPREAD_REGRESSION_WINDOW_DAYS,
     MIN_REGRESSION_DAYS,
@@ -57,8 +68,13 @@ from app.constants.factors import (
     QUALITY_FLAG_FULL_HISTORY,
     QUALITY_FLAG_LIMITED_HISTORY,
 )
-from app.calculations.regression_utils import run_single_factor_regression
+from app.calculations.regression_utils import (
+    run_single_factor_regression,
+    run_batch_single_factor_regression,
+)
+from app.calculations.regression_executor import map_symbol_chunks
 from app.core.logging import get_logger
+from app.utils.trading_calendar import trading_calendar
 
 logger = get_logger(__name__)
 
@@ -67,6 +83,8 @@ logger = get_logger(__name__)
 # Higher batch sizes reduce session overhead, higher concurrency speeds processing
 BATCH_SIZE = 50  # Symbols per batch (was 15, increased for full universe)
 MAX_CONCURRENT_BATCHES = 8  # Concurrent DB connections (was 5, safe for Railway)
+RETURNS_FETCH_CHUNK_SIZE = 500  # Symbols per price query when no PriceCache is available
+BULK_UPSERT_CHUNK_ROWS = 2000  # Rows per INSERT ... ON CONFLICT (12 params/row, asyncpg max 32767)
 DEFAULT_REGULARIZATION_ALPHA = 1.0
 
 # OLS Beta factors (simple single-factor regressions)
@@ -782,6 +800,142 @@ async def store_symbol_provider_beta(
     }
 
 
+class SymbolFactorBulkWriter:
+    """
+    Accumulates symbol_factor_exposures rows and writes them with large
+    multi-row INSERT ... ON CONFLICT DO UPDATE statements.
+
+    Rows are keyed by (symbol, factor_id, calculation_date); re-adding a key
+    replaces the pending row, since Postgres rejects an upsert statement that
+    touches the same conflict key twice. flush() writes all pending rows on a
+    single session (one statement + commit per chunk of chunk_size rows) and
+    accumulates throughput stats across flushes for the phase result.
+    """
+
+    def __init__(self, chunk_size: int = BULK_UPSERT_CHUNK_ROWS):
+        self.chunk_size = chunk_size
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.statements = 0
+        self.elapsed_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        symbol: str,
+        factor_betas: Dict[str, float],
+        calculation_date: date,
+        factor_name_to_id: Dict[str, UUID],
+        calculation_method: str,
+        r_squared: Optional[float] = None,
+        observations: Optional[int] = None,
+        quality_flag: Optional[str] = None,
+        regularization_alpha: Optional[float] = None,
+        regression_window_days: Optional[int] = None
+    ) -> int:
+        """
+        Stage one symbol's factor betas (same arguments and value conversion
+        as persist_symbol_factors, minus the session).
+
+        Returns:
+            Number of rows staged
+        """
+        staged = 0
+        now = datetime.now(timezone.utc)
+
+        for factor_name, beta_value in factor_betas.items():
+            factor_id = factor_name_to_id.get(factor_name)
+            if factor_id is None:
+                logger.warning(f"Factor '{factor_name}' not found in factor definitions")
+                continue
+
+            self._pending[(symbol, factor_id, calculation_date)] = {
+                'id': uuid4(),
+                'symbol': symbol,
+                'factor_id': factor_id,
+                'calculation_date': calculation_date,
+                'beta_value': Decimal(str(beta_value)),
+                'r_squared': Decimal(str(r_squared)) if r_squared else None,
+                'observations': observations,
+                'quality_flag': quality_flag,
+                'calculation_method': calculation_method,
+                'regularization_alpha': Decimal(str(regularization_alpha)) if regularization_alpha else None,
+                'regression_window_days': regression_window_days,
+                'created_at': now,
+            }
+            staged += 1
+
+        return staged
+
+    async def flush(self, label: str = 'upsert') -> Dict[str, str]:
+        """
+        Write all pending rows.
+
+        A failing chunk is rolled back and logged; the remaining chunks are
+        still written.
+
+        Returns:
+            {symbol: error} for symbols with at least one row that failed to write
+        """
+        rows = list(self._pending.values())
+        self._pending.clear()
+        failed_symbols: Dict[str, str] = {}
+        if not rows:
+            return failed_symbols
+
+        chunks = [rows[i:i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)]
+        start = time.perf_counter()
+
+        async with AsyncSessionLocal() as db:
+            for i, chunk in enumerate(chunks):
+                stmt = pg_insert(SymbolFactorExposure).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['symbol', 'factor_id', 'calculation_date'],
+                    set_={
+                        'beta_value': stmt.excluded.beta_value,
+                        'r_squared': stmt.excluded.r_squared,
+                        'observations': stmt.excluded.observations,
+                        'quality_flag': stmt.excluded.quality_flag,
+                        'calculation_method': stmt.excluded.calculation_method,
+                        'regularization_alpha': stmt.excluded.regularization_alpha,
+                        'regression_window_days': stmt.excluded.regression_window_days,
+                    }
+                )
+                try:
+                    await db.execute(stmt)
+                    await db.commit()
+                    self.rows_written += len(chunk)
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"Bulk upsert chunk {i + 1}/{len(chunks)} failed: {e}")
+                    self.rows_failed += len(chunk)
+                    for row in chunk:
+                        failed_symbols.setdefault(row['symbol'], str(e))
+                self.statements += 1
+
+                print(f"  [{label.upper()}] Upsert {i + 1}/{len(chunks)} - {len(chunk)} rows")
+                sys.stdout.flush()
+
+        self.elapsed_seconds += time.perf_counter() - start
+        return failed_symbols
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput summary across all flushes."""
+        return {
+            'rows_written': self.rows_written,
+            'rows_failed': self.rows_failed,
+            'statements': self.statements,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'rows_per_second': (
+                round(self.rows_written / self.elapsed_seconds, 1)
+                if self.elapsed_seconds > 0 else 0.0
+            ),
+        }
+
+
 async def _load_factor_definitions(db: AsyncSession) -> Dict[str, UUID]:
     """Load factor name to ID mapping from database."""
     stmt = select(FactorDefinition.name, FactorDefinition.id)
@@ -789,6 +943,47 @@ async def _load_factor_definitions(db: AsyncSession) -> Dict[str, UUID]:
     return {row[0]: row[1] for row in result.fetchall()}
 
 
+def _solve_ols_betas(
+    symbol_returns: pd.DataFrame,
+    benchmark: pd.Series,
+    factor_name: str
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Solve every symbol-vs-benchmark OLS in one vectorized pass.
+
+    Pure numpy (no DB/session state), so it can run in the regression process
+    pool. symbol_returns must already be aligned to benchmark's dates.
+    """
+    Y = symbol_returns.to_numpy(dtype=np.float64)
+    regression = run_batch_single_factor_regression(
+        Y=Y,
+        X=benchmark.to_numpy(dtype=np.float64),
+        mask=np.isfinite(Y),
+        cap=BETA_CAP_LIMIT,
+        confidence=0.10
+    )
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for j, symbol in enumerate(symbol_returns.columns):
+        n_obs = int(regression['observations'][j])
+        beta = float(regression['beta'][j, 0])
+        r_squared = float(regression['r_squared'][j, 0])
+
+        if n_obs < MIN_REGRESSION_DAYS or not np.isfinite(beta):
+            results[symbol] = {'success': False}
+            continue
+
+        results[symbol] = {
+            'success': True,
+            'betas': {factor_name: beta},
+            'r_squared': r_squared if np.isfinite(r_squared) else None,
+            'observations': n_obs,
+            'quality_flag': QUALITY_FLAG_FULL_HISTORY,
+        }
+
+    return results
+
+
 async def _process_ols_beta_batches(
     symbols: List[str],
     benchmark_returns: pd.Series,
@@ -796,19 +991,20 @@ async def _process_ols_beta_batches(
     factor_name_to_id: Dict[str, UUID],
     factor_name: str,
     calculation_method: str,
-    price_cache=None
+    writer: "SymbolFactorBulkWriter",
+    price_cache=None,
+    regression_workers: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Process OLS beta calculations in parallel batches with bulk upserts.
+    Calculate OLS betas for all symbols in one vectorized pass, then bulk upsert.
 
-    This replaces the sequential per-symbol processing with efficient batching:
-    1. Batch symbols into groups of BATCH_SIZE
-    2. Fetch all symbol returns for the batch at once
-    3. Calculate betas in-memory (vectorized)
-    4. Bulk upsert all results per batch
-    5. Single commit per batch
+    1. Fetch one returns matrix for all symbols (masked for missing data)
+    2. Run every symbol-vs-benchmark OLS at once (_solve_ols_betas, in the
+       regression process pool when configured)
+    3. Stage the results on the bulk writer and flush them
 
-    ~50x faster than sequential processing over network.
+    Each symbol is regressed on its own dates in common with the benchmark,
+    the same rows calculate_symbol_market_beta / calculate_symbol_ir_beta use.
 
     Args:
         symbols: List of symbols to calculate
@@ -817,143 +1013,44 @@ async def _process_ols_beta_batches(
         factor_name_to_id: Mapping of factor names to UUIDs
         factor_name: Factor name (e.g., 'Market Beta (90D)')
         calculation_method: Method string (e.g., 'ols_market')
+        writer: Bulk writer shared across the universe run
         price_cache: Optional PriceCache for fast lookups
+        regression_workers: Process-pool workers (None = settings.FACTOR_REGRESSION_WORKERS)
 
     Returns:
         Dict with success count, failed count, errors
     """
-    from datetime import timezone
-
-    # Batch symbols
-    batches = [
-        symbols[i:i + BATCH_SIZE]
-        for i in range(0, len(symbols), BATCH_SIZE)
-    ]
-
-    logger.info(f"Processing {len(symbols)} symbols in {len(batches)} batches for {factor_name}")
-
-    factor_id = factor_name_to_id.get(factor_name)
-    if factor_id is None:
+    if factor_name_to_id.get(factor_name) is None:
         logger.error(f"Factor '{factor_name}' not found in factor definitions")
         return {'success': 0, 'failed': len(symbols), 'errors': [f"Factor '{factor_name}' not found"]}
 
-    async def process_batch(batch_symbols: List[str]) -> Dict[str, Any]:
-        """Process a batch of symbols with bulk operations."""
-        batch_result = {'success': 0, 'failed': 0, 'errors': []}
-
-        async with AsyncSessionLocal() as batch_db:
-            # Fetch all symbol returns for this batch at once
-            start_date = calculation_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
-
-            returns_df = await get_returns(
-                db=batch_db,
-                symbols=batch_symbols,
-                start_date=start_date,
-                end_date=calculation_date,
-                align_dates=True,
-                price_cache=price_cache
-            )
-
-            # Prepare bulk insert records
-            records_to_upsert = []
-            now = datetime.now(timezone.utc)
-
-            for symbol in batch_symbols:
-                if symbol not in returns_df.columns:
-                    batch_result['failed'] += 1
-                    continue
-
-                symbol_returns = returns_df[symbol]
-
-                # Align with benchmark returns
-                common_dates = benchmark_returns.index.intersection(symbol_returns.index)
-                if len(common_dates) < MIN_REGRESSION_DAYS:
-                    batch_result['failed'] += 1
-                    continue
-
-                symbol_returns_aligned = symbol_returns.loc[common_dates]
-                benchmark_returns_aligned = benchmark_returns.loc[common_dates]
-
-                # Run OLS regression (fast in-memory calculation)
-                regression_result = run_single_factor_regression(
-                    y=symbol_returns_aligned.values,
-                    x=benchmark_returns_aligned.values,
-                    cap=BETA_CAP_LIMIT,
-                    confidence=0.10,
-                    return_diagnostics=True
-                )
-
-                quality_flag = (
-                    QUALITY_FLAG_FULL_HISTORY if len(common_dates) >= MIN_REGRESSION_DAYS
-                    else QUALITY_FLAG_LIMITED_HISTORY
-                )
-
-                records_to_upsert.append({
-                    'id': uuid4(),
-                    'symbol': symbol,
-                    'factor_id': factor_id,
-                    'calculation_date': calculation_date,
-                    'beta_value': Decimal(str(regression_result['beta'])),
-                    'r_squared': Decimal(str(regression_result['r_squared'])) if regression_result.get('r_squared') else None,
-                    'observations': len(common_dates),
-                    'quality_flag': quality_flag,
-                    'calculation_method': calculation_method,
-                    'regularization_alpha': None,
-                    'regression_window_days': REGRESSION_WINDOW_DAYS,
-                    'created_at': now,
-                })
-                batch_result['success'] += 1
-
-            # Bulk upsert all records at once
-            if records_to_upsert:
-                stmt = pg_insert(SymbolFactorExposure).values(records_to_upsert)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=['symbol', 'factor_id', 'calculation_date'],
-                    set_={
-                        'beta_value': stmt.excluded.beta_value,
-                        'r_squared': stmt.excluded.r_squared,
-                        'observations': stmt.excluded.observations,
-                        'quality_flag': stmt.excluded.quality_flag,
-                        'calculation_method': stmt.excluded.calculation_method,
-                    }
-                )
-                await batch_db.execute(stmt)
-
-            # Single commit per batch
-            await batch_db.commit()
-
-        return batch_result
-
-    # Process batches with limited concurrency
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
-    completed_batches = 0
-    total_batches = len(batches)
-
-    async def limited_process_batch(batch_idx: int, batch: List[str]) -> Dict[str, Any]:
-        nonlocal completed_batches
-        async with semaphore:
-            result = await process_batch(batch)
-            completed_batches += 1
-            pct = (completed_batches / total_batches) * 100
-            print(f"  [{calculation_method.upper()}] Batch {completed_batches}/{total_batches} ({pct:.0f}%) - {result['success']} ok, {result['failed']} fail")
-            sys.stdout.flush()
-            return result
+    # Step 1: One returns matrix for the whole universe
+    start_date = calculation_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
+    returns_df = await _fetch_universe_returns(symbols, start_date, calculation_date, price_cache)
 
-    batch_tasks = [limited_process_batch(i, batch) for i, batch in enumerate(batches)]
-    batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+    # Step 2: All OLS regressions at once (process pool when configured)
+    benchmark = benchmark_returns.dropna()
+    aligned = returns_df.reindex(index=benchmark.index, columns=symbols)
+    results = await map_symbol_chunks(
+        _solve_ols_betas, aligned, benchmark, factor_name, workers=regression_workers
+    )
 
-    # Aggregate results
-    aggregate = {'success': 0, 'failed': 0, 'errors': []}
-    for result in batch_results:
-        if isinstance(result, Exception):
-            logger.error(f"Batch failed with exception: {result}")
-            aggregate['errors'].append(str(result))
-        else:
-            aggregate['success'] += result['success']
-            aggregate['failed'] += result['failed']
-            aggregate['errors'].extend(result.get('errors', []))
+    logger.info(
+        f"Vectorized {factor_name}: "
+        f"{sum(1 for r in results.values() if r['success'])}/{len(symbols)} calculated"
+    )
 
-    return aggregate
+    # Step 3: Bulk upsert
+    return await _write_symbol_results(
+        writer=writer,
+        results=results,
+        calculation_date=calculation_date,
+        factor_name_to_id=factor_name_to_id,
+        calculation_method=calculation_method,
+        regularization_alpha=None,
+        regression_window_days=REGRESSION_WINDOW_DAYS,
+        label=calculation_method
+    )
 
 
 async def _process_provider_beta_batches(
@@ -961,99 +1058,49 @@ async def _process_provider_beta_batches(
     provider_betas: Dict[str, float],
     calculation_date: date,
     factor_name_to_id: Dict[str, UUID],
+    writer: "SymbolFactorBulkWriter",
 ) -> Dict[str, Any]:
     """
-    Store Provider Betas in batches with bulk upserts.
+    Store Provider Betas with the bulk writer.
 
     Args:
         symbols: List of symbols to store
         provider_betas: Dict mapping symbol to provider beta value
         calculation_date: Calculation date
         factor_name_to_id: Mapping of factor names to UUIDs
+        writer: Bulk writer shared across the universe run
 
     Returns:
         Dict with success count, failed count, errors
     """
-    from datetime import timezone
-
-    # Filter to symbols with provider betas
-    symbols_with_betas = [s for s in symbols if s in provider_betas]
-
-    if not symbols_with_betas:
-        return {'success': 0, 'failed': len(symbols), 'errors': []}
-
-    # Batch symbols
-    batches = [
-        symbols_with_betas[i:i + BATCH_SIZE]
-        for i in range(0, len(symbols_with_betas), BATCH_SIZE)
-    ]
-
-    factor_id = factor_name_to_id.get(PROVIDER_BETA_FACTOR_NAME)
-    if factor_id is None:
+    if factor_name_to_id.get(PROVIDER_BETA_FACTOR_NAME) is None:
         logger.error(f"Factor '{PROVIDER_BETA_FACTOR_NAME}' not found")
         return {'success': 0, 'failed': len(symbols), 'errors': [f"Factor not found"]}
 
-    logger.info(f"Storing {len(symbols_with_betas)} provider betas in {len(batches)} batches")
-
-    async def process_batch(batch_symbols: List[str]) -> Dict[str, Any]:
-        """Process a batch with bulk upsert."""
-        batch_result = {'success': 0, 'failed': 0, 'errors': []}
-
-        async with AsyncSessionLocal() as batch_db:
-            now = datetime.now(timezone.utc)
-
-            records_to_upsert = []
-            for symbol in batch_symbols:
-                beta = provider_betas.get(symbol)
-                if beta is None:
-                    batch_result['failed'] += 1
-                    continue
-
-                records_to_upsert.append({
-                    'id': uuid4(),
-                    'symbol': symbol,
-                    'factor_id': factor_id,
-                    'calculation_date': calculation_date,
-                    'beta_value': Decimal(str(beta)),
-                    'r_squared': None,
-                    'observations': 252,  # Assume 1 year
-                    'quality_flag': QUALITY_FLAG_FULL_HISTORY,
-                    'calculation_method': 'provider',
-                    'regularization_alpha': None,
-                    'regression_window_days': 252,
-                    'created_at': now,
-                })
-                batch_result['success'] += 1
-
-            if records_to_upsert:
-                stmt = pg_insert(SymbolFactorExposure).values(records_to_upsert)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=['symbol', 'factor_id', 'calculation_date'],
-                    set_={
-                        'beta_value': stmt.excluded.beta_value,
-                        'observations': stmt.excluded.observations,
-                    }
-                )
-                await batch_db.execute(stmt)
-
-            await batch_db.commit()
-
-        return batch_result
-
-    # Process batches (no concurrency needed - just bulk inserts)
-    aggregate = {'success': 0, 'failed': 0, 'errors': []}
-    for i, batch in enumerate(batches):
-        result = await process_batch(batch)
-        aggregate['success'] += result['success']
-        aggregate['failed'] += result['failed']
-        pct = ((i + 1) / len(batches)) * 100
-        print(f"  [PROVIDER] Batch {i+1}/{len(batches)} ({pct:.0f}%) - {result['success']} ok")
-        sys.stdout.flush()
+    # Symbols without a provider beta count as failed (no error message)
+    results = {
+        symbol: {
+            'success': True,
+            'betas': {PROVIDER_BETA_FACTOR_NAME: provider_betas[symbol]},
+            'r_squared': None,  # No R² for provider beta
+            'observations': 252,  # Assume 1 year of data
+            'quality_flag': QUALITY_FLAG_FULL_HISTORY,
+        } if provider_betas.get(symbol) is not None else {'success': False}
+        for symbol in symbols
+    }
 
-    # Add symbols without provider betas to failed count
-    aggregate['failed'] += len(symbols) - len(symbols_with_betas)
+    logger.info(f"Storing {len(provider_betas)} provider betas")
 
-    return aggregate
+    return await _write_symbol_results(
+        writer=writer,
+        results=results,
+        calculation_date=calculation_date,
+        factor_name_to_id=factor_name_to_id,
+        calculation_method='provider',
+        regularization_alpha=None,
+        regression_window_days=252,  # 1 year
+        label='provider'
+    )
 
 
 async def calculate_universe_factors(
@@ -1066,12 +1113,16 @@ async def calculate_universe_factors(
     calculate_provider_beta: bool = True,
     price_cache=None,
     symbols: Optional[List[str]] = None,  # NEW: Override symbol list for scoped mode
+    regression_workers: Optional[int] = None,
+    backfill_start_date: Optional[date] = None,
+    tune_regularization_alpha: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """
-    Calculate factor betas for all symbols in the universe using parallel batches.
+    Calculate factor betas for all symbols in the universe.
 
     This is the main entry point for Phase 3 of batch processing.
-    Uses the safe parallelization pattern: each batch gets its own session.
+    Each factor family is solved in one batched regression; the results are
+    written by a shared SymbolFactorBulkWriter in multi-row upserts.
 
     Calculates 5 types of factors:
     1. Ridge factors (6 style factors): Value, Growth, Momentum, Quality, Size, Low Volatility
@@ -1091,6 +1142,16 @@ async def calculate_universe_factors(
         price_cache: Optional price cache
         symbols: Optional list of symbols to process. If provided, overrides
                  get_all_active_symbols() (used for single-portfolio scoped mode)
+        regression_workers: Process-pool workers for the regressions
+                 (None = settings.FACTOR_REGRESSION_WORKERS, 0 = inline)
+        backfill_start_date: If set, Ridge and Spread factors are also filled
+                 for every trading day from this date through calculation_date
+                 in one rolling pass (sufficient statistics slid across the
+                 dates instead of one full refit per date). Market, IR and
+                 Provider betas are still calculated for calculation_date only.
+        tune_regularization_alpha: Re-select the Ridge alpha for the universe by
+                 GCV on this run's returns (None = settings.RIDGE_ALPHA_AUTO_TUNE).
+                 The rolling backfill keeps regularization_alpha.
 
     Returns:
         Dict with:
@@ -1100,6 +1161,10 @@ async def calculate_universe_factors(
         - market_beta_results: Market Beta calculation summary
         - ir_beta_results: IR Beta calculation summary
         - provider_beta_results: Provider Beta summary
+        - factor_returns: factor_returns refresh summary (rows_written, date range)
+        - alpha_tuning: GCV error curve and chosen alpha (when tuned)
+        - backfill_dates: Dates filled by the rolling backfill (empty when not backfilling)
+        - persistence: Bulk write throughput (rows_written, statements, rows_per_second, ...)
         - errors: List of errors
     """
     logger.info(f"Starting universe factor calculation for {calculation_date}")
@@ -1112,8 +1177,24 @@ async def calculate_universe_factors(
         'market_beta_results': {'calculated': 0, 'cached': 0, 'failed': 0},
         'ir_beta_results': {'calculated': 0, 'cached': 0, 'failed': 0},
         'provider_beta_results': {'calculated': 0, 'cached': 0, 'failed': 0},
+        'factor_returns': {},
+        'alpha_tuning': None,
+        'backfill_dates': [],
+        'persistence': {},
         'errors': []
     }
+    writer = SymbolFactorBulkWriter()
+
+    backfill_dates: List[date] = []
+    if backfill_start_date is not None and backfill_start_date < calculation_date:
+        backfill_dates = sorted(set(
+            trading_calendar.get_trading_days_between(backfill_start_date, calculation_date)
+        ) | {calculation_date})
+        results['backfill_dates'] = [d.isoformat() for d in backfill_dates]
+        logger.info(
+            f"Rolling backfill: Ridge/Spread for {len(backfill_dates)} dates "
+            f"({backfill_dates[0]} to {calculation_date})"
+        )
 
     # Step 1: Get symbols to process
     # If symbols provided (scoped mode), use those; otherwise get all active symbols
@@ -1134,8 +1215,34 @@ async def calculate_universe_factors(
 
     results['symbols_processed'] = len(all_symbols)
 
+    # Step 1b: Persist factor ETF returns for this date (read by every step below
+    # and by portfolio-level consumers via get_factor_returns)
+    try:
+        async with AsyncSessionLocal() as db:
+            results['factor_returns'] = await refresh_factor_returns(db, calculation_date)
+    except Exception as e:
+        # Non-fatal: get_factor_returns() falls back to computing from prices
+        logger.error(f"Factor return refresh failed: {e}")
+        results['errors'].append(f"Factor return refresh failed: {e}")
+
     # Step 2: Calculate Ridge factors
-    if calculate_ridge:
+    if calculate_ridge and backfill_dates:
+        logger.info("Phase 0.5a: Rolling Ridge backfill for universe")
+        ridge_backfill = await _process_rolling_backfill(
+            calculation_method='ridge_regression',
+            symbols=all_symbols,
+            calculation_dates=backfill_dates,
+            factor_name_to_id=factor_name_to_id,
+            writer=writer,
+            regularization_alpha=regularization_alpha,
+            price_cache=price_cache,
+            regression_workers=regression_workers
+        )
+        results['ridge_results'] = {
+            key: ridge_backfill[key] for key in ('calculated', 'cached', 'failed')
+        }
+        results['errors'].extend(ridge_backfill['errors'])
+    elif calculate_ridge:
         logger.info("Phase 0.5a: Calculating Ridge factors for universe")
 
         # Check which symbols need calculation
@@ -1147,16 +1254,15 @@ async def calculate_universe_factors(
         results['ridge_results']['cached'] = len(all_symbols) - len(symbols_needing_ridge)
 
         if symbols_needing_ridge:
-            # Fetch factor ETF returns ONCE (shared across all batches)
+            # Fetch factor ETF returns ONCE (persisted factor_returns, shared across all batches)
             async with AsyncSessionLocal() as db:
                 start_date = calculation_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
                 factor_symbols = list(RIDGE_STYLE_FACTORS.values())
-                factor_returns = await get_returns(
+                factor_returns = await get_factor_returns(
                     db=db,
                     symbols=factor_symbols,
                     start_date=start_date,
                     end_date=calculation_date,
-                    align_dates=True,
                     price_cache=price_cache
                 )
 
@@ -1168,23 +1274,45 @@ async def calculate_universe_factors(
                 logger.error("No factor ETF returns available for Ridge")
                 results['errors'].append("No factor ETF returns available")
             else:
-                # Process in parallel batches
-                ridge_batch_results = await _process_batches(
+                # Solve the whole universe in one batched regression, bulk upsert
+                ridge_batch_results = await _process_ridge_universe(
                     symbols=symbols_needing_ridge,
                     calculation_date=calculation_date,
                     factor_name_to_id=factor_name_to_id,
                     factor_returns=factor_returns,
-                    calculation_method='ridge',
                     regularization_alpha=regularization_alpha,
-                    price_cache=price_cache
+                    writer=writer,
+                    price_cache=price_cache,
+                    regression_workers=regression_workers,
+                    tune_alpha=(
+                        settings.RIDGE_ALPHA_AUTO_TUNE if tune_regularization_alpha is None
+                        else tune_regularization_alpha
+                    )
                 )
 
+                results['alpha_tuning'] = ridge_batch_results['alpha_tuning']
+                results['ridge_results']['regularization_alpha'] = ridge_batch_results['regularization_alpha']
                 results['ridge_results']['calculated'] = ridge_batch_results['success']
                 results['ridge_results']['failed'] = ridge_batch_results['failed']
                 results['errors'].extend(ridge_batch_results['errors'])
 
     # Step 3: Calculate Spread factors
-    if calculate_spread:
+    if calculate_spread and backfill_dates:
+        logger.info("Phase 0.5b: Rolling Spread backfill for universe")
+        spread_backfill = await _process_rolling_backfill(
+            calculation_method='spread_regression',
+            symbols=all_symbols,
+            calculation_dates=backfill_dates,
+            factor_name_to_id=factor_name_to_id,
+            writer=writer,
+            price_cache=price_cache,
+            regression_workers=regression_workers
+        )
+        results['spread_results'] = {
+            key: spread_backfill[key] for key in ('calculated', 'cached', 'failed')
+        }
+        results['errors'].extend(spread_backfill['errors'])
+    elif calculate_spread:
         logger.info("Phase 0.5b: Calculating Spread factors for universe")
 
         # Check which symbols need calculation
@@ -1207,15 +1335,15 @@ async def calculate_universe_factors(
                 logger.error("No spread returns available")
                 results['errors'].append("No spread returns available")
             else:
-                # Process in parallel batches
-                spread_batch_results = await _process_batches(
+                # Vectorized OLS for every (symbol, spread) pair, bulk upsert
+                spread_batch_results = await _process_spread_universe(
                     symbols=symbols_needing_spread,
                     calculation_date=calculation_date,
                     factor_name_to_id=factor_name_to_id,
-                    factor_returns=spread_returns,
-                    calculation_method='spread',
-                    regularization_alpha=None,
-                    price_cache=price_cache
+                    spread_returns=spread_returns,
+                    writer=writer,
+                    price_cache=price_cache,
+                    regression_workers=regression_workers
                 )
 
                 results['spread_results']['calculated'] = spread_batch_results['success']
@@ -1235,15 +1363,14 @@ async def calculate_universe_factors(
         results['market_beta_results']['cached'] = len(all_symbols) - len(symbols_needing_market_beta)
 
         if symbols_needing_market_beta:
-            # Fetch SPY returns ONCE
+            # Fetch SPY returns ONCE (persisted factor_returns)
             async with AsyncSessionLocal() as db:
                 start_date = calculation_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
-                spy_returns_df = await get_returns(
+                spy_returns_df = await get_factor_returns(
                     db=db,
                     symbols=['SPY'],
                     start_date=start_date,
                     end_date=calculation_date,
-                    align_dates=True,
                     price_cache=price_cache
                 )
 
@@ -1253,7 +1380,7 @@ async def calculate_universe_factors(
             else:
                 spy_returns = spy_returns_df['SPY']
 
-                # Process symbols in batches (50x faster than sequential)
+                # Vectorized OLS for all symbols, bulk upsert
                 market_beta_results = await _process_ols_beta_batches(
                     symbols=symbols_needing_market_beta,
                     benchmark_returns=spy_returns,
@@ -1261,7 +1388,9 @@ async def calculate_universe_factors(
                     factor_name_to_id=factor_name_to_id,
                     factor_name=MARKET_BETA_FACTOR_NAME,
                     calculation_method='ols_market',
-                    price_cache=price_cache
+                    writer=writer,
+                    price_cache=price_cache,
+                    regression_workers=regression_workers
                 )
 
                 results['market_beta_results']['calculated'] = market_beta_results['success']
@@ -1281,15 +1410,14 @@ async def calculate_universe_factors(
         results['ir_beta_results']['cached'] = len(all_symbols) - len(symbols_needing_ir_beta)
 
         if symbols_needing_ir_beta:
-            # Fetch TLT returns ONCE
+            # Fetch TLT returns ONCE (persisted factor_returns)
             async with AsyncSessionLocal() as db:
                 start_date = calculation_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
-                tlt_returns_df = await get_returns(
+                tlt_returns_df = await get_factor_returns(
                     db=db,
                     symbols=['TLT'],
                     start_date=start_date,
                     end_date=calculation_date,
-                    align_dates=True,
                     price_cache=price_cache
                 )
 
@@ -1299,7 +1427,7 @@ async def calculate_universe_factors(
             else:
                 tlt_returns = tlt_returns_df['TLT']
 
-                # Process symbols in batches (50x faster than sequential)
+                # Vectorized OLS for all symbols, bulk upsert
                 ir_beta_results = await _process_ols_beta_batches(
                     symbols=symbols_needing_ir_beta,
                     benchmark_returns=tlt_returns,
@@ -1307,7 +1435,9 @@ async def calculate_universe_factors(
                     factor_name_to_id=factor_name_to_id,
                     factor_name=IR_BETA_FACTOR_NAME,
                     calculation_method='ols_ir',
-                    price_cache=price_cache
+                    writer=writer,
+                    price_cache=price_cache,
+                    regression_workers=regression_workers
                 )
 
                 results['ir_beta_results']['calculated'] = ir_beta_results['success']
@@ -1343,18 +1473,21 @@ async def calculate_universe_factors(
             if not provider_betas:
                 logger.warning("No provider betas found in company_profiles")
             else:
-                # Store provider betas in batches (bulk upsert)
+                # Store provider betas (bulk upsert)
                 provider_batch_results = await _process_provider_beta_batches(
                     symbols=symbols_needing_provider_beta,
                     provider_betas=provider_betas,
                     calculation_date=calculation_date,
                     factor_name_to_id=factor_name_to_id,
+                    writer=writer,
                 )
 
                 results['provider_beta_results']['calculated'] = provider_batch_results['success']
                 results['provider_beta_results']['failed'] = provider_batch_results['failed']
                 results['errors'].extend(provider_batch_results.get('errors', []))
 
+    results['persistence'] = writer.get_stats()
+
     # Log summary
     logger.info(
         f"Universe factor calculation complete: "
@@ -1363,108 +1496,416 @@ async def calculate_universe_factors(
         f"Spread: {results['spread_results']}, "
         f"Market Beta: {results['market_beta_results']}, "
         f"IR Beta: {results['ir_beta_results']}, "
-        f"Provider Beta: {results['provider_beta_results']}"
+        f"Provider Beta: {results['provider_beta_results']}, "
+        f"Persistence: {results['persistence']}"
     )
 
     return results
 
 
-async def _process_batches(
+async def _fetch_universe_returns(
+    symbols: List[str],
+    start_date: date,
+    end_date: date,
+    price_cache=None
+) -> pd.DataFrame:
+    """
+    Fetch a (dates x symbols) returns matrix for the universe.
+
+    With a PriceCache this is a single window slice; without one, prices are
+    queried in chunks of RETURNS_FETCH_CHUNK_SIZE symbols.
+    """
+    chunk_size = len(symbols) if price_cache else RETURNS_FETCH_CHUNK_SIZE
+    frames = []
+
+    async with AsyncSessionLocal() as db:
+        for i in range(0, len(symbols), max(chunk_size, 1)):
+            chunk = symbols[i:i + chunk_size]
+            chunk_returns = await get_returns_matrix(
+                db=db,
+                symbols=chunk,
+                start_date=start_date,
+                end_date=end_date,
+                price_cache=price_cache
+            )
+            if not chunk_returns.empty:
+                frames.append(chunk_returns)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1) if len(frames) > 1 else frames[0]
+
+
+async def _process_ridge_universe(
     symbols: List[str],
     calculation_date: date,
     factor_name_to_id: Dict[str, UUID],
     factor_returns: pd.DataFrame,
-    calculation_method: str,
-    regularization_alpha: Optional[float],
+    regularization_alpha: float,
+    writer: SymbolFactorBulkWriter,
+    price_cache=None,
+    regression_workers: Optional[int] = None,
+    tune_alpha: bool = False
+) -> Dict[str, Any]:
+    """
+    Calculate Ridge factors for all symbols with one batched regression.
+
+    1. Fetch one returns matrix for every symbol (masked for missing data)
+    2. Optionally re-select alpha for the universe by GCV (select_ridge_alpha)
+    3. Solve all Ridge regressions at once (calculate_batch_ridge_betas, in
+       the regression process pool when configured)
+    4. Bulk upsert successful results (SymbolFactorBulkWriter)
+
+    Returns the _write_symbol_results summary plus the alpha used and, when
+    tuned, the alpha_tuning curve.
+    """
+    start_date = calculation_date - timedelta(days=REGRESSION_WINDOW_DAYS + 30)
+    symbol_returns = await _fetch_universe_returns(
+        symbols, start_date, calculation_date, price_cache
+    )
+
+    alpha_tuning = None
+    if tune_alpha and not symbol_returns.empty:
+        selection = select_ridge_alpha(symbol_returns, factor_returns)
+        if selection['symbols_evaluated']:
+            regularization_alpha = selection['recommended_alpha']
+            alpha_tuning = {
+                key: selection[key]
+                for key in ('alphas', 'criterion', 'error_curve', 'recommended_alpha', 'symbols_evaluated')
+            }
+            logger.info(
+                f"Ridge alpha re-tuned by GCV over {selection['symbols_evaluated']} symbols: "
+                f"alpha={regularization_alpha}"
+            )
+
+    fits = await map_symbol_chunks(
+        calculate_batch_ridge_betas,
+        symbol_returns,
+        factor_returns,
+        regularization_alpha,
+        workers=regression_workers
+    ) if not symbol_returns.empty else {}
+
+    results = _ridge_symbol_results(symbols, fits)
+
+    solved = sum(1 for r in results.values() if r['success'])
+    logger.info(
+        f"Batched Ridge solved {solved}/{len(symbols)} symbols "
+        f"({len(symbol_returns)} return dates)"
+    )
+
+    summary = await _write_symbol_results(
+        writer=writer,
+        results=results,
+        calculation_date=calculation_date,
+        factor_name_to_id=factor_name_to_id,
+        calculation_method='ridge_regression',
+        regularization_alpha=regularization_alpha,
+        regression_window_days=REGRESSION_WINDOW_DAYS,
+        label='ridge'
+    )
+    summary['regularization_alpha'] = regularization_alpha
+    summary['alpha_tuning'] = alpha_tuning
+    return summary
+
+
+async def _process_spread_universe(
+    symbols: List[str],
+    calculation_date: date,
+    factor_name_to_id: Dict[str, UUID],
+    spread_returns: pd.DataFrame,
+    writer: SymbolFactorBulkWriter,
+    price_cache=None,
+    regression_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Calculate Spread factors for all symbols with one vectorized OLS pass.
+
+    Same flow as _process_ridge_universe: one returns matrix, one batched
+    regression (calculate_batch_spread_betas), then a bulk upsert.
+    """
+    start_date = calculation_date - timedelta(days=SPREAD_REGRESSION_WINDOW_DAYS + 30)
+    symbol_returns = await _fetch_universe_returns(
+        symbols, start_date, calculation_date, price_cache
+    )
+
+    fits = await map_symbol_chunks(
+        calculate_batch_spread_betas,
+        symbol_returns,
+        spread_returns,
+        workers=regression_workers
+    ) if not symbol_returns.empty else {}
+
+    results = _spread_symbol_results(symbols, fits)
+
+    solved = sum(1 for r in results.values() if r['success'])
+    logger.info(
+        f"Batched Spread OLS solved {solved}/{len(symbols)} symbols "
+        f"({len(symbol_returns)} return dates)"
+    )
+
+    return await _write_symbol_results(
+        writer=writer,
+        results=results,
+        calculation_date=calculation_date,
+        factor_name_to_id=factor_name_to_id,
+        calculation_method='spread_regression',
+        regularization_alpha=None,  # Not used for spread
+        regression_window_days=SPREAD_REGRESSION_WINDOW_DAYS,
+        label='spread'
+    )
+
+
+def _ridge_symbol_results(
+    symbols: List[str],
+    fits: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Map batched Ridge fits to the per-symbol result dicts _write_symbol_results stores."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for symbol in symbols:
+        fit = fits.get(symbol)
+        if fit is None:
+            results[symbol] = {'success': False, 'error': f'No return data for {symbol}'}
+        elif not fit['success']:
+            results[symbol] = {'success': False, 'error': fit['error']}
+        else:
+            results[symbol] = {
+                'success': True,
+                'betas': fit['betas'],
+                'r_squared': fit['r_squared'],
+                'observations': fit['observations'],
+                'quality_flag': (
+                    QUALITY_FLAG_FULL_HISTORY if fit['observations'] >= MIN_REGRESSION_DAYS
+                    else QUALITY_FLAG_LIMITED_HISTORY
+                ),
+            }
+    return results
+
+
+def _spread_symbol_results(
+    symbols: List[str],
+    fits: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Map batched Spread fits to the per-symbol result dicts _write_symbol_results stores."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for symbol in symbols:
+        fit = fits.get(symbol)
+        if fit is None:
+            results[symbol] = {'success': False, 'error': f'No return data for {symbol}'}
+        elif not (fit['success'] and fit['betas']):
+            results[symbol] = {'success': False, 'error': fit.get('error') or 'Spread regression failed'}
+        else:
+            results[symbol] = {
+                'success': True,
+                'betas': fit['betas'],
+                'r_squared': fit['avg_r_squared'],
+                'observations': fit['observations'],
+                'quality_flag': (
+                    QUALITY_FLAG_FULL_HISTORY if fit['observations'] >= SPREAD_MIN_REGRESSION_DAYS
+                    else QUALITY_FLAG_LIMITED_HISTORY
+                ),
+            }
+    return results
+
+
+async def _fetch_universe_prices(
+    symbols: List[str],
+    start_date: date,
+    end_date: date,
     price_cache=None
+) -> pd.DataFrame:
+    """
+    Fetch a (dates x symbols) close matrix for the universe.
+
+    Same chunking as _fetch_universe_returns; used by the rolling backfill,
+    which derives returns itself so it can apply each window's edges.
+    """
+    chunk_size = len(symbols) if price_cache else RETURNS_FETCH_CHUNK_SIZE
+    frames = []
+
+    async with AsyncSessionLocal() as db:
+        for i in range(0, len(symbols), max(chunk_size, 1)):
+            chunk_prices = await fetch_historical_prices(
+                db=db,
+                symbols=symbols[i:i + chunk_size],
+                start_date=start_date,
+                end_date=end_date,
+                price_cache=price_cache
+            )
+            if not chunk_prices.empty:
+                frames.append(chunk_prices)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1).sort_index() if len(frames) > 1 else frames[0]
+
+
+async def _process_rolling_backfill(
+    calculation_method: str,
+    symbols: List[str],
+    calculation_dates: List[date],
+    factor_name_to_id: Dict[str, UUID],
+    writer: SymbolFactorBulkWriter,
+    regularization_alpha: Optional[float] = None,
+    price_cache=None,
+    regression_workers: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Process symbols in parallel batches with isolated sessions.
+    Calculate Ridge or Spread factors for several dates with one rolling pass.
+
+    1. Check the cache per date; solve the union of symbols still missing a date
+    2. Fetch prices once for [first window start, last date]
+    3. Slide the regression sufficient statistics across the dates
+       (calculate_rolling_ridge_betas / calculate_rolling_spread_betas)
+    4. Bulk upsert each date's results for the symbols that needed it
+
+    Results are identical to running the per-date path once per date.
+
+    Args:
+        calculation_method: 'ridge_regression' or 'spread_regression'
+        symbols: Universe symbols
+        calculation_dates: Dates to calculate, ascending
+        factor_name_to_id: Mapping of factor names to UUIDs
+        writer: Bulk writer shared across the universe run
+        regularization_alpha: L2 penalty (Ridge only)
+        price_cache: Optional PriceCache (must cover the full backfill range)
+        regression_workers: Process-pool workers (None = settings.FACTOR_REGRESSION_WORKERS)
 
-    This is the safe parallelization pattern that avoids SQLAlchemy session conflicts.
+    Returns:
+        Dict with calculated, cached and failed counts (summed over dates) and errors
     """
-    # Batch symbols
-    batches = [
-        symbols[i:i + BATCH_SIZE]
-        for i in range(0, len(symbols), BATCH_SIZE)
-    ]
+    is_ridge = calculation_method == 'ridge_regression'
+    window_days = REGRESSION_WINDOW_DAYS if is_ridge else SPREAD_REGRESSION_WINDOW_DAYS
+    lookback_days = window_days + 30  # Same price window as the per-date path
+    summary = {'calculated': 0, 'cached': 0, 'failed': 0, 'errors': []}
 
-    logger.info(f"Processing {len(symbols)} symbols in {len(batches)} batches")
+    async with AsyncSessionLocal() as db:
+        needed = {
+            calculation_date: await get_uncached_symbols(db, symbols, calculation_date, calculation_method)
+            for calculation_date in calculation_dates
+        }
+    summary['cached'] = sum(len(symbols) - len(pending) for pending in needed.values())
 
-    async def process_batch(batch_symbols: List[str]) -> Dict[str, Any]:
-        """Process a batch of symbols with its own database session."""
-        batch_result = {'success': 0, 'failed': 0, 'errors': []}
+    to_solve = sorted(set().union(*needed.values()))
+    if not to_solve:
+        return summary
 
-        async with AsyncSessionLocal() as batch_db:
-            for symbol in batch_symbols:
-                try:
-                    if calculation_method == 'ridge':
-                        result = await calculate_symbol_ridge_factors(
-                            db=batch_db,
-                            symbol=symbol,
-                            factor_returns=factor_returns,
-                            calculation_date=calculation_date,
-                            factor_name_to_id=factor_name_to_id,
-                            regularization_alpha=regularization_alpha or DEFAULT_REGULARIZATION_ALPHA,
-                            price_cache=price_cache
-                        )
-                    else:  # spread
-                        result = await calculate_symbol_spread_factors(
-                            db=batch_db,
-                            symbol=symbol,
-                            spread_returns=factor_returns,
-                            calculation_date=calculation_date,
-                            factor_name_to_id=factor_name_to_id,
-                            price_cache=price_cache
-                        )
-
-                    if result['success']:
-                        batch_result['success'] += 1
-                    else:
-                        batch_result['failed'] += 1
-                        if result.get('error'):
-                            batch_result['errors'].append(f"{symbol}: {result['error']}")
+    range_start = calculation_dates[0] - timedelta(days=lookback_days)
+    range_end = calculation_dates[-1]
 
-                except Exception as e:
-                    logger.error(f"Error calculating factors for {symbol}: {e}")
-                    batch_result['failed'] += 1
-                    batch_result['errors'].append(f"{symbol}: {str(e)}")
-
-            # Commit all symbols in this batch at once
-            await batch_db.commit()
-
-        return batch_result
-
-    # Process batches with limited concurrency
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
-    completed_batches = 0
-    total_batches = len(batches)
-
-    async def limited_process_batch(batch_idx: int, batch: List[str]) -> Dict[str, Any]:
-        nonlocal completed_batches
-        async with semaphore:
-            result = await process_batch(batch)
-            completed_batches += 1
-            # Progress update every batch
-            pct = (completed_batches / total_batches) * 100
-            print(f"  [{calculation_method.upper()}] Batch {completed_batches}/{total_batches} ({pct:.0f}%) - {result['success']} ok, {result['failed']} fail")
-            sys.stdout.flush()
-            return result
-
-    batch_tasks = [limited_process_batch(i, batch) for i, batch in enumerate(batches)]
-    batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-
-    # Aggregate results
+    if is_ridge:
+        factor_etfs = list(RIDGE_STYLE_FACTORS.values())
+    else:
+        factor_etfs = sorted({etf for pair in SPREAD_FACTORS.values() for etf in pair})
+
+    factor_prices = await _fetch_universe_prices(factor_etfs, range_start, range_end, price_cache)
+    symbol_prices = await _fetch_universe_prices(to_solve, range_start, range_end, price_cache)
+
+    if factor_prices.empty:
+        error = f"No factor ETF prices available for {calculation_method} backfill"
+        logger.error(error)
+        summary['failed'] = sum(len(pending) for pending in needed.values())
+        summary['errors'].append(error)
+        return summary
+
+    if symbol_prices.empty:
+        fits_by_date: Dict[date, Dict[str, Dict[str, Any]]] = {}
+    elif is_ridge:
+        symbol_to_factor = {v: k for k, v in RIDGE_STYLE_FACTORS.items()}
+        fits_by_date = await map_symbol_chunks(
+            calculate_rolling_ridge_betas,
+            symbol_prices,
+            factor_prices.rename(columns=symbol_to_factor),
+            calculation_dates,
+            lookback_days,
+            regularization_alpha,
+            workers=regression_workers,
+            nested=True
+        )
+    else:
+        fits_by_date = await map_symbol_chunks(
+            calculate_rolling_spread_betas,
+            symbol_prices,
+            factor_prices,
+            calculation_dates,
+            lookback_days,
+            workers=regression_workers,
+            nested=True
+        )
+
+    logger.info(
+        f"Rolling {calculation_method} backfill: {len(to_solve)} symbols x "
+        f"{len(calculation_dates)} dates ({calculation_dates[0]} to {calculation_dates[-1]})"
+    )
+
+    to_results = _ridge_symbol_results if is_ridge else _spread_symbol_results
+    for calculation_date in calculation_dates:
+        if not needed[calculation_date]:
+            continue
+        date_results = await _write_symbol_results(
+            writer=writer,
+            results=to_results(needed[calculation_date], fits_by_date.get(calculation_date, {})),
+            calculation_date=calculation_date,
+            factor_name_to_id=factor_name_to_id,
+            calculation_method=calculation_method,
+            regularization_alpha=regularization_alpha if is_ridge else None,
+            regression_window_days=window_days,
+            label=f"{'ridge' if is_ridge else 'spread'} {calculation_date}"
+        )
+        summary['calculated'] += date_results['success']
+        summary['failed'] += date_results['failed']
+        summary['errors'].extend(date_results['errors'])
+
+    return summary
+
+
+async def _write_symbol_results(
+    writer: SymbolFactorBulkWriter,
+    results: Dict[str, Dict[str, Any]],
+    calculation_date: date,
+    factor_name_to_id: Dict[str, UUID],
+    calculation_method: str,
+    regularization_alpha: Optional[float],
+    regression_window_days: int,
+    label: str
+) -> Dict[str, Any]:
+    """
+    Stage pre-computed per-symbol results on the bulk writer and flush them.
+
+    Failed results are counted (and their errors collected) without touching
+    the database; symbols whose rows fail to write are moved to failed.
+    """
     aggregate = {'success': 0, 'failed': 0, 'errors': []}
+    staged = []
+
+    for symbol, result in results.items():
+        if result['success']:
+            writer.add(
+                symbol=symbol,
+                factor_betas=result['betas'],
+                calculation_date=calculation_date,
+                factor_name_to_id=factor_name_to_id,
+                calculation_method=calculation_method,
+                r_squared=result['r_squared'],
+                observations=result['observations'],
+                quality_flag=result['quality_flag'],
+                regularization_alpha=regularization_alpha,
+                regression_window_days=regression_window_days
+            )
+            staged.append(symbol)
+        else:
+            aggregate['failed'] += 1
+            if result.get('error'):
+                aggregate['errors'].append(f"{symbol}: {result['error']}")
+
+    failed_writes = await writer.flush(label)
 
-    for result in batch_results:
-        if isinstance(result, Exception):
-            logger.error(f"Batch failed with exception: {result}")
-            aggregate['errors'].append(str(result))
+    for symbol in staged:
+        if symbol in failed_writes:
+            aggregate['failed'] += 1
+            aggregate['errors'].append(f"{symbol}: {failed_writes[symbol]}")
         else:
-            aggregate['success'] += result['success']
-            aggregate['failed'] += result['failed']
-            aggregate['errors'].extend(result['errors'])
+            aggregate['success'] += 1
 
     return aggregate
 
@@ -12,24 +12,26 @@ Key Concepts:
 - Must calculate portfolio returns first, then volatility
 - All windows use trading days, not calendar days
 - HAR model uses daily/weekly/monthly components for forecasting
+- Symbol metrics are computed once per symbol (calculate_symbol_volatilities)
+  and shared by every position and portfolio holding that symbol
 """
 
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from uuid import UUID
 
 import numpy as np
 import pandas as pd
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sklearn.linear_model import LinearRegression
 
 from app.core.logging import get_logger
 from app.models.market_data import MarketDataCache, PositionVolatility
 from app.models.positions import Position
 from app.models.users import Portfolio
-from app.calculations.market_data import get_returns
+from app.calculations.market_data import fetch_historical_prices, gap_aware_returns, get_returns
 from app.services.symbol_utils import should_skip_symbol
 
 logger = get_logger(__name__)
@@ -39,6 +41,10 @@ TRADING_DAYS_PER_YEAR = 252
 TRADING_DAYS_PER_MONTH = 21
 TRADING_DAYS_PER_WEEK = 5
 
+# Calendar-day lookbacks
+VOLATILITY_LOOKBACK_DAYS = 365  # 1 year of prices for percentile calculation
+YANG_ZHANG_LOOKBACK_DAYS = 45  # Covers the 21-trading-day OHLC window
+
 
 async def calculate_position_volatility(
     db: AsyncSession,
@@ -118,7 +124,7 @@ async def calculate_position_volatility(
         logger.debug(f"Calculating volatility for position {position.symbol} using data from {symbol_for_volatility}")
 
         # Get historical prices (need ~90 days for 63-day window + lookback)
-        lookback_days = 365  # Get 1 year for percentile calculation
+        lookback_days = VOLATILITY_LOOKBACK_DAYS  # Get 1 year for percentile calculation
         start_date = calculation_date - timedelta(days=lookback_days)
 
         # Phase 8 Refactoring: Use canonical get_returns() instead of manual price fetching
@@ -214,7 +220,8 @@ async def calculate_portfolio_volatility(
     calculation_date: date,
     min_observations: int = 63,
     positions_override: Optional[List[Position]] = None,
-    price_cache=None
+    price_cache=None,
+    symbol_volatility: Optional["SymbolVolatilityTable"] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Calculate volatility metrics for entire portfolio.
@@ -222,6 +229,10 @@ async def calculate_portfolio_volatility(
     CRITICAL: Portfolio volatility ≠ weighted average of position volatilities!
     Must calculate portfolio returns first, then volatility of those returns.
 
+    Args:
+        symbol_volatility: Optional SymbolVolatilityTable whose price window
+            covers the portfolio's symbols (no price fetch when provided)
+
     Returns:
         {
             'portfolio_id': UUID,
@@ -286,7 +297,7 @@ async def calculate_portfolio_volatility(
 
         # Get historical prices for all positions
         # For options, use underlying symbol; for equities use position symbol
-        lookback_days = 365
+        lookback_days = VOLATILITY_LOOKBACK_DAYS
         start_date = calculation_date - timedelta(days=lookback_days)
 
         # Phase 8 Refactoring: Use canonical get_returns() instead of manual price fetching
@@ -301,14 +312,17 @@ async def calculate_portfolio_volatility(
         symbols_to_fetch = list(set(symbols_to_fetch))  # Deduplicate
 
         # Fetch returns for all symbols using canonical function
-        returns_df = await get_returns(
-            db=db,
-            symbols=symbols_to_fetch,
-            start_date=start_date,
-            end_date=calculation_date,
-            align_dates=False,  # Keep all dates, handle missing data below
-            price_cache=price_cache  # Pass through cache for optimization
-        )
+        if symbol_volatility is not None:
+            returns_df = symbol_volatility.portfolio_returns(symbols_to_fetch)
+        else:
+            returns_df = await get_returns(
+                db=db,
+                symbols=symbols_to_fetch,
+                start_date=start_date,
+                end_date=calculation_date,
+                align_dates=False,  # Keep all dates, handle missing data below
+                price_cache=price_cache  # Pass through cache for optimization
+            )
 
         if returns_df.empty:
             logger.warning(f"No returns data found for portfolio {portfolio_id}")
@@ -438,16 +452,179 @@ async def save_position_volatility(
         return False
 
 
+# ============================================================================
+# SYMBOL-LEVEL VOLATILITY (shared across positions and portfolios)
+# ============================================================================
+
+
+@dataclass
+class SymbolVolatilityTable:
+    """
+    Volatility metrics for many symbols, computed once from one price window.
+
+    Attributes:
+        calculation_date: Date the metrics are as of
+        prices: (dates x symbols) closes over the lookback window, as returned
+            by fetch_historical_prices() for all symbols together
+        metrics: symbol -> metrics dict (the position volatility fields other
+            than position_id/calculation_date, plus yang_zhang_vol_21d)
+        failures: symbol -> {'reason': ..., ...} for symbols without metrics
+    """
+    calculation_date: date
+    prices: pd.DataFrame
+    metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    failures: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def portfolio_returns(self, symbols: List[str]) -> pd.DataFrame:
+        """
+        Returns for a subset of symbols, equal to get_returns(align_dates=False)
+        over the same window: dates where none of the symbols has a close are
+        dropped before differencing, then any date with a missing return.
+        """
+        columns = [s for s in sorted(set(symbols)) if s in self.prices.columns]
+        if not columns:
+            return pd.DataFrame()
+        price_df = self.prices[columns]
+        price_df = price_df[price_df.notna().any(axis=1)]
+        return price_df.pct_change(fill_method=None).dropna()
+
+
+async def calculate_symbol_volatilities(
+    db: AsyncSession,
+    symbols: List[str],
+    calculation_date: date,
+    min_observations: int = 63,
+    price_cache=None
+) -> SymbolVolatilityTable:
+    """
+    Calculate volatility metrics for every symbol at once.
+
+    Each symbol's metrics equal what calculate_position_volatility() computes
+    for a position on that symbol, but from one (dates x symbols) price window:
+    returns are right-aligned per symbol (gaps removed, as with a single-symbol
+    get_returns()) and realized vols, trend and percentile come from rolling
+    window sums over the whole matrix, and HAR forecasts from one batched
+    least-squares solve. Yang-Zhang 21d vol is added from one OHLC query.
+
+    Args:
+        db: Database session
+        symbols: Symbols (or option underlyings) to calculate
+        calculation_date: Date to calculate for
+        min_observations: Minimum returns a symbol needs for metrics
+        price_cache: Optional PriceCache for the price window
+
+    Returns:
+        SymbolVolatilityTable (skipped symbols are in neither metrics nor failures)
+    """
+    eligible = sorted({s for s in symbols if s and not should_skip_symbol(s)[0]})
+    start_date = calculation_date - timedelta(days=VOLATILITY_LOOKBACK_DAYS)
+
+    prices = await fetch_historical_prices(
+        db=db,
+        symbols=eligible,
+        start_date=start_date,
+        end_date=calculation_date,
+        price_cache=price_cache
+    ) if eligible else pd.DataFrame()
+    table = SymbolVolatilityTable(calculation_date=calculation_date, prices=prices)
+
+    priced = [s for s in eligible if s in prices.columns]
+    for symbol in eligible:
+        if symbol not in prices.columns:
+            table.failures[symbol] = {'reason': 'no_price_data', 'symbol': symbol}
+    if not priced:
+        return table
+
+    returns, counts = _right_align_returns(gap_aware_returns(prices[priced]).to_numpy())
+    annualize = np.sqrt(TRADING_DAYS_PER_YEAR)
+    vol_weekly = _rolling_std(returns, TRADING_DAYS_PER_WEEK)[-1] * annualize
+    rolling_21d = _rolling_std(returns, TRADING_DAYS_PER_MONTH) * annualize
+    vol_63d = _rolling_std(returns, 63)[-1] * annualize
+    trends, trend_strengths = _volatility_trends(rolling_21d, counts, window=TRADING_DAYS_PER_MONTH)
+    percentiles = _volatility_percentiles(rolling_21d, counts)
+    vol_daily = np.abs(returns[-1]) * annualize
+    har_forecasts, har_r_squared = _forecast_har_batch(
+        returns, vol_daily, vol_weekly, rolling_21d[-1], min_observations=min_observations
+    )
+
+    ohlc_symbols = [s for s, n in zip(priced, counts) if n >= min_observations]
+    yang_zhang = await _fetch_yang_zhang_volatilities(db, ohlc_symbols, calculation_date) if ohlc_symbols else {}
+
+    def as_float(value) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+
+    for j, symbol in enumerate(priced):
+        n = int(counts[j])
+        if n == 0:
+            table.failures[symbol] = {'reason': 'no_price_data', 'symbol': symbol}
+            continue
+        if n < min_observations:
+            table.failures[symbol] = {
+                'reason': 'insufficient_observations',
+                'observations': n,
+                'required': min_observations,
+                'symbol': symbol,
+            }
+            continue
+
+        vol_monthly = as_float(rolling_21d[-1, j])
+        table.metrics[symbol] = {
+            'realized_vol_21d': vol_monthly,
+            'realized_vol_63d': as_float(vol_63d[j]),
+            'vol_daily': float(vol_daily[j]),
+            'vol_weekly': as_float(vol_weekly[j]),
+            'vol_monthly': vol_monthly,
+            'expected_vol_21d': as_float(har_forecasts[j]),
+            'vol_trend': trends[j],
+            'vol_trend_strength': float(trend_strengths[j]),
+            'vol_percentile': as_float(percentiles[j]),
+            'observations': n,
+            'model_r_squared': as_float(har_r_squared[j]),
+            'yang_zhang_vol_21d': yang_zhang.get(symbol),
+        }
+
+    logger.info(
+        f"Symbol volatility: {len(table.metrics)} symbols calculated, "
+        f"{len(table.failures)} without metrics ({len(symbols)} requested)"
+    )
+    return table
+
+
+async def get_volatility_symbols(db: AsyncSession, portfolio_ids: List[UUID]) -> List[str]:
+    """
+    Symbols whose volatility the given portfolios need, in one query.
+
+    Active positions only; options contribute their underlying symbol.
+    """
+    result = await db.execute(
+        select(Position.symbol, Position.underlying_symbol).where(
+            Position.portfolio_id.in_(portfolio_ids),
+            Position.exit_date.is_(None),
+            Position.deleted_at.is_(None)
+        )
+    )
+    return sorted({
+        underlying_symbol or symbol
+        for symbol, underlying_symbol in result.all()
+        if underlying_symbol or symbol
+    })
+
+
 async def calculate_portfolio_volatility_batch(
     db: AsyncSession,
     portfolio_id: UUID,
     calculation_date: date,
-    price_cache=None
+    price_cache=None,
+    symbol_volatility: Optional[SymbolVolatilityTable] = None
 ) -> Dict[str, Any]:
     """
     Calculate volatility for all positions in a portfolio and aggregate.
 
-    This is the main entry point for batch processing.
+    This is the main entry point for batch processing. Position metrics are
+    read from a SymbolVolatilityTable (one row per underlying symbol), so
+    positions sharing a symbol - within or across portfolios - share one
+    calculation. Pass symbol_volatility to reuse a table built for many
+    portfolios; otherwise one is built for this portfolio's symbols.
 
     Returns:
         {
@@ -521,16 +698,24 @@ async def calculate_portfolio_volatility_batch(
 
         failure_reasons: List[Dict[str, Any]] = []
 
-        for position in eligible_positions:
-            vol_result = await calculate_position_volatility(
+        if symbol_volatility is None:
+            symbol_volatility = await calculate_symbol_volatilities(
                 db=db,
-                position_id=position.id,
+                symbols=[p.underlying_symbol or p.symbol for p in eligible_positions],
                 calculation_date=calculation_date,
                 price_cache=price_cache
             )
 
-            if vol_result.get('success'):
-                vol_data = vol_result['data']
+        for position in eligible_positions:
+            symbol_for_vol = position.underlying_symbol or position.symbol
+            metrics = symbol_volatility.metrics.get(symbol_for_vol)
+
+            if metrics is not None:
+                vol_data = {
+                    'position_id': position.id,
+                    'calculation_date': calculation_date,
+                    **metrics,
+                }
                 # Save to database
                 saved = await save_position_volatility(db, vol_data)
                 if saved:
@@ -543,13 +728,16 @@ async def calculate_portfolio_volatility_batch(
                         'reason': 'save_failed'
                     })
             else:
+                failure = symbol_volatility.failures.get(
+                    symbol_for_vol, {'reason': 'no_price_data', 'symbol': symbol_for_vol}
+                )
                 positions_failed += 1
                 failure_reasons.append({
                     'position_id': str(position.id),
-                    'reason': vol_result.get('reason', 'unknown'),
+                    'reason': failure.get('reason', 'unknown'),
                     'details': {
-                        k: v for k, v in vol_result.items()
-                        if k not in {'success', 'reason'}
+                        **{k: v for k, v in failure.items() if k != 'reason'},
+                        'position_symbol': position.symbol,
                     }
                 })
 
@@ -559,7 +747,8 @@ async def calculate_portfolio_volatility_batch(
             portfolio_id=portfolio_id,
             calculation_date=calculation_date,
             positions_override=eligible_positions,
-            price_cache=price_cache
+            price_cache=price_cache,
+            symbol_volatility=symbol_volatility
         )
 
         success = positions_processed > 0 and portfolio_vol is not None
@@ -730,6 +919,8 @@ def _forecast_har(
     For the daily component, we use squared returns (realized variance for single period).
     For weekly/monthly, we use rolling standard deviation.
 
+    Single-series form of _forecast_har_batch().
+
     Args:
         returns: Historical daily returns
         vol_daily: Current daily volatility (annualized)
@@ -743,58 +934,105 @@ def _forecast_har(
         return None, None
 
     try:
-        # Need at least 63 days for meaningful HAR fit
-        if len(returns) < 63:
-            return None, None
-
-        # Calculate rolling volatilities for training
-        # Daily: Use squared returns (annualized) - this is the actual realized variance
-        rv_daily = (returns ** 2) * TRADING_DAYS_PER_YEAR  # Annualized variance
-        rv_daily = np.sqrt(rv_daily)  # Convert to volatility
-
-        # Weekly: Average volatility over 5-day rolling window
-        rv_weekly = returns.rolling(5).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
-
-        # Monthly: Average volatility over 21-day rolling window
-        rv_monthly = returns.rolling(21).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
-
-        # Create dataset: predict tomorrow's daily vol from today's components
-        X = pd.DataFrame({
-            'rv_daily': rv_daily,
-            'rv_weekly': rv_weekly,
-            'rv_monthly': rv_monthly
-        })
-        y = rv_daily.shift(-1)  # Tomorrow's volatility
-
-        # Drop NaN values
-        df = pd.concat([X, y.rename('target')], axis=1).dropna()
-
-        if len(df) < 30:  # Need minimum data for regression
+        forecast, r_squared = _forecast_har_batch(
+            returns.dropna().to_numpy(dtype=np.float64).reshape(-1, 1),
+            np.array([vol_daily], dtype=np.float64),
+            np.array([vol_weekly], dtype=np.float64),
+            np.array([vol_monthly], dtype=np.float64)
+        )
+        if np.isnan(forecast[0]):
             return None, None
+        return float(forecast[0]), float(r_squared[0])
 
-        X_train = df[['rv_daily', 'rv_weekly', 'rv_monthly']]
-        y_train = df['target']
+    except Exception as e:
+        logger.warning(f"HAR forecast failed: {e}")
+        return None, None
 
-        # Fit HAR model
-        model = LinearRegression()
-        model.fit(X_train, y_train)
 
-        # Make forecast using current volatilities
-        # Use DataFrame with same column names to avoid sklearn warning
-        X_current = pd.DataFrame(
-            [[vol_daily, vol_weekly, vol_monthly]],
-            columns=['rv_daily', 'rv_weekly', 'rv_monthly']
-        )
-        forecast = model.predict(X_current)[0]
+def _forecast_har_batch(
+    returns: np.ndarray,
+    vol_daily: np.ndarray,
+    vol_weekly: np.ndarray,
+    vol_monthly: np.ndarray,
+    min_observations: int = 63,
+    min_training_rows: int = 30
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    HAR forecasts for many series at once (one least-squares solve for all).
 
-        # Calculate R-squared
-        r_squared = model.score(X_train, y_train)
+    Builds the (rows x series x 3) design tensor of daily |r|·√252, 5-day and
+    21-day rolling vols with tomorrow's daily vol as the target, then solves
+    every series' intercept + 3-coefficient OLS through one batched SVD of the
+    demeaned design. The minimum-norm solution and R² equal sklearn's
+    LinearRegression fit/score on the same rows.
 
-        return float(forecast), float(r_squared)
+    Args:
+        returns: (days x series) daily returns, each column's returns in its
+            last rows with NaN above (see _right_align_returns())
+        vol_daily, vol_weekly, vol_monthly: Current HAR components per series
+            (annualized; NaN = unavailable)
+        min_observations: Minimum returns per series
+        min_training_rows: Minimum complete regression rows per series
 
-    except Exception as e:
-        logger.warning(f"HAR forecast failed: {e}")
-        return None, None
+    Returns:
+        (forecast, r_squared) arrays, NaN where a series cannot be fitted
+    """
+    n_rows, n_series = returns.shape
+    forecast = np.full(n_series, np.nan)
+    r_squared = np.full(n_series, np.nan)
+    if n_rows < 2:
+        return forecast, r_squared
+
+    annualize = np.sqrt(TRADING_DAYS_PER_YEAR)
+    rv_daily = np.abs(returns) * annualize
+    design = np.stack([
+        rv_daily,
+        _rolling_std(returns, TRADING_DAYS_PER_WEEK) * annualize,
+        _rolling_std(returns, TRADING_DAYS_PER_MONTH) * annualize,
+    ], axis=-1)[:-1]  # Rows with a next-day target
+    target = rv_daily[1:]
+
+    mask = np.isfinite(design).all(axis=-1) & np.isfinite(target)
+    rows = mask.sum(axis=0)
+    current = np.column_stack([vol_daily, vol_weekly, vol_monthly])
+    fit = (
+        (np.count_nonzero(~np.isnan(returns), axis=0) >= min_observations)
+        & (rows >= min_training_rows)
+        & np.isfinite(current).all(axis=1)
+    )
+    if not fit.any():
+        return forecast, r_squared
+
+    # Demean each series over its own training rows (the intercept), zero the rest
+    mask = mask[:, fit]
+    weights = mask[..., None]
+    x = np.where(weights, design[:, fit], 0.0)
+    y = np.where(mask, target[:, fit], 0.0)
+    x_mean = x.sum(axis=0) / rows[fit, None]
+    y_mean = y.sum(axis=0) / rows[fit]
+    x_centered = np.where(weights, x - x_mean, 0.0).transpose(1, 0, 2)  # (series, rows, 3)
+    y_centered = np.where(mask, y - y_mean, 0.0).T  # (series, rows)
+
+    # Minimum-norm least squares per series (scipy lstsq cutoff, as sklearn uses)
+    u, singular, vt = np.linalg.svd(x_centered, full_matrices=False)
+    cutoff = np.finfo(np.float64).eps * max(n_rows - 1, 3) * singular[:, :1]
+    inverse = np.divide(1.0, singular, out=np.zeros_like(singular), where=singular > cutoff)
+    coefficients = np.einsum('sji,sj->si', vt, inverse * np.einsum('sri,sr->si', u, y_centered))
+    intercept = y_mean - np.einsum('si,si->s', x_mean, coefficients)
+
+    residuals = y_centered - np.einsum('sri,si->sr', x_centered, coefficients)
+    ss_res = (residuals ** 2).sum(axis=1)
+    ss_tot = (y_centered ** 2).sum(axis=1)
+    # sklearn's R² convention for a constant target: 1.0 if fitted exactly, else 0.0
+    fit_r_squared = np.where(
+        ss_tot > 0,
+        1.0 - np.divide(ss_res, ss_tot, out=np.zeros_like(ss_tot), where=ss_tot > 0),
+        np.where(ss_res == 0, 1.0, 0.0)
+    )
+
+    forecast[fit] = intercept + np.einsum('si,si->s', current[fit], coefficients)
+    r_squared[fit] = fit_r_squared
+    return forecast, r_squared
 
 
 def _analyze_volatility_trend(returns: pd.Series, window: int = 21) -> tuple[str, float]:
@@ -888,6 +1126,211 @@ def _calculate_vol_percentile(returns: pd.Series, window: int = 21) -> Optional[
         return None
 
 
+def _right_align_returns(returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Move each column's non-NaN returns to the bottom rows, keeping their order.
+
+    Column j then holds that symbol's returns with gaps removed (what
+    .dropna() gives for one symbol) in its last counts[j] rows, NaN above.
+
+    Returns:
+        (aligned returns, valid returns per column)
+    """
+    valid = ~np.isnan(returns)
+    order = np.argsort(valid, axis=0, kind='stable')  # NaN rows first, then valid rows in date order
+    return np.take_along_axis(returns, order, axis=0), valid.sum(axis=0)
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling sample standard deviation (ddof=1) down each column.
+
+    Row t is the std of rows t-window+1..t; NaN for the first window-1 rows
+    and for any window containing a NaN (same as pandas rolling(window).std()).
+    Uses demeaned cumulative sums, so every window of every column costs O(1).
+    """
+    n_rows, n_cols = values.shape
+    result = np.full((n_rows, n_cols), np.nan)
+    if n_rows < window or window < 2:
+        return result
+
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    means = np.divide(np.where(valid, values, 0.0).sum(axis=0), counts, out=np.zeros(n_cols), where=counts > 0)
+    centered = np.where(valid, values - means, 0.0)
+
+    def window_sums(x: np.ndarray) -> np.ndarray:
+        cumulative = np.vstack([np.zeros((1, n_cols)), np.cumsum(x, axis=0)])
+        return cumulative[window:] - cumulative[:-window]
+
+    full = window_sums(valid.astype(np.float64)) == window
+    sums = window_sums(centered)
+    squares = window_sums(centered ** 2)
+    variance = np.maximum((squares - sums ** 2 / window) / (window - 1), 0.0)
+    result[window - 1:] = np.where(full, np.sqrt(variance), np.nan)
+    return result
+
+
+def _volatility_trends(
+    rolling_vol: np.ndarray,
+    counts: np.ndarray,
+    window: int = 21
+) -> Tuple[List[str], np.ndarray]:
+    """
+    _analyze_volatility_trend() for every column of a right-aligned rolling vol matrix.
+
+    Fits the last `window` rolling vols against time for all columns at once
+    (closed-form slope and R²). Columns with fewer than 2 x window returns are
+    'stable' with strength 0.
+    """
+    n_cols = rolling_vol.shape[1]
+    trends = ['stable'] * n_cols
+    strengths = np.zeros(n_cols)
+    eligible = counts >= window * 2
+    if not eligible.any() or rolling_vol.shape[0] < window:
+        return trends, strengths
+
+    y = rolling_vol[-window:, eligible]
+    x = np.arange(window, dtype=np.float64) - (window - 1) / 2.0
+    y_centered = y - y.mean(axis=0)
+    sxx = float(x @ x)
+    sxy = x @ y_centered
+    ss_tot = (y_centered ** 2).sum(axis=0)
+    slope = sxy / sxx
+    ss_res = np.maximum(ss_tot - slope * sxy, 0.0)
+    # sklearn's R² convention for a constant target: 1.0 if fitted exactly, else 0.0
+    r_squared = np.where(
+        ss_tot > 0,
+        1.0 - np.divide(ss_res, ss_tot, out=np.zeros_like(ss_tot), where=ss_tot > 0),
+        np.where(ss_res == 0, 1.0, 0.0)
+    )
+    strength = np.minimum(np.abs(r_squared), 1.0)
+    strengths[eligible] = strength
+
+    threshold = 0.001  # Minimum slope to be considered trending
+    for j, col in enumerate(np.flatnonzero(eligible)):
+        if slope[j] > threshold and strength[j] > 0.3:
+            trends[col] = 'increasing'
+        elif slope[j] < -threshold and strength[j] > 0.3:
+            trends[col] = 'decreasing'
+    return trends, strengths
+
+
+def _volatility_percentiles(
+    rolling_vol: np.ndarray,
+    counts: np.ndarray,
+    window: int = 21
+) -> np.ndarray:
+    """
+    _calculate_vol_percentile() for every column of a right-aligned rolling vol matrix.
+
+    NaN where a column has less than a year of returns.
+    """
+    percentiles = np.full(rolling_vol.shape[1], np.nan)
+    eligible = counts >= TRADING_DAYS_PER_YEAR
+    if not eligible.any():
+        return percentiles
+
+    history = rolling_vol[:, eligible]
+    n_history = counts[eligible] - window + 1
+    current = history[-1]
+    below = np.sum(history < current, axis=0)  # NaN rows compare False
+    percentiles[eligible] = np.where(n_history >= 100, below / n_history, np.nan)
+    return percentiles
+
+
+def _yang_zhang_volatility_matrix(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray
+) -> np.ndarray:
+    """
+    _calculate_yang_zhang_volatility() for every column of (days x symbols) OHLC arrays.
+
+    Each column is one symbol's consecutive rows; NaN OHLC values are skipped
+    like pandas' mean()/var() do.
+
+    Returns:
+        Annualized volatility per column (NaN where undefined)
+    """
+    n = close.shape[0]
+    if n < 2:
+        return np.full(close.shape[1], np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overnight_var = np.nanmean(np.log(open_[1:] / close[:-1]) ** 2, axis=0)
+        close_var = np.nanvar(np.log(close[1:] / close[:-1]), axis=0, ddof=1)
+        rs_var = np.nanmean(
+            np.log(high / close) * np.log(high / open_) + np.log(low / close) * np.log(low / open_),
+            axis=0
+        )
+        k = 0.34 / (1.34 + (n + 1) / (n - 1))
+        yang_zhang_var = overnight_var + k * close_var + (1 - k) * rs_var
+        return np.sqrt(yang_zhang_var) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+async def _fetch_yang_zhang_volatilities(
+    db: AsyncSession,
+    symbols: List[str],
+    calculation_date: date,
+    window: int = TRADING_DAYS_PER_MONTH
+) -> Dict[str, Optional[float]]:
+    """
+    Yang-Zhang volatility over each symbol's last `window` OHLC rows (one query).
+
+    Equivalent to _calculate_realized_vol_from_ohlc(df, window) per symbol.
+    PriceCache only holds closes, so OHLC comes from market_data_cache.
+    Symbols with fewer than `window` rows are omitted.
+    """
+    try:
+        result = await db.execute(
+            select(
+                MarketDataCache.symbol,
+                MarketDataCache.date,
+                MarketDataCache.open,
+                MarketDataCache.high,
+                MarketDataCache.low,
+                MarketDataCache.close
+            ).where(
+                MarketDataCache.symbol.in_(symbols),
+                MarketDataCache.date >= calculation_date - timedelta(days=YANG_ZHANG_LOOKBACK_DAYS),
+                MarketDataCache.date <= calculation_date
+            )
+        )
+        rows = result.all()
+    except Exception as e:
+        logger.warning(f"Yang-Zhang OHLC query failed: {e}")
+        return {}
+    if not rows:
+        return {}
+
+    df = pd.DataFrame(
+        [
+            (r.symbol, r.date, *(float(v) if v is not None else np.nan for v in (r.open, r.high, r.low, r.close)))
+            for r in rows
+        ],
+        columns=['symbol', 'date', 'open', 'high', 'low', 'close']
+    )
+    wide = df.pivot_table(index='date', columns='symbol', aggfunc='last', dropna=False).sort_index()
+    close = wide['close']
+    ohlc_symbols = list(close.columns)
+
+    # Right-align each symbol's rows (dates it has a close for), keep the last `window`
+    order = np.argsort(close.notna().to_numpy(), axis=0, kind='stable')[-window:]
+    fields = [
+        np.take_along_axis(wide[name].reindex(columns=ohlc_symbols).to_numpy(), order, axis=0)
+        for name in ('open', 'high', 'low', 'close')
+    ]
+    vols = _yang_zhang_volatility_matrix(*fields)
+    enough = close.notna().sum(axis=0).to_numpy() >= window
+    return {
+        symbol: float(vol)
+        for symbol, vol, ok in zip(ohlc_symbols, vols, enough)
+        if ok and not np.isnan(vol)
+    }
+
+
 def _calculate_portfolio_returns_from_df(
     positions: List[Position],
     returns_df: pd.DataFrame,
@@ -259,6 +259,36 @@ class Settings(BaseSettings):
         env="FACTOR_CALC_CONCURRENCY",
         description="Max concurrent factor calculations"
     )
+    FACTOR_REGRESSION_WORKERS: int = Field(
+        default=0,
+        env="FACTOR_REGRESSION_WORKERS",
+        description="Process-pool workers for Phase 3 regressions (0 = solve inline on the event loop)"
+    )
+    RIDGE_ALPHA_AUTO_TUNE: bool = Field(
+        default=False,
+        env="RIDGE_ALPHA_AUTO_TUNE",
+        description="Re-select the universe Ridge alpha by GCV on each Phase 3 run instead of using the fixed default"
+    )
+    CORRELATION_SHRINKAGE: bool = Field(
+        default=False,
+        env="CORRELATION_SHRINKAGE",
+        description="Shrink the shared Phase 4 correlation matrix toward the identity (Ledoit-Wolf-type intensity)"
+    )
+    CORRELATION_CLUSTERS_ENABLED: bool = Field(
+        default=False,
+        env="CORRELATION_CLUSTERS_ENABLED",
+        description="Detect and store named correlation clusters during Phase 4"
+    )
+    CLUSTER_NICKNAME_TTL_DAYS: int = Field(
+        default=7,
+        env="CLUSTER_NICKNAME_TTL_DAYS",
+        description="Days a cached cluster nickname is reused before it is regenerated"
+    )
+    CLUSTER_NICKNAME_CONCURRENCY: int = Field(
+        default=4,
+        env="CLUSTER_NICKNAME_CONCURRENCY",
+        description="Max concurrent cluster nickname generations on a cache miss"
+    )
     PORTFOLIO_REFRESH_CONCURRENCY: int = Field(
         default=10,
         env="PORTFOLIO_REFRESH_CONCURRENCY",
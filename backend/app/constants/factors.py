@@ -27,6 +27,13 @@ FACTOR_ETFS = {
     "Interest Rate": "TLT"     # Interest Rate sensitivity (20+ Year Treasury Bond ETF)
 }
 
+# Persisted factor returns (factor_returns table)
+FACTOR_RETURNS_VERSION = 1            # Bump when the return definition changes; readers only see the current version
+FACTOR_RETURN_HISTORY_DAYS = 420      # Calendar days stored on first refresh (covers the 252d correlation lookback)
+FACTOR_RETURN_REFRESH_OVERLAP_DAYS = 7  # Recent days rewritten on each refresh to pick up price corrections
+FACTOR_RETURN_MEMO_TTL_SECONDS = 900  # In-process memo lifetime for get_factor_returns()
+FACTOR_RETURN_MEMO_MAX_ENTRIES = 256  # Least recently used frames are evicted beyond this
+
 # Factor types
 FACTOR_TYPE_STYLE = "style"
 FACTOR_TYPE_SECTOR = "sector"
@@ -0,0 +1,72 @@
+"""
+Event loop lag monitoring
+
+CPU-bound work on the asyncio event loop (pandas/numpy regressions, large
+DataFrame builds) delays every other coroutine in the process, including
+health checks and admin batch-status calls. EventLoopLagMonitor measures
+that delay directly: a sampler task sleeps for a fixed interval and records
+how late it wakes up.
+
+Usage:
+    async with EventLoopLagMonitor() as lag:
+        await calculate_universe_factors(...)
+    lag.get_stats()  # {'samples': ..., 'mean_ms': ..., 'p95_ms': ..., 'max_ms': ...}
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 0.05
+
+
+class EventLoopLagMonitor:
+    """Samples event loop scheduling lag while the context is active."""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._expected: Optional[float] = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._lags.append(max(loop.time() - self._expected, 0.0))
+            self._expected = None
+
+    async def __aenter__(self) -> "EventLoopLagMonitor":
+        self._lags = []
+        self._task = asyncio.create_task(self._sample())
+        await asyncio.sleep(0)  # Let the sampler arm its first wake-up
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        # A wake-up still pending at exit is overdue if the block ran the loop past it
+        # (covers work that blocked the loop for the whole context)
+        if self._expected is not None:
+            overdue = asyncio.get_running_loop().time() - self._expected
+            if overdue > 0:
+                self._lags.append(overdue)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag summary in milliseconds (zeros when nothing was sampled)."""
+        if not self._lags:
+            return {'samples': 0, 'mean_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+
+        ordered = sorted(self._lags)
+        p95 = ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]
+        return {
+            'samples': len(ordered),
+            'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+            'p95_ms': round(p95 * 1000, 2),
+            'max_ms': round(ordered[-1] * 1000, 2),
+        }
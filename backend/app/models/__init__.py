@@ -5,11 +5,11 @@ SQLAlchemy models for SigmaSight Backend
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models.users import User, Portfolio
 from app.models.positions import Position, PositionType, TagType
-from app.models.market_data import MarketDataCache, PositionGreeks, FactorDefinition, FactorExposure, PositionFactorExposure, FundHoldings
+from app.models.market_data import MarketDataCache, PositionGreeks, FactorDefinition, FactorExposure, PositionFactorExposure, FundHoldings, FactorReturn, PortfolioVaRResult
 from app.models.snapshots import PortfolioSnapshot, BatchJob, BatchJobSchedule
 from app.models.modeling import ModelingSessionSnapshot
 from app.models.history import ExportHistory
-from app.models.correlations import CorrelationCalculation, CorrelationCluster, CorrelationClusterPosition, PairwiseCorrelation
+from app.models.correlations import CorrelationCalculation, CorrelationCluster, CorrelationClusterNickname, CorrelationClusterPosition, PairwiseCorrelation
 from app.models.target_prices import TargetPrice
 from app.models.tags_v2 import TagV2
 from app.models.position_tags import PositionTag
@@ -39,6 +39,8 @@ __all__ = [
     "FactorExposure",
     "PositionFactorExposure",
     "FundHoldings",
+    "FactorReturn",
+    "PortfolioVaRResult",
     
     # Snapshots module
     "PortfolioSnapshot",
@@ -54,6 +56,7 @@ __all__ = [
     # Correlations module
     "CorrelationCalculation",
     "CorrelationCluster",
+    "CorrelationClusterNickname",
     "CorrelationClusterPosition",
     "PairwiseCorrelation",
 
@@ -9,9 +9,9 @@ from uuid import UUID
 
 from sqlalchemy import (
     Column, String, Integer, DateTime, ForeignKey, 
-    UniqueConstraint, Index, DECIMAL, Enum
+    UniqueConstraint, Index, DECIMAL, Enum, LargeBinary
 )
-from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PostgresUUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -45,6 +45,12 @@ class CorrelationCalculation(Base):
     positions_included = Column(Integer, nullable=False)
     positions_excluded = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Packed correlation matrix (see app.services.correlation_storage)
+    matrix_symbols = Column(JSONB)  # Row/column order
+    packed_correlations = Column(LargeBinary)  # float32 upper triangle incl. diagonal
+    packed_overlaps = Column(LargeBinary)  # int16 paired observation counts
+    packed_significance = Column(LargeBinary)  # float32 1 - p-value
     
     # Relationships
     portfolio = relationship("Portfolio", back_populates="correlation_calculations")
@@ -81,6 +87,24 @@ class CorrelationCluster(Base):
     )
 
 
+class CorrelationClusterNickname(Base):
+    """
+    Cached cluster nicknames, keyed by portfolio and normalized symbol set
+    """
+    __tablename__ = "correlation_cluster_nicknames"
+
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
+    portfolio_id = Column(PostgresUUID(as_uuid=True), ForeignKey("portfolios.id", ondelete="CASCADE"), nullable=False)
+    symbol_set_hash = Column(String(64), nullable=False)  # See correlation_clusters.symbol_set_key()
+    symbol_count = Column(Integer, nullable=False)
+    nickname = Column(String(100), nullable=False)
+    generated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('portfolio_id', 'symbol_set_hash', name='uq_cluster_nicknames_portfolio_symbol_set'),
+    )
+
+
 class CorrelationClusterPosition(Base):
     """
     Links positions to their correlation clusters
@@ -108,6 +132,9 @@ class CorrelationClusterPosition(Base):
 class PairwiseCorrelation(Base):
     """
     Stores pairwise correlations between all positions (including both directions and self-correlations)
+
+    LEGACY: new calculations store a packed matrix on CorrelationCalculation;
+    these rows are only read for calculations written before that format.
     """
     __tablename__ = "pairwise_correlations"
     
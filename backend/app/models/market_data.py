@@ -468,6 +468,34 @@ class StressTestResult(Base):
     )
 
 
+class PortfolioVaRResult(Base):
+    """Portfolio Value-at-Risk / Expected Shortfall - historical simulation results per date"""
+    __tablename__ = "portfolio_var_results"
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    portfolio_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("portfolios.id", ondelete="CASCADE"), nullable=False)
+    calculation_date: Mapped[date] = mapped_column(Date, nullable=False)
+    method: Mapped[str] = mapped_column(String(30), nullable=False)  # 'historical' or 'filtered_historical'
+    confidence_level: Mapped[Decimal] = mapped_column(Numeric(4, 3), nullable=False)  # 0.950, 0.990
+    horizon_days: Mapped[int] = mapped_column(Integer, nullable=False)  # 1 or 10 trading days
+    var_amount: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False)  # Loss (positive = loss)
+    expected_shortfall: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False)  # Mean loss beyond VaR
+    simulated_value: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False)  # Gross market value of simulated positions
+    observations: Mapped[int] = mapped_column(Integer, nullable=False)  # Return scenarios used
+    positions_simulated: Mapped[int] = mapped_column(Integer, nullable=False)
+    positions_excluded: Mapped[int] = mapped_column(Integer, nullable=False)  # Options and symbols without price history
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'portfolio_id', 'calculation_date', 'method', 'confidence_level', 'horizon_days',
+            name='uq_portfolio_var_results'
+        ),
+        Index('idx_portfolio_var_portfolio_date', 'portfolio_id', 'calculation_date'),
+    )
+
+
 class FactorCorrelation(Base):
     """Factor correlations - stores factor correlation matrix results"""
     __tablename__ = "factor_correlations"
@@ -494,6 +522,24 @@ class FactorCorrelation(Base):
     )
 
 
+class FactorReturn(Base):
+    """Factor returns - persisted daily factor ETF returns shared by all factor consumers"""
+    __tablename__ = "factor_returns"
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)  # Factor ETF proxy (SPY, VTV, TLT, ...)
+    return_date: Mapped[date] = mapped_column(Date, nullable=False)
+    daily_return: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 12), nullable=True)  # NULL for the first stored close
+    version: Mapped[int] = mapped_column(Integer, nullable=False)  # FACTOR_RETURNS_VERSION that produced the row
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('symbol', 'return_date', 'version', name='uq_factor_returns_symbol_date_version'),
+        Index('idx_factor_returns_version_date', 'version', 'return_date'),
+    )
+
+
 class FundHoldings(Base):
     """Fund holdings - stores mutual fund and ETF holdings data (Section 1.4.9)"""
     __tablename__ = "fund_holdings"
@@ -4,7 +4,7 @@ Analytics API Response Schemas
 Pydantic models for portfolio analytics endpoints including portfolio overview,
 risk metrics, and performance data.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Union, List
 from datetime import datetime
 
@@ -255,6 +255,70 @@ class StressTestResponse(BaseModel):
     metadata: Optional[Dict[str, Union[str, List[str]]]] = Field(None, description="Additional metadata, including scenarios_requested if provided")
 
 
+class WhatIfStressScenario(BaseModel):
+    name: str = Field("What-if", description="Display name for the scenario")
+    shocked_factors: Dict[str, float] = Field(
+        ...,
+        min_length=1,
+        description="Factor shocks as decimal returns, keyed by stress factor name (e.g., {'Market': -0.10, 'Interest_Rate': 0.01})"
+    )
+
+    @field_validator("shocked_factors")
+    @classmethod
+    def validate_shocks(cls, v: Dict[str, float]) -> Dict[str, float]:
+        for factor, shock in v.items():
+            if not -1.0 <= shock <= 1.0:
+                raise ValueError(f"Shock for {factor} must be between -1.0 and 1.0")
+        return v
+
+
+class WhatIfPositionChange(BaseModel):
+    symbol: str = Field(..., min_length=1, description="Position symbol")
+    market_value_change: float = Field(..., description="Signed market value change in dollars (negative sells or shorts)")
+
+    @field_validator("symbol")
+    @classmethod
+    def normalize_symbol(cls, v: str) -> str:
+        return v.strip().upper()
+
+
+class WhatIfStressTestRequest(BaseModel):
+    scenarios: List[WhatIfStressScenario] = Field(..., min_length=1, max_length=50, description="Ad-hoc shock scenarios to evaluate")
+    position_changes: List[WhatIfPositionChange] = Field(
+        default_factory=list,
+        max_length=200,
+        description="Optional hypothetical position changes applied before shocking"
+    )
+
+
+class WhatIfScenarioResult(BaseModel):
+    name: str
+    shocked_factors: Dict[str, float]
+    direct_pnl: float = Field(..., description="P&L from shocked factors only")
+    correlated_pnl: float = Field(..., description="P&L with shocks propagated through factor correlations")
+    correlation_effect: float = Field(..., description="correlated_pnl - direct_pnl")
+    percentage_impact: float = Field(..., description="correlated_pnl as percentage points of net exposure")
+    loss_cap_applied: bool = Field(..., description="Whether the loss was capped at 99% of net exposure")
+    direct_factor_pnl: Dict[str, float] = Field(default_factory=dict, description="Direct P&L per shocked factor")
+    correlated_factor_pnl: Dict[str, float] = Field(default_factory=dict, description="Correlated P&L per exposure factor")
+
+
+class WhatIfStressTestPayload(BaseModel):
+    scenarios: List[WhatIfScenarioResult]
+    net_exposure: float
+    calculation_date: str
+    factor_exposures_date: Optional[str] = None
+    correlation_data_days: int
+    positions_changed: int = 0
+    symbols_without_betas: List[str] = Field(default_factory=list, description="Changed symbols with no factor betas (net exposure only)")
+
+
+class WhatIfStressTestResponse(BaseModel):
+    available: bool = Field(..., description="Whether the what-if stress test could be run")
+    data: Optional[WhatIfStressTestPayload] = Field(None, description="What-if results when available")
+    metadata: Optional[Dict[str, Union[str, bool, float]]] = Field(None, description="Reason when unavailable, cache and timing info")
+
+
 class RiskDateRange(BaseModel):
     start: str = Field(..., description="ISO date start of lookback window")
     end: str = Field(..., description="ISO date end of lookback window")
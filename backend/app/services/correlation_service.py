@@ -2,6 +2,7 @@
 Position-to-position correlation analysis service
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, date
 from decimal import Decimal
@@ -10,14 +11,14 @@ from uuid import UUID
 from collections import defaultdict
 import numpy as np
 import pandas as pd
-from scipy import stats
 from sqlalchemy import select, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models import (
     Portfolio, Position, MarketDataCache,
-    CorrelationCalculation, CorrelationCluster,
+    CorrelationCalculation, CorrelationCluster, CorrelationClusterNickname,
     CorrelationClusterPosition, PairwiseCorrelation
 )
 from sqlalchemy import delete
@@ -28,7 +29,23 @@ from app.schemas.correlations import (
     PositionFilterConfig, CorrelationCalculationCreate,
     PairwiseCorrelationCreate
 )
+from app.calculations.correlation_clusters import (
+    CorrelationClusterTree,
+    build_clusters,
+    find_correlation_components,
+    symbol_set_key,
+)
+from app.calculations.correlation_universe import (
+    UniverseCorrelationMatrix,
+    fix_psd,
+    min_pair_overlap,
+    pairwise_complete_statistics,
+)
 from app.calculations.market_data import get_position_valuation
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.datetime_utils import utc_now
+from app.services.correlation_storage import load_correlation_matrix, pack_correlation_matrix
 from app.services.market_data_service import MarketDataService
 from app.utils.trading_calendar import trading_calendar
 
@@ -38,10 +55,17 @@ logger = logging.getLogger(__name__)
 class CorrelationService:
     """Service for calculating position-to-position correlations"""
 
-    def __init__(self, db: AsyncSession, price_cache=None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        price_cache=None,
+        universe_correlations: Optional[Dict[int, UniverseCorrelationMatrix]] = None
+    ):
         self.db = db
         self.market_data_service = MarketDataService()
         self.price_cache = price_cache  # PriceCache for optimized price lookups
+        # Shared matrices from build_universe_correlations(), keyed by duration_days
+        self.universe_correlations = universe_correlations or {}
 
     async def _get_portfolio_value_from_snapshot(
         self,
@@ -168,7 +192,7 @@ class CorrelationService:
             )
             await self.db.execute(delete_clusters_stmt)
 
-            # Delete pairwise correlations
+            # Delete legacy pairwise correlations (pre-packed calculations)
             delete_pairs_stmt = delete(PairwiseCorrelation).where(
                 PairwiseCorrelation.correlation_calculation_id == calc_id
             )
@@ -265,52 +289,84 @@ class CorrelationService:
                 f"(excluded: {excluded_count} = {private_count} PRIVATE + {len(public_positions) - len(filtered_positions)} insignificant)"
             )
             
-            # Get position returns data
-            start_date = calculation_date - timedelta(days=duration_days)
-            returns_df = await self._get_position_returns(
-                filtered_positions, start_date, calculation_date
-            )
-
-            # Phase 8.1 Task 7a: Graceful skip instead of ValueError
-            if returns_df.empty:
-                logger.warning(
-                    f"No return data available for correlation calculation (portfolio {portfolio_id}). "
-                    f"All {private_count} PRIVATE positions were filtered. Skipping correlation calculation."
+            min_overlap = min_pair_overlap(duration_days)
+            shared = self.universe_correlations.get(duration_days)
+            if shared is not None and shared.calculation_date != calculation_date:
+                shared = None
+
+            if shared is not None:
+                # Slice the shared universe matrix (already PSD-repaired once for all portfolios)
+                correlation_matrix, overlaps, p_values = shared.slice(
+                    p.symbol for p in filtered_positions if p.symbol
+                )
+                valid_positions = list(correlation_matrix.columns)
+                psd_corrected = shared.psd_corrected
+
+                # Phase 8.1 Task 7a: Graceful skip instead of ValueError
+                if not valid_positions:
+                    logger.warning(
+                        f"No positions have sufficient data for correlation calculation (portfolio {portfolio_id}). "
+                        f"Skipping correlation calculation."
+                    )
+                    return None
+            else:
+                # Get position returns data
+                start_date = calculation_date - timedelta(days=duration_days)
+                returns_df = await self._get_position_returns(
+                    filtered_positions, start_date, calculation_date
                 )
-                # Note: No rollback needed - no changes were made, let caller manage transaction
-                return None  # Option B: Skip persistence, return None
 
-            # Validate data sufficiency (minimum 20 days)
-            valid_positions = self._validate_data_sufficiency(returns_df, min_days=20)
-            returns_df = returns_df[valid_positions]
+                # Phase 8.1 Task 7a: Graceful skip instead of ValueError
+                if returns_df.empty:
+                    logger.warning(
+                        f"No return data available for correlation calculation (portfolio {portfolio_id}). "
+                        f"All {private_count} PRIVATE positions were filtered. Skipping correlation calculation."
+                    )
+                    # Note: No rollback needed - no changes were made, let caller manage transaction
+                    return None  # Option B: Skip persistence, return None
+
+                # Validate data sufficiency (minimum 20 days)
+                valid_positions = self._validate_data_sufficiency(returns_df, min_days=20)
+                returns_df = returns_df[valid_positions]
+
+                # Phase 8.1 Task 7a: Graceful skip instead of ValueError
+                if returns_df.empty:
+                    logger.warning(
+                        f"No positions have sufficient data for correlation calculation (portfolio {portfolio_id}). "
+                        f"All positions have <20 days of data. Skipping correlation calculation."
+                    )
+                    # Note: No rollback needed - no changes were made, let caller manage transaction
+                    return None  # Option B: Skip persistence, return None
 
-            # Phase 8.1 Task 7a: Graceful skip instead of ValueError
-            if returns_df.empty:
-                logger.warning(
-                    f"No positions have sufficient data for correlation calculation (portfolio {portfolio_id}). "
-                    f"All positions have <20 days of data. Skipping correlation calculation."
-                )
-                # Note: No rollback needed - no changes were made, let caller manage transaction
-                return None  # Option B: Skip persistence, return None
-            
-            # Calculate pairwise correlations with adaptive minimum overlap requirement
-            # Require at least 1/3 of lookback period, minimum 20 days for statistical reliability
-            min_overlap = max(20, duration_days // 3)
-            correlation_matrix = self.calculate_pairwise_correlations(returns_df, min_periods=min_overlap)
+                # Calculate pairwise correlations with adaptive minimum overlap requirement
+                # Require at least 1/3 of lookback period, minimum 20 days for statistical reliability
+                correlation_matrix = self.calculate_pairwise_correlations(returns_df, min_periods=min_overlap)
+
+                # Validate and fix PSD property (Positive Semi-Definite matrix required for correlation)
+                correlation_matrix, psd_corrected = self._validate_and_fix_psd(correlation_matrix)
 
-            # Validate and fix PSD property (Positive Semi-Definite matrix required for correlation)
-            correlation_matrix, psd_corrected = self._validate_and_fix_psd(correlation_matrix)
+                # Same paired observations for data_points and the p-value
+                _, overlaps, p_values = self.calculate_pairwise_statistics(returns_df)
 
-            # SKIP CLUSTER DETECTION - Not used by frontend, causes hang bug on 3rd consecutive day
-            # The cluster/nickname generation was querying market data in a way that hung after 2-3 days
-            # Pairwise correlations are sufficient for the correlation matrix display
+            # Cluster detection is opt-in (CORRELATION_CLUSTERS_ENABLED) - not used by frontend.
+            # It was disabled after per-symbol sector queries in nickname generation hung
+            # after 2-3 days; nicknames now come from the nickname cache, misses are
+            # generated concurrently with one sector query per cluster.
             clusters = []
+            if settings.CORRELATION_CLUSTERS_ENABLED:
+                clusters = await self.detect_correlation_clusters(
+                    correlation_matrix,
+                    filtered_positions,
+                    portfolio_value,
+                    threshold=float(correlation_threshold),
+                    portfolio_id=portfolio_id
+                )
 
-            # Calculate portfolio-level metrics (without clusters)
+            # Calculate portfolio-level metrics
             metrics = self.calculate_portfolio_metrics(
                 correlation_matrix,
                 filtered_positions,
-                clusters  # Empty list
+                clusters
             )
             
             # Create calculation record
@@ -335,18 +391,23 @@ class CorrelationService:
             
             # Store correlation matrix
             await self._store_correlation_matrix(
-                calculation.id, correlation_matrix, returns_df
+                calculation, correlation_matrix, overlaps, p_values
             )
 
-            # SKIP STORING CLUSTERS - Not used by frontend/API
-            # Removed to eliminate hang bug in cluster nickname generation
-            # (was querying market data for sector info in a loop that hung on 3rd day)
+            if clusters:
+                await self._store_clusters(
+                    calculation.id, clusters, filtered_positions, portfolio_value, correlation_matrix
+                )
 
             # Log comprehensive data quality metrics before commit
             total_pairs = len(correlation_matrix) * len(correlation_matrix)
             valid_pairs = (~correlation_matrix.isna()).sum().sum()
             filtered_pairs = correlation_matrix.isna().sum().sum()
 
+            cluster_status = (
+                f"{len(clusters)} clusters" if settings.CORRELATION_CLUSTERS_ENABLED
+                else "SKIPPED (CORRELATION_CLUSTERS_ENABLED is off)"
+            )
             logger.info(
                 f"Correlation calculation data quality for portfolio {portfolio_id}:\n"
                 f"  - Duration: {duration_days} days\n"
@@ -356,10 +417,11 @@ class CorrelationService:
                 f"  - Total correlation pairs: {total_pairs}\n"
                 f"  - Valid pairs (sufficient data): {valid_pairs}\n"
                 f"  - Filtered pairs (insufficient overlap): {filtered_pairs}\n"
-                f"  - PSD validation: {'CORRECTED' if psd_corrected else 'PASSED'}\n"
+                f"  - PSD validation: {'CORRECTED' if psd_corrected else 'PASSED'}"
+                f"{' (shared universe matrix)' if shared is not None else ''}\n"
                 f"  - Overall correlation: {metrics['overall_correlation']:.4f}\n"
                 f"  - Effective positions: {metrics['effective_positions']:.2f}\n"
-                f"  - Cluster detection: SKIPPED (not used by frontend, was causing hang bug)"
+                f"  - Cluster detection: {cluster_status}"
             )
 
             # Note: Do NOT commit here - let caller manage transaction boundaries
@@ -468,6 +530,20 @@ class CorrelationService:
 
         return correlation_matrix
 
+    def calculate_pairwise_statistics(
+        self,
+        returns_df: pd.DataFrame
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pairwise-complete correlations, overlap counts and p-values in array operations.
+
+        See app.calculations.correlation_universe.pairwise_complete_statistics.
+
+        Returns:
+            Tuple of (correlations, overlaps, p_values), each (n_symbols x n_symbols)
+        """
+        return pairwise_complete_statistics(returns_df)
+
     def _validate_and_fix_psd(
         self,
         correlation_matrix: pd.DataFrame
@@ -488,144 +564,148 @@ class CorrelationService:
         Returns:
             Tuple of (corrected_matrix, was_corrected_flag)
         """
-        # Handle empty or all-NaN matrices
-        if correlation_matrix.empty or correlation_matrix.isna().all().all():
-            logger.warning("Empty or all-NaN correlation matrix, skipping PSD validation")
+        corrected, was_corrected = fix_psd(correlation_matrix.to_numpy(dtype=float))
+        if not was_corrected:
             return correlation_matrix, False
 
-        # Check for PSD property (all eigenvalues >= 0)
-        try:
-            eigenvalues = np.linalg.eigvalsh(correlation_matrix.values)
-            min_eigenvalue = np.min(eigenvalues)
-        except np.linalg.LinAlgError as e:
-            logger.error(f"Failed to compute eigenvalues for PSD validation: {e}")
-            return correlation_matrix, False
-
-        # Tolerance for numerical precision (-1e-10 allows for floating point errors)
-        if min_eigenvalue < -1e-10:
-            logger.warning(
-                f"Non-PSD correlation matrix detected. "
-                f"Min eigenvalue: {min_eigenvalue:.6f}. "
-                f"This indicates numerical issues or insufficient data. "
-                f"Applying nearest PSD correction..."
-            )
-
-            # Apply nearest PSD correction using eigenvalue clipping
-            # This is a simplified version of Higham's algorithm
-            eigenvalues_clipped = np.maximum(eigenvalues, 0)
-
-            # Reconstruct matrix from corrected eigenvalues
-            eigenvectors = np.linalg.eigh(correlation_matrix.values)[1]
-            corrected_matrix = eigenvectors @ np.diag(eigenvalues_clipped) @ eigenvectors.T
-
-            # Rescale to ensure diagonal = 1.0 (required for correlation matrix)
-            d = np.sqrt(np.diag(corrected_matrix))
-            # Avoid division by zero
-            d = np.where(d == 0, 1, d)
-            corrected_matrix = corrected_matrix / d[:, None] / d[None, :]
-
-            # Convert back to DataFrame with original index/columns
-            corrected_df = pd.DataFrame(
-                corrected_matrix,
-                index=correlation_matrix.index,
-                columns=correlation_matrix.columns
-            )
-
-            logger.info(
-                f"PSD correction applied. "
-                f"New min eigenvalue: {np.min(np.linalg.eigvalsh(corrected_df.values)):.6f}"
-            )
-
-            return corrected_df, True
-
-        # Matrix is already PSD
-        return correlation_matrix, False
+        corrected_df = pd.DataFrame(
+            corrected,
+            index=correlation_matrix.index,
+            columns=correlation_matrix.columns
+        )
+        return corrected_df, True
 
     async def detect_correlation_clusters(
         self,
         correlation_matrix: pd.DataFrame,
         positions: List[Position],
         portfolio_value: Decimal,
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        portfolio_id: Optional[UUID] = None
     ) -> List[Dict]:
         """
         Identify clusters of highly correlated positions using graph connectivity
+
+        Clusters are connected components of the |corr| >= threshold graph with
+        2+ positions, largest first (see app.calculations.correlation_clusters).
+        Nicknames come from the nickname cache when portfolio_id is given.
         """
         logger.debug(f"[SEARCH] Detecting correlation clusters (threshold: {threshold})")
         symbols = list(correlation_matrix.columns)
         n = len(symbols)
         logger.debug(f"  Correlation matrix: {n} symbols")
 
-        # Create adjacency matrix based on correlation threshold
-        adj_matrix = (correlation_matrix.abs() >= threshold).values
-
-        # Find connected components using depth-first search
-        visited = [False] * n
-        clusters = []
-
-        def dfs(node: int, cluster: List[int]):
-            visited[node] = True
-            cluster.append(node)
-
-            for neighbor in range(n):
-                if not visited[neighbor] and adj_matrix[node][neighbor] and node != neighbor:
-                    dfs(neighbor, cluster)
-
-        # Find all clusters
-        logger.debug(f"  Finding connected components via DFS...")
-        for i in range(n):
-            if not visited[i]:
-                cluster_indices = []
-                dfs(i, cluster_indices)
-
-                # Only consider clusters with 2+ positions
-                if len(cluster_indices) >= 2:
-                    cluster_symbols = [symbols[idx] for idx in cluster_indices]
-                    logger.debug(f"  Found cluster with {len(cluster_symbols)} symbols: {cluster_symbols[:3]}...")
-
-                    # Calculate average correlation within cluster
-                    cluster_corr_values = []
-                    for j, idx1 in enumerate(cluster_indices):
-                        for idx2 in cluster_indices[j+1:]:
-                            cluster_corr_values.append(
-                                correlation_matrix.iloc[idx1, idx2]
-                            )
-
-                    avg_correlation = np.mean(cluster_corr_values) if cluster_corr_values else 0
-                    logger.debug(f"    Avg correlation: {avg_correlation:.4f}")
+        # Connected components of the |corr| >= threshold graph (sparse, non-recursive)
+        labels = find_correlation_components(correlation_matrix.to_numpy(dtype=float), threshold)
+        clusters = build_clusters(symbols, correlation_matrix.to_numpy(dtype=float), labels)
 
-                    # Generate cluster nickname
-                    logger.debug(f"    Generating nickname...")
-                    nickname = await self.generate_cluster_nickname(
-                        cluster_symbols, positions
-                    )
-                    logger.debug(f"    [OK] Nickname generated: {nickname}")
-                    
-                    clusters.append({
-                        "symbols": cluster_symbols,
-                        "indices": cluster_indices,
-                        "avg_correlation": Decimal(str(avg_correlation)),
-                        "nickname": nickname
-                    })
-                    logger.debug(f"    Cluster added to results")
+        for cluster in clusters:
+            logger.debug(
+                f"  Found cluster with {len(cluster['symbols'])} symbols: {cluster['symbols'][:3]}... "
+                f"(avg correlation {cluster['avg_correlation']:.4f})"
+            )
+            cluster["avg_correlation"] = Decimal(str(cluster["avg_correlation"]))
 
-        # Sort clusters by size (descending)
-        clusters.sort(key=lambda x: len(x["symbols"]), reverse=True)
+        await self.assign_cluster_nicknames(clusters, positions, portfolio_id)
 
         logger.debug(f"[OK] Detected {len(clusters)} clusters total")
         return clusters
-    
+
+    async def assign_cluster_nicknames(
+        self,
+        clusters: List[Dict],
+        positions: List[Position],
+        portfolio_id: Optional[UUID] = None
+    ) -> None:
+        """
+        Set cluster["nickname"] for every cluster, reusing cached nicknames
+
+        Nicknames are cached per (portfolio, symbol_set_key(symbols)) for
+        CLUSTER_NICKNAME_TTL_DAYS, so unchanged clusters cost one lookup for all
+        of them. Misses are generated concurrently (at most
+        CLUSTER_NICKNAME_CONCURRENCY at once, each on its own session) and
+        upserted back into the cache. Without a portfolio_id nothing is cached.
+        """
+        if not clusters:
+            return
+
+        keys = [symbol_set_key(cluster["symbols"]) for cluster in clusters]
+        nicknames: Dict[str, str] = {}
+
+        if portfolio_id is not None:
+            cutoff = utc_now() - timedelta(days=settings.CLUSTER_NICKNAME_TTL_DAYS)
+            result = await self.db.execute(
+                select(
+                    CorrelationClusterNickname.symbol_set_hash,
+                    CorrelationClusterNickname.nickname
+                ).where(
+                    and_(
+                        CorrelationClusterNickname.portfolio_id == portfolio_id,
+                        CorrelationClusterNickname.symbol_set_hash.in_(set(keys)),
+                        CorrelationClusterNickname.generated_at >= cutoff
+                    )
+                )
+            )
+            nicknames.update({key: nickname for key, nickname in result.all()})
+
+        misses = {
+            key: cluster["symbols"]
+            for key, cluster in zip(keys, clusters)
+            if key not in nicknames
+        }
+        logger.debug(f"  Cluster nicknames: {len(clusters) - len(misses)} cached, {len(misses)} to generate")
+
+        if misses:
+            semaphore = asyncio.Semaphore(max(1, settings.CLUSTER_NICKNAME_CONCURRENCY))
+
+            async def generate(cluster_symbols: List[str]) -> str:
+                async with semaphore:
+                    async with AsyncSessionLocal() as db:
+                        return await self.generate_cluster_nickname(cluster_symbols, positions, db=db)
+
+            generated = await asyncio.gather(*(generate(symbols) for symbols in misses.values()))
+            nicknames.update(zip(misses, generated))
+
+            if portfolio_id is not None:
+                generated_at = utc_now()
+                stmt = pg_insert(CorrelationClusterNickname).values([
+                    {
+                        "portfolio_id": portfolio_id,
+                        "symbol_set_hash": key,
+                        "symbol_count": len(set(misses[key])),
+                        "nickname": nicknames[key][:100],
+                        "generated_at": generated_at,
+                    }
+                    for key in misses
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    constraint="uq_cluster_nicknames_portfolio_symbol_set",
+                    set_={
+                        "nickname": stmt.excluded.nickname,
+                        "symbol_count": stmt.excluded.symbol_count,
+                        "generated_at": stmt.excluded.generated_at,
+                    }
+                )
+                await self.db.execute(stmt)
+
+        for key, cluster in zip(keys, clusters):
+            cluster["nickname"] = nicknames[key]
+
     async def generate_cluster_nickname(
         self,
         cluster_symbols: List[str],
-        positions: List[Position]
+        positions: List[Position],
+        db: Optional[AsyncSession] = None
     ) -> str:
         """
         Generate human-readable cluster nickname using waterfall logic:
         1. Common tags
         2. Common sector
         3. Largest position + "lookalikes"
+
+        Queries run on db when given (concurrent generation), else self.db.
         """
+        db = db or self.db
         logger.debug(f"[SEARCH] Generating nickname for cluster: {cluster_symbols[:3]}... ({len(cluster_symbols)} symbols)")
 
         # Create symbol to position mapping
@@ -648,7 +728,7 @@ class CorrelationService:
                     .where(PositionTag.position_id.in_(position_ids))
                     .where(TagV2.is_archived == False)
                 )
-                result = await self.db.execute(tag_query)
+                result = await db.execute(tag_query)
                 tags = result.scalars().all()
                 logger.debug(f"  Found {len(tags)} tags")
 
@@ -666,22 +746,15 @@ class CorrelationService:
         
         # 2. Check for common sector
         logger.debug(f"  Step 2: Checking common sectors for {len(cluster_symbols)} symbols")
-        sectors = []
-        for i, symbol in enumerate(cluster_symbols):
-            logger.debug(f"    Querying sector for symbol {i+1}/{len(cluster_symbols)}: {symbol}")
-            # Query market data cache for sector info
-            query = select(MarketDataCache).where(
-                MarketDataCache.symbol == symbol
-            ).order_by(MarketDataCache.date.desc()).limit(1)
-
-            result = await self.db.execute(query)
-            market_data = result.scalar_one_or_none()
-
-            if market_data and market_data.sector:
-                sectors.append(market_data.sector)
-                logger.debug(f"      Found sector: {market_data.sector}")
-            else:
-                logger.debug(f"      No sector data")
+        # Latest market data row per symbol, one query for the whole cluster
+        sector_query = (
+            select(MarketDataCache.symbol, MarketDataCache.sector)
+            .where(MarketDataCache.symbol.in_(cluster_symbols))
+            .order_by(MarketDataCache.symbol, MarketDataCache.date.desc())
+            .distinct(MarketDataCache.symbol)
+        )
+        result = await db.execute(sector_query)
+        sectors = [sector for _, sector in result.all() if sector]
         
         logger.debug(f"  Collected {len(sectors)} sector values from {len(cluster_symbols)} symbols")
 
@@ -728,7 +801,7 @@ class CorrelationService:
         """
         # Get upper triangle of correlation matrix (excluding diagonal)
         upper_triangle = np.triu(correlation_matrix.values, k=1)
-        non_zero_correlations = upper_triangle[upper_triangle != 0]
+        non_zero_correlations = upper_triangle[(upper_triangle != 0) & ~np.isnan(upper_triangle)]
         
         # Overall correlation (average pairwise correlation)
         overall_correlation = (
@@ -1027,54 +1100,46 @@ class CorrelationService:
     
     async def _store_correlation_matrix(
         self,
-        calculation_id: UUID,
+        calculation: CorrelationCalculation,
         correlation_matrix: pd.DataFrame,
-        returns_df: pd.DataFrame
+        overlaps: np.ndarray,
+        p_values: np.ndarray
     ):
-        """Store full correlation matrix including both directions and self-correlations"""
-        correlations_to_store = []
-        
-        for symbol1 in correlation_matrix.columns:
-            for symbol2 in correlation_matrix.columns:
-                # Store all pairs including self-correlations
-                correlation_value = correlation_matrix.loc[symbol1, symbol2]
-
-                # Get paired observations (both symbols must have data)
-                # CRITICAL: Use same observations for both data_points count and stats.pearsonr()
-                paired_data = returns_df[[symbol1, symbol2]].dropna()
-                data_points = len(paired_data)
-
-                # Calculate statistical significance (p-value)
-                if symbol1 != symbol2 and data_points >= 3:
-                    # Use scipy stats for p-value calculation on SAME paired observations
-                    _, p_value = stats.pearsonr(
-                        paired_data[symbol1],  # ← Same observations as data_points
-                        paired_data[symbol2]   # ← Same observations as data_points
-                    )
-                    statistical_significance = Decimal(str(1 - p_value))
+        """
+        Store the correlation matrix packed on the calculation row.
 
-                    # Log low-confidence correlations (p > 0.05 = less than 95% confidence)
-                    if p_value > 0.05:
-                        logger.debug(
-                            f"Low-confidence correlation: {symbol1}-{symbol2} "
-                            f"(r={correlation_value:.3f}, p={p_value:.3f}, n={data_points})"
-                        )
-                else:
-                    statistical_significance = Decimal("1") if symbol1 == symbol2 else None
-                
-                pairwise_corr = PairwiseCorrelation(
-                    correlation_calculation_id=calculation_id,
-                    symbol_1=symbol1,
-                    symbol_2=symbol2,
-                    correlation_value=Decimal(str(correlation_value)),
-                    data_points=data_points,
-                    statistical_significance=statistical_significance
+        Stores the upper triangle (self-correlations included) with paired
+        observation counts and significance (1 - p-value); see
+        app.services.correlation_storage.
+
+        Args:
+            calculation: Calculation row to populate
+            correlation_matrix: Final (PSD-repaired) correlation matrix
+            overlaps: Paired observation counts, same symbol order
+            p_values: Pairwise p-values, same symbol order
+        """
+        symbols = list(correlation_matrix.columns)
+        significance = 1.0 - p_values
+
+        # Log low-confidence correlations (p > 0.05 = less than 95% confidence)
+        low_confidence = np.triu(p_values > 0.05, k=1)
+        if low_confidence.any() and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"{int(low_confidence.sum())} low-confidence correlation pairs (p > 0.05): "
+                + ", ".join(
+                    f"{symbols[i]}-{symbols[j]} (r={correlation_matrix.iat[i, j]:.3f}, "
+                    f"p={p_values[i, j]:.3f}, n={overlaps[i, j]})"
+                    for i, j in zip(*np.nonzero(low_confidence))
                 )
-                
-                correlations_to_store.append(pairwise_corr)
-        
-        # Bulk insert
-        self.db.add_all(correlations_to_store)
+            )
+
+        pack_correlation_matrix(
+            calculation,
+            symbols,
+            correlation_matrix.to_numpy(dtype=float),
+            overlaps,
+            significance
+        )
         await self.db.flush()
     
     async def _store_clusters(
@@ -1130,6 +1195,7 @@ class CorrelationService:
                     if (
                         position.symbol in correlation_matrix.index
                         and other_symbol in correlation_matrix.columns
+                        and not pd.isna(correlation_matrix.loc[position.symbol, other_symbol])
                     ):
                         correlation_values.append(
                             Decimal(
@@ -1205,25 +1271,15 @@ class CorrelationService:
                 },
             }
 
-        # 2) Load pairwise correlations for this calculation with overlap filter
-        pairs_query = (
-            select(PairwiseCorrelation)
-            .where(
-                and_(
-                    PairwiseCorrelation.correlation_calculation_id == calculation.id,
-                    PairwiseCorrelation.data_points >= min_overlap,
-                )
-            )
-        )
-        pairs_result = await self.db.execute(pairs_query)
-        pairs: List[PairwiseCorrelation] = list(pairs_result.scalars().all())
-
-        # Build symbol set (exclude self-correlations for set construction)
+        # 2) Load the correlation matrix; pairs below min_overlap are treated as missing
+        matrix_data = await load_correlation_matrix(self.db, calculation)
         symbol_set: Set[str] = set()
-        for p in pairs:
-            if p.symbol_1 and p.symbol_2 and p.symbol_1 != p.symbol_2:
-                symbol_set.add(p.symbol_1)
-                symbol_set.add(p.symbol_2)
+        if matrix_data is not None:
+            usable = matrix_data.overlaps >= min_overlap
+            np.fill_diagonal(usable, False)  # Exclude self-correlations for set construction
+            symbol_set = {
+                symbol for symbol, has_pair in zip(matrix_data.symbols, usable.any(axis=1)) if has_pair
+            }
 
         if len(symbol_set) < 2:
             return {
@@ -1267,39 +1323,20 @@ class CorrelationService:
             equal = 1.0 / float(len(symbol_set))
             weights = {s: equal for s in symbol_set}
 
-        # 4) Build unique unordered pairs and aggregate
+        # 4) Aggregate over unique unordered pairs (upper triangle)
         #    Use absolute correlation for weighted similarity metric.
-        seen_pairs: Set[frozenset] = set()
-        # Build a lookup for correlations to avoid repeated scans
-        corr_lookup: Dict[Tuple[str, str], float] = {}
-        for p in pairs:
-            if p.symbol_1 and p.symbol_2 and p.symbol_1 != p.symbol_2:
-                corr_lookup[(p.symbol_1, p.symbol_2)] = float(p.correlation_value)
-
-        numerator = 0.0
-        denominator = 0.0
+        index = matrix_data.symbol_index()
         symbols_list = sorted(symbol_set)
-        for i in range(len(symbols_list)):
-            for j in range(i + 1, len(symbols_list)):
-                s1 = symbols_list[i]
-                s2 = symbols_list[j]
-                key = frozenset({s1, s2})
-                if key in seen_pairs:
-                    continue
-                seen_pairs.add(key)
-                # correlation may be stored in either direction
-                c = corr_lookup.get((s1, s2))
-                if c is None:
-                    c = corr_lookup.get((s2, s1))
-                if c is None:
-                    continue  # pair removed by min_overlap or not present
-                w1 = weights.get(s1, 0.0)
-                w2 = weights.get(s2, 0.0)
-                w_prod = w1 * w2
-                if w_prod <= 0:
-                    continue
-                numerator += w_prod * abs(c)
-                denominator += w_prod
+        positions = np.array([index[s] for s in symbols_list])
+        w = np.array([weights.get(s, 0.0) for s in symbols_list])
+
+        sub_corr = matrix_data.correlations[np.ix_(positions, positions)]
+        sub_usable = usable[np.ix_(positions, positions)] & ~np.isnan(sub_corr)
+        w_prod = np.outer(w, w)
+        pair_mask = np.triu(sub_usable & (w_prod > 0), k=1)
+
+        numerator = float(np.sum(w_prod[pair_mask] * np.abs(sub_corr[pair_mask])))
+        denominator = float(np.sum(w_prod[pair_mask]))
 
         if denominator <= 0:
             return {
@@ -1332,6 +1369,69 @@ class CorrelationService:
             },
         }
     
+    async def get_cluster_hierarchy(
+        self,
+        portfolio_id: UUID,
+        thresholds: List[float],
+        lookback_days: int = 90
+    ) -> Dict:
+        """
+        Correlation clusters at several thresholds from the latest stored matrix.
+
+        The single-linkage hierarchy is built once; each threshold is a cut of
+        it (same clusters as detect_correlation_clusters at that threshold,
+        without nicknames).
+
+        Args:
+            portfolio_id: Portfolio UUID
+            thresholds: Absolute correlation thresholds (e.g. [0.5, 0.7, 0.9])
+            lookback_days: Duration of the calculation period
+
+        Returns:
+            Dict with available flag, clusters per threshold and metadata
+        """
+        stmt = select(CorrelationCalculation).where(
+            and_(
+                CorrelationCalculation.portfolio_id == portfolio_id,
+                CorrelationCalculation.duration_days == lookback_days
+            )
+        ).order_by(CorrelationCalculation.calculation_date.desc()).limit(1)
+        calculation = (await self.db.execute(stmt)).scalar_one_or_none()
+
+        matrix_data = await load_correlation_matrix(self.db, calculation) if calculation else None
+        if matrix_data is None:
+            return {
+                "available": False,
+                "metadata": {
+                    "reason": "no_calculation_available",
+                    "lookback_days": lookback_days,
+                },
+            }
+
+        tree = CorrelationClusterTree(matrix_data.symbols, matrix_data.correlations)
+        clusters_by_threshold = tree.clusters_at(thresholds)
+
+        return {
+            "available": True,
+            "thresholds": {
+                str(threshold): [
+                    {
+                        "symbols": cluster["symbols"],
+                        "size": len(cluster["symbols"]),
+                        "avg_correlation": cluster["avg_correlation"],
+                    }
+                    for cluster in clusters
+                ]
+                for threshold, clusters in clusters_by_threshold.items()
+            },
+            "metadata": {
+                "calculation_id": str(calculation.id),
+                "calculation_date": calculation.calculation_date.isoformat() if calculation.calculation_date else None,
+                "lookback_days": lookback_days,
+                "symbols_included": len(matrix_data.symbols),
+            },
+        }
+
     async def get_matrix(
         self,
         portfolio_id: UUID,
@@ -1384,20 +1484,14 @@ class CorrelationService:
                     }
                 }
             
-            # Get all pairwise correlations for this calculation
-            corr_stmt = select(PairwiseCorrelation).where(
-                PairwiseCorrelation.correlation_calculation_id == calculation.id
+            # Load the correlation matrix and apply the min_overlap filter
+            matrix_data = await load_correlation_matrix(self.db, calculation)
+            usable = (
+                matrix_data.overlaps >= min_overlap
+                if matrix_data is not None else np.zeros((0, 0), dtype=bool)
             )
-            corr_result = await self.db.execute(corr_stmt)
-            correlations = corr_result.scalars().all()
-            
-            # Filter by min_overlap
-            filtered_correlations = [
-                c for c in correlations
-                if c.data_points >= min_overlap
-            ]
 
-            if not filtered_correlations:
+            if not usable.any():
                 # Compute data_quality when insufficient data
                 data_quality = await self._compute_data_quality(
                     portfolio_id=portfolio_id,
@@ -1434,11 +1528,10 @@ class CorrelationService:
                 if valuation.abs_market_value > 0:
                     symbol_weights[pos.symbol] = float(valuation.abs_market_value)
             
-            # Get unique symbols from correlations
-            symbols = set()
-            for corr in filtered_correlations:
-                symbols.add(corr.symbol_1)
-                symbols.add(corr.symbol_2)
+            # Symbols with at least one pair (self-correlations included) meeting min_overlap
+            symbols = {
+                symbol for symbol, has_pair in zip(matrix_data.symbols, usable.any(axis=1)) if has_pair
+            }
             
             # Order symbols by weight (descending), then alphabetically for those not in portfolio
             ordered_symbols = sorted(
@@ -1450,27 +1543,22 @@ class CorrelationService:
             if len(ordered_symbols) > max_symbols:
                 ordered_symbols = ordered_symbols[:max_symbols]
             
-            # Build the matrix as nested dictionary
-            matrix = {}
-            for symbol1 in ordered_symbols:
-                matrix[symbol1] = {}
-                for symbol2 in ordered_symbols:
-                    if symbol1 == symbol2:
-                        matrix[symbol1][symbol2] = 1.0
-                    else:
-                        # Find correlation value (checking both directions)
-                        corr_value = None
-                        for corr in filtered_correlations:
-                            if (corr.symbol_1 == symbol1 and corr.symbol_2 == symbol2) or \
-                               (corr.symbol_1 == symbol2 and corr.symbol_2 == symbol1):
-                                corr_value = float(corr.correlation_value)
-                                break
-                        
-                        if corr_value is not None:
-                            matrix[symbol1][symbol2] = corr_value
-                        else:
-                            # This shouldn't happen if data is complete, but handle gracefully
-                            matrix[symbol1][symbol2] = 0.0
+            # Build the matrix as nested dictionary (0.0 for pairs filtered by min_overlap)
+            index = matrix_data.symbol_index()
+            positions = [index[s] for s in ordered_symbols]
+            sub_corr = np.where(
+                usable[np.ix_(positions, positions)],
+                matrix_data.correlations[np.ix_(positions, positions)],
+                0.0
+            )
+            np.fill_diagonal(sub_corr, 1.0)
+            matrix = {
+                symbol1: {
+                    symbol2: float(sub_corr[i, j])
+                    for j, symbol2 in enumerate(ordered_symbols)
+                }
+                for i, symbol1 in enumerate(ordered_symbols)
+            }
             
             # Check if we have enough symbols
             if len(ordered_symbols) < 2:
@@ -0,0 +1,159 @@
+"""
+Packed correlation matrix storage
+
+Each CorrelationCalculation stores its matrix on the calculation row itself
+instead of as N² pairwise_correlations rows (3,600 rows per lookback per day
+for a 60-position portfolio):
+- matrix_symbols: symbol order (JSON list)
+- packed_correlations: float32 upper triangle, diagonal included, row-major
+- packed_overlaps: int16 paired observation counts (diagonal = the symbol's
+  own observation count), same layout
+- packed_significance: float32 1 - p-value, same layout (NaN = not computed)
+
+All arrays are little-endian. Calculations written before the packed format
+(and not yet migrated) are read from pairwise_correlations instead, so
+readers only ever see CorrelationMatrixData.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.correlations import CorrelationCalculation, PairwiseCorrelation
+
+CORRELATION_DTYPE = np.dtype('<f4')
+OVERLAP_DTYPE = np.dtype('<i2')
+MAX_STORED_OVERLAP = np.iinfo(OVERLAP_DTYPE).max
+
+
+@dataclass
+class CorrelationMatrixData:
+    """Full symmetric matrices for one correlation calculation."""
+    symbols: List[str]
+    correlations: np.ndarray  # (n x n), NaN where not computed
+    overlaps: np.ndarray  # (n x n) paired observation counts
+    significance: np.ndarray  # (n x n) 1 - p-value, NaN where not computed
+
+    def symbol_index(self) -> dict:
+        """{symbol: row/column index}"""
+        return {symbol: i for i, symbol in enumerate(self.symbols)}
+
+
+def pack_upper_triangle(matrix: np.ndarray, dtype: np.dtype) -> bytes:
+    """Serialize the upper triangle (diagonal included) of a square matrix."""
+    rows, cols = np.triu_indices(matrix.shape[0])
+    return np.ascontiguousarray(matrix[rows, cols], dtype=dtype).tobytes()
+
+
+def unpack_upper_triangle(payload: bytes, n: int, dtype: np.dtype) -> np.ndarray:
+    """Rebuild the full symmetric (n x n) float matrix from pack_upper_triangle() output."""
+    values = np.frombuffer(payload, dtype=dtype).astype(np.float64)
+    rows, cols = np.triu_indices(n)
+    if values.size != rows.size:
+        raise ValueError(f"Packed matrix has {values.size} values, expected {rows.size} for {n} symbols")
+    matrix = np.empty((n, n))
+    matrix[rows, cols] = values
+    matrix[cols, rows] = values
+    return matrix
+
+
+def pack_correlation_matrix(
+    calculation: CorrelationCalculation,
+    symbols: List[str],
+    correlations: np.ndarray,
+    overlaps: np.ndarray,
+    significance: Optional[np.ndarray] = None
+) -> None:
+    """
+    Store a correlation matrix on its calculation row.
+
+    Args:
+        calculation: Calculation to populate (not flushed here)
+        symbols: Row/column order of the matrices
+        correlations: (n x n) correlation matrix
+        overlaps: (n x n) paired observation counts (clipped to int16)
+        significance: Optional (n x n) 1 - p-value matrix
+    """
+    n = len(symbols)
+    if significance is None:
+        significance = np.full((n, n), np.nan)
+
+    calculation.matrix_symbols = list(symbols)
+    calculation.packed_correlations = pack_upper_triangle(np.asarray(correlations, dtype=float), CORRELATION_DTYPE)
+    calculation.packed_overlaps = pack_upper_triangle(
+        np.clip(np.asarray(overlaps), 0, MAX_STORED_OVERLAP), OVERLAP_DTYPE
+    )
+    calculation.packed_significance = pack_upper_triangle(np.asarray(significance, dtype=float), CORRELATION_DTYPE)
+
+
+def unpack_correlation_matrix(calculation: CorrelationCalculation) -> Optional[CorrelationMatrixData]:
+    """Decode the packed matrix on a calculation row (None if it has none)."""
+    if calculation.packed_correlations is None or calculation.matrix_symbols is None:
+        return None
+
+    symbols = list(calculation.matrix_symbols)
+    n = len(symbols)
+    significance = (
+        unpack_upper_triangle(calculation.packed_significance, n, CORRELATION_DTYPE)
+        if calculation.packed_significance is not None
+        else np.full((n, n), np.nan)
+    )
+    return CorrelationMatrixData(
+        symbols=symbols,
+        correlations=unpack_upper_triangle(calculation.packed_correlations, n, CORRELATION_DTYPE),
+        overlaps=unpack_upper_triangle(calculation.packed_overlaps, n, OVERLAP_DTYPE).astype(np.int64),
+        significance=significance,
+    )
+
+
+async def load_correlation_matrix(
+    db: AsyncSession,
+    calculation: CorrelationCalculation
+) -> Optional[CorrelationMatrixData]:
+    """
+    Load the matrix for a calculation - CANONICAL CORRELATION MATRIX READER
+
+    Decodes the packed columns, falling back to legacy pairwise_correlations
+    rows for calculations stored before the packed format.
+
+    Returns:
+        CorrelationMatrixData, or None if the calculation has no matrix
+    """
+    packed = unpack_correlation_matrix(calculation)
+    if packed is not None:
+        return packed
+
+    result = await db.execute(
+        select(
+            PairwiseCorrelation.symbol_1,
+            PairwiseCorrelation.symbol_2,
+            PairwiseCorrelation.correlation_value,
+            PairwiseCorrelation.data_points,
+            PairwiseCorrelation.statistical_significance
+        ).where(PairwiseCorrelation.correlation_calculation_id == calculation.id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    symbols = sorted({row[0] for row in rows} | {row[1] for row in rows})
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    n = len(symbols)
+    correlations = np.full((n, n), np.nan)
+    overlaps = np.zeros((n, n), dtype=np.int64)
+    significance = np.full((n, n), np.nan)
+    for symbol_1, symbol_2, value, data_points, p_complement in rows:
+        for i, j in ((index[symbol_1], index[symbol_2]), (index[symbol_2], index[symbol_1])):
+            correlations[i, j] = float(value)
+            overlaps[i, j] = data_points
+            if p_complement is not None:
+                significance[i, j] = float(p_complement)
+
+    return CorrelationMatrixData(
+        symbols=symbols,
+        correlations=correlations,
+        overlaps=overlaps,
+        significance=significance,
+    )
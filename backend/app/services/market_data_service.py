@@ -550,7 +550,9 @@ class MarketDataService:
     async def fetch_options_chain(
         self, 
         symbol: str, 
-        expiration_date: Optional[date] = None
+        expiration_date: Optional[date] = None,
+        underlying_price: Optional[float] = None,
+        mid_prices: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch options chain data from Polygon.io
@@ -558,9 +560,12 @@ class MarketDataService:
         Args:
             symbol: Underlying symbol
             expiration_date: Specific expiration date (optional)
+            underlying_price: Current underlying price (optional, for implied vols)
+            mid_prices: Contract ticker -> bid/ask mid (optional, for implied vols)
             
         Returns:
-            List of option contract data
+            List of option contract data; with underlying_price and mid_prices,
+            each contract also has 'implied_volatility' (None if not solvable)
         """
         logger.info(f"Fetching options chain for {symbol}")
         
@@ -624,12 +629,51 @@ class MarketDataService:
                 })
             
             logger.info(f"Fetched {len(options_data)} option contracts for {symbol} across {page_count} page(s)")
+
+            if underlying_price and mid_prices:
+                self._add_chain_implied_volatilities(options_data, underlying_price, mid_prices)
             return options_data
             
         except Exception as e:
             logger.error(f"Error fetching options chain for {symbol}: {str(e)}")
             return []
     
+    def _add_chain_implied_volatilities(
+        self,
+        options_data: List[Dict[str, Any]],
+        underlying_price: float,
+        mid_prices: Dict[str, float]
+    ) -> None:
+        """
+        Solve implied volatilities for a whole chain in one call (cached per contract and quote)
+
+        Uses the decimal risk-free rate; the /100 mibian rate convention stays
+        inside the Greeks path only.
+        """
+        from app.calculations.greeks import get_risk_free_rate, calculate_time_to_expiry
+        from app.calculations.implied_volatility import get_contract_implied_volatilities
+
+        rate = get_risk_free_rate({})
+        contracts = [
+            {
+                'symbol': contract['ticker'],
+                'option_price': float(mid_prices[contract['ticker']]),
+                'underlying_price': float(underlying_price),
+                'strike': float(contract['strike_price']),
+                'time_to_expiry': calculate_time_to_expiry(contract['expiration_date']),
+                'risk_free_rate': rate,
+                'is_call': contract['contract_type'] == 'call',
+            }
+            for contract in options_data
+            if mid_prices.get(contract['ticker'])
+        ]
+        implied_vols = (
+            get_contract_implied_volatilities(contracts, date.today(), namespace="chain")
+            if contracts else {}
+        )
+        for contract in options_data:
+            contract['implied_volatility'] = implied_vols.get(contract['ticker'])
+
     async def update_market_data_cache(
         self, 
         db: AsyncSession, 
@@ -10,16 +10,25 @@ Key insight: Factor beta is intrinsic to the symbol, not the position.
 AAPL's momentum beta is the same regardless of which portfolio holds it.
 So we calculate once per symbol, then aggregate per portfolio.
 
+Batch aggregation (aggregate_all_portfolio_factors) does this for every
+portfolio at once: one positions query builds a sparse portfolio x symbol
+weight matrix, one symbol_factor_exposures query builds a symbol x factor
+beta matrix, and a single product gives every portfolio's exposures,
+bulk-upserted into factor_exposures.
+
 Created: 2025-12-20
 Part of Symbol Factor Universe Architecture (Phase 3)
 """
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Any, Tuple
-from uuid import UUID
+from uuid import UUID, uuid4
 
+import numpy as np
+from scipy import sparse
 from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.users import Portfolio
@@ -51,6 +60,16 @@ OLS_FACTORS = {
 # All factor names for reference
 ALL_FACTOR_NAMES = set(RIDGE_FACTORS) | set(SPREAD_FACTORS) | set(OLS_FACTORS.keys())
 
+# Factor families aggregated (and stored) independently, keyed by result field
+FACTOR_FAMILIES = {
+    'ridge_betas': RIDGE_FACTORS,
+    'spread_betas': SPREAD_FACTORS,
+    'ols_betas': list(OLS_FACTORS.keys()),
+}
+
+# Rows per factor_exposures INSERT statement (8 bind params per row)
+FACTOR_EXPOSURE_UPSERT_CHUNK_ROWS = 2000
+
 
 async def load_symbol_betas_from_cache(
     symbols: List[str],
@@ -254,6 +273,284 @@ def aggregate_symbol_betas_to_portfolio(
     return portfolio_betas
 
 
+def aggregate_factor_matrix(
+    position_weights_by_portfolio: Dict[UUID, List[PositionWeight]],
+    symbol_betas: Dict[str, Dict[str, float]],
+    factor_names: List[str],
+    use_delta_adjusted: bool = False
+) -> Dict[UUID, Dict[str, float]]:
+    """
+    aggregate_symbol_betas_to_portfolio() for many portfolios in one sparse product.
+
+    Same semantics per portfolio, with symbol_betas filtered to factor_names:
+    - effective weight = weight (x delta for options with a known delta when
+      use_delta_adjusted), summed over positions in the same symbol
+    - a symbol without a beta for a factor contributes 0
+    - a portfolio reports exactly the factors that at least one of its
+      symbols has a beta for (empty dict if none)
+
+    Args:
+        position_weights_by_portfolio: {portfolio_id: [PositionWeight]}
+        symbol_betas: {symbol: {factor_name: beta}} (may include other factors)
+        factor_names: Factors to aggregate (one family)
+        use_delta_adjusted: Apply delta adjustment for options
+
+    Returns:
+        {portfolio_id: {factor_name: portfolio_beta}}
+    """
+    portfolio_ids = list(position_weights_by_portfolio)
+    symbols = sorted(
+        symbol for symbol, betas in symbol_betas.items()
+        if any(fn in betas for fn in factor_names)
+    )
+    if not portfolio_ids:
+        return {}
+    if not symbols:
+        return {pid: {} for pid in portfolio_ids}
+
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    rows, cols, weights = [], [], []
+    for row, pid in enumerate(portfolio_ids):
+        for pw in position_weights_by_portfolio[pid]:
+            col = symbol_index.get(pw.symbol)
+            if col is None:
+                continue  # No betas: contributes 0 (as in the per-portfolio path)
+            if use_delta_adjusted and pw.is_option and pw.delta is not None:
+                effective_weight = pw.weight * pw.delta
+            else:
+                effective_weight = pw.weight
+            rows.append(row)
+            cols.append(col)
+            weights.append(effective_weight)
+
+    shape = (len(portfolio_ids), len(symbols))
+    weight_matrix = sparse.csr_matrix((weights, (rows, cols)), shape=shape)
+    holdings = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+
+    betas = np.zeros((len(symbols), len(factor_names)))
+    has_beta = np.zeros((len(symbols), len(factor_names)))
+    for symbol, i in symbol_index.items():
+        for k, factor_name in enumerate(factor_names):
+            value = symbol_betas[symbol].get(factor_name)
+            if value is not None:
+                betas[i, k] = value
+                has_beta[i, k] = 1.0
+
+    exposures = weight_matrix @ betas
+    reported = (holdings @ has_beta) > 0
+
+    return {
+        pid: {
+            factor_name: float(exposures[row, k])
+            for k, factor_name in enumerate(factor_names)
+            if reported[row, k]
+        }
+        for row, pid in enumerate(portfolio_ids)
+    }
+
+
+async def load_all_portfolio_position_weights(
+    db: AsyncSession,
+    portfolio_ids: List[UUID]
+) -> Tuple[Dict[UUID, List[PositionWeight]], Dict[UUID, float], Dict[UUID, str]]:
+    """
+    get_portfolio_positions_with_weights() for many portfolios in three queries.
+
+    Returns:
+        Tuple of ({portfolio_id: [PositionWeight]}, {portfolio_id: equity},
+        {portfolio_id: error}) - portfolios that are missing or have
+        equity_balance <= 0 are reported in the error dict only
+    """
+    portfolio_result = await db.execute(
+        select(Portfolio.id, Portfolio.equity_balance).where(Portfolio.id.in_(portfolio_ids))
+    )
+    equity_by_portfolio: Dict[UUID, float] = {}
+    errors: Dict[UUID, str] = {}
+    found = {}
+    for pid, equity_balance in portfolio_result.all():
+        found[pid] = float(equity_balance) if equity_balance is not None else 0.0
+
+    for pid in portfolio_ids:
+        if pid not in found:
+            errors[pid] = f"Portfolio {pid} not found"
+        elif found[pid] <= 0:
+            errors[pid] = f"Portfolio {pid} has invalid equity_balance: {found[pid]}"
+        else:
+            equity_by_portfolio[pid] = found[pid]
+
+    positions_result = await db.execute(
+        select(Position).where(
+            and_(
+                Position.portfolio_id.in_(list(equity_by_portfolio)),
+                Position.exit_date.is_(None),  # Active only
+                Position.investment_class == 'PUBLIC'  # PUBLIC only
+            )
+        )
+    ) if equity_by_portfolio else None
+    positions = list(positions_result.scalars().all()) if positions_result is not None else []
+
+    option_position_ids = [
+        p.id for p in positions
+        if p.position_type.value in ('LC', 'LP', 'SC', 'SP')
+    ]
+    delta_map: Dict[UUID, float] = {}
+    if option_position_ids:
+        greeks_result = await db.execute(
+            select(PositionGreeks.position_id, PositionGreeks.delta)
+            .where(PositionGreeks.position_id.in_(option_position_ids))
+        )
+        for pos_id, delta in greeks_result.fetchall():
+            if delta is not None:
+                delta_map[pos_id] = float(delta)
+
+    weights_by_portfolio: Dict[UUID, List[PositionWeight]] = {pid: [] for pid in equity_by_portfolio}
+    for position in positions:
+        signed_value = float(get_position_value(position, signed=True, recalculate=False))
+        weights_by_portfolio[position.portfolio_id].append(PositionWeight(
+            position_id=position.id,
+            symbol=position.symbol,
+            weight=signed_value / equity_by_portfolio[position.portfolio_id],
+            delta=delta_map.get(position.id),
+            is_option=position.position_type.value in ('LC', 'LP', 'SC', 'SP')
+        ))
+
+    return weights_by_portfolio, equity_by_portfolio, errors
+
+
+async def aggregate_all_portfolio_factors(
+    db: AsyncSession,
+    portfolio_ids: List[UUID],
+    calculation_date: date,
+    use_delta_adjusted: bool = False
+) -> Dict[str, Any]:
+    """
+    Aggregate and store factor exposures for many portfolios at once.
+
+    Batch equivalent of get_portfolio_factor_exposures() +
+    store_portfolio_factor_exposures() per portfolio and factor family
+    (Ridge, Spread, OLS), with a fixed number of queries regardless of
+    portfolio count:
+    1. Portfolios, positions and option deltas (load_all_portfolio_position_weights)
+    2. Symbol betas for every held symbol (load_symbol_betas)
+    3. One sparse weight x beta product per family (aggregate_factor_matrix)
+    4. Multi-row upsert into factor_exposures, committed per chunk
+
+    Args:
+        db: Database session
+        portfolio_ids: Portfolios to process
+        calculation_date: Date to load betas for / store exposures under
+        use_delta_adjusted: Apply delta adjustment for options
+
+    Returns:
+        Dict with:
+        - portfolios: {portfolio_id: {status, ridge_betas, spread_betas, ols_betas[, error]}}
+          (status is 'calculated', 'skipped' (nothing to store) or 'failed')
+        - calculated / skipped / failed: Portfolio counts
+        - records_stored: factor_exposures rows written
+        - errors: Error messages
+    """
+    weights_by_portfolio, equity_by_portfolio, load_errors = await load_all_portfolio_position_weights(
+        db, portfolio_ids
+    )
+
+    symbols = sorted({pw.symbol for weights in weights_by_portfolio.values() for pw in weights})
+    symbol_betas = await load_symbol_betas(db, symbols, calculation_date) if symbols else {}
+
+    family_results = {
+        family: aggregate_factor_matrix(weights_by_portfolio, symbol_betas, factor_names, use_delta_adjusted)
+        for family, factor_names in FACTOR_FAMILIES.items()
+    }
+
+    factor_result = await db.execute(select(FactorDefinition.name, FactorDefinition.id))
+    factor_name_to_id = {row[0]: row[1] for row in factor_result.fetchall()}
+
+    summary: Dict[str, Any] = {
+        'portfolios': {},
+        'calculated': 0,
+        'skipped': 0,
+        'failed': 0,
+        'records_stored': 0,
+        'errors': [],
+    }
+    for pid, error in load_errors.items():
+        summary['portfolios'][pid] = {'status': 'failed', 'error': error}
+        summary['failed'] += 1
+        summary['errors'].append(f"Factor aggregation failed for {pid}: {error[:100]}")
+
+    now = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+    rows_by_portfolio: Dict[UUID, int] = {}
+    missing_factors = set()
+    for pid in weights_by_portfolio:
+        portfolio_betas = {family: family_results[family][pid] for family in FACTOR_FAMILIES}
+        summary['portfolios'][pid] = {'status': 'skipped', **portfolio_betas}
+
+        for betas in portfolio_betas.values():
+            for factor_name, beta_value in betas.items():
+                factor_id = factor_name_to_id.get(factor_name)
+                if factor_id is None:
+                    missing_factors.add(factor_name)
+                    continue
+                rows.append({
+                    'id': uuid4(),
+                    'portfolio_id': pid,
+                    'factor_id': factor_id,
+                    'calculation_date': calculation_date,
+                    'exposure_value': Decimal(str(beta_value)),
+                    'exposure_dollar': Decimal(str(beta_value)) * Decimal(str(equity_by_portfolio[pid])),
+                    'created_at': now,
+                    'updated_at': now,
+                })
+                rows_by_portfolio[pid] = rows_by_portfolio.get(pid, 0) + 1
+
+    if missing_factors:
+        summary['errors'].append(f"Factors not found in database: {sorted(missing_factors)}")
+
+    failed_portfolios = set()
+    for i in range(0, len(rows), FACTOR_EXPOSURE_UPSERT_CHUNK_ROWS):
+        chunk = rows[i:i + FACTOR_EXPOSURE_UPSERT_CHUNK_ROWS]
+        stmt = pg_insert(FactorExposure).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_factor_exposures_portfolio_factor_date',
+            set_={
+                'exposure_value': stmt.excluded.exposure_value,
+                'exposure_dollar': stmt.excluded.exposure_dollar,
+                'updated_at': stmt.excluded.updated_at,
+            }
+        )
+        try:
+            await db.execute(stmt)
+            await db.commit()
+            summary['records_stored'] += len(chunk)
+        except Exception as e:
+            await db.rollback()
+            chunk_portfolios = {row['portfolio_id'] for row in chunk}
+            failed_portfolios |= chunk_portfolios
+            logger.error(f"factor_exposures upsert failed for {len(chunk_portfolios)} portfolios: {e}")
+            for pid in chunk_portfolios:
+                summary['portfolios'][pid]['error'] = str(e)[:100]
+                summary['errors'].append(f"Factor aggregation failed for {pid}: {str(e)[:100]}")
+
+    for pid in weights_by_portfolio:
+        if pid in failed_portfolios:
+            summary['portfolios'][pid]['status'] = 'failed'
+            summary['failed'] += 1
+        elif rows_by_portfolio.get(pid):
+            summary['portfolios'][pid]['status'] = 'calculated'
+            summary['calculated'] += 1
+        else:
+            summary['skipped'] += 1
+
+    logger.info(
+        f"Aggregated factor exposures for {len(portfolio_ids)} portfolios "
+        f"({len(symbols)} symbols): calculated={summary['calculated']}, "
+        f"skipped={summary['skipped']}, failed={summary['failed']}, "
+        f"{summary['records_stored']} rows stored"
+    )
+    return summary
+
+
 async def get_portfolio_factor_exposures(
     db: AsyncSession,
     portfolio_id: UUID,
@@ -0,0 +1,240 @@
+"""
+What-if stress testing service
+
+Evaluates ad-hoc factor shocks (and optional hypothetical position changes)
+against a portfolio on request, using the matrix stress engine:
+
+- The portfolio's latest factor exposure vector (load_stress_exposures())
+  and the day's factor correlation matrix are held in an in-process cache,
+  so a warm request touches the database only for symbol betas of any
+  position changes
+- Position changes are folded into the exposure vector as
+  market value change x symbol beta per factor (the same aggregation
+  portfolio factor exposures use)
+- Direct and correlated P&L come from build_stress_results(), so shocks are
+  mapped, correlated and loss-capped exactly as in the nightly stress tests
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.calculations.stress_matrix import (
+    StressExposureMatrix,
+    build_stress_results,
+    compile_stress_scenarios,
+    load_stress_exposures,
+)
+from app.calculations.stress_testing import calculate_factor_correlation_matrix
+from app.core.logging import get_logger
+from app.services.portfolio_factor_service import load_symbol_betas_from_cache
+
+logger = get_logger(__name__)
+
+WHAT_IF_CACHE_TTL_SECONDS = 900  # Exposure vectors and correlation matrices held in-process
+WHAT_IF_CACHE_MAX_ENTRIES = 1024  # Least recently used entries are evicted beyond this
+WHAT_IF_CATEGORY = 'what_if'
+IR_SYMBOL_FACTOR = 'IR Beta'  # Symbol beta giving a position's Interest_Rate dollar exposure
+
+# (portfolio_id, as-of date) -> single-portfolio exposure matrix or None
+_exposure_cache: TTLCache = TTLCache(maxsize=WHAT_IF_CACHE_MAX_ENTRIES, ttl=WHAT_IF_CACHE_TTL_SECONDS)
+# as-of date -> calculate_factor_correlation_matrix() output
+_correlation_cache: TTLCache = TTLCache(maxsize=WHAT_IF_CACHE_MAX_ENTRIES, ttl=WHAT_IF_CACHE_TTL_SECONDS)
+
+
+def clear_what_if_cache(portfolio_id: Optional[UUID] = None) -> None:
+    """Drop cached exposure vectors (one portfolio's, or all with correlations)."""
+    if portfolio_id is None:
+        _exposure_cache.clear()
+        _correlation_cache.clear()
+        return
+    for key in [key for key in _exposure_cache if key[0] == portfolio_id]:
+        del _exposure_cache[key]
+
+
+def _cached(cache: TTLCache, key) -> Tuple[bool, Any]:
+    # Membership distinguishes a cached None (no exposures) from a miss
+    if key in cache:
+        return True, cache[key]
+    return False, None
+
+
+def apply_position_changes(
+    exposures: StressExposureMatrix,
+    position_changes: Dict[str, float],
+    symbol_betas: Dict[str, Dict[str, float]]
+) -> StressExposureMatrix:
+    """
+    Single-portfolio exposure matrix with hypothetical position changes applied.
+
+    Each factor's dollar exposure moves by sum(market value change x symbol
+    beta); factors the portfolio had no exposure to are added. Net exposure
+    moves by the total change, and the IR dollar exposure (when the portfolio
+    IR beta is available) by the changes' IR Beta exposure.
+
+    Args:
+        exposures: One-portfolio output of load_stress_exposures()
+        position_changes: {symbol: signed market value change}
+        symbol_betas: Output of load_symbol_betas_from_cache()
+
+    Returns:
+        New StressExposureMatrix (the input is not modified)
+    """
+    deltas: Dict[str, float] = {}
+    for symbol, change in position_changes.items():
+        for factor_name, beta in symbol_betas.get(symbol, {}).items():
+            deltas[factor_name] = deltas.get(factor_name, 0.0) + change * beta
+
+    factor_names = sorted(set(exposures.factor_names) | set(deltas))
+    columns = [factor_names.index(name) for name in exposures.factor_names]
+    m = len(factor_names)
+
+    exposure_dollars = np.zeros((1, m))
+    reported = np.full((1, m), np.nan)
+    present = np.zeros((1, m), dtype=bool)
+    exposure_dollars[:, columns] = exposures.exposure_dollars
+    reported[:, columns] = exposures.reported_dollars
+    present[:, columns] = exposures.present
+
+    delta = np.array([deltas.get(name, 0.0) for name in factor_names])
+    changed = delta != 0.0
+    exposure_dollars[0] += delta
+    reported[0, changed] = exposure_dollars[0, changed]  # Changed factors now carry explicit dollars
+    present[0] |= changed
+
+    net_exposure = float(exposures.net_exposure[0]) + sum(position_changes.values())
+    ir_exposure_dollar = exposures.ir_exposure_dollar + deltas.get(IR_SYMBOL_FACTOR, 0.0)
+
+    return replace(
+        exposures,
+        factor_names=factor_names,
+        exposure_dollars=exposure_dollars,
+        reported_dollars=reported,
+        present=present,
+        net_exposure=np.array([net_exposure if net_exposure > 0 else 1.0]),
+        ir_exposure_dollar=ir_exposure_dollar,
+    )
+
+
+class StressWhatIfService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def _exposures(self, portfolio_id: UUID, as_of: date) -> Tuple[Optional[StressExposureMatrix], bool]:
+        """Cached exposure vector for the portfolio (None when it has no factor exposures)."""
+        hit, exposures = _cached(_exposure_cache, (portfolio_id, as_of))
+        if not hit:
+            matrix = await load_stress_exposures(self.db, [portfolio_id], as_of)
+            exposures = matrix if matrix.portfolio_ids else None
+            _exposure_cache[(portfolio_id, as_of)] = exposures
+        return exposures, hit
+
+    async def _correlations(self, as_of: date) -> Dict[str, Any]:
+        """Cached factor correlation matrix for the day."""
+        hit, correlation_data = _cached(_correlation_cache, as_of)
+        if not hit:
+            correlation_data = await calculate_factor_correlation_matrix(self.db, as_of_date=as_of)
+            _correlation_cache[as_of] = correlation_data
+        return correlation_data
+
+    async def run(
+        self,
+        portfolio_id: UUID,
+        scenarios: List[Dict[str, Any]],
+        *,
+        position_changes: Optional[Dict[str, float]] = None,
+        as_of_date: Optional[date] = None,
+    ) -> Dict:
+        """
+        Direct and correlated P&L of ad-hoc shocks for a portfolio.
+
+        - scenarios: [{'name': str, 'shocked_factors': {factor: shock}}], factor
+          names as in the stress scenario config (Market, Value, Interest_Rate, ...)
+        - position_changes: optional {symbol: signed market value change}
+          applied on top of the portfolio before shocking
+        - Returns available=false (reason: no_factor_exposures) when the
+          portfolio has no factor exposures, or no_factor_correlations when the
+          correlation matrix cannot be computed
+        - percentage_impact is in percentage points of net exposure (the loss
+          cap base)
+        """
+        start = time.perf_counter()
+        as_of = as_of_date or date.today()
+
+        exposures, cache_hit = await self._exposures(portfolio_id, as_of)
+        if exposures is None:
+            return {"available": False, "metadata": {"reason": "no_factor_exposures"}}
+
+        try:
+            correlation_data = await self._correlations(as_of)
+        except ValueError as e:
+            logger.warning(f"What-if stress test without correlations for {portfolio_id}: {e}")
+            return {"available": False, "metadata": {"reason": "no_factor_correlations"}}
+
+        factor_exposures_date = exposures.exposure_dates[0]
+        symbols_without_betas: List[str] = []
+        if position_changes:
+            symbols = list(position_changes)
+            symbol_betas = await load_symbol_betas_from_cache(
+                symbols, factor_exposures_date or as_of, db=self.db
+            )
+            symbols_without_betas = [symbol for symbol in symbols if symbol not in symbol_betas]
+            exposures = apply_position_changes(exposures, position_changes, symbol_betas)
+
+        scenario_ids = [f"{WHAT_IF_CATEGORY}_{k}" for k in range(len(scenarios))]
+        compiled = compile_stress_scenarios({
+            'stress_scenarios': {
+                WHAT_IF_CATEGORY: {
+                    scenario_id: {'name': scenario['name'], 'shocked_factors': scenario['shocked_factors']}
+                    for scenario_id, scenario in zip(scenario_ids, scenarios)
+                }
+            }
+        })
+        results = build_stress_results(
+            exposures, compiled, correlation_data, as_of, {portfolio_id: None}
+        )[portfolio_id]['stress_test_results']
+
+        net_exposure = float(exposures.net_exposure[0])
+        items = []
+        for scenario_id in scenario_ids:
+            direct = results['direct_impacts'][WHAT_IF_CATEGORY][scenario_id]
+            correlated = results['correlated_impacts'][WHAT_IF_CATEGORY][scenario_id]
+            items.append({
+                "name": correlated['scenario_name'],
+                "shocked_factors": correlated['shocked_factors'],
+                "direct_pnl": direct['total_direct_pnl'],
+                "correlated_pnl": correlated['correlated_pnl'],
+                "correlation_effect": correlated['correlation_effect'],
+                "percentage_impact": correlated['correlated_pnl'] / net_exposure * 100.0,
+                "loss_cap_applied": correlated['loss_cap_applied'],
+                "direct_factor_pnl": {
+                    name: impact['factor_pnl'] for name, impact in direct['factor_impacts'].items()
+                },
+                "correlated_factor_pnl": {
+                    name: impact['total_factor_impact'] for name, impact in correlated['factor_impacts'].items()
+                },
+            })
+
+        return {
+            "available": True,
+            "data": {
+                "scenarios": items,
+                "net_exposure": net_exposure,
+                "calculation_date": as_of.isoformat(),
+                "factor_exposures_date": factor_exposures_date.isoformat() if factor_exposures_date else None,
+                "correlation_data_days": correlation_data['data_days'],
+                "positions_changed": len(position_changes or {}),
+                "symbols_without_betas": symbols_without_betas,
+            },
+            "metadata": {
+                "exposure_cache_hit": cache_hit,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 3),
+            },
+        }
@@ -0,0 +1,48 @@
+"""Add factor_returns table
+
+Revision ID: t6u7v8w9x0y1
+Revises: s5t6u7v8w9x0
+Create Date: 2026-10-16
+
+Persisted daily factor ETF returns, computed once per batch date and read by
+every factor consumer through app.calculations.factor_returns.get_factor_returns():
+- symbol: factor ETF proxy (SPY, VTV, VUG, MTUM, QUAL, IWM, USMV, TLT)
+- return_date / daily_return: close-to-close return vs the previous available close
+- version: FACTOR_RETURNS_VERSION that produced the row (readers filter on it)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 't6u7v8w9x0y1'
+down_revision = 's5t6u7v8w9x0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'factor_returns',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('return_date', sa.Date(), nullable=False),
+        sa.Column('daily_return', sa.Numeric(18, 12), nullable=True),  # NULL for the first stored close
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    # Unique constraint for upsert pattern
+    op.create_unique_constraint(
+        'uq_factor_returns_symbol_date_version',
+        'factor_returns',
+        ['symbol', 'return_date', 'version']
+    )
+    op.create_index('idx_factor_returns_version_date', 'factor_returns', ['version', 'return_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_factor_returns_version_date', table_name='factor_returns')
+    op.drop_constraint('uq_factor_returns_symbol_date_version', 'factor_returns', type_='unique')
+    op.drop_table('factor_returns')
@@ -0,0 +1,159 @@
+"""Pack correlation matrices onto correlation_calculations
+
+Revision ID: u7v8w9x0y1z2
+Revises: t6u7v8w9x0y1
+Create Date: 2026-10-16
+
+Correlation matrices move from one pairwise_correlations row per ordered
+symbol pair to packed arrays on the calculation row
+(app.services.correlation_storage):
+- matrix_symbols: symbol order (JSONB list)
+- packed_correlations: float32 upper triangle incl. diagonal, row-major
+- packed_overlaps: int16 paired observation counts, same layout
+- packed_significance: float32 1 - p-value, same layout (NaN = not computed)
+
+Existing calculations are packed here and their pairwise rows deleted; the
+pairwise_correlations table is kept for rollback. Downgrade expands packed
+matrices back into pairwise rows.
+"""
+from collections import defaultdict
+
+import numpy as np
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'u7v8w9x0y1z2'
+down_revision = 't6u7v8w9x0y1'
+branch_labels = None
+depends_on = None
+
+# Packed layout (must match app.services.correlation_storage)
+CORRELATION_DTYPE = np.dtype('<f4')
+OVERLAP_DTYPE = np.dtype('<i2')
+
+# Calculations packed per round trip
+BATCH_SIZE = 200
+
+
+def _pack(matrix: np.ndarray, dtype: np.dtype) -> bytes:
+    rows, cols = np.triu_indices(matrix.shape[0])
+    return np.ascontiguousarray(matrix[rows, cols], dtype=dtype).tobytes()
+
+
+def _unpack(payload: bytes, n: int, dtype: np.dtype) -> np.ndarray:
+    values = np.frombuffer(payload, dtype=dtype).astype(np.float64)
+    rows, cols = np.triu_indices(n)
+    matrix = np.empty((n, n))
+    matrix[rows, cols] = values
+    matrix[cols, rows] = values
+    return matrix
+
+
+def upgrade() -> None:
+    op.add_column('correlation_calculations', sa.Column('matrix_symbols', postgresql.JSONB(), nullable=True))
+    op.add_column('correlation_calculations', sa.Column('packed_correlations', sa.LargeBinary(), nullable=True))
+    op.add_column('correlation_calculations', sa.Column('packed_overlaps', sa.LargeBinary(), nullable=True))
+    op.add_column('correlation_calculations', sa.Column('packed_significance', sa.LargeBinary(), nullable=True))
+
+    conn = op.get_bind()
+    calculations = sa.table(
+        'correlation_calculations',
+        sa.column('id', postgresql.UUID(as_uuid=True)),
+        sa.column('matrix_symbols', postgresql.JSONB()),
+        sa.column('packed_correlations', sa.LargeBinary()),
+        sa.column('packed_overlaps', sa.LargeBinary()),
+        sa.column('packed_significance', sa.LargeBinary()),
+    )
+
+    calc_ids = [
+        row[0] for row in conn.execute(
+            sa.text("SELECT DISTINCT correlation_calculation_id FROM pairwise_correlations")
+        )
+    ]
+
+    for start in range(0, len(calc_ids), BATCH_SIZE):
+        batch = calc_ids[start:start + BATCH_SIZE]
+        rows_by_calc = defaultdict(list)
+        for row in conn.execute(
+            sa.text(
+                "SELECT correlation_calculation_id, symbol_1, symbol_2, correlation_value, "
+                "data_points, statistical_significance FROM pairwise_correlations "
+                "WHERE correlation_calculation_id = ANY(:ids)"
+            ),
+            {'ids': batch}
+        ):
+            rows_by_calc[row[0]].append(row[1:])
+
+        for calc_id, rows in rows_by_calc.items():
+            symbols = sorted({r[0] for r in rows} | {r[1] for r in rows})
+            index = {symbol: i for i, symbol in enumerate(symbols)}
+            n = len(symbols)
+            correlations = np.full((n, n), np.nan)
+            overlaps = np.zeros((n, n))
+            significance = np.full((n, n), np.nan)
+            for symbol_1, symbol_2, value, data_points, p_complement in rows:
+                for i, j in ((index[symbol_1], index[symbol_2]), (index[symbol_2], index[symbol_1])):
+                    correlations[i, j] = float(value)
+                    overlaps[i, j] = data_points
+                    if p_complement is not None:
+                        significance[i, j] = float(p_complement)
+
+            conn.execute(
+                calculations.update().where(calculations.c.id == calc_id).values(
+                    matrix_symbols=symbols,
+                    packed_correlations=_pack(correlations, CORRELATION_DTYPE),
+                    packed_overlaps=_pack(np.clip(overlaps, 0, np.iinfo(OVERLAP_DTYPE).max), OVERLAP_DTYPE),
+                    packed_significance=_pack(significance, CORRELATION_DTYPE),
+                )
+            )
+
+        conn.execute(
+            sa.text("DELETE FROM pairwise_correlations WHERE correlation_calculation_id = ANY(:ids)"),
+            {'ids': batch}
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    pairwise = sa.table(
+        'pairwise_correlations',
+        sa.column('correlation_calculation_id', postgresql.UUID(as_uuid=True)),
+        sa.column('symbol_1', sa.String),
+        sa.column('symbol_2', sa.String),
+        sa.column('correlation_value', sa.Numeric),
+        sa.column('data_points', sa.Integer),
+        sa.column('statistical_significance', sa.Numeric),
+    )
+
+    packed = conn.execute(
+        sa.text(
+            "SELECT id, matrix_symbols, packed_correlations, packed_overlaps, packed_significance "
+            "FROM correlation_calculations WHERE packed_correlations IS NOT NULL"
+        )
+    ).fetchall()
+
+    for calc_id, symbols, packed_corr, packed_overlaps, packed_sig in packed:
+        n = len(symbols)
+        correlations = _unpack(packed_corr, n, CORRELATION_DTYPE)
+        overlaps = _unpack(packed_overlaps, n, OVERLAP_DTYPE)
+        significance = _unpack(packed_sig, n, CORRELATION_DTYPE) if packed_sig is not None else np.full((n, n), np.nan)
+        rows = [
+            {
+                'correlation_calculation_id': calc_id,
+                'symbol_1': symbols[i],
+                'symbol_2': symbols[j],
+                'correlation_value': round(float(correlations[i, j]), 6),
+                'data_points': int(overlaps[i, j]),
+                'statistical_significance': None if np.isnan(significance[i, j]) else round(float(significance[i, j]), 6),
+            }
+            for i in range(n) for j in range(n)
+        ]
+        if rows:
+            op.bulk_insert(pairwise, rows)
+
+    op.drop_column('correlation_calculations', 'packed_significance')
+    op.drop_column('correlation_calculations', 'packed_overlaps')
+    op.drop_column('correlation_calculations', 'packed_correlations')
+    op.drop_column('correlation_calculations', 'matrix_symbols')
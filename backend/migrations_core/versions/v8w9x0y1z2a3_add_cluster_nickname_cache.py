@@ -0,0 +1,46 @@
+"""Add correlation_cluster_nicknames cache table
+
+Revision ID: v8w9x0y1z2a3
+Revises: u7v8w9x0y1z2
+Create Date: 2026-10-16
+
+Nicknames generated for correlation clusters, reused while fresh so repeat
+runs with unchanged cluster membership skip nickname generation:
+- portfolio_id / symbol_set_hash: portfolio and SHA-256 of the sorted,
+  normalized cluster symbols (unique together)
+- nickname: generated nickname
+- generated_at: generation time, compared against CLUSTER_NICKNAME_TTL_DAYS
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'v8w9x0y1z2a3'
+down_revision = 'u7v8w9x0y1z2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'correlation_cluster_nicknames',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('portfolio_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('portfolios.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('symbol_set_hash', sa.String(64), nullable=False),
+        sa.Column('symbol_count', sa.Integer(), nullable=False),
+        sa.Column('nickname', sa.String(100), nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+    # Unique constraint for upsert pattern
+    op.create_unique_constraint(
+        'uq_cluster_nicknames_portfolio_symbol_set',
+        'correlation_cluster_nicknames',
+        ['portfolio_id', 'symbol_set_hash']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_cluster_nicknames_portfolio_symbol_set', 'correlation_cluster_nicknames', type_='unique')
+    op.drop_table('correlation_cluster_nicknames')
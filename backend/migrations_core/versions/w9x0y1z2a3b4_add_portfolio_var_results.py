@@ -0,0 +1,61 @@
+"""Add portfolio_var_results table
+
+Revision ID: w9x0y1z2a3b4
+Revises: v8w9x0y1z2a3
+Create Date: 2026-10-16
+
+Historical-simulation Value-at-Risk and Expected Shortfall per portfolio and
+calculation date, one row per (method, confidence level, horizon):
+- method: 'historical' or 'filtered_historical' (EWMA volatility-rescaled)
+- confidence_level / horizon_days: 0.95 or 0.99, 1 or 10 trading days
+- var_amount / expected_shortfall: losses in dollars (positive = loss)
+- simulated_value, observations, positions_simulated, positions_excluded:
+  coverage of the simulation
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'w9x0y1z2a3b4'
+down_revision = 'v8w9x0y1z2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'portfolio_var_results',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('portfolio_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('portfolios.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('calculation_date', sa.Date(), nullable=False),
+        sa.Column('method', sa.String(30), nullable=False),
+        sa.Column('confidence_level', sa.Numeric(4, 3), nullable=False),
+        sa.Column('horizon_days', sa.Integer(), nullable=False),
+        sa.Column('var_amount', sa.Numeric(16, 2), nullable=False),
+        sa.Column('expected_shortfall', sa.Numeric(16, 2), nullable=False),
+        sa.Column('simulated_value', sa.Numeric(16, 2), nullable=False),
+        sa.Column('observations', sa.Integer(), nullable=False),
+        sa.Column('positions_simulated', sa.Integer(), nullable=False),
+        sa.Column('positions_excluded', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Unique constraint for upsert pattern
+    op.create_unique_constraint(
+        'uq_portfolio_var_results',
+        'portfolio_var_results',
+        ['portfolio_id', 'calculation_date', 'method', 'confidence_level', 'horizon_days']
+    )
+    op.create_index(
+        'idx_portfolio_var_portfolio_date',
+        'portfolio_var_results',
+        ['portfolio_id', 'calculation_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_portfolio_var_portfolio_date', table_name='portfolio_var_results')
+    op.drop_constraint('uq_portfolio_var_results', 'portfolio_var_results', type_='unique')
+    op.drop_table('portfolio_var_results')
@@ -0,0 +1,84 @@
+"""
+Benchmark fetch_historical_prices() cache path
+
+Compares the cache-native window slice against the previous implementation
+(per-symbol/per-date get_price() loop + pivot_table) on a synthetic
+200-day price cache. No database required.
+
+Usage:
+    cd backend
+    uv run python scripts/analysis/benchmark_fetch_historical_prices.py
+"""
+import asyncio
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.cache.price_cache import PriceCache
+from app.calculations.market_data import fetch_historical_prices
+from app.utils.trading_calendar import trading_calendar
+
+UNIVERSE_SIZE = 1000
+END_DATE = date(2025, 11, 7)
+START_DATE = END_DATE - timedelta(days=200)
+REPEATS = 20
+
+
+def build_cache() -> PriceCache:
+    """Populate a PriceCache with a random-walk close for every symbol/trading day."""
+    rng = np.random.default_rng(7)
+    days = trading_calendar.get_trading_days_between(START_DATE, END_DATE)
+    cache = PriceCache()
+
+    symbols, dates, prices = [], [], []
+    for i in range(UNIVERSE_SIZE):
+        path = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(days)))
+        symbols.extend([f"SYM{i}"] * len(days))
+        dates.extend(days)
+        prices.extend(np.round(path, 4))
+    cache.set_prices(symbols, dates, prices)
+    return cache
+
+
+def legacy_fetch(price_cache: PriceCache, symbols, start_date, end_date) -> pd.DataFrame:
+    """Previous cache path, kept here for comparison only."""
+    date_list = trading_calendar.get_trading_days_between(start_date, end_date)
+    data = []
+    for symbol in symbols:
+        for check_date in date_list:
+            price = price_cache.get_price(symbol, check_date)
+            if price is not None:
+                data.append({'symbol': symbol, 'date': check_date, 'close': float(price)})
+    df = pd.DataFrame(data)
+    price_df = df.pivot_table(index='date', columns='symbol', values='close', aggfunc='last')
+    price_df.index = pd.to_datetime(price_df.index)
+    return price_df
+
+
+async def main():
+    cache = build_cache()
+    print(f"Cache: {cache.get_stats()['matrix_shape']} (symbols x dates)")
+    print(f"{'symbols':>8} {'legacy ms':>10} {'window ms':>10} {'speedup':>8}")
+
+    for n_symbols in (1, 50, 500):
+        symbols = [f"SYM{i}" for i in range(n_symbols)]
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            legacy = legacy_fetch(cache, symbols, START_DATE, END_DATE)
+        legacy_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            fast = await fetch_historical_prices(None, symbols, START_DATE, END_DATE, price_cache=cache)
+        fast_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+        assert fast.index.equals(legacy.index) and list(fast.columns) == list(legacy.columns)
+        np.testing.assert_allclose(fast.to_numpy(), legacy.to_numpy())
+        print(f"{n_symbols:>8} {legacy_ms:>10.2f} {fast_ms:>10.2f} {legacy_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark event loop lag for Phase 3 regressions: inline vs process pool
+
+Solves the batched Ridge and Spread regressions for a synthetic universe the
+way calculate_universe_factors does (map_symbol_chunks), once inline on the
+event loop and once per worker count, and reports wall time plus the event
+loop lag other coroutines (health checks, batch-status calls) would see.
+No database required.
+
+Usage:
+    cd backend
+    uv run python scripts/analysis/benchmark_regression_offload.py
+"""
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.calculations.factors_ridge import calculate_batch_ridge_betas
+from app.calculations.factors_spread import calculate_batch_spread_betas
+from app.calculations.regression_executor import map_symbol_chunks, shutdown_regression_executor
+from app.core.event_loop_monitor import EventLoopLagMonitor
+
+UNIVERSE_SIZE = 6000
+N_DAYS = 180
+WORKER_COUNTS = (0, 2, 4, 6)
+FACTORS = ["Value", "Growth", "Momentum", "Quality", "Size", "Low Volatility"]
+SPREADS = ["Growth-Value Spread", "Momentum Spread", "Size Spread", "Quality Spread"]
+
+
+def build_universe():
+    """Synthetic symbol returns (with gaps), style factor returns and spread returns."""
+    rng = np.random.default_rng(11)
+    index = pd.bdate_range("2025-01-02", periods=N_DAYS)
+    factors = pd.DataFrame(rng.normal(0, 0.01, (N_DAYS, len(FACTORS))), index=index, columns=FACTORS)
+    spreads = pd.DataFrame(rng.normal(0, 0.01, (N_DAYS, len(SPREADS))), index=index, columns=SPREADS)
+    returns = factors.to_numpy() @ rng.normal(0, 1.0, (len(FACTORS), UNIVERSE_SIZE))
+    returns += rng.normal(0, 0.02, returns.shape)
+    returns[rng.random(returns.shape) < 0.05] = np.nan
+    symbols = pd.DataFrame(returns, index=index, columns=[f"SYM{i}" for i in range(UNIVERSE_SIZE)])
+    return symbols, factors, spreads
+
+
+async def run(workers: int, symbols, factors, spreads):
+    async with EventLoopLagMonitor(interval=0.01) as lag:
+        start = time.perf_counter()
+        await map_symbol_chunks(calculate_batch_ridge_betas, symbols, factors, 1.0, workers=workers)
+        await map_symbol_chunks(calculate_batch_spread_betas, symbols, spreads, workers=workers)
+        elapsed = time.perf_counter() - start
+    return elapsed, lag.get_stats()
+
+
+async def main():
+    symbols, factors, spreads = build_universe()
+    print(f"Universe: {UNIVERSE_SIZE} symbols x {N_DAYS} days")
+    print(f"{'workers':>8} {'wall s':>8} {'lag mean ms':>12} {'lag p95 ms':>11} {'lag max ms':>11}")
+
+    for workers in WORKER_COUNTS:
+        if workers:
+            # Warm every worker so process start-up is not counted as solve time
+            await run(workers, symbols, factors, spreads)
+        elapsed, lag = await run(workers, symbols, factors, spreads)
+        label = workers or "inline"
+        print(f"{label:>8} {elapsed:>8.2f} {lag['mean_ms']:>12.2f} {lag['p95_ms']:>11.2f} {lag['max_ms']:>11.2f}")
+        shutdown_regression_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
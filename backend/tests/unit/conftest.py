@@ -0,0 +1,33 @@
+"""
+Shared fixtures for unit tests
+
+Provides:
+- synthetic_universe: factory for factor returns plus gappy symbol returns
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+STYLE_FACTORS = ["Value", "Growth", "Momentum", "Quality", "Size", "Low Volatility"]
+
+
+def _synthetic_universe(n_days: int = 85, n_symbols: int = 40, seed: int = 0):
+    """Factor returns plus symbol returns with random gaps and a few sparse symbols."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2025-01-02", periods=n_days)
+    factors = pd.DataFrame(
+        rng.normal(0, 0.01, (n_days, len(STYLE_FACTORS))), index=index, columns=STYLE_FACTORS
+    )
+    loadings = rng.normal(0, 1.5, (len(STYLE_FACTORS), n_symbols))
+    returns = factors.to_numpy() @ loadings + rng.normal(0, 0.02, (n_days, n_symbols))
+    returns[rng.random(returns.shape) < 0.15] = np.nan
+    returns[:, 0] = np.nan          # no data at all
+    returns[:-20, 1] = np.nan       # below MIN_REGRESSION_DAYS
+    symbols = pd.DataFrame(returns, index=index, columns=[f"SYM{j}" for j in range(n_symbols)])
+    return symbols, factors
+
+
+@pytest.fixture
+def synthetic_universe():
+    """Factory: synthetic_universe(n_days=85, n_symbols=40, seed=0) -> (symbol_returns, factor_returns)"""
+    return _synthetic_universe
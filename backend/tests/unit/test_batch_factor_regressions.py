@@ -0,0 +1,155 @@
+"""
+Unit tests for batched universe factor regressions
+
+Each batched engine must reproduce its per-symbol counterpart:
+- calculate_batch_ridge_betas vs calculate_single_position_ridge_betas
+- calculate_batch_spread_betas vs calculate_single_position_spread_betas
+- run_batch_single_factor_regression vs run_single_factor_regression (statsmodels)
+- ridge_cv_errors (one SVD per mask) vs brute-force leave-one-out Ridge refits
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+
+from app.calculations.factors_ridge import (
+    calculate_batch_ridge_betas,
+    calculate_single_position_ridge_betas,
+    select_ridge_alpha,
+)
+from app.calculations.factors_spread import (
+    calculate_batch_spread_betas,
+    calculate_single_position_spread_betas,
+)
+from app.calculations.regression_utils import (
+    ridge_cv_errors,
+    run_batch_single_factor_regression,
+    run_single_factor_regression,
+)
+
+STYLE_FACTORS = ["Value", "Growth", "Momentum", "Quality", "Size", "Low Volatility"]
+
+
+class TestBatchRidge:
+    """calculate_batch_ridge_betas matches the per-symbol sklearn path"""
+
+    @pytest.mark.parametrize("alpha", [0.1, 1.0, 10.0])
+    def test_matches_single_symbol_fits(self, alpha, synthetic_universe):
+        symbol_returns, factor_returns = synthetic_universe()
+        batched = calculate_batch_ridge_betas(symbol_returns, factor_returns, alpha)
+
+        for symbol in symbol_returns.columns:
+            series = symbol_returns[symbol].dropna()
+            single = calculate_single_position_ridge_betas(
+                series, factor_returns.loc[series.index], alpha
+            )
+            result = batched[symbol]
+
+            assert result["success"] == single["success"]
+            assert result["observations"] == single["observations"]
+            if single["success"]:
+                assert result["r_squared"] == pytest.approx(single["r_squared"], abs=1e-10)
+                for factor in STYLE_FACTORS:
+                    assert result["betas"][factor] == pytest.approx(single["betas"][factor], abs=1e-10)
+
+    def test_insufficient_history_reported(self, synthetic_universe):
+        symbol_returns, factor_returns = synthetic_universe()
+        batched = calculate_batch_ridge_betas(symbol_returns, factor_returns)
+
+        assert batched["SYM0"]["success"] is False
+        assert batched["SYM1"]["success"] is False
+        assert "Insufficient data" in batched["SYM1"]["error"]
+
+    def test_betas_are_capped(self, synthetic_universe):
+        symbol_returns, factor_returns = synthetic_universe()
+        symbol_returns["LEVERED"] = factor_returns["Value"] * 40.0
+        batched = calculate_batch_ridge_betas(symbol_returns, factor_returns, 0.0)
+
+        assert max(abs(b) for b in batched["LEVERED"]["betas"].values()) == pytest.approx(5.0)
+
+
+class TestBatchSingleFactorOLS:
+    """run_batch_single_factor_regression matches statsmodels per pair"""
+
+    def test_matches_statsmodels(self):
+        rng = np.random.default_rng(3)
+        X = rng.normal(0, 0.01, (120, 3))
+        Y = X @ rng.normal(0, 3, (3, 12)) + rng.normal(0, 0.02, (120, 12))
+        mask = rng.random(Y.shape) > 0.2
+
+        batched = run_batch_single_factor_regression(Y, X, mask, cap=5.0, confidence=0.10)
+
+        for j in range(Y.shape[1]):
+            rows = mask[:, j]
+            for f in range(X.shape[1]):
+                single = run_single_factor_regression(Y[rows, j], X[rows, f], cap=5.0)
+                for key in ("beta", "alpha", "r_squared", "std_error", "p_value"):
+                    assert batched[key][j, f] == pytest.approx(single[key], abs=1e-10)
+                assert bool(batched["is_significant"][j, f]) == single["is_significant"]
+                assert bool(batched["capped"][j, f]) == single["capped"]
+
+
+class TestBatchSpread:
+    """calculate_batch_spread_betas matches the per-symbol statsmodels path"""
+
+    def test_matches_single_symbol_fits(self, synthetic_universe):
+        symbol_returns, factor_returns = synthetic_universe(n_days=130)
+        spreads = factor_returns.iloc[:, :4].rename(columns=dict(zip(
+            factor_returns.columns[:4],
+            ["Growth-Value Spread", "Momentum Spread", "Size Spread", "Quality Spread"],
+        )))
+        batched = calculate_batch_spread_betas(symbol_returns, spreads)
+
+        for symbol in symbol_returns.columns:
+            series = symbol_returns[symbol].dropna()
+            single = calculate_single_position_spread_betas(series, spreads.loc[series.index])
+            result = batched[symbol]
+
+            assert result["success"] == single["success"]
+            assert result["observations"] == single["observations"]
+            if single["success"]:
+                assert result["avg_r_squared"] == pytest.approx(single["avg_r_squared"], abs=1e-10)
+                assert result["betas"] == pytest.approx(single["betas"], abs=1e-10)
+
+
+class TestRidgeAlphaSelection:
+    """Closed-form CV scoring matches refits and picks a sensible alpha"""
+
+    def test_loo_matches_refits(self, synthetic_universe):
+        symbol_returns, factor_returns = synthetic_universe(n_days=60, n_symbols=6, seed=3)
+        Y = symbol_returns.to_numpy()[:, 2:]
+        mask = np.isfinite(Y)
+        alphas = np.array([0.1, 1.0, 10.0])
+
+        errors = ridge_cv_errors(factor_returns.to_numpy(), np.where(mask, Y, 0.0), mask, alphas, "loo")
+
+        for j in range(Y.shape[1]):
+            rows = mask[:, j]
+            X = StandardScaler().fit_transform(factor_returns.to_numpy()[rows])
+            y = Y[rows, j]
+            for a, alpha in enumerate(alphas):
+                squared = []
+                for i in range(len(y)):
+                    keep = np.arange(len(y)) != i
+                    model = Ridge(alpha=alpha).fit(X[keep], y[keep])
+                    squared.append((y[i] - model.predict(X[i:i + 1])[0]) ** 2)
+                assert errors[a, j] == pytest.approx(np.mean(squared), rel=1e-9)
+
+    def test_select_prefers_more_shrinkage_for_noise(self, synthetic_universe):
+        symbol_returns, factor_returns = synthetic_universe(n_symbols=30)
+        noise = pd.DataFrame(
+            np.random.default_rng(9).normal(0, 0.02, symbol_returns.shape),
+            index=symbol_returns.index,
+            columns=symbol_returns.columns,
+        )
+
+        signal = select_ridge_alpha(symbol_returns, factor_returns)
+        pure_noise = select_ridge_alpha(noise, factor_returns)
+
+        assert signal["symbols_evaluated"] == 28  # SYM0 / SYM1 lack history
+        assert set(signal["symbol_alphas"]) == set(symbol_returns.columns[2:])
+        assert len(signal["error_curve"]) == len(signal["alphas"])
+        assert pure_noise["recommended_alpha"] > signal["recommended_alpha"]
+
@@ -0,0 +1,186 @@
+"""
+Unit tests for correlation cluster detection
+
+find_correlation_components() and CorrelationClusterTree must reproduce the
+recursive DFS clustering detect_correlation_clusters() used to run:
+- components match a brute-force graph search (NaN pairs never linked)
+- every threshold cut of the hierarchy equals the components at that threshold
+- avg_correlation is the mean over member pairs, clusters largest first
+
+Cluster nicknames are cached by symbol set:
+- symbol_set_key() ignores order, case and duplicates
+- cache hits skip generation; misses run concurrently within the bound
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.calculations.correlation_clusters import (
+    CorrelationClusterTree,
+    build_clusters,
+    find_correlation_components,
+    symbol_set_key,
+)
+from app.config import settings
+from app.services import correlation_service
+from app.services.correlation_service import CorrelationService
+
+
+def _block_correlations(n=30, seed=0):
+    """Noisy block-structured correlation matrix with a few NaN pairs."""
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, 5, size=n)
+    correlations = np.where(groups[:, None] == groups[None, :], 0.8, 0.2)
+    correlations = correlations + rng.normal(0.0, 0.15, size=(n, n))
+    correlations = np.clip((correlations + correlations.T) / 2.0, -1.0, 1.0)
+    correlations *= np.where(rng.random(n) < 0.2, -1.0, 1.0)[:, None]  # Negative links count via |corr|
+    correlations = (correlations + correlations.T) / 2.0
+    i, j = 3, 7
+    correlations[i, j] = correlations[j, i] = np.nan
+    np.fill_diagonal(correlations, 1.0)
+    return [f"SYM{k}" for k in range(n)], correlations
+
+
+def _dfs_partition(correlations, threshold):
+    """Partition (as a set of frozensets) from an explicit graph search."""
+    n = correlations.shape[0]
+    seen, partition = set(), set()
+    for start in range(n):
+        if start in seen:
+            continue
+        stack, component = [start], set()
+        while stack:
+            node = stack.pop()
+            if node in component:
+                continue
+            component.add(node)
+            for other in range(n):
+                value = correlations[node, other]
+                if other != node and not np.isnan(value) and abs(value) >= threshold:
+                    stack.append(other)
+        seen |= component
+        partition.add(frozenset(component))
+    return partition
+
+
+def _partition(labels):
+    return {frozenset(np.flatnonzero(labels == label).tolist()) for label in np.unique(labels)}
+
+
+class TestCorrelationComponents:
+    """Sparse-graph components match a brute-force search"""
+
+    @pytest.mark.parametrize("threshold", [0.3, 0.5, 0.7, 0.9])
+    def test_matches_graph_search(self, threshold):
+        _, correlations = _block_correlations()
+
+        labels = find_correlation_components(correlations, threshold)
+
+        assert _partition(labels) == _dfs_partition(correlations, threshold)
+
+    def test_threshold_is_inclusive(self):
+        correlations = np.array([[1.0, 0.7], [0.7, 1.0]])
+
+        assert _partition(find_correlation_components(correlations, 0.7)) == {frozenset({0, 1})}
+        assert _partition(CorrelationClusterTree(["A", "B"], correlations).labels(0.7)) == {frozenset({0, 1})}
+
+
+class TestCorrelationClusterTree:
+    """Hierarchy cuts equal per-threshold components"""
+
+    def test_cuts_match_components(self):
+        symbols, correlations = _block_correlations(seed=1)
+        tree = CorrelationClusterTree(symbols, correlations)
+
+        for threshold in np.linspace(0.1, 0.95, 18):
+            expected = _partition(find_correlation_components(correlations, threshold))
+            assert _partition(tree.labels(threshold)) == expected
+
+    def test_cluster_statistics(self):
+        symbols, correlations = _block_correlations(seed=2)
+
+        clusters = CorrelationClusterTree(symbols, correlations).clusters_at([0.6])[0.6]
+
+        sizes = [len(c["symbols"]) for c in clusters]
+        assert sizes == sorted(sizes, reverse=True)
+        assert all(size >= 2 for size in sizes)
+        for cluster in clusters:
+            idx = cluster["indices"]
+            pairs = [correlations[a, b] for k, a in enumerate(idx) for b in idx[k + 1:]]
+            assert cluster["avg_correlation"] == pytest.approx(np.nanmean(pairs), abs=1e-12)
+            assert cluster["symbols"] == [symbols[i] for i in idx]
+
+    def test_single_symbol(self):
+        tree = CorrelationClusterTree(["AAPL"], np.array([[1.0]]))
+
+        assert tree.clusters(0.7) == []
+        assert build_clusters([], np.empty((0, 0)), np.array([], dtype=int)) == []
+
+
+def _service(cached_rows):
+    """CorrelationService on a fake session whose cache lookup returns cached_rows."""
+    result = MagicMock()
+    result.all.return_value = cached_rows
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    service = CorrelationService.__new__(CorrelationService)
+    service.db = db
+    return service
+
+
+class TestClusterNicknameCache:
+    """Nicknames reused by symbol set, misses generated concurrently"""
+
+    def test_symbol_set_key_is_normalized(self):
+        assert symbol_set_key(["AAPL", "msft", "NVDA"]) == symbol_set_key(["NVDA", "MSFT ", "aapl", "AAPL"])
+        assert symbol_set_key(["AAPL", "MSFT"]) != symbol_set_key(["AAPL", "MSFT", "NVDA"])
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_skip_generation(self):
+        clusters = [{"symbols": ["AAPL", "MSFT"]}, {"symbols": ["XOM", "CVX"]}]
+        service = _service([
+            (symbol_set_key(["MSFT", "AAPL"]), "Big Tech"),
+            (symbol_set_key(["CVX", "XOM"]), "Energy"),
+        ])
+        service.generate_cluster_nickname = AsyncMock()
+
+        await service.assign_cluster_nicknames(clusters, [], portfolio_id=uuid4())
+
+        assert [c["nickname"] for c in clusters] == ["Big Tech", "Energy"]
+        service.generate_cluster_nickname.assert_not_called()
+        assert service.db.execute.await_count == 1  # Lookup only, nothing to upsert
+
+    @pytest.mark.asyncio
+    async def test_misses_generated_concurrently_within_bound(self, monkeypatch):
+        monkeypatch.setattr(settings, "CLUSTER_NICKNAME_CONCURRENCY", 3)
+
+        @asynccontextmanager
+        async def session():
+            yield MagicMock()
+
+        monkeypatch.setattr(correlation_service, "AsyncSessionLocal", session)
+
+        running, peak = 0, 0
+
+        async def generate(symbols, positions, db=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return f"Cluster {symbols[0]}"
+
+        clusters = [{"symbols": [f"S{k}", f"T{k}"]} for k in range(8)]
+        service = _service([(symbol_set_key(["S0", "T0"]), "Cached")])
+        service.generate_cluster_nickname = generate
+
+        await service.assign_cluster_nicknames(clusters, [], portfolio_id=uuid4())
+
+        assert clusters[0]["nickname"] == "Cached"
+        assert [c["nickname"] for c in clusters[1:]] == [f"Cluster S{k}" for k in range(1, 8)]
+        assert 1 < peak <= 3
+        assert service.db.execute.await_count == 2  # Lookup + one upsert for all misses
@@ -0,0 +1,62 @@
+"""
+Unit tests for vectorized pairwise correlation statistics
+
+CorrelationService.calculate_pairwise_statistics must match the per-pair
+path it replaces: for every pair, dropna() on the two columns, len() for
+data_points and scipy.stats.pearsonr for the correlation and p-value.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from app.services.correlation_service import CorrelationService
+
+
+def _returns(n_days=90, n_symbols=8, seed=0):
+    """Returns with random gaps, a late listing, a short history and a constant column."""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0.001, 0.02, size=(n_days, n_symbols))
+    values[:, 1] = 0.7 * values[:, 0] + 0.3 * values[:, 1]
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[:60, 4] = np.nan
+    values[:n_days - 2, 5] = np.nan
+    values[:, 6] = 0.01
+    return pd.DataFrame(values, columns=[f"SYM{j}" for j in range(n_symbols)])
+
+
+class TestPairwiseStatistics:
+    """Vectorized overlaps, correlations and p-values match per-pair pearsonr"""
+
+    def test_matches_per_pair_pearsonr(self):
+        returns = _returns()
+        service = CorrelationService.__new__(CorrelationService)
+
+        correlations, overlaps, p_values = service.calculate_pairwise_statistics(returns)
+
+        symbols = list(returns.columns)
+        for i, s1 in enumerate(symbols):
+            for j, s2 in enumerate(symbols):
+                paired = returns[[s1, s2]].dropna()
+                assert overlaps[i, j] == len(paired)
+                if i == j or len(paired) < 3:
+                    continue
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    r, p = stats.pearsonr(paired[s1], paired[s2])
+                if np.isnan(r):
+                    assert np.isnan(correlations[i, j]) and np.isnan(p_values[i, j])
+                else:
+                    assert correlations[i, j] == pytest.approx(r, abs=1e-12)
+                    assert p_values[i, j] == pytest.approx(p, abs=1e-12)
+
+    def test_correlations_match_pandas(self):
+        returns = _returns(seed=3)
+        service = CorrelationService.__new__(CorrelationService)
+
+        correlations, _, _ = service.calculate_pairwise_statistics(returns)
+
+        expected = returns.corr(min_periods=3).to_numpy()
+        np.testing.assert_allclose(correlations, expected, atol=1e-12, equal_nan=True)
@@ -0,0 +1,81 @@
+"""
+Unit tests for packed correlation matrix storage
+
+Tests:
+- pack/unpack round trip (float32 correlations, int16 overlaps, NaN preserved)
+- legacy pairwise_correlations rows decode to the same matrices
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services.correlation_storage import (
+    load_correlation_matrix,
+    pack_correlation_matrix,
+    unpack_correlation_matrix,
+)
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TLT"]
+
+
+def _matrices(seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(SYMBOLS)
+    a = rng.normal(size=(n, 3 * n))
+    correlations = np.corrcoef(a)
+    correlations[0, 3] = correlations[3, 0] = np.nan  # Insufficient overlap
+    overlaps = rng.integers(10, 90, size=(n, n))
+    overlaps = np.triu(overlaps) + np.triu(overlaps, 1).T
+    significance = np.clip(np.abs(correlations), 0, 1)
+    return correlations, overlaps, significance
+
+
+def _calculation():
+    return SimpleNamespace(
+        id=uuid4(),
+        matrix_symbols=None,
+        packed_correlations=None,
+        packed_overlaps=None,
+        packed_significance=None,
+    )
+
+
+class TestPackedCorrelationMatrix:
+    """Packed upper-triangle storage"""
+
+    def test_round_trip(self):
+        correlations, overlaps, significance = _matrices()
+        calculation = _calculation()
+
+        pack_correlation_matrix(calculation, SYMBOLS, correlations, overlaps, significance)
+        data = unpack_correlation_matrix(calculation)
+
+        n = len(SYMBOLS)
+        assert len(calculation.packed_correlations) == 4 * n * (n + 1) // 2
+        assert len(calculation.packed_overlaps) == 2 * n * (n + 1) // 2
+        assert data.symbols == SYMBOLS
+        np.testing.assert_allclose(data.correlations, correlations, atol=1e-7, equal_nan=True)
+        np.testing.assert_array_equal(data.overlaps, overlaps)
+        np.testing.assert_allclose(data.significance, significance, atol=1e-7, equal_nan=True)
+
+    @pytest.mark.asyncio
+    async def test_legacy_rows_match_packed(self):
+        correlations, overlaps, significance = _matrices(seed=1)
+        rows = [
+            (s1, s2, correlations[i, j], int(overlaps[i, j]), significance[i, j])
+            for i, s1 in enumerate(SYMBOLS) for j, s2 in enumerate(SYMBOLS)
+        ]
+        result = MagicMock()
+        result.all.return_value = rows
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+
+        legacy = await load_correlation_matrix(db, _calculation())
+
+        assert legacy.symbols == sorted(SYMBOLS)
+        order = [SYMBOLS.index(s) for s in legacy.symbols]
+        np.testing.assert_allclose(legacy.correlations, correlations[np.ix_(order, order)], equal_nan=True)
+        np.testing.assert_array_equal(legacy.overlaps, overlaps[np.ix_(order, order)])
@@ -0,0 +1,155 @@
+"""
+Unit tests for persisted factor returns
+
+Tests:
+- stored returns, re-aligned, match get_returns(align_dates=True) on the prices
+- factor_return_rows() only anchors a NULL first return for unstored symbols
+- get_factor_returns() serves the table, memoizes, and falls back when the
+  window's start or most recent trading days are not stored
+"""
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.calculations import factor_returns
+from app.calculations.factor_returns import (
+    align_factor_returns,
+    clear_factor_return_memo,
+    factor_return_rows,
+    get_factor_returns,
+)
+
+ETFS = ["SPY", "TLT", "VTV"]
+
+
+def _prices(n_days=60, seed=0):
+    """ETF closes with a few missing days per column."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2025-03-03", periods=n_days, name="date")
+    prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_days, len(ETFS))), axis=0)
+    prices[[5, 17], 0] = np.nan
+    prices[[17, 30], 1] = np.nan
+    prices[:3, 2] = np.nan  # first close inside the range
+    return pd.DataFrame(prices, index=index, columns=ETFS)
+
+
+def _stored_frame(rows):
+    """Pivot factor_return_rows() output the way get_factor_returns() does."""
+    frame = pd.DataFrame(rows)
+    frame["date"] = pd.to_datetime(frame["return_date"])
+    frame["daily_return"] = frame["daily_return"].map(lambda v: 0.0 if v is None else float(v))
+    return frame.pivot(index="date", columns="symbol", values="daily_return").sort_index()
+
+
+def _expected_returns(prices, symbols):
+    """get_returns(align_dates=True) on a price frame."""
+    return prices[symbols].dropna().pct_change(fill_method=None).dropna()
+
+
+def _fake_db(rows, symbols):
+    """AsyncSession stand-in returning the symbols' rows for the factor_returns select."""
+    records = [
+        SimpleNamespace(symbol=r["symbol"], return_date=r["return_date"], daily_return=r["daily_return"])
+        for r in rows if r["symbol"] in symbols
+    ]
+    result = MagicMock()
+    result.all.return_value = records
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+class TestAlignFactorReturns:
+    """Stored gap-aware returns rebuild aligned price returns"""
+
+    @pytest.mark.parametrize("symbols", [ETFS, ["SPY", "TLT"], ["TLT"]])
+    def test_matches_aligned_price_returns(self, symbols):
+        prices = _prices()
+        stored = _stored_frame(factor_return_rows(prices, stored_symbols=set()))
+
+        aligned = align_factor_returns(stored[symbols])
+
+        expected = _expected_returns(prices, symbols)
+        assert list(aligned.index) == list(expected.index)
+        np.testing.assert_allclose(aligned.to_numpy(), expected.to_numpy(), atol=1e-11)
+
+
+class TestFactorReturnRows:
+    """Row building for refresh_factor_returns"""
+
+    def test_first_close_only_anchored_when_unstored(self):
+        prices = _prices()
+
+        fresh = factor_return_rows(prices, stored_symbols=set())
+        incremental = factor_return_rows(prices, stored_symbols={"SPY"})
+
+        nulls = {r["symbol"] for r in fresh if r["daily_return"] is None}
+        assert nulls == set(ETFS)
+        assert not any(r["symbol"] == "SPY" and r["daily_return"] is None for r in incremental)
+        assert len(fresh) == int(prices.notna().sum().sum())
+
+
+class TestGetFactorReturns:
+    """get_factor_returns reads the table, memoizes and falls back"""
+
+    @pytest.mark.asyncio
+    async def test_serves_table_and_memoizes(self):
+        clear_factor_return_memo()
+        prices = _prices()
+        db = _fake_db(factor_return_rows(prices, stored_symbols=set()), ["VTV", "SPY"])
+        start, end = prices.index[0].date(), prices.index[-1].date()
+
+        first = await get_factor_returns(db, ["VTV", "SPY"], start, end)
+        second = await get_factor_returns(db, ["VTV", "SPY"], start, end)
+
+        expected = _expected_returns(prices, ["VTV", "SPY"])
+        assert list(first.columns) == ["VTV", "SPY"]
+        np.testing.assert_allclose(first.to_numpy(), expected.to_numpy(), atol=1e-11)
+        pd.testing.assert_frame_equal(first, second)
+        assert db.execute.await_count == 1
+        clear_factor_return_memo()
+
+    @pytest.mark.asyncio
+    async def test_memo_is_bounded(self, monkeypatch):
+        prices = _prices()
+        db = _fake_db(factor_return_rows(prices, stored_symbols=set()), ["SPY"])
+        monkeypatch.setattr(factor_returns, "_memo", factor_returns.TTLCache(maxsize=2, ttl=60))
+        end = prices.index[-1].date()
+
+        for days in (0, 1, 2):
+            await get_factor_returns(db, ["SPY"], prices.index[days].date(), end)
+
+        assert len(factor_returns._memo) == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_window_not_stored(self, monkeypatch):
+        clear_factor_return_memo()
+        prices = _prices()
+        db = _fake_db(factor_return_rows(prices, stored_symbols=set()), ["SPY"])
+        fallback = AsyncMock(return_value=_expected_returns(prices, ["SPY"]))
+        monkeypatch.setattr(factor_returns, "get_returns", fallback)
+        start = prices.index[0].date() - timedelta(days=30)  # Older than the stored history
+
+        returns = await get_factor_returns(db, ["SPY"], start, prices.index[-1].date())
+
+        fallback.assert_awaited_once()
+        assert len(returns) == len(_expected_returns(prices, ["SPY"]))
+        clear_factor_return_memo()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_recent_days_not_stored(self, monkeypatch):
+        clear_factor_return_memo()
+        prices = _prices()
+        db = _fake_db(factor_return_rows(prices, stored_symbols=set()), ["SPY"])
+        fallback = AsyncMock(return_value=_expected_returns(prices, ["SPY"]))
+        monkeypatch.setattr(factor_returns, "get_returns", fallback)
+        end = prices.index[-1].date() + timedelta(days=7)  # Table not refreshed through end
+
+        await get_factor_returns(db, ["SPY"], prices.index[0].date(), end)
+
+        fallback.assert_awaited_once()
+        clear_factor_return_memo()
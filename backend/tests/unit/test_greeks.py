@@ -0,0 +1,125 @@
+"""
+Unit tests for the vectorized Black-Scholes Greeks engine
+
+- black_scholes_greeks() matches mibian per contract, in the units stored in
+  position_greeks (vega/rho per-1% figures / 100, mibian's percent rate input)
+- calculate_positions_greeks() equals calculate_position_greeks() per position,
+  including expired, stock and unpriced positions
+- bulk_upsert_position_greeks() writes chunked multi-row upserts
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.calculations import greeks as greeks_module
+from app.calculations.greeks import (
+    GREEK_NAMES,
+    black_scholes_greeks,
+    bulk_upsert_position_greeks,
+    calculate_position_greeks,
+    calculate_positions_greeks,
+)
+from app.models.positions import PositionType
+
+
+def _option(position_type, strike, days, underlying='AAPL', quantity=1):
+    return SimpleNamespace(
+        id=uuid4(),
+        symbol=f"{underlying}_{position_type.value}_{strike}",
+        investment_class='OPTIONS',
+        position_type=position_type,
+        strike_price=Decimal(str(strike)),
+        expiration_date=date.today() + timedelta(days=days),
+        underlying_symbol=underlying,
+        quantity=Decimal(str(quantity)),
+    )
+
+
+class TestBlackScholesGreeks:
+    """Kernel matches mibian contract by contract"""
+
+    def test_matches_mibian(self):
+        mibian = pytest.importorskip("mibian")
+        rng = np.random.default_rng(0)
+        n = 40
+        spot = rng.uniform(50, 150, n)
+        strike = rng.uniform(50, 150, n)
+        tte = rng.uniform(5, 700, n) / 365.0
+        vol = rng.uniform(0.1, 0.8, n)
+        is_call = rng.random(n) < 0.5
+
+        result = black_scholes_greeks(spot, strike, tte, vol, 0.05 / 100.0, is_call)
+
+        for k in range(n):
+            bs = mibian.BS([spot[k], strike[k], 0.05, tte[k] * 365], volatility=vol[k] * 100)
+            expected = {
+                "delta": bs.callDelta if is_call[k] else bs.putDelta,
+                "gamma": bs.gamma,
+                "theta": bs.callTheta if is_call[k] else bs.putTheta,
+                "vega": bs.vega / 100.0,
+                "rho": (bs.callRho if is_call[k] else bs.putRho) / 100.0,
+            }
+            for name in GREEK_NAMES:
+                assert result[name][k] == pytest.approx(expected[name], rel=1e-9, abs=1e-14)
+
+    def test_invalid_inputs_are_nan(self):
+        result = black_scholes_greeks([100.0, 100.0, 0.0], 100.0, [0.5, 0.0, 0.5], [0.2, 0.2, 0.2], 0.0005, True)
+
+        assert not np.isnan(result["delta"][0])
+        assert np.isnan(result["delta"][1:]).all()
+
+
+class TestCalculatePositionsGreeks:
+    """One call for a whole book equals per-position calculation"""
+
+    @pytest.mark.asyncio
+    async def test_matches_single_position_path(self):
+        positions = [
+            _option(PositionType.LC, 190, 30, quantity=10),
+            _option(PositionType.SP, 170, 90, quantity=-5),
+            _option(PositionType.LP, 200, 400, underlying='MSFT', quantity=2),
+            _option(PositionType.LC, 150, -3),  # Expired
+            _option(PositionType.SC, 150, 20, underlying='NOPRICE'),
+            SimpleNamespace(id=uuid4(), symbol='AAPL', investment_class='PUBLIC', position_type=PositionType.LONG,
+                            strike_price=None, expiration_date=None, underlying_symbol=None, quantity=Decimal('100')),
+        ]
+        market_data = {
+            'AAPL': {'current_price': 185.0, 'implied_volatility': 0.3},
+            'MSFT': {'current_price': 410.0},
+            'risk_free_rate': 0.045,
+        }
+
+        batch = calculate_positions_greeks(positions, market_data)
+
+        assert set(batch) == {p.id for p in positions[:4]}
+        assert batch[positions[3].id] == {name: 0.0 for name in GREEK_NAMES}
+        for position in positions:
+            single = await calculate_position_greeks(position, market_data)
+            if single is None:
+                assert position.id not in batch
+            else:
+                for name in GREEK_NAMES:
+                    assert batch[position.id][name] == pytest.approx(single[name], rel=1e-12)
+
+
+class TestBulkUpsertPositionGreeks:
+    """Chunked multi-row upserts"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_rows(self, monkeypatch):
+        monkeypatch.setattr(greeks_module, 'GREEKS_UPSERT_CHUNK_ROWS', 2)
+        db = MagicMock()
+        db.execute = AsyncMock()
+        greeks = {uuid4(): {name: 0.5 for name in GREEK_NAMES} for _ in range(5)}
+
+        written = await bulk_upsert_position_greeks(db, greeks, date(2026, 10, 15))
+
+        assert written == 5
+        assert db.execute.await_count == 3
+        params = db.execute.await_args_list[0].args[0].compile().params
+        assert params['delta_dollars_m0'] == Decimal('50.0')
@@ -0,0 +1,172 @@
+"""
+Unit tests for the historical-simulation VaR/ES engine
+
+- filter_returns() matches an explicit EWMA recursion (Hull-White rescaling)
+- tail_risk() matches per-portfolio sorting: k-th worst loss and mean of the k worst
+- run_var_for_portfolios() on a populated PriceCache equals a per-position
+  loop over the same returns; options and symbols without (near-complete)
+  history are excluded
+- 10-day figures are the 1-day figures x sqrt(10)
+"""
+import math
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.cache.price_cache import PriceCache
+from app.calculations import historical_var
+from app.calculations.historical_var import (
+    FHS_EWMA_LAMBDA,
+    filter_returns,
+    run_var_for_portfolios,
+    tail_risk,
+)
+
+CALC_DATE = date(2026, 10, 15)
+
+
+def _reference_filter(returns, decay):
+    """Day-by-day EWMA variance and rescaling."""
+    n_days, n_symbols = returns.shape
+    variance = np.empty((n_days, n_symbols))
+    variance[0] = np.mean(returns ** 2, axis=0)
+    for t in range(1, n_days):
+        variance[t] = decay * variance[t - 1] + (1 - decay) * returns[t - 1] ** 2
+    forecast = decay * variance[-1] + (1 - decay) * returns[-1] ** 2
+    filtered = np.array(returns, dtype=float)
+    for t in range(n_days):
+        for j in range(n_symbols):
+            if variance[t, j] > 0:
+                filtered[t, j] = returns[t, j] * math.sqrt(forecast[j]) / math.sqrt(variance[t, j])
+    return filtered
+
+
+def _price_cache(symbols, n_days=130, seed=0):
+    """PriceCache with random-walk closes over the last n_days weekdays."""
+    rng = np.random.default_rng(seed)
+    days = []
+    day = CALC_DATE
+    while len(days) < n_days:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    days.reverse()
+
+    cache = PriceCache()
+    for k, symbol in enumerate(symbols):
+        closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01 + 0.005 * k, n_days)))
+        if symbol == 'NEWCO':
+            days_held, closes = days[-20:], closes[-20:]  # Too little history
+        elif symbol == 'GAPCO':
+            days_held, closes = days[-70:], closes[-70:]  # Enough returns, too little coverage
+        else:
+            days_held = days
+        cache.set_prices([symbol] * len(days_held), days_held, closes.tolist())
+    return cache
+
+
+def _weight(symbol, market_value, equity, is_option=False):
+    return SimpleNamespace(position_id=uuid4(), symbol=symbol, weight=market_value / equity, is_option=is_option)
+
+
+class TestFilterReturns:
+    """Vectorized EWMA filtering matches the recursion"""
+
+    def test_matches_recursion(self):
+        rng = np.random.default_rng(1)
+        returns = rng.normal(0, 0.02, size=(120, 5))
+        returns[:, 4] = 0.0  # Zero volatility: left unscaled
+
+        np.testing.assert_allclose(
+            filter_returns(returns, FHS_EWMA_LAMBDA), _reference_filter(returns, FHS_EWMA_LAMBDA), rtol=1e-10
+        )
+
+
+class TestTailRisk:
+    """VaR/ES from one sort of the P&L matrix"""
+
+    @pytest.mark.parametrize("confidence", [0.95, 0.99])
+    def test_matches_sorted_losses(self, confidence):
+        pnl = np.random.default_rng(2).normal(0, 1000, size=(4, 125))
+
+        var, es = tail_risk(pnl, confidence)
+
+        k = math.ceil(125 * (1 - confidence))
+        for p in range(4):
+            worst = np.sort(pnl[p])[:k]
+            assert var[p] == pytest.approx(-worst[-1])
+            assert es[p] == pytest.approx(-worst.mean())
+            assert es[p] >= var[p]
+
+
+class TestRunVarForPortfolios:
+    """All portfolios from one return matrix"""
+
+    @pytest.mark.asyncio
+    async def test_matches_position_loop(self, monkeypatch):
+        symbols = ['AAPL', 'MSFT', 'XOM', 'NEWCO', 'GAPCO']
+        cache = _price_cache(symbols)
+        growth, energy, private = uuid4(), uuid4(), uuid4()
+        equity = {growth: 1_000_000.0, energy: 500_000.0, private: 250_000.0}
+        weights = {
+            growth: [
+                _weight('AAPL', 400_000, equity[growth]),
+                _weight('MSFT', 300_000, equity[growth]),
+                _weight('XOM', -100_000, equity[growth]),
+                _weight('AAPL_C', 20_000, equity[growth], is_option=True),
+                _weight('NEWCO', 50_000, equity[growth]),
+                _weight('GAPCO', 50_000, equity[growth]),
+            ],
+            energy: [_weight('XOM', 450_000, equity[energy]), _weight('MSFT', 25_000, equity[energy])],
+            private: [_weight('NOPRICE', 250_000, equity[private])],
+        }
+        monkeypatch.setattr(
+            historical_var, 'load_all_portfolio_position_weights',
+            AsyncMock(return_value=(weights, equity, {}))
+        )
+
+        outcome = await run_var_for_portfolios(MagicMock(), list(weights), CALC_DATE, cache)
+
+        assert outcome['skipped'] == {private: 'no_simulatable_positions'}
+        result = outcome['results'][growth]
+        assert result['positions_simulated'] == 3 and result['positions_excluded'] == 3
+        assert result['simulated_value'] == pytest.approx(800_000.0)
+        start = CALC_DATE - timedelta(days=historical_var.VAR_LOOKBACK_CALENDAR_DAYS)
+        assert result['observations'] == len(cache.get_dates(start, CALC_DATE)) - 1
+
+        prices = cache.get_window(['AAPL', 'MSFT', 'XOM'], start, CALC_DATE)
+        returns = prices[1:] / prices[:-1] - 1.0
+        for pid, positions in [(growth, {'AAPL': 400_000, 'MSFT': 300_000, 'XOM': -100_000}),
+                               (energy, {'XOM': 450_000, 'MSFT': 25_000})]:
+            columns = {'AAPL': 0, 'MSFT': 1, 'XOM': 2}
+            filtered = filter_returns(returns)
+            for method, scenario_returns in [('historical', returns), ('filtered_historical', filtered)]:
+                pnl = sum(scenario_returns[:, columns[s]] * value for s, value in positions.items())
+                for confidence in (0.95, 0.99):
+                    k = math.ceil(len(pnl) * (1 - confidence))
+                    worst = np.sort(pnl)[:k]
+                    metrics = {
+                        m['horizon_days']: m for m in outcome['results'][pid]['metrics']
+                        if m['method'] == method and m['confidence_level'] == confidence
+                    }
+                    assert metrics[1]['var'] == pytest.approx(-worst[-1], rel=1e-9)
+                    assert metrics[1]['expected_shortfall'] == pytest.approx(-worst.mean(), rel=1e-9)
+                    assert metrics[10]['var'] == pytest.approx(metrics[1]['var'] * math.sqrt(10))
+
+    @pytest.mark.asyncio
+    async def test_insufficient_history(self, monkeypatch):
+        cache = _price_cache(['AAPL'], n_days=30)
+        pid = uuid4()
+        monkeypatch.setattr(
+            historical_var, 'load_all_portfolio_position_weights',
+            AsyncMock(return_value=({pid: [_weight('AAPL', 1e5, 1e5)]}, {pid: 1e5}, {}))
+        )
+
+        outcome = await run_var_for_portfolios(MagicMock(), [pid], CALC_DATE, cache)
+
+        assert outcome['results'] == {}
+        assert outcome['skipped'] == {pid: 'insufficient_price_history'}
@@ -0,0 +1,188 @@
+"""
+Unit tests for the vectorized implied volatility solver
+
+- solve_implied_volatility() recovers the volatility a price was generated
+  with, and matches scipy's brentq per contract
+- prices outside the no-arbitrage bounds have no implied volatility
+- get_contract_implied_volatilities() solves each (contract, date, quote) once,
+  re-solves new quotes, keeps namespaces apart and keeps a bounded cache
+- Greeks use the solved implied volatility when a contract has a market price
+"""
+import warnings
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from app.calculations import implied_volatility
+from app.calculations.greeks import black_scholes_greeks, calculate_positions_greeks
+from app.calculations.implied_volatility import (
+    black_scholes_price,
+    clear_implied_volatility_cache,
+    get_contract_implied_volatilities,
+    solve_implied_volatility,
+)
+from app.models.positions import PositionType
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_implied_volatility_cache()
+    yield
+    clear_implied_volatility_cache()
+
+
+def _chain(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(
+        spot=np.full(n, 100.0),
+        strike=rng.uniform(60, 140, n),
+        tte=rng.uniform(3, 730, n) / 365.0,
+        vol=rng.uniform(0.08, 1.5, n),
+        rate=np.full(n, 0.04),
+        is_call=rng.random(n) < 0.5,
+    )
+
+
+class TestSolveImpliedVolatility:
+    """Vectorized safeguarded Newton"""
+
+    def test_recovers_generating_volatility(self):
+        chain = _chain()
+        prices = black_scholes_price(chain['spot'], chain['strike'], chain['tte'], chain['vol'],
+                                     chain['rate'], chain['is_call'])
+
+        solved = solve_implied_volatility(prices, chain['spot'], chain['strike'], chain['tte'],
+                                          chain['rate'], chain['is_call'])
+
+        # Deep out-of-the-money prices below the price tolerance carry no volatility information
+        informative = prices > 1e-4
+        np.testing.assert_allclose(solved[informative], chain['vol'][informative], rtol=1e-6)
+        repriced = black_scholes_price(chain['spot'], chain['strike'], chain['tte'], solved,
+                                       chain['rate'], chain['is_call'])
+        np.testing.assert_allclose(repriced[informative], prices[informative], atol=1e-7)
+
+    def test_matches_brentq(self):
+        chain = _chain(n=20, seed=1)
+        prices = black_scholes_price(chain['spot'], chain['strike'], chain['tte'], chain['vol'],
+                                     chain['rate'], chain['is_call']) * 1.01
+
+        solved = solve_implied_volatility(prices, chain['spot'], chain['strike'], chain['tte'],
+                                          chain['rate'], chain['is_call'])
+
+        for k in range(20):
+            def objective(v):
+                return black_scholes_price(100.0, chain['strike'][k], chain['tte'][k], v, 0.04,
+                                           chain['is_call'][k]) - prices[k]
+            assert solved[k] == pytest.approx(brentq(objective, 1e-4, 5.0, xtol=1e-14), rel=1e-6)
+
+    def test_no_arbitrage_violations_are_nan(self):
+        solved = solve_implied_volatility(
+            [5.0, 101.0, 1.0, 3.0],
+            100.0,
+            [90.0, 100.0, 100.0, 100.0],
+            [0.5, 0.5, 0.0, 0.5],
+            0.0,
+            [True, True, True, False],
+        )
+
+        assert np.isnan(solved[:3]).all()  # Below intrinsic, above spot, expired
+        assert 0 < solved[3] < 1
+
+    def test_large_chain_solves_without_warnings(self):
+        chain = _chain(n=20_000, seed=2)
+        prices = black_scholes_price(chain['spot'], chain['strike'], chain['tte'], chain['vol'],
+                                     chain['rate'], chain['is_call'])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            solve_implied_volatility(prices, chain['spot'], chain['strike'], chain['tte'],
+                                     chain['rate'], chain['is_call'])
+
+
+class TestContractImpliedVolatilities:
+    """(contract, date, quote) cache"""
+
+    def test_solves_each_contract_once_per_date(self, monkeypatch):
+        calls = []
+        solve = implied_volatility.solve_implied_volatility
+        monkeypatch.setattr(implied_volatility, 'solve_implied_volatility',
+                            lambda *args, **kwargs: calls.append(len(args[0])) or solve(*args, **kwargs))
+        contracts = [
+            {'symbol': 'AAPL_C', 'option_price': 6.0, 'underlying_price': 100.0, 'strike': 100.0,
+             'time_to_expiry': 0.25, 'risk_free_rate': 0.0005, 'is_call': True},
+            {'symbol': 'AAPL_BAD', 'option_price': 150.0, 'underlying_price': 100.0, 'strike': 100.0,
+             'time_to_expiry': 0.25, 'risk_free_rate': 0.0005, 'is_call': True},
+        ]
+
+        first = get_contract_implied_volatilities(contracts, date(2026, 10, 15))
+        second = get_contract_implied_volatilities(contracts, date(2026, 10, 15))
+        get_contract_implied_volatilities(contracts[:1], date(2026, 10, 16))
+
+        assert first == second
+        assert first['AAPL_BAD'] is None and 0 < first['AAPL_C'] < 1
+        assert calls == [2, 1]
+
+
+    def test_new_quote_is_resolved(self):
+        contract = {'symbol': 'AAPL_C', 'option_price': 6.0, 'underlying_price': 100.0, 'strike': 100.0,
+                    'time_to_expiry': 0.25, 'risk_free_rate': 0.0005, 'is_call': True}
+
+        stale = get_contract_implied_volatilities([contract], date(2026, 10, 15))
+        fresh = get_contract_implied_volatilities([{**contract, 'option_price': 7.0}], date(2026, 10, 15))
+
+        assert fresh['AAPL_C'] > stale['AAPL_C']
+
+    def test_namespaces_do_not_share_entries(self, monkeypatch):
+        calls = []
+        solve = implied_volatility.solve_implied_volatility
+        monkeypatch.setattr(implied_volatility, 'solve_implied_volatility',
+                            lambda *args, **kwargs: calls.append(len(args[0])) or solve(*args, **kwargs))
+        contract = {'symbol': 'AAPL_C', 'option_price': 6.0, 'underlying_price': 100.0, 'strike': 100.0,
+                    'time_to_expiry': 0.25, 'risk_free_rate': 0.05, 'is_call': True}
+
+        get_contract_implied_volatilities([contract], date(2026, 10, 15), namespace='greeks')
+        get_contract_implied_volatilities([contract], date(2026, 10, 15), namespace='chain')
+
+        assert calls == [1, 1]
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(implied_volatility, '_iv_cache', implied_volatility.TTLCache(maxsize=2, ttl=60))
+        contracts = [
+            {'symbol': f'C{k}', 'option_price': 6.0, 'underlying_price': 100.0, 'strike': 100.0,
+             'time_to_expiry': 0.25, 'risk_free_rate': 0.0005, 'is_call': True}
+            for k in range(3)
+        ]
+
+        get_contract_implied_volatilities(contracts, date(2026, 10, 15))
+
+        assert len(implied_volatility._iv_cache) == 2
+
+
+class TestGreeksUseImpliedVolatility:
+    """Contracts with a market price are priced at their implied volatility"""
+
+    def test_option_price_drives_volatility(self):
+        expiry = date.today() + timedelta(days=60)
+        tte = (expiry - date.today()).days / 365.0
+        price = float(black_scholes_price(185.0, 190.0, tte, 0.42, 0.045 / 100, True))
+        position = SimpleNamespace(
+            id=uuid4(), symbol='AAPL_C190', investment_class='OPTIONS', position_type=PositionType.LC,
+            strike_price=Decimal('190'), expiration_date=expiry, underlying_symbol='AAPL',
+            quantity=Decimal('1'), last_price=None,
+        )
+        market_data = {
+            'AAPL': {'current_price': 185.0, 'implied_volatility': 0.25},
+            'AAPL_C190': {'bid': price - 0.05, 'ask': price + 0.05},
+            'risk_free_rate': 0.045,
+        }
+
+        greeks = calculate_positions_greeks([position], market_data)[position.id]
+
+        expected = black_scholes_greeks(185.0, 190.0, tte, 0.42, 0.045 / 100, True)
+        assert greeks['delta'] == pytest.approx(float(expected['delta']), rel=1e-6)
+        assert greeks['vega'] == pytest.approx(float(expected['vega']), rel=1e-6)
@@ -2,6 +2,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 from uuid import uuid4
 
+import pandas as pd
 import pytest
 
 from app.batch.pnl_calculator import PnLCalculator
@@ -160,3 +161,47 @@ async def test_daily_return_aligned_for_short_positions(monkeypatch):
 
     assert result["daily_pnl"] == Decimal("20")  # (-10 * 48) - (-10 * 50)
     assert result["daily_return"] == Decimal("0.04")
+
+
+@pytest.mark.asyncio
+async def test_fetch_historical_prices_cache_path_matches_pivot_layout():
+    """Cache slice keeps only trading days and symbols with data, sorted like pivot_table."""
+    from app.cache.price_cache import PriceCache
+    from app.calculations.market_data import fetch_historical_prices
+
+    cache = PriceCache()
+    cache.set_price("MSFT", date(2025, 3, 3), Decimal("400"))
+    cache.set_price("AAPL", date(2025, 3, 3), Decimal("200"))
+    cache.set_price("AAPL", date(2025, 3, 4), Decimal("202"))
+    cache.set_price("AAPL", date(2025, 3, 8), Decimal("999"))  # Saturday - ignored
+
+    price_df = await fetch_historical_prices(
+        None, ["MSFT", "AAPL", "MISSING"], date(2025, 3, 1), date(2025, 3, 9), price_cache=cache
+    )
+
+    assert list(price_df.columns) == ["AAPL", "MSFT"]
+    assert [ts.date() for ts in price_df.index] == [date(2025, 3, 3), date(2025, 3, 4)]
+    assert price_df.loc["2025-03-04", "AAPL"] == 202.0
+    assert pd.isna(price_df.loc["2025-03-04", "MSFT"])
+
+
+@pytest.mark.asyncio
+async def test_get_returns_matrix_matches_single_symbol_returns():
+    """Each matrix column equals get_returns() for that symbol alone (gap-aware)."""
+    from app.cache.price_cache import PriceCache
+    from app.calculations.market_data import get_returns, get_returns_matrix
+
+    cache = PriceCache()
+    days = [date(2025, 3, 3) + timedelta(days=i) for i in (0, 1, 2, 3, 4, 7, 8)]
+    for i, day in enumerate(days):
+        cache.set_price("AAPL", day, Decimal(100 + i))
+        if i != 2:  # MSFT gap on the third day
+            cache.set_price("MSFT", day, Decimal(200 - i))
+
+    matrix = await get_returns_matrix(None, ["AAPL", "MSFT"], days[0], days[-1], price_cache=cache)
+
+    for symbol in ("AAPL", "MSFT"):
+        single = await get_returns(None, [symbol], days[0], days[-1], price_cache=cache)
+        column = matrix[symbol].dropna()
+        assert list(column.index) == list(single.index)
+        assert column.to_numpy() == pytest.approx(single[symbol].to_numpy())
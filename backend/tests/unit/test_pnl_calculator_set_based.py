@@ -0,0 +1,235 @@
+"""
+Unit tests for the set-based P&L mode of PnLCalculator
+
+- _build_snapshot_rows() reproduces the per-portfolio P&L rules (option
+  multiplier, PRIVATE and first-snapshot positions at $0, prior-close
+  fallback) and the snapshot exposure/cash/count fields
+- _load_prices() resolves current, prior and snapshot closes like the
+  per-symbol lookups, preferring the price cache for the current close
+- calculate_all_portfolios_pnl(set_based=True) recovers incomplete snapshots,
+  skips portfolios whose slot is taken and writes one snapshot upsert and one
+  equity update per chunk; current-date snapshots carry sector exposure, and
+  a failing chunk is retried one portfolio at a time
+"""
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.batch import pnl_calculator as pnl_calculator_module
+from app.batch.pnl_calculator import PnLCalculator
+from app.models.positions import PositionType
+
+CALC_DATE = date(2024, 5, 6)  # Monday
+PREV_DATE = date(2024, 5, 3)
+
+
+def _position(portfolio_id, symbol, quantity, position_type=PositionType.LONG, investment_class='PUBLIC',
+              exit_date=None, market_value=None, entry_price=Decimal('10')):
+    return SimpleNamespace(
+        portfolio_id=portfolio_id, symbol=symbol, quantity=Decimal(str(quantity)), position_type=position_type,
+        investment_class=investment_class, exit_date=exit_date, market_value=market_value, entry_price=entry_price,
+    )
+
+
+def _previous(equity, cumulative_pnl=Decimal('0')):
+    return SimpleNamespace(equity_balance=Decimal(equity), cumulative_pnl=cumulative_pnl,
+                           cumulative_realized_pnl=Decimal('0'), cumulative_capital_flow=Decimal('0'))
+
+
+def _result(rows=(), scalars=()):
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    result.scalars.return_value.all.return_value = list(scalars)
+    return result
+
+
+class TestBuildSnapshotRows:
+    """Array math matches the per-portfolio rules"""
+
+    def test_pnl_equity_and_exposures(self):
+        p1, p2 = uuid4(), uuid4()
+        positions = [
+            _position(p1, 'AAPL', 100),
+            _position(p1, 'AAPL_C', -2, PositionType.SC),
+            _position(p1, 'HOME', 1, investment_class='PRIVATE', market_value=Decimal('5000')),
+            _position(p1, 'MSFT', 10, exit_date=CALC_DATE),  # Exited: P&L only
+            _position(p1, 'NOPREV', 5),  # No prior close: P&L $0
+            _position(p2, 'AAPL', 10),  # First snapshot: P&L $0
+        ]
+        prices = {
+            'AAPL': (105.0, 100.0, 105.0),
+            'AAPL_C': (3.0, 2.5, 3.0),
+            'HOME': (np.nan, np.nan, np.nan),
+            'MSFT': (410.0, 400.0, 410.0),
+            'NOPREV': (20.0, np.nan, 20.0),
+        }
+
+        rows = PnLCalculator()._build_snapshot_rows(
+            claimed=[p1, p2],
+            calculation_date=CALC_DATE,
+            initial_equity={p1: Decimal('1'), p2: Decimal('20000')},
+            positions=positions,
+            previous_snapshots={p1: _previous('100000', Decimal('250'))},
+            realized_pnl={p1: Decimal('300')},
+            capital_flows={p1: Decimal('-1000')},
+            prices=prices,
+        )
+        first, second = rows
+
+        # 500 (AAPL) - 100 (short call x100) + 100 (MSFT) unrealized, + 300 realized
+        assert first['daily_pnl'] == Decimal('800.00')
+        assert first['equity_balance'] == Decimal('99800.00')
+        assert first['cumulative_pnl'] == Decimal('1050.00')
+        assert first['daily_return'] == Decimal('0.008')
+        assert first['long_value'] == Decimal('15600.00')  # 10500 + 5000 + 100
+        assert first['short_value'] == Decimal('-600.00')
+        assert first['gross_exposure'] == Decimal('16200.00')
+        assert first['cash_value'] == Decimal('99800.00') - Decimal('15600.00') + Decimal('600.00')
+        assert (first['num_positions'], first['num_long_positions'], first['num_short_positions']) == (4, 3, 1)
+        assert first['is_complete'] is True
+
+        assert second['daily_pnl'] == Decimal('0.00')
+        assert second['equity_balance'] == Decimal('20000.00')
+        assert second['total_value'] == Decimal('20000.00')
+
+    def test_empty_portfolio_is_zero_snapshot(self):
+        portfolio_id = uuid4()
+
+        row, = PnLCalculator()._build_snapshot_rows(
+            claimed=[portfolio_id], calculation_date=CALC_DATE, initial_equity={portfolio_id: Decimal('500')},
+            positions=[], previous_snapshots={}, realized_pnl={}, capital_flows={portfolio_id: Decimal('100')},
+            prices={},
+        )
+
+        assert row['equity_balance'] == Decimal('600')
+        assert row['total_value'] == Decimal('0') and row['portfolio_delta'] is None
+
+
+class TestLoadPrices:
+    """Latest two closes per symbol resolve all three prices"""
+
+    @pytest.mark.asyncio
+    async def test_current_previous_and_snapshot_prices(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_result(rows=[
+            ('AAPL', CALC_DATE, Decimal('105')), ('AAPL', PREV_DATE, Decimal('100')),
+            ('STALE', date(2024, 4, 1), Decimal('50')),
+            ('CACHED', PREV_DATE, Decimal('30')),
+        ]))
+        price_cache = MagicMock()
+        price_cache.get_price.side_effect = lambda symbol, _: Decimal('31') if symbol == 'CACHED' else None
+
+        prices = await PnLCalculator()._load_prices(db, {'AAPL', 'STALE', 'CACHED', 'NONE'}, CALC_DATE, price_cache)
+
+        assert prices['AAPL'] == (105.0, 100.0, 105.0)
+        assert np.isnan(prices['STALE'][:2]).all() and prices['STALE'][2] == 50.0
+        assert prices['CACHED'] == (31.0, 30.0, 30.0)
+        assert np.isnan(prices['NONE']).all()
+
+
+def _run_db(portfolio, calculation_date):
+    """Session stand-in for one set-based chunk: portfolio row, claim, bulk loads, writes."""
+    db = MagicMock()
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    db.execute = AsyncMock(side_effect=[
+        _result(rows=[(portfolio, Decimal('1000'))]),
+        _result(),  # No incomplete snapshots
+        _result(scalars=[portfolio]),
+        _result(rows=[_position(portfolio, 'AAPL', 10)]),
+        _result(),
+        _result(),
+        _result(),
+        _result(rows=[('AAPL', calculation_date, Decimal('105'))]),
+        _result(),  # Equity update
+        _result(),  # Snapshot upsert
+    ])
+    return db
+
+
+class TestSetBasedRun:
+    """Slot claiming, bulk writes and per-chunk failure isolation"""
+
+    @pytest.mark.asyncio
+    async def test_claims_slots_and_writes_in_bulk(self):
+        claimed, complete, recovered = uuid4(), uuid4(), uuid4()
+        db = MagicMock()
+        db.commit = AsyncMock()
+        db.rollback = AsyncMock()
+        db.execute = AsyncMock(side_effect=[
+            _result(rows=[(claimed, Decimal('1000')), (complete, Decimal('1000')), (recovered, Decimal('2000'))]),
+            _result(scalars=[recovered]),  # Incomplete snapshots deleted
+            _result(scalars=[claimed, recovered]),  # Placeholders inserted
+            _result(rows=[_position(claimed, 'AAPL', 10)]),
+            _result(rows=[SimpleNamespace(portfolio_id=claimed, **vars(_previous('1000')))]),
+            _result(),
+            _result(),
+            _result(rows=[('AAPL', CALC_DATE, Decimal('105')), ('AAPL', PREV_DATE, Decimal('100'))]),
+            _result(),  # Equity update
+            _result(),  # Snapshot upsert
+        ])
+
+        with patch('app.batch.pnl_calculator.trading_calendar.is_trading_day', return_value=True):
+            summary = await PnLCalculator().calculate_all_portfolios_pnl(CALC_DATE, db=db, set_based=True)
+
+        assert summary['success'] and summary['snapshots_created'] == 2
+        assert db.commit.await_count == 2  # Recovery delete, then the chunk
+        equity_updates = db.execute.await_args_list[8].args[1]
+        assert {row['id']: row['equity_balance'] for row in equity_updates} == {
+            claimed: Decimal('1050.00'),
+            recovered: Decimal('2000'),
+        }
+        upsert = db.execute.await_args_list[9].args[0]
+        sql = str(upsert.compile(dialect=postgresql.dialect()))
+        assert 'ON CONFLICT (portfolio_id, snapshot_date) DO UPDATE' in sql
+        assert 'WHERE portfolio_snapshots.is_complete IS false' in sql
+
+    @pytest.mark.asyncio
+    async def test_current_date_snapshot_has_sector_exposure(self):
+        portfolio = uuid4()
+        today = date.today()
+        db = _run_db(portfolio, today)
+        sector = AsyncMock(return_value={
+            'success': True,
+            'sector_exposure': {'portfolio_weights': {'Technology': 1.0}},
+            'concentration': {'hhi': 10000, 'effective_num_positions': 1,
+                              'top_3_concentration': 1.0, 'top_10_concentration': 1.0},
+        })
+
+        with patch('app.batch.pnl_calculator.trading_calendar.is_trading_day', return_value=True), \
+                patch('app.calculations.sector_analysis.calculate_portfolio_sector_concentration', sector):
+            summary = await PnLCalculator().calculate_all_portfolios_pnl(today, db=db, set_based=True)
+
+        assert summary['snapshots_created'] == 1
+        assert sector.await_args.kwargs['portfolio_id'] == portfolio
+        params = db.execute.await_args_list[9].args[0].compile(dialect=postgresql.dialect()).params
+        assert params['sector_exposure_m0'] == {'Technology': 1.0}
+        assert params['hhi_m0'] == Decimal('10000')
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_falls_back_per_portfolio(self, monkeypatch):
+        monkeypatch.setattr(pnl_calculator_module, 'SNAPSHOT_UPSERT_CHUNK_ROWS', 1)
+        good, bad = uuid4(), uuid4()
+        db = MagicMock()
+        db.rollback = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(rows=[(good, Decimal('1')), (bad, Decimal('1'))]))
+        calculator = PnLCalculator()
+        chunk = AsyncMock(side_effect=[1, ValueError('bad row')])
+        fallback = AsyncMock(return_value={'portfolios_processed': 0, 'snapshots_created': 0,
+                                           'errors': ['Bad: failed']})
+        monkeypatch.setattr(calculator, '_process_chunk_set_based', chunk)
+        monkeypatch.setattr(calculator, '_process_all_with_session', fallback)
+
+        with patch('app.batch.pnl_calculator.trading_calendar.is_trading_day', return_value=True):
+            summary = await calculator.calculate_all_portfolios_pnl(CALC_DATE, db=db, set_based=True)
+
+        db.rollback.assert_awaited_once()
+        assert fallback.await_args.args[2] == [bad]
+        assert summary['snapshots_created'] == 1
+        assert summary['errors'] == ['Bad: failed'] and not summary['success']
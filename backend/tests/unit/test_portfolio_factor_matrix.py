@@ -0,0 +1,87 @@
+"""
+Unit tests for matrix-based portfolio factor aggregation
+
+aggregate_factor_matrix() must reproduce aggregate_symbol_betas_to_portfolio()
+for every portfolio, with each portfolio's symbol betas loaded the way
+get_portfolio_factor_exposures() loads them (held symbols only, filtered to
+one factor family):
+- repeated symbols, short positions and options (with and without delta)
+- symbols with no betas, or betas for only some factors
+- factors reported only when a held symbol has a beta for them
+"""
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services.portfolio_factor_service import (
+    FACTOR_FAMILIES,
+    PositionWeight,
+    aggregate_factor_matrix,
+    aggregate_symbol_betas_to_portfolio,
+)
+
+
+def _universe(n_portfolios=25, n_symbols=40, seed=0):
+    """Random portfolios over a symbol universe with partial beta coverage."""
+    rng = np.random.default_rng(seed)
+    symbols = [f"SYM{j}" for j in range(n_symbols)]
+    all_factors = [fn for names in FACTOR_FAMILIES.values() for fn in names]
+
+    symbol_betas = {}
+    for symbol in symbols[:-5]:  # Last five symbols have no betas at all
+        present = [fn for fn in all_factors if rng.random() < 0.8]
+        if present:
+            symbol_betas[symbol] = {fn: float(rng.normal(1.0, 0.5)) for fn in present}
+
+    portfolios = {}
+    for _ in range(n_portfolios):
+        n_positions = int(rng.integers(0, 12))
+        positions = []
+        for symbol in rng.choice(symbols, size=n_positions):
+            is_option = bool(rng.random() < 0.3)
+            positions.append(PositionWeight(
+                position_id=uuid4(),
+                symbol=str(symbol),
+                weight=float(rng.normal(0.0, 0.2)),
+                delta=float(rng.uniform(-1, 1)) if is_option and rng.random() < 0.7 else None,
+                is_option=is_option,
+            ))
+        portfolios[uuid4()] = positions
+    return portfolios, symbol_betas
+
+
+def _per_portfolio(positions, symbol_betas, factor_names, use_delta_adjusted):
+    """Per-portfolio path: load held symbols' betas for one family, then aggregate."""
+    loaded = {}
+    for pw in positions:
+        filtered = {k: v for k, v in symbol_betas.get(pw.symbol, {}).items() if k in factor_names}
+        if filtered:
+            loaded[pw.symbol] = filtered
+    return aggregate_symbol_betas_to_portfolio(positions, loaded, use_delta_adjusted)
+
+
+class TestAggregateFactorMatrix:
+    """Sparse matrix aggregation matches the per-portfolio loop"""
+
+    @pytest.mark.parametrize("use_delta_adjusted", [False, True])
+    @pytest.mark.parametrize("family", list(FACTOR_FAMILIES))
+    def test_matches_per_portfolio_aggregation(self, family, use_delta_adjusted):
+        portfolios, symbol_betas = _universe()
+        factor_names = FACTOR_FAMILIES[family]
+
+        result = aggregate_factor_matrix(portfolios, symbol_betas, factor_names, use_delta_adjusted)
+
+        assert set(result) == set(portfolios)
+        for pid, positions in portfolios.items():
+            expected = _per_portfolio(positions, symbol_betas, factor_names, use_delta_adjusted)
+            assert set(result[pid]) == set(expected)
+            assert result[pid] == pytest.approx(expected, abs=1e-12)
+
+    def test_no_betas_gives_empty_exposures(self):
+        pid = uuid4()
+        positions = {pid: [PositionWeight(position_id=uuid4(), symbol="AAPL", weight=0.5)]}
+
+        result = aggregate_factor_matrix(positions, {"MSFT": {"Value": 1.1}}, FACTOR_FAMILIES['ridge_betas'])
+
+        assert result == {pid: {}}
@@ -0,0 +1,74 @@
+"""
+Unit tests for the columnar PriceCache
+
+Tests:
+- get_price() compatibility (Decimal in, Decimal out, None on miss)
+- Bulk set_prices() into the matrix, including growth past initial capacity
+- get_window() slicing (chronological dates, requested column order, NaN gaps)
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from app.cache.price_cache import PriceCache
+
+
+class TestPriceCache:
+    """Test suite for PriceCache"""
+
+    def test_get_price_round_trips_decimal(self):
+        cache = PriceCache()
+        cache.set_price("AAPL", date(2025, 1, 2), Decimal("187.1234"))
+
+        assert cache.get_price("AAPL", date(2025, 1, 2)) == Decimal("187.1234")
+        assert cache.get_price("AAPL", date(2025, 1, 3)) is None
+        assert cache.get_price("MSFT", date(2025, 1, 2)) is None
+
+        stats = cache.get_stats()
+        assert stats["cache_hits"] == 1
+        assert stats["cache_misses"] == 2
+        assert stats["cached_prices"] == 1
+
+    def test_bulk_set_grows_matrix(self):
+        cache = PriceCache()
+        start = date(2025, 1, 1)
+        symbols, dates, prices = [], [], []
+        for i in range(100):
+            for d in range(40):
+                symbols.append(f"S{i}")
+                dates.append(start + timedelta(days=d))
+                prices.append(Decimal(i) + Decimal(d) / 100)
+
+        assert cache.set_prices(symbols, dates, prices) == 4000
+        assert cache.get_price("S99", start + timedelta(days=39)) == Decimal("99.39")
+        assert cache.get_stats()["matrix_shape"] == [100, 40]
+
+    def test_get_window_orders_dates_and_symbols(self):
+        cache = PriceCache()
+        # Insert dates out of order to exercise the chronological sort
+        cache.set_price("MSFT", date(2025, 1, 3), Decimal("30"))
+        cache.set_price("AAPL", date(2025, 1, 2), Decimal("10"))
+        cache.set_price("AAPL", date(2025, 1, 3), Decimal("11"))
+        cache.set_price("AAPL", date(2025, 1, 6), Decimal("12"))
+
+        start, end = date(2025, 1, 2), date(2025, 1, 5)
+        window = cache.get_window(["MSFT", "AAPL", "NOPE"], start, end)
+
+        assert cache.get_dates(start, end) == [date(2025, 1, 2), date(2025, 1, 3)]
+        assert window.shape == (2, 3)
+        np.testing.assert_array_equal(window[:, 1], [10.0, 11.0])
+        assert np.isnan(window[0, 0]) and window[1, 0] == 30.0
+        assert np.isnan(window[:, 2]).all()
+
+        frame = cache.get_window(["AAPL"], start, end, as_frame=True)
+        assert list(frame.columns) == ["AAPL"]
+        assert frame.index[0].date() == date(2025, 1, 2)
+
+    def test_clear_resets_matrix(self):
+        cache = PriceCache()
+        cache.set_price("AAPL", date(2025, 1, 2), Decimal("10"))
+        cache.clear()
+
+        assert cache.get_price("AAPL", date(2025, 1, 2)) is None
+        assert cache.get_stats()["cached_prices"] == 0
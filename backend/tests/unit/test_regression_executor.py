@@ -0,0 +1,56 @@
+"""
+Unit tests for process-pool regression offload
+
+Tests:
+- map_symbol_chunks() on a process pool matches the inline batched solve
+- EventLoopLagMonitor sees a blocking call on the event loop
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.calculations import regression_executor
+from app.calculations.factors_ridge import calculate_batch_ridge_betas
+from app.calculations.regression_executor import map_symbol_chunks, shutdown_regression_executor
+from app.core.event_loop_monitor import EventLoopLagMonitor
+
+
+class TestMapSymbolChunks:
+    """map_symbol_chunks splits symbols across workers without changing results"""
+
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_inline(self, monkeypatch, synthetic_universe):
+        monkeypatch.setattr(regression_executor, "MIN_SYMBOLS_PER_TASK", 10)
+        symbol_returns, factor_returns = synthetic_universe()
+
+        inline = await map_symbol_chunks(
+            calculate_batch_ridge_betas, symbol_returns, factor_returns, 1.0, workers=0
+        )
+        try:
+            pooled = await map_symbol_chunks(
+                calculate_batch_ridge_betas, symbol_returns, factor_returns, 1.0, workers=2
+            )
+        finally:
+            shutdown_regression_executor()
+
+        assert list(pooled) == list(symbol_returns.columns)
+        for symbol, result in inline.items():
+            assert pooled[symbol]["success"] == result["success"]
+            if result["success"]:
+                assert pooled[symbol]["betas"] == pytest.approx(result["betas"], abs=1e-12)
+
+
+class TestEventLoopLagMonitor:
+    """EventLoopLagMonitor reports time the loop was blocked"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_shows_as_lag(self):
+        async with EventLoopLagMonitor(interval=0.01) as lag:
+            await asyncio.sleep(0.03)
+            time.sleep(0.2)  # Blocks the loop, like an inline regression would
+            await asyncio.sleep(0.03)
+
+        stats = lag.get_stats()
+        assert stats["samples"] >= 2
+        assert stats["max_ms"] >= 150
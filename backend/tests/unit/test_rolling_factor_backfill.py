@@ -0,0 +1,114 @@
+"""
+Unit tests for rolling (multi-date) factor backfill regressions
+
+The rolling engines must reproduce the per-date path exactly: for every
+calculation date, slice prices to [date - lookback, date], build returns the
+way get_returns / get_returns_matrix do, and run the batched solver.
+- calculate_rolling_ridge_betas vs calculate_batch_ridge_betas per date
+- calculate_rolling_spread_betas vs calculate_batch_spread_betas per date
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.calculations.factors_ridge import (
+    calculate_batch_ridge_betas,
+    calculate_rolling_ridge_betas,
+)
+from app.calculations.factors_spread import (
+    _spread_returns_from_etf_returns,
+    calculate_batch_spread_betas,
+    calculate_rolling_spread_betas,
+)
+from app.calculations.market_data import gap_aware_returns
+from app.constants.factors import SPREAD_FACTORS
+
+STYLE_FACTORS = ["Value", "Growth", "Momentum", "Quality", "Size", "Low Volatility"]
+SPREAD_ETFS = sorted({etf for pair in SPREAD_FACTORS.values() for etf in pair})
+
+
+def _price_panel(columns, n_days=320, seed=0, gap_rate=0.0):
+    """Random-walk closes on business days, with optional random gaps."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2024-06-03", periods=n_days)
+    prices = 100 * np.cumprod(1 + rng.normal(0, 0.012, (n_days, len(columns))), axis=0)
+    prices[rng.random(prices.shape) < gap_rate] = np.nan
+    return pd.DataFrame(prices, index=index, columns=columns)
+
+
+def _symbol_prices(factor_prices, n_symbols=30, seed=1):
+    """Symbol closes driven by the factor returns, with gaps, late listings and a long halt."""
+    rng = np.random.default_rng(seed)
+    factor_ret = factor_prices.pct_change(fill_method=None).fillna(0.0).to_numpy()
+    loadings = rng.normal(0, 1.0, (factor_ret.shape[1], n_symbols))
+    returns = factor_ret @ loadings + rng.normal(0, 0.015, (len(factor_prices), n_symbols))
+    prices = 50 * np.cumprod(1 + returns, axis=0)
+    prices[rng.random(prices.shape) < 0.1] = np.nan
+    prices[:280, 0] = np.nan                      # lists mid-backfill (crosses MIN_REGRESSION_DAYS)
+    prices[215:240, 1] = np.nan                   # halt spanning the window start
+    prices[:, 2] = np.nan                         # never trades
+    return pd.DataFrame(prices, index=factor_prices.index, columns=[f"SYM{j}" for j in range(n_symbols)])
+
+
+def _window(frame, calc_date, lookback_days):
+    start = pd.Timestamp(calc_date - timedelta(days=lookback_days))
+    return frame.loc[start:pd.Timestamp(calc_date)]
+
+
+def _calculation_dates(index, count=12):
+    return [d.date() for d in index[-count:]]
+
+
+def _assert_same_results(rolling, per_date, beta_key="betas", r2_key="r_squared"):
+    assert set(rolling) == set(per_date)
+    for symbol, expected in per_date.items():
+        result = rolling[symbol]
+        assert result["success"] == expected["success"], symbol
+        assert result["observations"] == expected["observations"], symbol
+        if expected["success"]:
+            assert result[r2_key] == pytest.approx(expected[r2_key], abs=1e-9)
+            assert result[beta_key] == pytest.approx(expected[beta_key], abs=1e-8)
+
+
+class TestRollingRidge:
+    """calculate_rolling_ridge_betas matches per-date batched fits"""
+
+    def test_matches_per_date_fits(self):
+        factor_prices = _price_panel(STYLE_FACTORS, gap_rate=0.01)
+        symbol_prices = _symbol_prices(factor_prices)
+        dates = _calculation_dates(factor_prices.index)
+        lookback = 120
+
+        rolling = calculate_rolling_ridge_betas(symbol_prices, factor_prices, dates, lookback, 1.0)
+
+        for calc_date in dates:
+            window_factors = _window(factor_prices, calc_date, lookback).dropna()
+            factor_returns = window_factors.pct_change(fill_method=None).dropna()
+            symbol_returns = gap_aware_returns(_window(symbol_prices, calc_date, lookback))
+            per_date = calculate_batch_ridge_betas(symbol_returns, factor_returns, 1.0)
+
+            _assert_same_results(rolling[calc_date], per_date)
+
+
+class TestRollingSpread:
+    """calculate_rolling_spread_betas matches per-date batched fits"""
+
+    def test_matches_per_date_fits(self):
+        etf_prices = _price_panel(SPREAD_ETFS, seed=4, gap_rate=0.01)
+        symbol_prices = _symbol_prices(etf_prices, seed=5)
+        dates = _calculation_dates(etf_prices.index, count=8)
+        lookback = 210
+
+        rolling = calculate_rolling_spread_betas(symbol_prices, etf_prices, dates, lookback)
+
+        for calc_date in dates:
+            window_etfs = _window(etf_prices, calc_date, lookback).dropna()
+            spread_returns = _spread_returns_from_etf_returns(
+                window_etfs.pct_change(fill_method=None).dropna()
+            )
+            symbol_returns = gap_aware_returns(_window(symbol_prices, calc_date, lookback))
+            per_date = calculate_batch_spread_betas(symbol_returns, spread_returns)
+
+            _assert_same_results(rolling[calc_date], per_date, r2_key="avg_r_squared")
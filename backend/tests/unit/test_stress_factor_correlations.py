@@ -0,0 +1,107 @@
+"""
+Unit tests for the exponentially weighted stress factor correlation matrix
+
+weighted_correlation_matrix() must reproduce the pair-by-pair np.average
+computation calculate_factor_correlation_matrix() used to run:
+- decay weights with the most recent row weighted highest
+- each pair masked to rows where both factors are present
+- 0.0 for pairs under the observation minimum or with zero variance
+
+calculate_factor_correlation_matrix() is memoized per (as-of date, lookback,
+decay, bounds) in a bounded TTL cache, so repeat calls do not refetch factor
+returns.
+"""
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.calculations import stress_testing
+from app.calculations.stress_testing import (
+    calculate_factor_correlation_matrix,
+    clear_factor_correlation_memo,
+    weighted_correlation_matrix,
+)
+
+
+def _returns(n_days=200, n_factors=6, seed=0):
+    """Correlated factor returns with gaps, a short series and a constant series."""
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(size=(n_factors, n_factors))
+    returns = rng.normal(0.0, 0.01, size=(n_days, n_factors)) @ mixing
+    returns[rng.random((n_days, n_factors)) < 0.1] = np.nan
+    returns[:-25, 4] = np.nan  # Fewer than 30 observations
+    returns[:, 5] = 0.002  # Zero variance
+    return returns
+
+
+def _pairwise_reference(returns, decay_factor, min_observations=30):
+    """The original per-pair np.average loop."""
+    n_days, n_factors = returns.shape
+    weights = np.array([decay_factor ** i for i in range(n_days)])[::-1]
+    weights = weights / weights.sum()
+    expected = np.eye(n_factors)
+    for i in range(n_factors):
+        for j in range(n_factors):
+            if i == j:
+                continue
+            mask = ~(np.isnan(returns[:, i]) | np.isnan(returns[:, j]))
+            x, y, w = returns[mask, i], returns[mask, j], weights[mask]
+            if len(x) < min_observations:
+                continue
+            mean_x, mean_y = np.average(x, weights=w), np.average(y, weights=w)
+            cov = np.average((x - mean_x) * (y - mean_y), weights=w)
+            var_x = np.average((x - mean_x) ** 2, weights=w)
+            var_y = np.average((y - mean_y) ** 2, weights=w)
+            if var_x > 0 and var_y > 0:
+                expected[i, j] = cov / (np.sqrt(var_x) * np.sqrt(var_y))
+    return expected
+
+
+class TestWeightedCorrelationMatrix:
+    """Vectorized weighted correlations match the pairwise loop"""
+
+    @pytest.mark.parametrize("decay_factor", [0.94, 0.99, 1.0])
+    def test_matches_pairwise_average(self, decay_factor):
+        returns = _returns()
+
+        result = weighted_correlation_matrix(returns, decay_factor)
+
+        np.testing.assert_allclose(result, _pairwise_reference(returns, decay_factor), atol=1e-9)
+        assert np.all(result[4, :4] == 0.0) and np.all(result[5, :5] == 0.0)
+
+
+class TestFactorCorrelationMemo:
+    """One factor return fetch per (as-of date, lookback, decay, bounds)"""
+
+    @pytest.mark.asyncio
+    async def test_memoized_per_as_of_date(self, monkeypatch):
+        clear_factor_correlation_memo()
+        frame = pd.DataFrame(_returns()[:, :4], columns=["SPY", "VTV", "VUG", "MTUM"])
+        fetch = AsyncMock(return_value=frame)
+        monkeypatch.setattr(stress_testing, "fetch_factor_returns", fetch)
+        config = {"configuration": {"min_factor_correlation": -0.9, "max_factor_correlation": 0.9}}
+
+        first = await calculate_factor_correlation_matrix(MagicMock(), config=config, as_of_date=date(2026, 10, 15))
+        first['correlation_matrix']['SPY']['VTV'] = 99.0  # Callers get their own copy
+        second = await calculate_factor_correlation_matrix(MagicMock(), config=config, as_of_date=date(2026, 10, 15))
+        await calculate_factor_correlation_matrix(MagicMock(), config=config, as_of_date=date(2026, 10, 16))
+
+        assert fetch.await_count == 2
+        assert second['correlation_matrix']['SPY']['VTV'] != 99.0
+        values = np.array([list(row.values()) for row in second['correlation_matrix'].values()])
+        assert np.all(values[~np.eye(4, dtype=bool)] <= 0.9) and np.all(values >= -0.9)
+        clear_factor_correlation_memo()
+
+    @pytest.mark.asyncio
+    async def test_memo_is_bounded(self, monkeypatch):
+        frame = pd.DataFrame(_returns()[:, :4], columns=["SPY", "VTV", "VUG", "MTUM"])
+        monkeypatch.setattr(stress_testing, "fetch_factor_returns", AsyncMock(return_value=frame))
+        monkeypatch.setattr(stress_testing, "_factor_correlation_memo", stress_testing.TTLCache(maxsize=2, ttl=60))
+
+        for day in (13, 14, 15):
+            await calculate_factor_correlation_matrix(MagicMock(), config={}, as_of_date=date(2026, 10, day))
+
+        assert len(stress_testing._factor_correlation_memo) == 2
@@ -0,0 +1,223 @@
+"""
+Unit tests for the matrix stress testing engine
+
+load_stress_exposures() + build_stress_results() must reproduce
+calculate_direct_stress_impact() and calculate_correlated_stress_impact()
+for every (portfolio, scenario) fed the same exposure rows:
+- exposure_dollar with net exposure x beta fallback, net exposure <= 0 -> 1.0
+- scenario -> exposure and exposure -> correlation factor name mappings
+- Interest_Rate shocks through the portfolio IR beta (skipped when unavailable)
+- 99% loss cap, inactive scenarios skipped
+
+save_all_stress_test_results() writes every portfolio in one transaction.
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.calculations import stress_matrix, stress_testing, stress_testing_ir_integration
+from app.calculations.stress_matrix import (
+    build_stress_results,
+    compile_stress_scenarios,
+    load_stress_exposures,
+)
+from app.calculations.stress_testing import (
+    calculate_correlated_stress_impact,
+    calculate_direct_stress_impact,
+    save_all_stress_test_results,
+)
+
+CALC_DATE = date(2026, 10, 15)
+FACTORS = ['Market Beta (90D)', 'Market Beta', 'Value', 'Growth', 'Momentum', 'Size', 'Quality-Growth Spread']
+CORRELATION_FACTORS = ['Market', 'Value', 'Growth', 'Momentum', 'Size', 'Quality']
+
+CONFIG = {
+    'stress_scenarios': {
+        'market': {
+            'crash': {'name': 'Crash', 'shocked_factors': {'Market': -0.35}},
+            'rally': {'name': 'Rally', 'shocked_factors': {'Market': 0.10, 'Momentum': 0.05}},
+            'old': {'name': 'Inactive', 'active': False, 'shocked_factors': {'Market': -0.5}},
+        },
+        'rates': {
+            'rate_up': {'name': 'Rates up', 'shocked_factors': {'Interest_Rate': 0.01, 'Value': 0.02}},
+            'doomsday': {'name': 'Doomsday', 'shocked_factors': {'Market': -3.0, 'Interest_Rate': 0.03}},
+        },
+        'rotation': {
+            'value_growth': {'name': 'Rotation', 'shocked_factors': {'Value': 0.08, 'Growth': -0.10, 'Unknown': 0.2}},
+        },
+    }
+}
+
+
+def _correlation_matrix(seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.clip(rng.uniform(-0.9, 0.9, (6, 6)), -0.95, 0.95)
+    values = (values + values.T) / 2
+    np.fill_diagonal(values, 1.0)
+    return {
+        f1: {f2: float(values[i, j]) for j, f2 in enumerate(CORRELATION_FACTORS)}
+        for i, f1 in enumerate(CORRELATION_FACTORS)
+    }
+
+
+def _portfolios(n=4, seed=1):
+    """Exposure rows (newest first), net exposure and IR beta per portfolio."""
+    rng = np.random.default_rng(seed)
+    portfolios = {}
+    for k in range(n):
+        rows = []
+        for days_back in range(3):  # Older dates repeat factors; latest wins
+            for name in FACTORS:
+                if rng.random() < 0.8:
+                    dollar = None if rng.random() < 0.3 else float(rng.normal(0, 2e5))
+                    rows.append(SimpleNamespace(
+                        name=name,
+                        exposure_value=float(rng.normal(1.0, 0.4)),
+                        exposure_dollar=dollar,
+                        calculation_date=CALC_DATE - timedelta(days=days_back),
+                    ))
+        portfolios[uuid4()] = {
+            'rows': rows,
+            'net_exposure': -5e4 if k == 1 else float(rng.uniform(5e5, 2e6)),
+            'ir': None if k == 2 else {'equity': float(rng.uniform(5e5, 2e6)), 'beta': float(rng.normal(-0.5, 0.2))},
+        }
+    return portfolios
+
+
+def _result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+async def _reference(portfolio_id, data, scenario_config, correlation_matrix, monkeypatch):
+    """Per-scenario path on the same data."""
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=_result([
+        (SimpleNamespace(exposure_value=r.exposure_value, exposure_dollar=r.exposure_dollar,
+                         calculation_date=r.calculation_date), SimpleNamespace(name=r.name))
+        for r in data['rows']
+    ]))
+    monkeypatch.setattr(
+        stress_testing, 'get_portfolio_exposures',
+        AsyncMock(return_value={'net_exposure': data['net_exposure']})
+    )
+
+    async def add_ir(db, portfolio_id, shocked_factors, calculation_date):
+        if 'Interest_Rate' not in shocked_factors:
+            return {'has_ir_shock': False, 'ir_impact': None, 'ir_exposure_dollar': None}
+        if data['ir'] is None:
+            return {'has_ir_shock': True, 'ir_impact': None, 'ir_exposure_dollar': None}
+        equity, beta = data['ir']['equity'], data['ir']['beta']
+        return {
+            'has_ir_shock': True,
+            'ir_impact': {
+                'predicted_pnl': equity * beta * shocked_factors['Interest_Rate'],
+                'portfolio_ir_beta': beta, 'positions_with_beta': 3,
+                'ir_beta_date': CALC_DATE, 'ir_shock_bps': shocked_factors['Interest_Rate'] * 1e4,
+            },
+            'ir_exposure_dollar': equity * beta,
+        }
+
+    monkeypatch.setattr(stress_testing_ir_integration, 'add_ir_shocks_to_stress_results', add_ir)
+    direct = await calculate_direct_stress_impact(db, portfolio_id, scenario_config, CALC_DATE)
+    correlated = await calculate_correlated_stress_impact(
+        db, portfolio_id, scenario_config, correlation_matrix, CALC_DATE
+    )
+    return direct, correlated
+
+
+async def _engine(portfolios, correlation_matrix, monkeypatch):
+    """Matrix path: load_stress_exposures() on the same rows, then build_stress_results()."""
+    ranked_rows = [
+        SimpleNamespace(portfolio_id=pid, **vars(row))
+        for pid, data in portfolios.items() for row in data['rows']
+    ]
+    snapshots = [(pid, CALC_DATE, data['net_exposure']) for pid, data in portfolios.items()]
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[_result(ranked_rows), _result(snapshots)])
+
+    async def ir_beta(db, portfolio_id, calculation_date):
+        ir = portfolios[portfolio_id]['ir']
+        if ir is None:
+            return {'success': False, 'error': 'No IR betas'}
+        return {'success': True, 'portfolio_equity': ir['equity'], 'portfolio_ir_beta': ir['beta'],
+                'positions_with_beta': 3, 'ir_beta_date': CALC_DATE}
+
+    monkeypatch.setattr(stress_matrix, 'get_portfolio_ir_beta', ir_beta)
+    exposures = await load_stress_exposures(db, list(portfolios), CALC_DATE)
+    correlation_data = {
+        'correlation_matrix': correlation_matrix, 'calculation_date': CALC_DATE,
+        'data_days': 252, 'matrix_stats': {'mean_correlation': 0.1},
+    }
+    compiled = compile_stress_scenarios(CONFIG)
+    return compiled, build_stress_results(
+        exposures, compiled, correlation_data, CALC_DATE,
+        {pid: 'Test' for pid in portfolios}, include_breakdown=True
+    )
+
+
+class TestMatrixStressEngine:
+    """Matrix engine matches the per-scenario functions"""
+
+    @pytest.mark.asyncio
+    async def test_matches_per_scenario_functions(self, monkeypatch):
+        portfolios = _portfolios()
+        correlation_matrix = _correlation_matrix()
+        compiled, results = await _engine(portfolios, correlation_matrix, monkeypatch)
+
+        assert compiled.scenario_ids == ['crash', 'rally', 'rate_up', 'doomsday', 'value_growth']
+        assert compiled.scenarios_skipped == 1 and compiled.scenarios_available == 6
+
+        caps_seen = False
+        for pid, data in portfolios.items():
+            stress = results[pid]['stress_test_results']
+            assert stress['scenarios_tested'] == 5
+            for category, scenario_id, scenario_config in zip(compiled.categories, compiled.scenario_ids, compiled.configs):
+                expected_direct, expected_correlated = await _reference(
+                    pid, data, scenario_config, correlation_matrix, monkeypatch
+                )
+                direct = stress['direct_impacts'][category][scenario_id]
+                correlated = stress['correlated_impacts'][category][scenario_id]
+
+                assert direct['total_direct_pnl'] == pytest.approx(expected_direct['total_direct_pnl'], rel=1e-9, abs=1e-6)
+                assert direct['loss_cap_applied'] == expected_direct['loss_cap_applied']
+                assert direct['factor_exposures_date'] == expected_direct['factor_exposures_date']
+                assert correlated['correlated_pnl'] == pytest.approx(expected_correlated['correlated_pnl'], rel=1e-9, abs=1e-6)
+                assert correlated['loss_cap_applied'] == expected_correlated['loss_cap_applied']
+                caps_seen |= correlated['loss_cap_applied']
+
+                assert list(direct['factor_impacts']) == list(expected_direct['factor_impacts'])
+                for name, impact in expected_direct['factor_impacts'].items():
+                    assert direct['factor_impacts'][name]['factor_pnl'] == pytest.approx(impact['factor_pnl'], abs=1e-6)
+                    assert direct['factor_impacts'][name].get('calculation_method') == impact.get('calculation_method')
+                assert set(correlated['factor_impacts']) == set(expected_correlated['factor_impacts'])
+                for name, impact in expected_correlated['factor_impacts'].items():
+                    ours = correlated['factor_impacts'][name]
+                    assert ours['total_factor_impact'] == pytest.approx(impact['total_factor_impact'], abs=1e-6)
+                    assert ours['exposure_dollar'] == pytest.approx(impact['exposure_dollar'])
+                    assert set(ours['impact_breakdown']) == set(impact['impact_breakdown'])
+        assert caps_seen
+
+
+class TestSaveAllStressTestResults:
+    """Bulk save: one scenario lookup, one delete, one insert, one commit"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_write(self, monkeypatch):
+        portfolios = _portfolios(n=3)
+        _, results = await _engine(portfolios, _correlation_matrix(), monkeypatch)
+        scenario_rows = [(scenario_id, uuid4()) for scenario_id in ['crash', 'rally', 'rate_up', 'value_growth']]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_result(scenario_rows))
+        db.commit = AsyncMock()
+
+        saved = await save_all_stress_test_results(db, results)
+
+        assert saved == {pid: 4 for pid in portfolios}  # 'doomsday' is not seeded
+        assert db.execute.await_count == 3
+        db.commit.assert_awaited_once()
@@ -0,0 +1,125 @@
+"""
+Unit tests for the stress scenario registry
+
+- the built-in scenario file validates and compiles once per category filter
+- the file is reloaded when its mtime changes; an invalid edit keeps the
+  last good scenarios, an invalid first load raises
+- validate_stress_scenario_config() rejects unknown factors, non-numeric
+  shocks and shocks beyond stress_magnitude_cap
+- load_stress_scenarios() hands out copies of the registry's config
+"""
+import json
+import os
+
+import pytest
+
+from app.calculations.stress_scenario_registry import (
+    StressScenarioRegistry,
+    stress_scenario_registry,
+    validate_stress_scenario_config,
+)
+from app.calculations.stress_testing import load_stress_scenarios
+
+
+def _config(market_shock=-0.2):
+    return {
+        'stress_scenarios': {
+            'market_risk': {
+                'crash': {'name': 'Crash', 'severity': 'severe', 'shocked_factors': {'Market': market_shock}},
+                'rates': {'name': 'Rates', 'shocked_factors': {'Interest_Rate': 0.01, 'Value': 0.02}},
+            },
+        },
+        'configuration': {'stress_magnitude_cap': 1.0},
+        'factor_mappings': {'Market': 'SPY', 'Value': 'VTV', 'Interest_Rate': 'Treasury_10Y'},
+        'severity_levels': {'severe': {}},
+    }
+
+
+def _write(path, config, mtime_ns):
+    path.write_text(json.dumps(config))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestBuiltInScenarios:
+    """The shipped scenario file loads through the registry"""
+
+    def test_compiles_once_per_filter(self):
+        compiled = stress_scenario_registry.compiled()
+
+        assert compiled is stress_scenario_registry.compiled()
+        assert len(compiled.scenario_ids) > 0
+        assert compiled.exposure_factors['Market'] == 'Market Beta (90D)'
+        assert not compiled.shocks.flags.writeable
+        rates = stress_scenario_registry.compiled(['interest_rate_risk'])
+        assert rates is stress_scenario_registry.compiled(['interest_rate_risk'])
+        assert set(rates.categories) == {'interest_rate_risk'}
+
+    def test_load_stress_scenarios_returns_copy(self):
+        config = load_stress_scenarios()
+        config['stress_scenarios'].clear()
+
+        assert stress_scenario_registry.config()['stress_scenarios']
+
+
+class TestHotReload:
+    """Reloaded on mtime change, last good config kept on bad edits"""
+
+    def test_reloads_on_mtime_change(self, tmp_path):
+        path = tmp_path / 'scenarios.json'
+        _write(path, _config(-0.2), 1_000_000_000)
+        registry = StressScenarioRegistry(path)
+
+        first = registry.compiled()
+        _write(path, _config(-0.3), 2_000_000_000)
+        second = registry.compiled()
+
+        assert first is not second
+        assert second.shocks[0, second.shock_factors.index('Market')] == pytest.approx(-0.3)
+        assert registry.get_stats()['reload_count'] == 2
+
+    def test_invalid_edit_keeps_last_good(self, tmp_path):
+        path = tmp_path / 'scenarios.json'
+        _write(path, _config(-0.2), 1_000_000_000)
+        registry = StressScenarioRegistry(path)
+        good = registry.compiled()
+
+        path.write_text('{"stress_scenarios": ')
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+
+        assert registry.compiled() is good
+
+    def test_invalid_first_load_raises(self, tmp_path):
+        path = tmp_path / 'scenarios.json'
+        _write(path, _config(-1.5), 1_000_000_000)
+
+        with pytest.raises(ValueError, match="stress_magnitude_cap"):
+            StressScenarioRegistry(path).config()
+
+
+class TestValidateStressScenarioConfig:
+    """Scenario-level validation"""
+
+    def test_counts_active(self):
+        config = _config()
+        config['stress_scenarios']['market_risk']['rates']['active'] = False
+
+        assert validate_stress_scenario_config(config) == (1, 2)
+
+    @pytest.mark.parametrize("shocked_factors, message", [
+        ({'Unknown': 0.1}, "unknown factor"),
+        ({'Market': '0.1'}, "non-numeric"),
+        ({}, "no shocked_factors"),
+    ])
+    def test_rejects_bad_shocks(self, shocked_factors, message):
+        config = _config()
+        config['stress_scenarios']['market_risk']['crash']['shocked_factors'] = shocked_factors
+
+        with pytest.raises(ValueError, match=message):
+            validate_stress_scenario_config(config)
+
+    def test_rejects_unknown_severity(self):
+        config = _config()
+        config['stress_scenarios']['market_risk']['crash']['severity'] = 'apocalyptic'
+
+        with pytest.raises(ValueError, match="severity"):
+            validate_stress_scenario_config(config)
@@ -0,0 +1,165 @@
+"""
+Unit tests for the what-if stress testing service
+
+StressWhatIfService.run():
+- direct and correlated P&L of ad-hoc shocks match the matrix engine
+- exposure vectors and correlation matrices are loaded once and then cached,
+  in bounded TTL caches
+- portfolios without factor exposures return available=false
+
+apply_position_changes() moves each factor's dollar exposure by
+market value change x symbol beta, adds new factors, and adjusts net and
+IR dollar exposure.
+"""
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.calculations.stress_matrix import StressExposureMatrix
+from app.services import stress_what_if_service
+from app.services.stress_what_if_service import (
+    StressWhatIfService,
+    apply_position_changes,
+    clear_what_if_cache,
+)
+
+AS_OF = date(2026, 10, 15)
+CORRELATIONS = {
+    'Market': {'Market': 1.0, 'Value': 0.4, 'Growth': 0.6},
+    'Value': {'Market': 0.4, 'Value': 1.0, 'Growth': -0.3},
+    'Growth': {'Market': 0.6, 'Value': -0.3, 'Growth': 1.0},
+}
+CORRELATION_DATA = {
+    'correlation_matrix': CORRELATIONS, 'calculation_date': AS_OF,
+    'data_days': 252, 'matrix_stats': {'mean_correlation': 0.23},
+}
+
+
+def _exposures(portfolio_id):
+    """Market, Value and Growth dollar exposures on $1M net exposure."""
+    return StressExposureMatrix(
+        portfolio_ids=[portfolio_id],
+        factor_names=['Growth', 'Market Beta (90D)', 'Value'],
+        exposure_dollars=np.array([[200_000.0, 900_000.0, -100_000.0]]),
+        reported_dollars=np.array([[200_000.0, 900_000.0, -100_000.0]]),
+        present=np.ones((1, 3), dtype=bool),
+        net_exposure=np.array([1_000_000.0]),
+        exposure_dates=[AS_OF],
+        ir_exposure_dollar=np.array([-50_000.0]),
+        ir_details=[{'portfolio_ir_beta': -0.05, 'positions_with_beta': 2, 'ir_beta_date': AS_OF}],
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    clear_what_if_cache()
+    portfolio_id = uuid4()
+    load = AsyncMock(side_effect=lambda db, ids, as_of: _exposures(ids[0]))
+    correlations = AsyncMock(return_value=CORRELATION_DATA)
+    monkeypatch.setattr(stress_what_if_service, 'load_stress_exposures', load)
+    monkeypatch.setattr(stress_what_if_service, 'calculate_factor_correlation_matrix', correlations)
+    yield StressWhatIfService(MagicMock()), portfolio_id, load, correlations
+    clear_what_if_cache()
+
+
+class TestWhatIfStressTest:
+    """Ad-hoc shocks priced from cached exposure vectors"""
+
+    @pytest.mark.asyncio
+    async def test_direct_and_correlated_pnl(self, service):
+        svc, portfolio_id, _, _ = service
+        scenarios = [
+            {'name': 'Sell-off', 'shocked_factors': {'Market': -0.10}},
+            {'name': 'Rates', 'shocked_factors': {'Interest_Rate': 0.01, 'Value': 0.05}},
+        ]
+
+        result = await svc.run(portfolio_id, scenarios, as_of_date=AS_OF)
+
+        assert result['available'] is True
+        selloff, rates = result['data']['scenarios']
+        assert selloff['direct_pnl'] == pytest.approx(900_000 * -0.10)
+        # Correlated path maps only 'Market Beta' onto Market, as the nightly engine does
+        assert selloff['correlated_pnl'] == pytest.approx(-0.10 * (0.6 * 200_000 + 0.4 * -100_000))
+        assert selloff['percentage_impact'] == pytest.approx(selloff['correlated_pnl'] / 1_000_000 * 100)
+        assert rates['direct_pnl'] == pytest.approx(-50_000 * 0.01 + -100_000 * 0.05)
+        assert rates['correlated_factor_pnl']['Interest_Rate'] == pytest.approx(-500.0)
+        assert not selloff['loss_cap_applied']
+
+    @pytest.mark.asyncio
+    async def test_exposures_and_correlations_cached(self, service):
+        svc, portfolio_id, load, correlations = service
+        scenarios = [{'name': 'Crash', 'shocked_factors': {'Market': -0.5}}]
+
+        first = await svc.run(portfolio_id, scenarios, as_of_date=AS_OF)
+        second = await svc.run(portfolio_id, scenarios, as_of_date=AS_OF)
+
+        assert load.await_count == 1 and correlations.await_count == 1
+        assert first['metadata']['exposure_cache_hit'] is False
+        assert second['metadata']['exposure_cache_hit'] is True
+        assert second['data']['scenarios'] == first['data']['scenarios']
+
+        clear_what_if_cache(portfolio_id)
+        await svc.run(portfolio_id, scenarios, as_of_date=AS_OF)
+        assert load.await_count == 2 and correlations.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, service, monkeypatch):
+        svc, _, load, _ = service
+        monkeypatch.setattr(stress_what_if_service, '_exposure_cache', stress_what_if_service.TTLCache(maxsize=2, ttl=60))
+
+        for _ in range(3):
+            await svc._exposures(uuid4(), AS_OF)
+
+        assert len(stress_what_if_service._exposure_cache) == 2
+        assert load.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_no_factor_exposures(self, service, monkeypatch):
+        svc, portfolio_id, _, _ = service
+        empty = _exposures(portfolio_id)
+        empty.portfolio_ids = []
+        monkeypatch.setattr(stress_what_if_service, 'load_stress_exposures', AsyncMock(return_value=empty))
+
+        result = await svc.run(portfolio_id, [{'name': 'x', 'shocked_factors': {'Market': -0.1}}], as_of_date=AS_OF)
+
+        assert result == {'available': False, 'metadata': {'reason': 'no_factor_exposures'}}
+
+    @pytest.mark.asyncio
+    async def test_position_changes(self, service, monkeypatch):
+        svc, portfolio_id, _, _ = service
+        betas = AsyncMock(return_value={'NVDA': {'Market Beta (90D)': 1.5, 'Momentum': 0.8}})
+        monkeypatch.setattr(stress_what_if_service, 'load_symbol_betas_from_cache', betas)
+
+        result = await svc.run(
+            portfolio_id,
+            [{'name': 'Sell-off', 'shocked_factors': {'Market': -0.10}}],
+            position_changes={'NVDA': 100_000.0, 'PRIVATE1': 50_000.0},
+            as_of_date=AS_OF,
+        )
+
+        data = result['data']
+        assert data['scenarios'][0]['direct_pnl'] == pytest.approx((900_000 + 150_000) * -0.10)
+        assert data['net_exposure'] == pytest.approx(1_150_000)
+        assert data['symbols_without_betas'] == ['PRIVATE1']
+
+
+class TestApplyPositionChanges:
+    """Position changes folded into the exposure vector"""
+
+    def test_adds_beta_weighted_dollars(self):
+        exposures = _exposures(uuid4())
+        betas = {'AAPL': {'Growth': 0.5, 'Momentum': 1.2, 'IR Beta': -0.1}, 'XOM': {'Value': 0.9}}
+
+        changed = apply_position_changes(exposures, {'AAPL': 200_000.0, 'XOM': -100_000.0}, betas)
+
+        assert changed.factor_names == ['Growth', 'IR Beta', 'Market Beta (90D)', 'Momentum', 'Value']
+        np.testing.assert_allclose(
+            changed.exposure_dollars[0], [300_000.0, -20_000.0, 900_000.0, 240_000.0, -190_000.0]
+        )
+        assert changed.present.all()
+        assert changed.net_exposure[0] == pytest.approx(1_100_000.0)
+        assert changed.ir_exposure_dollar[0] == pytest.approx(-70_000.0)
+        assert exposures.factor_names == ['Growth', 'Market Beta (90D)', 'Value']  # Input untouched
@@ -0,0 +1,95 @@
+"""
+Unit tests for SymbolFactorBulkWriter
+
+Tests:
+- add() converts values like persist_symbol_factors and de-duplicates conflict keys
+- flush() writes chunked multi-row upserts and reports throughput
+- a failing chunk is rolled back and its symbols reported, other chunks still land
+"""
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.calculations import symbol_factors
+from app.calculations.symbol_factors import SymbolFactorBulkWriter
+
+CALC_DATE = date(2025, 11, 7)
+FACTOR_IDS = {"Value": uuid4(), "Growth": uuid4()}
+
+
+def _fake_session_factory(fail_on_call=None):
+    """AsyncSessionLocal stand-in recording the row count of each executed statement."""
+    session = MagicMock()
+    session.rows_per_statement = []
+
+    async def execute(stmt):
+        session.rows_per_statement.append(len(stmt._multi_values[0]))
+        if len(session.rows_per_statement) == fail_on_call:
+            raise RuntimeError("boom")
+
+    session.execute = execute
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=session)
+    context.__aexit__ = AsyncMock(return_value=False)
+    return session, MagicMock(return_value=context)
+
+
+class TestSymbolFactorBulkWriter:
+    """Test suite for SymbolFactorBulkWriter"""
+
+    def test_add_converts_and_dedupes(self):
+        writer = SymbolFactorBulkWriter()
+        staged = writer.add(
+            "AAPL", {"Value": 0.5, "Growth": 1.25, "Unknown": 2.0}, CALC_DATE, FACTOR_IDS,
+            "ridge_regression", r_squared=0.0, observations=90, regularization_alpha=1.0,
+        )
+        writer.add("AAPL", {"Value": 0.75}, CALC_DATE, FACTOR_IDS, "ridge_regression")
+
+        assert staged == 2
+        assert len(writer) == 2
+        row = writer._pending[("AAPL", FACTOR_IDS["Value"], CALC_DATE)]
+        assert row["beta_value"] == Decimal("0.75")
+        growth = writer._pending[("AAPL", FACTOR_IDS["Growth"], CALC_DATE)]
+        assert growth["r_squared"] is None
+        assert growth["regularization_alpha"] == Decimal("1.0")
+
+    @pytest.mark.asyncio
+    async def test_flush_chunks_and_reports_throughput(self, monkeypatch):
+        session, factory = _fake_session_factory()
+        monkeypatch.setattr(symbol_factors, "AsyncSessionLocal", factory)
+
+        writer = SymbolFactorBulkWriter(chunk_size=4)
+        for i in range(5):
+            writer.add(f"S{i}", {"Value": 1.0, "Growth": -1.0}, CALC_DATE, FACTOR_IDS, "ridge_regression")
+
+        failed = await writer.flush("ridge")
+        stats = writer.get_stats()
+
+        assert failed == {}
+        assert session.rows_per_statement == [4, 4, 2]
+        assert len(writer) == 0
+        assert stats["rows_written"] == 10
+        assert stats["statements"] == 3
+        assert stats["rows_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_reports_symbols(self, monkeypatch):
+        session, factory = _fake_session_factory(fail_on_call=1)
+        monkeypatch.setattr(symbol_factors, "AsyncSessionLocal", factory)
+
+        writer = SymbolFactorBulkWriter(chunk_size=1)
+        for symbol in ("A", "B"):
+            writer.add(symbol, {"Value": 1.0}, CALC_DATE, FACTOR_IDS, "ols_market")
+
+        failed = await writer.flush()
+
+        assert set(failed) == {"A"}
+        session.rollback.assert_awaited_once()
+        assert writer.get_stats()["rows_written"] == 1
+        assert writer.get_stats()["rows_failed"] == 1
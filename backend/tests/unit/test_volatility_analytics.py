@@ -0,0 +1,267 @@
+"""
+Unit tests for symbol-level volatility analytics
+
+- _rolling_std() matches pandas rolling(window).std() including NaN windows
+- calculate_symbol_volatilities() on a PriceCache matches the per-position
+  helpers applied to each symbol's own get_returns() series (gaps included)
+- vectorized trend, percentile and Yang-Zhang kernels match their per-series versions
+- _forecast_har_batch() matches a per-series sklearn LinearRegression HAR fit
+- SymbolVolatilityTable.portfolio_returns() equals get_returns(align_dates=False)
+- calculate_portfolio_volatility_batch() reads shared symbol metrics for every
+  position on the same underlying
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cache.price_cache import PriceCache
+from app.calculations import volatility_analytics
+from app.calculations.market_data import get_returns
+from app.calculations.volatility_analytics import (
+    SymbolVolatilityTable,
+    _analyze_volatility_trend,
+    _calculate_realized_vol,
+    _calculate_vol_percentile,
+    _calculate_yang_zhang_volatility,
+    _forecast_har,
+    _forecast_har_batch,
+    _right_align_returns,
+    _rolling_std,
+    _volatility_percentiles,
+    _volatility_trends,
+    _yang_zhang_volatility_matrix,
+    calculate_portfolio_volatility_batch,
+    calculate_symbol_volatilities,
+)
+
+CALC_DATE = date(2026, 10, 15)
+
+
+def _sklearn_har(returns):
+    """HAR fit with pandas rolling windows and sklearn, one series at a time."""
+    from sklearn.linear_model import LinearRegression
+
+    annualize = np.sqrt(252)
+    rv_daily = returns.abs() * annualize
+    X = pd.DataFrame({
+        'rv_daily': rv_daily,
+        'rv_weekly': returns.rolling(5).std() * annualize,
+        'rv_monthly': returns.rolling(21).std() * annualize,
+    })
+    df = pd.concat([X, rv_daily.shift(-1).rename('target')], axis=1).dropna()
+    model = LinearRegression().fit(df[X.columns].to_numpy(), df['target'].to_numpy())
+    current = X.iloc[-1].to_numpy()
+    return model.predict(current.reshape(1, -1))[0], model.score(df[X.columns].to_numpy(), df['target'].to_numpy())
+
+
+def _price_cache(symbols, n_days=300, seed=0):
+    """PriceCache with random-walk closes; GAPPY misses every 7th day, NEWCO has 30 days."""
+    rng = np.random.default_rng(seed)
+    days = []
+    day = CALC_DATE
+    while len(days) < n_days:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    days.reverse()
+
+    cache = PriceCache()
+    for k, symbol in enumerate(symbols):
+        # TREND has rising volatility
+        scale = np.linspace(0.005, 0.05, n_days) if symbol == 'TREND' else 0.01 + 0.004 * k
+        closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 1, n_days) * scale))
+        held = list(range(n_days))
+        if symbol == 'GAPPY':
+            held = [i for i in held if i % 7 != 3]
+        elif symbol == 'NEWCO':
+            held = held[-30:]
+        cache.set_prices([symbol] * len(held), [days[i] for i in held], closes[held].tolist())
+    return cache
+
+
+class TestRollingKernels:
+    """Array kernels match the per-series helpers"""
+
+    def test_rolling_std_matches_pandas(self):
+        rng = np.random.default_rng(1)
+        values = rng.normal(0.001, 0.02, size=(80, 4))
+        values[:10, 1] = np.nan
+        values[40, 2] = np.nan
+
+        for window in (5, 21, 63):
+            expected = pd.DataFrame(values).rolling(window).std().to_numpy()
+            np.testing.assert_allclose(_rolling_std(values, window), expected, rtol=1e-9, atol=1e-15)
+
+    def test_trend_and_percentile_match_series_helpers(self):
+        rng = np.random.default_rng(2)
+        n_days = 300
+        returns = np.column_stack([
+            rng.normal(0, np.linspace(0.005, 0.05, n_days)),  # Rising vol
+            rng.normal(0, np.linspace(0.05, 0.005, n_days)),  # Falling vol
+            rng.normal(0, 0.01, n_days),
+        ])
+        returns[:100, 2] = np.nan  # Too short for a percentile
+        aligned, counts = _right_align_returns(returns)
+        rolling_vol = _rolling_std(aligned, 21) * np.sqrt(252)
+
+        trends, strengths = _volatility_trends(rolling_vol, counts)
+        percentiles = _volatility_percentiles(rolling_vol, counts)
+
+        assert trends[:2] == ['increasing', 'decreasing']
+        for j in range(3):
+            series = pd.Series(returns[:, j]).dropna().reset_index(drop=True)
+            trend, strength = _analyze_volatility_trend(series)
+            assert trends[j] == trend
+            assert strengths[j] == pytest.approx(strength, rel=1e-9)
+            expected = _calculate_vol_percentile(series)
+            if expected is None:
+                assert np.isnan(percentiles[j])
+            else:
+                assert percentiles[j] == pytest.approx(expected)
+
+    def test_yang_zhang_matches_frame(self):
+        rng = np.random.default_rng(3)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(21, 3)), axis=0))
+        open_ = close * np.exp(rng.normal(0, 0.004, size=close.shape))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, size=close.shape))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, size=close.shape))
+        open_[5, 1] = np.nan
+
+        vols = _yang_zhang_volatility_matrix(open_, high, low, close)
+
+        for j in range(3):
+            frame = pd.DataFrame({'open': open_[:, j], 'high': high[:, j], 'low': low[:, j], 'close': close[:, j]})
+            assert vols[j] == pytest.approx(_calculate_yang_zhang_volatility(frame), rel=1e-10)
+
+
+class TestForecastHarBatch:
+    """One batched solve equals per-series OLS"""
+
+    def test_matches_sklearn(self):
+        rng = np.random.default_rng(4)
+        n_days = 250
+        returns = np.column_stack([
+            rng.normal(0, 0.01, n_days),
+            rng.standard_t(3, n_days) * 0.02,
+            rng.normal(0, np.linspace(0.005, 0.04, n_days)),
+            rng.normal(0, 0.015, n_days),
+            rng.normal(0, 0.01, n_days),
+        ])
+        returns[:150, 3] = np.nan  # 100 returns
+        returns[:200, 4] = np.nan  # 50 returns: below the 63 minimum
+        aligned, counts = _right_align_returns(returns)
+        annualize = np.sqrt(252)
+        current = [
+            np.abs(aligned[-1]) * annualize,
+            _rolling_std(aligned, 5)[-1] * annualize,
+            _rolling_std(aligned, 21)[-1] * annualize,
+        ]
+
+        forecast, r_squared = _forecast_har_batch(aligned, *current)
+
+        assert np.isnan(forecast[4]) and np.isnan(r_squared[4])
+        for j in range(4):
+            expected_forecast, expected_r_squared = _sklearn_har(pd.Series(aligned[-counts[j]:, j]))
+            assert forecast[j] == pytest.approx(expected_forecast, rel=1e-8)
+            assert r_squared[j] == pytest.approx(expected_r_squared, rel=1e-8)
+
+    def test_single_series_wrapper(self):
+        returns = pd.Series(np.random.default_rng(5).normal(0, 0.01, 120))
+        vol_daily = abs(returns.iloc[-1]) * np.sqrt(252)
+        vol_weekly = _calculate_realized_vol(returns, 5)
+        vol_monthly = _calculate_realized_vol(returns, 21)
+
+        forecast, r_squared = _forecast_har(returns, vol_daily, vol_weekly, vol_monthly)
+
+        expected = _sklearn_har(returns)
+        assert (forecast, r_squared) == (pytest.approx(expected[0], rel=1e-8), pytest.approx(expected[1], rel=1e-8))
+        assert _forecast_har(returns.head(40), vol_daily, vol_weekly, vol_monthly) == (None, None)
+
+
+class TestCalculateSymbolVolatilities:
+    """One pass over the price window for every symbol"""
+
+    @pytest.mark.asyncio
+    async def test_matches_per_symbol_series(self, monkeypatch):
+        symbols = ['AAPL', 'GAPPY', 'TREND', 'NEWCO']
+        cache = _price_cache(symbols)
+        monkeypatch.setattr(volatility_analytics, '_fetch_yang_zhang_volatilities', AsyncMock(return_value={}))
+
+        table = await calculate_symbol_volatilities(MagicMock(), symbols + ['NOPRICE'], CALC_DATE, price_cache=cache)
+
+        assert table.failures['NEWCO']['reason'] == 'insufficient_observations'
+        assert table.failures['NOPRICE']['reason'] == 'no_price_data'
+        start = CALC_DATE - timedelta(days=volatility_analytics.VOLATILITY_LOOKBACK_DAYS)
+        for symbol in ['AAPL', 'GAPPY', 'TREND']:
+            returns = (await get_returns(MagicMock(), [symbol], start, CALC_DATE, align_dates=False,
+                                         price_cache=cache))[symbol].dropna()
+            metrics = table.metrics[symbol]
+            vol_daily = abs(returns.iloc[-1]) * np.sqrt(252)
+            vol_weekly = _calculate_realized_vol(returns, 5)
+            vol_21d = _calculate_realized_vol(returns, 21)
+            forecast, r_squared = _forecast_har(returns, vol_daily, vol_weekly, vol_21d)
+            trend, strength = _analyze_volatility_trend(returns)
+
+            assert metrics['observations'] == len(returns)
+            assert metrics['realized_vol_21d'] == pytest.approx(vol_21d, rel=1e-9)
+            assert metrics['realized_vol_63d'] == pytest.approx(_calculate_realized_vol(returns, 63), rel=1e-9)
+            assert metrics['vol_weekly'] == pytest.approx(vol_weekly, rel=1e-9)
+            assert metrics['vol_daily'] == pytest.approx(vol_daily)
+            assert metrics['expected_vol_21d'] == pytest.approx(forecast, rel=1e-6)
+            assert metrics['model_r_squared'] == pytest.approx(r_squared, rel=1e-6)
+            assert (metrics['vol_trend'], metrics['vol_trend_strength']) == (trend, pytest.approx(strength))
+            assert metrics['vol_percentile'] == _calculate_vol_percentile(returns)
+
+    @pytest.mark.asyncio
+    async def test_portfolio_returns_match_get_returns(self, monkeypatch):
+        symbols = ['AAPL', 'GAPPY', 'TREND']
+        cache = _price_cache(symbols)
+        monkeypatch.setattr(volatility_analytics, '_fetch_yang_zhang_volatilities', AsyncMock(return_value={}))
+        table = await calculate_symbol_volatilities(MagicMock(), symbols, CALC_DATE, price_cache=cache)
+
+        start = CALC_DATE - timedelta(days=volatility_analytics.VOLATILITY_LOOKBACK_DAYS)
+        expected = await get_returns(MagicMock(), ['GAPPY', 'TREND'], start, CALC_DATE, align_dates=False,
+                                     price_cache=cache)
+
+        pd.testing.assert_frame_equal(table.portfolio_returns(['TREND', 'GAPPY']), expected)
+
+
+class TestPortfolioVolatilityBatch:
+    """Positions read shared symbol metrics"""
+
+    @pytest.mark.asyncio
+    async def test_positions_share_symbol_metrics(self, monkeypatch):
+        portfolio_id = uuid4()
+        positions = [
+            SimpleNamespace(id=uuid4(), symbol='AAPL', underlying_symbol=None),
+            SimpleNamespace(id=uuid4(), symbol='AAPL250117C00200000', underlying_symbol='AAPL'),
+            SimpleNamespace(id=uuid4(), symbol='NEWCO', underlying_symbol=None),
+        ]
+        db = MagicMock()
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = positions
+        db.execute = AsyncMock(return_value=result)
+        saved = []
+        monkeypatch.setattr(volatility_analytics, 'save_position_volatility',
+                            AsyncMock(side_effect=lambda _db, data: saved.append(data) or True))
+        portfolio_vol = AsyncMock(return_value={'realized_volatility_21d': 0.2})
+        monkeypatch.setattr(volatility_analytics, 'calculate_portfolio_volatility', portfolio_vol)
+        table = SymbolVolatilityTable(
+            calculation_date=CALC_DATE,
+            prices=pd.DataFrame(),
+            metrics={'AAPL': {'realized_vol_21d': 0.25, 'observations': 250}},
+            failures={'NEWCO': {'reason': 'insufficient_observations', 'observations': 29, 'symbol': 'NEWCO'}},
+        )
+
+        outcome = await calculate_portfolio_volatility_batch(db, portfolio_id, CALC_DATE, symbol_volatility=table)
+
+        assert outcome['success'] and outcome['positions_processed'] == 2
+        assert [d['position_id'] for d in saved] == [positions[0].id, positions[1].id]
+        assert all(d['realized_vol_21d'] == 0.25 for d in saved)
+        assert outcome['failure_reasons'][0]['reason'] == 'insufficient_observations'
+        assert portfolio_vol.await_args.kwargs['symbol_volatility'] is table